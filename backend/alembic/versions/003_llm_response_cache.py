@@ -0,0 +1,45 @@
+"""Create LLM response cache table
+
+Revision ID: 003_llm_response_cache
+Revises: 002_rag_vector_indexes
+Create Date: 2024-02-05 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '003_llm_response_cache'
+down_revision = '002_rag_vector_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute('''
+        CREATE TABLE IF NOT EXISTS llm_response_cache (
+            key VARCHAR PRIMARY KEY,
+            model VARCHAR NOT NULL,
+            response_text TEXT NOT NULL,
+            created_at DOUBLE PRECISION NOT NULL,
+            expires_at DOUBLE PRECISION NOT NULL,
+            last_accessed_at DOUBLE PRECISION NOT NULL
+        )
+    ''')
+    
+    # TTL purge and LRU eviction scans
+    op.execute('''
+        CREATE INDEX IF NOT EXISTS ix_llm_response_cache_expires_at 
+        ON llm_response_cache (expires_at)
+    ''')
+    
+    op.execute('''
+        CREATE INDEX IF NOT EXISTS ix_llm_response_cache_last_accessed_at 
+        ON llm_response_cache (last_accessed_at)
+    ''')
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS ix_llm_response_cache_last_accessed_at')
+    op.execute('DROP INDEX IF EXISTS ix_llm_response_cache_expires_at')
+    op.execute('DROP TABLE IF EXISTS llm_response_cache')
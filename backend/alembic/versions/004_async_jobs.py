@@ -0,0 +1,47 @@
+"""Create durable async job table
+
+Revision ID: 004_async_jobs
+Revises: 003_llm_response_cache
+Create Date: 2024-02-19 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '004_async_jobs'
+down_revision = '003_llm_response_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute('''
+        CREATE TABLE IF NOT EXISTS async_jobs (
+            id VARCHAR PRIMARY KEY,
+            user_id VARCHAR NOT NULL,
+            job_type VARCHAR NOT NULL,
+            status VARCHAR NOT NULL,
+            created_at TIMESTAMP NOT NULL,
+            updated_at TIMESTAMP NOT NULL,
+            data JSON NOT NULL
+        )
+    ''')
+
+    # Per-user job listings, newest first
+    op.execute('''
+        CREATE INDEX IF NOT EXISTS ix_async_jobs_user_id_created_at
+        ON async_jobs (user_id, created_at)
+    ''')
+
+    # Per-status counters in the system stats
+    op.execute('''
+        CREATE INDEX IF NOT EXISTS ix_async_jobs_status
+        ON async_jobs (status)
+    ''')
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS ix_async_jobs_status')
+    op.execute('DROP INDEX IF EXISTS ix_async_jobs_user_id_created_at')
+    op.execute('DROP TABLE IF EXISTS async_jobs')
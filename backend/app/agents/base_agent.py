@@ -1,10 +1,25 @@
+import asyncio
+import json
+import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
-from pydantic import BaseModel
+from dataclasses import dataclass
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+from pydantic import BaseModel, Field
+from app.agents.clause_segmenter import Clause, clause_segmenter
 from app.agents.entity_classifier import EntityClassifier, EntityInfo
+from app.agents.intent_router import Intent, intent_router
+from app.agents.model_router import model_router
 from app.legal.terms_of_service import terms_service, ServiceType, UserType
 from app.legal.privacy_service import privacy_service, DataCategory, ProcessingPurpose, LegalBasis
 from app.legal.bias_auditor import bias_auditor, BiasAuditResult
+from app.core.config import settings
+from app.services.clause_library import clause_library
+from app.services.llm_cache import llm_cache
+from app.services.llm_gateway import LLMDeadlineExceeded, llm_gateway
+from app.services.mock_llm_service import mock_llm_service
+
+logger = logging.getLogger(__name__)
 
 class ContractAnalysis(BaseModel):
     """Standard contract analysis response format"""
@@ -16,12 +31,82 @@ class ContractAnalysis(BaseModel):
     recommendations: List[str]
     clauses_analysis: List[Dict[str, Any]]
     confidence_score: float
+    metadata: Dict[str, Any] = Field(default_factory=dict)  # e.g. stage_timings
+
+@dataclass
+class AnalysisStage:
+    """Independent unit of pre-LLM work executed by run_stage_graph"""
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    timeout: float
+    default: Any = None  # Used when the stage times out or fails
 
 class BaseContractAgent(ABC):
     """Base class for all contract analysis agents with RAG integration"""
     
+    # Declarative intent table used by generate_response (see IntentRouter)
+    INTENTS: List[Intent] = []
+    
+    # Per-stage deadlines (seconds) for the concurrent pre-LLM stages
+    STAGE_TIMEOUTS: Dict[str, float] = {
+        "entities": 2.0,
+        "rag_context": 8.0,
+        "precedents": 5.0,
+    }
+    
+    # Long contracts are analysed clause by clause (map-reduce) instead of in one prompt
+    CLAUSE_SEGMENTATION_MIN_CHARS = 8000
+    CLAUSE_CONCURRENCY = 4
+    LEGAL_DOMAIN = "contratos de consumo"
+    
+    # Shared analysis method; agents place it in their static prompt prefix, ahead of the schema
+    ANALYSIS_GUIDELINES = """
+        DIRETRIZES GERAIS DE ANÁLISE (aplicáveis a qualquer contrato):
+
+        Critérios de severidade:
+        - high: cláusula nula de pleno direito ou contrária a norma de ordem pública; renúncia a direito irrenunciável; penalidade que gere perda financeira relevante ou irreversível; restrição ao acesso à Justiça ou a direitos essenciais da parte aderente.
+        - medium: cláusula desequilibrada, ambígua ou dependente de interpretação; obrigação desproporcional que pode ser reduzida judicialmente; omissão de informação relevante que dificulte a decisão da parte aderente.
+        - low: prática usual de mercado que merece atenção; redação imprecisa sem impacto financeiro direto; ponto informativo ou positivo.
+        - Em caso de dúvida entre dois níveis, escolha o mais grave e explique o motivo na descrição.
+
+        Evidência e fidelidade ao texto:
+        - Baseie cada achado em trecho literal do contrato, reproduzido no campo "clause" (no máximo duas frases).
+        - Nunca invente cláusulas, valores, prazos ou partes; se o texto estiver ilegível ou truncado, diga isso.
+        - Cláusulas ausentes que a legislação ou a boa prática exigem também são achados: descreva a omissão e use "cláusula ausente" no campo "clause".
+        - Valores e percentuais devem ser transcritos como aparecem; cálculos próprios devem ser indicados como estimativa.
+
+        Base legal:
+        - Indique o dispositivo aplicável (lei, artigo, súmula, resolução) sempre que conhecido com segurança.
+        - Se não tiver certeza do artigo, cite apenas a norma; não invente numeração, datas ou ementas.
+        - O contexto de conhecimento especializado enviado junto com o contrato prevalece sobre conhecimento genérico quando for mais específico, mas nunca sobre o texto do próprio contrato.
+        - Cláusulas de contratos de adesão devem ser interpretadas da forma mais favorável ao aderente (art. 423 do Código Civil e art. 47 do CDC).
+
+        Recomendações:
+        - Escreva recomendações acionáveis, dirigidas à parte aderente (consumidor, locatário, cliente), em linguagem simples.
+        - Sempre que possível, sugira redação alternativa para a cláusula problemática ou o documento a solicitar à outra parte.
+        - Indique quando o caso exige orientação profissional individual (advogado, Procon, Defensoria Pública ou agência reguladora).
+
+        Calibração do confidence_score:
+        - 0.90 a 1.00: contrato completo, legível e claramente do tipo analisado.
+        - 0.70 a 0.89: lacunas, anexos mencionados e não enviados, ou trechos ambíguos.
+        - abaixo de 0.70: texto truncado, erros de OCR, tipo de contrato incerto ou informações essenciais ausentes.
+
+        Forma da resposta:
+        - Português do Brasil, sem markdown dentro dos campos do JSON e sem texto fora do JSON.
+        - Ordene risk_factors do mais grave para o menos grave; key_findings com 3 a 7 itens objetivos.
+        - Em clauses_analysis, priorize as cláusulas com risco; não repita cláusulas neutras.
+        - Não reproduza dados pessoais (CPF, RG, endereço completo, dados bancários) nos campos de saída; substitua por [omitido].
+        """
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Register intent tables at import time so the shared index is built once
+        if cls.__dict__.get("INTENTS"):
+            intent_router.register(cls.__name__, cls.INTENTS)
+    
     def __init__(self, claude_client, rag_service, db_session=None):
-        self.claude_client = claude_client
+        # Without an injected client, calls go through the shared pooled gateway
+        self.claude_client = claude_client or llm_gateway.as_client()
         self.rag_service = rag_service
         self.db = db_session
         self.agent_type = self.__class__.__name__.replace("Agent", "").lower()
@@ -38,6 +123,442 @@ class BaseContractAgent(ABC):
         """Get the specialized prompt for this agent type"""
         pass
     
+    def get_prompt_prefix(self) -> str:
+        """Static head of the analysis prompt: instructions, legal guidelines and output schema
+        
+        Must not depend on the request, so the provider can serve it from its prompt cache;
+        everything variable belongs in the suffix that follows it.
+        """
+        return ""
+    
+    @staticmethod
+    def _join_prompt(system: Optional[str], prompt: str) -> str:
+        return f"{system}\n\n{prompt}" if system else prompt
+    
+    def respond_to_intent(self, question: str) -> Optional[str]:
+        """Return the template for the best matching intent, or None"""
+        return intent_router.respond(type(self).__name__, question)
+    
+    async def _complete(self, prompt: str, model: str = "claude-3-5-sonnet-20241022",
+                        max_tokens: int = 4000, temperature: float = 0.1,
+                        system: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        """Send a prompt to Claude through the shared response cache and return the text
+        
+        `system` is the stable prompt prefix. Gateway clients receive it separately (marked
+        for provider-side prompt caching), along with the deadline and the hedging flag;
+        other clients get it prepended to the prompt. Raises LLMDeadlineExceeded after
+        `timeout` seconds. A hedged reply from the fallback model is cached under that
+        model's key, never under `model`.
+        """
+
+        async def _call() -> Tuple[str, str]:
+            if getattr(self.claude_client, "supports_prompt_prefix", False):
+                extra = {"agent": self.agent_type, "hedge": settings.LLM_HEDGING_ENABLED,
+                         "timeout": timeout}
+                if system:
+                    extra["system"] = system
+                content = prompt
+            else:
+                extra = {}
+                content = self._join_prompt(system, prompt)
+            call = self.claude_client.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": content}],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **extra
+            )
+            if timeout is not None and not extra:
+                # The gateway enforces the deadline itself; other clients are bounded here
+                call = asyncio.wait_for(call, timeout)
+            try:
+                response = await call
+            except asyncio.TimeoutError:
+                raise LLMDeadlineExceeded(f"No LLM response within {timeout}s")
+            # Gateway replies name the model that answered (the hedge may have won)
+            return response.content[0].text, response.model if extra else model
+
+        return await llm_cache.get_or_create(
+            model=model,
+            temperature=temperature,
+            prompt=self._join_prompt(system, prompt),
+            factory=_call,
+            agent=self.agent_type
+        )
+
+    async def _complete_json(self, prompt: str, model: str = "claude-3-5-sonnet-20241022",
+                             max_tokens: int = 4000, temperature: float = 0.1,
+                             system: Optional[str] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Like _complete, but parse a JSON reply and never keep an unparseable one cached"""
+        text = await self._complete(prompt, model, max_tokens, temperature, system, timeout)
+        try:
+            return json.loads(text.strip())
+        except ValueError:
+            await llm_cache.invalidate(model, temperature, self._join_prompt(system, prompt))
+            raise
+
+    async def _complete_analysis(self, prompt: str, contract_text: str,
+                                 context: Dict[str, Any] = None,
+                                 system: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Answer the analysis prompt on the cheapest route that clears the router's thresholds
+        
+        Returns the parsed analysis and a routing record (routes tried, reasons, cost).
+        All routes share one hard deadline; once it passes, LLMDeadlineExceeded propagates
+        so the caller can fall back to `_create_fallback_analysis` instead of escalating.
+        """
+        deadline = time.monotonic() + settings.LLM_ANALYSIS_DEADLINE_SECONDS
+        if not settings.MODEL_ROUTING_ENABLED:
+            analysis_data = await self._complete_json(
+                prompt, system=system, timeout=settings.LLM_ANALYSIS_DEADLINE_SECONDS
+            )
+            return analysis_data, {"route": "full", "attempts": []}
+        
+        full_prompt = self._join_prompt(system, prompt)
+        routes = model_router.plan(contract_text, context)
+        attempts = []
+        for position, route in enumerate(routes):
+            is_last = position == len(routes) - 1
+            started = time.perf_counter()
+            try:
+                if route.model is None:
+                    analysis_data = await self._rule_based_analysis(contract_text, context)
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise LLMDeadlineExceeded("Analysis deadline exceeded before the LLM call")
+                    analysis_data = await self._complete_json(prompt, model=route.model,
+                                                              max_tokens=route.max_tokens,
+                                                              system=system, timeout=remaining)
+            except Exception as e:
+                model_router.record(route, time.perf_counter() - started, "error", full_prompt)
+                attempts.append({"route": route.name, "outcome": "error", "error": str(e)})
+                if is_last or isinstance(e, LLMDeadlineExceeded):
+                    raise
+                continue
+            
+            # The last route is always accepted: there is nothing left to escalate to
+            reason = None if is_last else model_router.escalation_reason(route, analysis_data, context)
+            outcome = "escalated" if reason else "accepted"
+            cost = model_router.record(route, time.perf_counter() - started, outcome, full_prompt,
+                                       json.dumps(analysis_data, ensure_ascii=False), reason)
+            attempts.append({
+                "route": route.name,
+                "outcome": outcome,
+                "reason": reason,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                "estimated_cost_usd": round(cost, 6)
+            })
+            if reason is None:
+                return analysis_data, {"route": route.name, "model": route.model or "rules", "attempts": attempts}
+    
+    async def _rule_based_analysis(self, contract_text: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Deterministic keyword analysis in the same JSON shape as the LLM prompts"""
+        result = await mock_llm_service.analyze_contract(contract_text, self.agent_type)
+        risk_factors = [
+            {
+                "type": "padrao_contratual",
+                "description": item["description"],
+                "severity": severity,
+                "clause": item["context"],
+                "recommendation": item["recommendation"]
+            }
+            for severity, items in result["risk_analysis"].items()
+            if severity != "low"  # "low" são pontos positivos, não riscos
+            for item in items
+        ]
+        return {
+            "summary": result["summary"],
+            "key_findings": [point["content"] for point in result["key_points"]],
+            "risk_factors": risk_factors,
+            "recommendations": result["recommendations"],
+            "clauses_analysis": [],
+            "confidence_score": model_router.classification_confidence(context or {})
+        }
+    
+    async def _stream_complete(self, prompt: str, model: str = "claude-3-5-sonnet-20241022",
+                               max_tokens: int = 4000, temperature: float = 0.1) -> AsyncIterator[str]:
+        """Streaming counterpart of _complete: yield text deltas, caching the full reply"""
+        cacheable = llm_cache.is_cacheable(temperature)
+        if cacheable:
+            cached = await llm_cache.get(model, temperature, prompt, agent=self.agent_type)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        stream = getattr(self.claude_client.completions, "stream", None)
+        if stream is None:
+            # Injected clients without streaming support answer in a single chunk
+            response = await self.claude_client.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+            parts.append(response.content[0].text)
+            yield parts[0]
+        else:
+            extra = {"agent": self.agent_type} if getattr(self.claude_client, "supports_prompt_prefix", False) else {}
+            async for delta in stream(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **extra
+            ):
+                parts.append(delta)
+                yield delta
+
+        if cacheable:
+            await llm_cache.set(model, temperature, prompt, "".join(parts))
+
+    async def stream_response(self, question: str, contract_text: str = "") -> AsyncIterator[str]:
+        """Yield the chat answer for a question incrementally"""
+        generate_response = getattr(self, "generate_response", None)
+        if generate_response is not None:
+            # Template answers are ready at once; send them paragraph by paragraph
+            for chunk in generate_response(question, contract_text).splitlines(keepends=True):
+                yield chunk
+            return
+
+        prompt = self.get_chat_prompt(question, contract_text)
+        async for delta in self._stream_complete(prompt, max_tokens=2000):
+            yield delta
+
+    def get_chat_prompt(self, question: str, contract_text: str = "") -> str:
+        """Prompt for free-form chat answers from LLM-backed agents"""
+        specialization = getattr(self, "specialization", self.agent_type)
+        contract_section = f"""
+        Trecho do contrato do usuário:
+        {contract_text[:4000]}
+        """ if contract_text else ""
+
+        return f"""
+        Você é um especialista em contratos de {specialization} no Brasil e responde dúvidas de consumidores em linguagem simples, citando a base legal quando aplicável.
+        {contract_section}
+        Pergunta do usuário:
+        {question}
+        """
+
+    def get_analysis_stages(self, contract_text: str, analysis_type: str = "analysis",
+                            context: Dict[str, Any] = None) -> List[AnalysisStage]:
+        """Independent stages that feed the analysis prompt"""
+        return [
+            AnalysisStage("entities", lambda: self._scan_entities(contract_text, context),
+                          self.STAGE_TIMEOUTS["entities"]),
+            AnalysisStage("rag_context", lambda: self.get_enriched_context(contract_text, analysis_type),
+                          self.STAGE_TIMEOUTS["rag_context"], default=""),
+            AnalysisStage("precedents", lambda: self.get_legal_precedents(contract_text[:1000]),
+                          self.STAGE_TIMEOUTS["precedents"], default=[]),
+        ]
+    
+    async def run_stage_graph(self, stages: List[AnalysisStage]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """
+        Run independent stages concurrently, each under its own deadline
+        
+        A stage that times out or fails yields its default so the analysis can
+        still proceed. Returns (results by stage name, timings by stage name).
+        """
+        
+        async def _run(stage: AnalysisStage):
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(stage.run(), stage.timeout)
+                status = "ok"
+            except asyncio.TimeoutError:
+                result, status = stage.default, "timeout"
+                logger.warning(f"Stage {stage.name} of {self.agent_type} exceeded {stage.timeout}s")
+            except Exception as e:
+                result, status = stage.default, "error"
+                logger.warning(f"Stage {stage.name} of {self.agent_type} failed: {e}")
+            
+            return stage.name, result, {
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                "status": status,
+                "timeout_s": stage.timeout
+            }
+        
+        outcomes = await asyncio.gather(*(_run(stage) for stage in stages))
+        results = {name: result for name, result, _ in outcomes}
+        timings = {name: timing for name, _, timing in outcomes}
+        return results, timings
+    
+    def should_segment(self, contract_text: str) -> bool:
+        """Whether the contract is long enough for clause-by-clause analysis"""
+        return len(contract_text) >= self.CLAUSE_SEGMENTATION_MIN_CHARS
+    
+    async def analyze_contract_by_clauses(self, contract_text: str,
+                                          context: Dict[str, Any] = None) -> Optional[ContractAnalysis]:
+        """
+        Map-reduce analysis: each clause gets its own retrieval and LLM call
+        (at most CLAUSE_CONCURRENCY in flight), then results are merged.
+        
+        Returns None when the text does not split into clauses, so callers can
+        fall back to single-prompt analysis.
+        """
+        clauses = clause_segmenter.segment(contract_text)
+        # The preamble (parties, qualification) carries no obligations to assess
+        clauses = [clause for clause in clauses if clause.number is not None]
+        if len(clauses) < 2:
+            return None
+        
+        semaphore = asyncio.Semaphore(self.CLAUSE_CONCURRENCY)
+        
+        async def _map(clause: Clause) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await self.analyze_clause(clause)
+                except Exception as e:
+                    logger.warning(f"Clause {clause.heading!r} analysis failed: {e}")
+                    return {"error": str(e)}
+        
+        started = time.perf_counter()
+        results = await asyncio.gather(*(_map(clause) for clause in clauses))
+        map_ms = round((time.perf_counter() - started) * 1000, 1)
+        
+        failed = [result["error"] for result in results if "error" in result]
+        if len(failed) == len(results):
+            fallback = getattr(self, "_create_fallback_analysis", None)
+            if fallback is None:
+                raise RuntimeError(failed[0])
+            analysis = fallback(contract_text, failed[0])
+        else:
+            analysis = self._reduce_clause_results(clauses, results)
+        
+        analysis.metadata.update({
+            "segmented": True,
+            "clause_count": len(clauses),
+            "failed_clauses": len(failed),
+            "clause_concurrency": self.CLAUSE_CONCURRENCY,
+            "stage_timings": {"clause_map": {"duration_ms": map_ms, "status": "ok" if not failed else "partial"}}
+        })
+        return analysis
+    
+    async def analyze_clause(self, clause: Clause) -> Dict[str, Any]:
+        """Verdict for a single clause: standard-clause library first, LLM only on a miss"""
+        if settings.CLAUSE_LIBRARY_ENABLED:
+            match = await clause_library.lookup(clause.text, self.agent_type)
+            if match:
+                return clause_library.verdict_for(*match)
+        
+        try:
+            rag_context = await asyncio.wait_for(
+                self.get_rag_context(clause.text), self.STAGE_TIMEOUTS["rag_context"]
+            )
+        except Exception:
+            rag_context = ""
+        
+        verdict = await self._complete_json(self.get_clause_prompt(clause, rag_context), max_tokens=1000)
+        if settings.CLAUSE_LIBRARY_ENABLED:
+            # Queued for review; approved verdicts are served from the library next time
+            clause_library.record_miss(clause.text, verdict, self.agent_type)
+        return verdict
+    
+    def get_clause_prompt(self, clause: Clause, rag_context: str = "") -> str:
+        """Prompt for analysing one clause in isolation"""
+        return f"""
+        Você é um especialista em {self.LEGAL_DOMAIN} no Brasil. Analise APENAS a cláusula abaixo, considerando o Código de Defesa do Consumidor, o Código Civil e a regulamentação setorial aplicável.
+
+        Contexto de conhecimento especializado:
+        {rag_context}
+
+        Cláusula ({clause.heading}):
+        {clause.text}
+
+        Responda APENAS com um JSON válido no seguinte formato:
+        {{
+            "analysis": "análise da cláusula",
+            "risk_level": "alto|médio|baixo",
+            "legal_basis": "base legal aplicável",
+            "key_finding": "achado principal em uma frase (ou vazio)",
+            "risk_factors": [
+                {{
+                    "type": "tipo_do_risco",
+                    "description": "descrição detalhada",
+                    "severity": "high|medium|low",
+                    "recommendation": "recomendação específica"
+                }}
+            ],
+            "confidence_score": 0.9
+        }}
+        """
+    
+    def _reduce_clause_results(self, clauses: List[Clause],
+                               results: List[Dict[str, Any]]) -> ContractAnalysis:
+        """Merge per-clause verdicts into a single ContractAnalysis"""
+        clauses_analysis = []
+        risk_factors = []
+        findings_by_level: Dict[str, List[str]] = {"alto": [], "médio": [], "baixo": []}
+        recommendations: List[str] = []
+        confidences = []
+        
+        for clause, result in zip(clauses, results):
+            if "error" in result:
+                clauses_analysis.append({
+                    "clause": clause.heading,
+                    "clause_number": clause.number,
+                    "analysis": "Análise indisponível para esta cláusula",
+                    "risk_level": "indeterminado",
+                    "legal_basis": ""
+                })
+                continue
+            
+            risk_level = result.get("risk_level", "baixo")
+            clauses_analysis.append({
+                "clause": clause.heading,
+                "clause_number": clause.number,
+                "analysis": result.get("analysis", ""),
+                "risk_level": risk_level,
+                "legal_basis": result.get("legal_basis", "")
+            })
+            
+            for risk_factor in result.get("risk_factors", []):
+                risk_factors.append({**risk_factor, "clause": risk_factor.get("clause") or clause.heading})
+                recommendation = risk_factor.get("recommendation")
+                if recommendation and recommendation not in recommendations:
+                    recommendations.append(recommendation)
+            
+            if result.get("key_finding"):
+                findings_by_level.setdefault(risk_level, []).append(result["key_finding"])
+            confidences.append(result.get("confidence_score", 0.0))
+        
+        high = sum(1 for item in clauses_analysis if item["risk_level"] == "alto")
+        medium = sum(1 for item in clauses_analysis if item["risk_level"] == "médio")
+        key_findings = [finding for findings in findings_by_level.values() for finding in findings]
+        
+        return ContractAnalysis(
+            contract_type=self.agent_type,
+            risk_level=self._calculate_risk_level(risk_factors),
+            summary=(f"Contrato analisado em {len(clauses)} cláusulas: "
+                     f"{high} com risco alto e {medium} com risco médio."),
+            key_findings=key_findings[:10],
+            risk_factors=risk_factors,
+            recommendations=recommendations[:10],
+            clauses_analysis=clauses_analysis,
+            # Clauses that could not be analysed lower the overall confidence
+            confidence_score=sum(confidences) / len(clauses)
+        )
+    
+    async def _scan_entities(self, contract_text: str, context: Dict[str, Any] = None) -> EntityInfo:
+        """Entity scan off the event loop; reuses (and shares) the result via context"""
+        if context is not None and context.get("entity_info") is not None:
+            return context["entity_info"]
+        
+        entity_info = await asyncio.to_thread(self.entity_classifier.identify_entities, contract_text)
+        if context is not None:
+            context["entity_info"] = entity_info
+        return entity_info
+    
+    def _format_precedents_for_prompt(self, precedents: List[Dict[str, Any]]) -> str:
+        """Format legal precedents for use in prompts"""
+        if not precedents:
+            return ""
+        
+        formatted = "## PRECEDENTES:\n"
+        for precedent in precedents:
+            formatted += f"- {precedent['court']} ({precedent['case_reference']}): {precedent['content']}\n"
+        return formatted + "\n"
+    
     async def get_enriched_context(self, contract_text: str, analysis_type: str = "analysis") -> Dict[str, Any]:
         """Get enriched context from RAG knowledge base"""
         if not self.db:
@@ -105,12 +626,16 @@ class BaseContractAgent(ABC):
         """
         Enhanced analysis that considers entity types (CPF/CNPJ) and legal framework
         """
-        # Identify entities first
-        entity_info = self.entity_classifier.identify_entities(contract_text)
+        # Agents running the stage graph leave their entity scan in the context
+        context = dict(context or {})
         
         # Perform base analysis
         base_analysis = await self.analyze_contract(contract_text, context)
         
+        entity_info = context.get("entity_info")
+        if entity_info is None:
+            entity_info = self.entity_classifier.identify_entities(contract_text)
+        
         # Enhance analysis with entity-specific considerations
         enhanced_analysis = self._enhance_with_entity_context(base_analysis, entity_info)
         
@@ -1,6 +1,8 @@
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.agents.base_agent import BaseContractAgent
+from app.agents.clause_segmenter import clause_segmenter
+from app.agents.embedding_classifier import contract_type_classifier
 from app.core.config import settings
 
 class ClassifierAgent(BaseContractAgent):
@@ -29,8 +31,11 @@ class ClassifierAgent(BaseContractAgent):
         best_type = max(scores, key=scores.get)
         confidence = scores[best_type] / len(self.CONTRACT_TYPES[best_type])
         
-        # Use Claude for confirmation if confidence is low
+        # Low keyword confidence: try the local embedding classifier, then Claude
         if confidence < 0.3:
+            embedding_classification = self._embedding_classify(contract_text)
+            if embedding_classification is not None:
+                return embedding_classification
             claude_classification = await self._claude_classify(contract_text)
             return claude_classification
         
@@ -40,6 +45,21 @@ class ClassifierAgent(BaseContractAgent):
             "method": "keyword_matching"
         }
     
+    def _embedding_classify(self, contract_text: str) -> Optional[Dict[str, Any]]:
+        """kNN over labelled example contracts; None when the result is still ambiguous"""
+        if not settings.EMBEDDING_CLASSIFIER_ENABLED:
+            return None
+        
+        prediction = contract_type_classifier.classify(contract_text)
+        if prediction.label is None or prediction.confidence < settings.EMBEDDING_CLASSIFIER_MIN_CONFIDENCE:
+            return None
+        return {
+            "contract_type": prediction.label,
+            "confidence": prediction.confidence,
+            "method": prediction.method,
+            "scores": prediction.scores
+        }
+    
     async def _claude_classify(self, contract_text: str) -> Dict[str, Any]:
         """Use Claude for contract classification when keyword matching is uncertain"""
         
@@ -54,24 +74,16 @@ class ClassifierAgent(BaseContractAgent):
         - servicos: Contratos de prestação de serviços empresariais
         - compra_venda: Contratos de compra e venda de produtos/mercadorias
         
-        Contrato:
-        {contract_text[:2000]}...
+        Contrato (início e títulos das cláusulas):
+        {clause_segmenter.outline(contract_text, max_chars=2000)}...
         
         Responda APENAS com um JSON no formato:
         {{"contract_type": "categoria", "confidence": 0.95, "reasoning": "breve explicação"}}
         """
         
         try:
-            response = await self.claude_client.completions.create(
-                model="claude-3-sonnet-20240229",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=200,
-                temperature=0.1
-            )
-            
-            # Parse JSON response
-            import json
-            result = json.loads(response.content[0].text.strip())
+            # Parse JSON response (cached per prompt fingerprint)
+            result = await self._complete_json(prompt, max_tokens=200)
             result["method"] = "claude_classification"
             return result
             
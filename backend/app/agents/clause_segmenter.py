@@ -0,0 +1,138 @@
+import re
+from typing import List, Optional
+from dataclasses import dataclass
+
+@dataclass
+class Clause:
+    """A contract clause (or paragraph) located by ClauseSegmenter"""
+    index: int
+    heading: str  # Primeira linha: "CLÁUSULA 3ª - DA MULTA", "§ 2º", "4.1", "Preâmbulo"
+    text: str
+    start: int
+    end: int
+    number: Optional[str] = None  # "3", "2", "4.1"
+    parent: Optional[str] = None  # Cláusula a que um § pertence
+
+class ClauseSegmenter:
+    """Splits contract text into clauses at "CLÁUSULA", "§" and numbered-item boundaries"""
+
+    # Marcadores válidos apenas no início de linha
+    CLAUSE_PATTERN = re.compile(
+        r'^[ \t]*(?:CL[ÁA]USULA|Cl[áa]usula)\s+'
+        r'(?P<clause>\d+|[IVXLC]+\b|[A-ZÀ-Úa-zà-ú]+)[ªºo°]?',
+        re.MULTILINE
+    )
+    PARAGRAPH_PATTERN = re.compile(
+        r'^[ \t]*(?:§\s*(?P<paragraph>\d+)[ºo°]?|PAR[ÁA]GRAFO\s+[ÚU]NICO|Par[áa]grafo\s+[úu]nico)',
+        re.MULTILINE
+    )
+    NUMBERED_PATTERN = re.compile(
+        r'^[ \t]*(?P<item>\d{1,3}(?:\.\d{1,3})*)[.)\-–]?\s+(?=[A-ZÀ-Ú])',
+        re.MULTILINE
+    )
+
+    def __init__(self, min_clause_chars: int = 80, max_clause_chars: int = 6000):
+        self.min_clause_chars = min_clause_chars
+        self.max_clause_chars = max_clause_chars
+
+    def segment(self, text: str) -> List[Clause]:
+        """Return clauses in document order; text before the first marker becomes the preamble"""
+
+        if not text or not text.strip():
+            return []
+
+        boundaries = self._find_boundaries(text)
+        if not boundaries or boundaries[0][0] > 0:
+            boundaries.insert(0, (0, None, None))
+
+        clauses: List[Clause] = []
+        current_parent = None
+        for position, (start, kind, number) in enumerate(boundaries):
+            end = boundaries[position + 1][0] if position + 1 < len(boundaries) else len(text)
+            body = text[start:end].strip()
+            if not body:
+                continue
+
+            if kind == "clause":
+                current_parent = number
+            heading = body.splitlines()[0].strip()[:120] if kind else "Preâmbulo"
+
+            # Trechos muito curtos (títulos soltos, numeração de página) são anexados ao anterior
+            if clauses and kind != "clause" and len(body) < self.min_clause_chars:
+                previous = clauses[-1]
+                previous.text = text[previous.start:end].strip()
+                previous.end = end
+                continue
+
+            clauses.append(Clause(
+                index=len(clauses),
+                heading=heading,
+                text=body,
+                start=start,
+                end=end,
+                number=number,
+                parent=current_parent if kind == "paragraph" else None
+            ))
+
+        return self._split_oversized(clauses)
+
+    def outline(self, text: str, max_chars: int = 2000) -> str:
+        """Compact view of the whole contract: preamble start plus every clause heading"""
+
+        clauses = self.segment(text)
+        if len(clauses) < 2:
+            return text[:max_chars]
+
+        lines = [clauses[0].text[:max_chars // 2]]
+        for clause in clauses[1:]:
+            lines.append(clause.heading)
+
+        return "\n".join(lines)[:max_chars]
+
+    def _find_boundaries(self, text: str) -> List[tuple]:
+        boundaries = {}
+        for match in self.NUMBERED_PATTERN.finditer(text):
+            boundaries[match.start()] = (match.start(), "item", match.group("item"))
+        for match in self.PARAGRAPH_PATTERN.finditer(text):
+            boundaries[match.start()] = (match.start(), "paragraph", match.group("paragraph") or "único")
+        # "CLÁUSULA" tem precedência quando coincide com outro marcador
+        for match in self.CLAUSE_PATTERN.finditer(text):
+            boundaries[match.start()] = (match.start(), "clause", match.group("clause"))
+
+        return [boundaries[position] for position in sorted(boundaries)]
+
+    def _split_oversized(self, clauses: List[Clause]) -> List[Clause]:
+        """Split clauses longer than max_clause_chars at paragraph breaks"""
+
+        result: List[Clause] = []
+        for clause in clauses:
+            if len(clause.text) <= self.max_clause_chars:
+                result.append(clause)
+                continue
+
+            part_start = 0
+            while part_start < len(clause.text):
+                part_end = min(part_start + self.max_clause_chars, len(clause.text))
+                if part_end < len(clause.text):
+                    cut = clause.text.rfind("\n", part_start + self.max_clause_chars // 2, part_end)
+                    part_end = cut if cut > part_start else part_end
+
+                part = clause.text[part_start:part_end].strip()
+                if part:
+                    result.append(Clause(
+                        index=0,
+                        heading=clause.heading if part_start == 0 else f"{clause.heading} (cont.)",
+                        text=part,
+                        start=clause.start + part_start,
+                        end=clause.start + part_end,
+                        number=clause.number,
+                        parent=clause.parent
+                    ))
+                part_start = part_end
+
+        for index, clause in enumerate(result):
+            clause.index = index
+        return result
+
+# Instância global (sem estado)
+clause_segmenter = ClauseSegmenter()
@@ -1,45 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class ConsortiumAgent(BaseContractAgent):
     """Agente especializado em contratos de consórcio"""
     
-    def __init__(self):
-        self.specialization = "Consórcio"
-        self.icon = "🎯"
-        
-    def generate_response(self, question: str, contract_text: str = "") -> str:
-        """Gera resposta especializada para consórcios"""
-        
-        if not question:
-            return """🎯 **Consórcio - Análise Especializada**
-
-Olá! Sou especialista em contratos de consórcio. Posso ajudar com:
-
-**📋 Principais Análises:**
-• Taxa de administração e adesão
-• Prazo do grupo e modalidade de sorteio
-• Condições de contemplação e lance
-• Seguro prestamista e proteção
-• Desistência e transferência de cotas
-
-**⚠️ Pontos Críticos:**
-• Taxa de administração acima da média (máx. 25%)
-• Cláusulas abusivas de retenção de valores
-• Falta de transparência nos critérios de sorteio
-• Condições de seguro obrigatório
-
-**📞 Órgãos de Defesa:**
-• BACEN (Banco Central) - Regulamentação
-• ABAC (Associação Brasileira de Administradoras de Consórcio)
-• PROCON - Defesa do consumidor
-
-Como posso ajudar com seu consórcio?"""
-        
-        # Análise baseada na pergunta
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ['taxa', 'administração', 'adesão', 'percentual']):
-            return """💰 **Taxas no Consórcio**
+    INTENTS = [
+        Intent(
+            name="taxa",
+            keywords=['taxa', 'administração', 'adesão', 'percentual'],
+            template="""💰 **Taxas no Consórcio**
 
 **Taxa de Administração:**
 • **Limite legal**: Máximo 25% do valor do bem
@@ -79,10 +48,12 @@ Como posso ajudar com seu consórcio?"""
 **💡 Dica Importante:**
 Taxa menor nem sempre significa melhor negócio - analise todas as condições do grupo.
 
-Precisa que eu analise as taxas do seu consórcio específico?"""
-        
-        if any(word in question_lower for word in ['sorteio', 'contemplação', 'lance', 'como funciona']):
-            return """🎲 **Contemplação no Consórcio**
+Precisa que eu analise as taxas do seu consórcio específico?""",
+        ),
+        Intent(
+            name="sorteio",
+            keywords=['sorteio', 'contemplação', 'lance', 'como funciona'],
+            template="""🎲 **Contemplação no Consórcio**
 
 **Formas de Contemplação:**
 • **Sorteio**: Aleatório, sem custo adicional
@@ -126,10 +97,12 @@ Precisa que eu analise as taxas do seu consórcio específico?"""
 **💡 Dica Estratégica:**
 Estude histórico do grupo: quantos lances típicos, valores médios, frequência de contemplação.
 
-Precisa de orientação sobre estratégia de lances no seu grupo?"""
-        
-        if any(word in question_lower for word in ['desistir', 'desistência', 'cancelar', 'sair']):
-            return """❌ **Desistência do Consórcio**
+Precisa de orientação sobre estratégia de lances no seu grupo?""",
+        ),
+        Intent(
+            name="desistir",
+            keywords=['desistir', 'desistência', 'cancelar', 'sair'],
+            template="""❌ **Desistência do Consórcio**
 
 **Tipos de Saída:**
 • **Desistência antes da contemplação**
@@ -190,10 +163,12 @@ Lei 11.795/08 e Circular BACEN 3.432/09.
 **🚨 Importante:**
 Antes de desistir, calcule: pode ser melhor manter até contemplação ou transferir a cota.
 
-Precisa de ajuda para calcular os valores da sua desistência?"""
-        
-        if any(word in question_lower for word in ['bem', 'carta', 'crédito', 'usar', 'comprar']):
-            return """🏆 **Uso da Carta de Crédito**
+Precisa de ajuda para calcular os valores da sua desistência?""",
+        ),
+        Intent(
+            name="bem",
+            keywords=['bem', 'carta', 'crédito', 'usar', 'comprar'],
+            template="""🏆 **Uso da Carta de Crédito**
 
 **O que é a Carta de Crédito:**
 • **Documento**: Autorização para aquisição do bem
@@ -254,10 +229,12 @@ Precisa de ajuda para calcular os valores da sua desistência?"""
 • Confirme valor na tabela FIPE
 • Considere seguro obrigatório
 
-Precisa de orientação sobre como usar sua carta de crédito?"""
-        
-        if any(word in question_lower for word in ['inadimplência', 'atraso', 'exclusão', 'expulsão']):
-            return """⚠️ **Inadimplência e Exclusão do Consórcio**
+Precisa de orientação sobre como usar sua carta de crédito?""",
+        ),
+        Intent(
+            name="inadimplencia",
+            keywords=['inadimplência', 'atraso', 'exclusão', 'expulsão'],
+            template="""⚠️ **Inadimplência e Exclusão do Consórcio**
 
 **Regras de Inadimplência:**
 • **Atraso permitido**: Geralmente até 60 dias sem exclusão
@@ -319,7 +296,46 @@ Nunca deixe chegar à exclusão - negocie sempre antes do prazo limite!
 **⚖️ Base Legal:**
 Lei 11.795/08 e Circular BACEN 3.432/09.
 
-Está enfrentando dificuldades para pagar? Posso orientar sobre negociação!"""
+Está enfrentando dificuldades para pagar? Posso orientar sobre negociação!""",
+        ),
+    ]
+    
+    def __init__(self):
+        self.specialization = "Consórcio"
+        self.icon = "🎯"
+        
+    def generate_response(self, question: str, contract_text: str = "") -> str:
+        """Gera resposta especializada para consórcios"""
+        
+        if not question:
+            return """🎯 **Consórcio - Análise Especializada**
+
+Olá! Sou especialista em contratos de consórcio. Posso ajudar com:
+
+**📋 Principais Análises:**
+• Taxa de administração e adesão
+• Prazo do grupo e modalidade de sorteio
+• Condições de contemplação e lance
+• Seguro prestamista e proteção
+• Desistência e transferência de cotas
+
+**⚠️ Pontos Críticos:**
+• Taxa de administração acima da média (máx. 25%)
+• Cláusulas abusivas de retenção de valores
+• Falta de transparência nos critérios de sorteio
+• Condições de seguro obrigatório
+
+**📞 Órgãos de Defesa:**
+• BACEN (Banco Central) - Regulamentação
+• ABAC (Associação Brasileira de Administradoras de Consórcio)
+• PROCON - Defesa do consumidor
+
+Como posso ajudar com seu consórcio?"""
+        
+        # Análise baseada na pergunta
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
         
         # Resposta geral com análise do contrato se disponível
         if contract_text:
@@ -1,45 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class CreditCardAgent(BaseContractAgent):
     """Agente especializado em contratos de cartão de crédito"""
     
-    def __init__(self):
-        self.specialization = "Cartão de Crédito"
-        self.icon = "💳"
-        
-    def generate_response(self, question: str, contract_text: str = "") -> str:
-        """Gera resposta especializada para cartões de crédito"""
-        
-        if not question:
-            return """💳 **Cartão de Crédito - Análise Especializada**
-
-Olá! Sou especialista em contratos de cartão de crédito. Posso ajudar com:
-
-**📋 Principais Análises:**
-• Taxas e juros (rotativo, parcelado, saque)
-• Anuidades e isenções
-• Limite de crédito e alterações
-• Seguros e produtos opcionais
-• Programa de pontos e benefícios
-
-**⚠️ Pontos Críticos:**
-• Juros do rotativo (máximo de 8% ao mês)
-• Cobrança de seguros não solicitados
-• Alteração unilateral de condições
-• Taxas abusivas ou não informadas
-
-**📞 Órgãos de Defesa:**
-• BACEN (Banco Central) - Registrator
-• PROCON - Defesa do consumidor
-• SPC/SERASA - Negativação indevida
-
-Como posso ajudar com seu cartão de crédito?"""
-        
-        # Análise baseada na pergunta
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ['juros', 'taxa', 'rotativo', 'parcelamento', 'cet']):
-            return """📊 **Juros e Taxas do Cartão de Crédito**
+    INTENTS = [
+        Intent(
+            name="juros",
+            keywords=['juros', 'taxa', 'rotativo', 'parcelamento', 'cet'],
+            template="""📊 **Juros e Taxas do Cartão de Crédito**
 
 **Juros do Rotativo:**
 • Máximo de 8% ao mês (Resolução CMN 4.549/2017)
@@ -64,10 +33,12 @@ Como posso ajudar com seu cartão de crédito?"""
 **💡 Dica Importante:**
 Resolução CMN 4.549/2017 criou modalidade rotativo não remunerado (sem juros por 30 dias).
 
-Precisa calcular alguma taxa específica?"""
-        
-        if any(word in question_lower for word in ['anuidade', 'anivers', 'isenção', 'isento', 'grátis']):
-            return """💰 **Anuidade do Cartão de Crédito**
+Precisa calcular alguma taxa específica?""",
+        ),
+        Intent(
+            name="anuidade",
+            keywords=['anuidade', 'anivers', 'isenção', 'isento', 'grátis'],
+            template="""💰 **Anuidade do Cartão de Crédito**
 
 **Regras da Anuidade:**
 • Pode ser cobrada anualmente ou em parcelas
@@ -96,10 +67,12 @@ Precisa calcular alguma taxa específica?"""
 **📋 Regulamentação:**
 Circular BACEN 3.598/2013 sobre transparência em cartões.
 
-Tem dúvidas sobre isenção ou cobrança de anuidade?"""
-        
-        if any(word in question_lower for word in ['seguro', 'proteção', 'cobertura', 'opcional']):
-            return """🛡️ **Seguros e Produtos Opcionais**
+Tem dúvidas sobre isenção ou cobrança de anuidade?""",
+        ),
+        Intent(
+            name="seguro",
+            keywords=['seguro', 'proteção', 'cobertura', 'opcional'],
+            template="""🛡️ **Seguros e Produtos Opcionais**
 
 **Seguros Comuns:**
 • Seguro proteção financeira
@@ -135,10 +108,12 @@ Tem dúvidas sobre isenção ou cobrança de anuidade?"""
 **💡 Dica Legal:**
 Circular BACEN 3.598/2013 proíbe venda casada e exige autorização expressa.
 
-Está enfrentando cobrança de seguro não autorizado?"""
-        
-        if any(word in question_lower for word in ['limite', 'aumentar', 'reduzir', 'crédito', 'disponível']):
-            return """📈 **Limite de Crédito do Cartão**
+Está enfrentando cobrança de seguro não autorizado?""",
+        ),
+        Intent(
+            name="limite",
+            keywords=['limite', 'aumentar', 'reduzir', 'crédito', 'disponível'],
+            template="""📈 **Limite de Crédito do Cartão**
 
 **Como funciona o limite:**
 • Valor máximo disponível para gastos
@@ -171,10 +146,12 @@ Está enfrentando cobrança de seguro não autorizado?"""
 **💡 Dica:**
 Mantenha dados atualizados para facilitar aumento de limite.
 
-Precisa de ajuda com alguma questão específica sobre limite?"""
-        
-        if any(word in question_lower for word in ['cancelar', 'cancelamento', 'encerrar', 'rescindir']):
-            return """❌ **Cancelamento do Cartão de Crédito**
+Precisa de ajuda com alguma questão específica sobre limite?""",
+        ),
+        Intent(
+            name="cancelar",
+            keywords=['cancelar', 'cancelamento', 'encerrar', 'rescindir'],
+            template="""❌ **Cancelamento do Cartão de Crédito**
 
 **Como Cancelar:**
 1. Quite todas as pendências (fatura, parcelamentos)
@@ -210,10 +187,12 @@ Precisa de ajuda com alguma questão específica sobre limite?"""
 **📞 Base Legal:**
 Art. 6º, III do CDC - Direito à informação adequada sobre cancelamento.
 
-Está enfrentando dificuldades para cancelar?"""
-        
-        if any(word in question_lower for word in ['pontos', 'milhas', 'programa', 'benefício', 'cashback']):
-            return """⭐ **Programas de Pontos e Benefícios**
+Está enfrentando dificuldades para cancelar?""",
+        ),
+        Intent(
+            name="pontos",
+            keywords=['pontos', 'milhas', 'programa', 'benefício', 'cashback'],
+            template="""⭐ **Programas de Pontos e Benefícios**
 
 **Tipos de Programas:**
 • **Pontos**: Acúmulo por compras para troca
@@ -249,7 +228,46 @@ Está enfrentando dificuldades para cancelar?"""
 • Avalie custo x benefício da anuidade
 • Use cartão específico para categoria com mais pontos
 
-Tem dúvidas sobre algum programa de pontos específico?"""
+Tem dúvidas sobre algum programa de pontos específico?""",
+        ),
+    ]
+    
+    def __init__(self):
+        self.specialization = "Cartão de Crédito"
+        self.icon = "💳"
+        
+    def generate_response(self, question: str, contract_text: str = "") -> str:
+        """Gera resposta especializada para cartões de crédito"""
+        
+        if not question:
+            return """💳 **Cartão de Crédito - Análise Especializada**
+
+Olá! Sou especialista em contratos de cartão de crédito. Posso ajudar com:
+
+**📋 Principais Análises:**
+• Taxas e juros (rotativo, parcelado, saque)
+• Anuidades e isenções
+• Limite de crédito e alterações
+• Seguros e produtos opcionais
+• Programa de pontos e benefícios
+
+**⚠️ Pontos Críticos:**
+• Juros do rotativo (máximo de 8% ao mês)
+• Cobrança de seguros não solicitados
+• Alteração unilateral de condições
+• Taxas abusivas ou não informadas
+
+**📞 Órgãos de Defesa:**
+• BACEN (Banco Central) - Registrator
+• PROCON - Defesa do consumidor
+• SPC/SERASA - Negativação indevida
+
+Como posso ajudar com seu cartão de crédito?"""
+        
+        # Análise baseada na pergunta
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
         
         # Resposta geral com análise do contrato se disponível
         if contract_text:
@@ -1,45 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class EcommerceAgent(BaseContractAgent):
     """Agente especializado em contratos de e-commerce e compras online"""
     
-    def __init__(self):
-        self.specialization = "E-commerce"
-        self.icon = "🛒"
-        
-    def generate_response(self, question: str, contract_text: str = "") -> str:
-        """Gera resposta especializada para e-commerce"""
-        
-        if not question:
-            return """🛒 **E-commerce - Análise Especializada**
-
-Olá! Sou especialista em contratos de e-commerce e compras online. Posso ajudar com:
-
-**📋 Principais Análises:**
-• Termos de uso e políticas de privacidade
-• Direito de arrependimento (7 dias)
-• Políticas de troca e devolução
-• Garantias de produtos online
-• Marketplaces e vendedores terceiros
-
-**⚠️ Pontos Críticos:**
-• Cláusulas abusivas nos termos de uso
-• Dificuldades no direito de arrependimento
-• Problemas com entregas e prazos
-• Segurança de dados pessoais
-
-**🏪 Órgãos de Defesa:**
-• PROCON - Defesa do consumidor
-• SENACON - Secretaria Nacional do Consumidor
-• Marco Civil da Internet
-
-Como posso ajudar com sua compra ou contrato online?"""
-        
-        # Análise baseada na pergunta
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ['arrependimento', 'cancelar', 'devolver', '7 dias', 'desistir']):
-            return """↩️ **Direito de Arrependimento no E-commerce**
+    INTENTS = [
+        Intent(
+            name="arrependimento",
+            keywords=['arrependimento', 'cancelar', 'devolver', '7 dias', 'desistir'],
+            template="""↩️ **Direito de Arrependimento no E-commerce**
 
 **Marco Legal - CDC Art. 49:**
 *"O consumidor pode desistir do contrato, no prazo de 7 dias corridos, a contar de sua assinatura ou do ato de recebimento do produto ou serviço, sempre que a contratação de fornecimento de produtos e serviços ocorrer fora do estabelecimento comercial, especialmente por telefone ou a domicílio."*
@@ -147,10 +116,12 @@ Como posso ajudar com sua compra ou contrato online?"""
 **Base Legal:**
 CDC Art. 49 e Decreto 7.962/13 sobre comércio eletrônico.
 
-Está enfrentando dificuldades para exercer seu direito de arrependimento?"""
-        
-        if any(word in question_lower for word in ['entrega', 'prazo', 'frete', 'correio', 'transportadora']):
-            return """🚚 **Entrega e Prazos no E-commerce**
+Está enfrentando dificuldades para exercer seu direito de arrependimento?""",
+        ),
+        Intent(
+            name="entrega",
+            keywords=['entrega', 'prazo', 'frete', 'correio', 'transportadora'],
+            template="""🚚 **Entrega e Prazos no E-commerce**
 
 **Prazos de Entrega:**
 
@@ -263,10 +234,12 @@ Está enfrentando dificuldades para exercer seu direito de arrependimento?"""
 **⚖️ Base Legal:**
 CDC sobre prazo de entrega e Decreto 7.962/13 sobre e-commerce.
 
-Está com problemas de entrega ou atraso no seu pedido?"""
-        
-        if any(word in question_lower for word in ['marketplace', 'mercadolivre', 'amazon', 'magazineluiza', 'terceiro']):
-            return """🏪 **Marketplaces e Vendedores Terceiros**
+Está com problemas de entrega ou atraso no seu pedido?""",
+        ),
+        Intent(
+            name="marketplace",
+            keywords=['marketplace', 'mercadolivre', 'amazon', 'magazineluiza', 'terceiro'],
+            template="""🏪 **Marketplaces e Vendedores Terceiros**
 
 **O que são Marketplaces:**
 • **Plataforma**: Espaço virtual para múltiplos vendedores
@@ -393,10 +366,12 @@ Está com problemas de entrega ou atraso no seu pedido?"""
 **Base Legal:**
 CDC, Lei 12.965/14 (Marco Civil) e regulamentações específicas.
 
-Está com problemas em marketplace ou dúvidas sobre vendedor terceirizado?"""
-        
-        if any(word in question_lower for word in ['dados', 'privacidade', 'lgpd', 'informações', 'cadastro']):
-            return """🔐 **Proteção de Dados e Privacidade no E-commerce**
+Está com problemas em marketplace ou dúvidas sobre vendedor terceirizado?""",
+        ),
+        Intent(
+            name="dados",
+            keywords=['dados', 'privacidade', 'lgpd', 'informações', 'cadastro'],
+            template="""🔐 **Proteção de Dados e Privacidade no E-commerce**
 
 **Marco Legal - LGPD:**
 *Lei Geral de Proteção de Dados Pessoais (Lei 13.709/18) regulamenta tratamento de dados pessoais no Brasil, incluindo e-commerce.*
@@ -531,10 +506,12 @@ Está com problemas em marketplace ou dúvidas sobre vendedor terceirizado?"""
 **Base Legal:**
 LGPD (Lei 13.709/18), CDC e Marco Civil da Internet.
 
-Tem dúvidas sobre como seus dados estão sendo tratados ou quer exercer algum direito LGPD?"""
-        
-        if any(word in question_lower for word in ['garantia', 'defeito', 'vício', 'troca', 'assistência']):
-            return """🛠️ **Garantia e Vícios em Produtos de E-commerce**
+Tem dúvidas sobre como seus dados estão sendo tratados ou quer exercer algum direito LGPD?""",
+        ),
+        Intent(
+            name="garantia",
+            keywords=['garantia', 'defeito', 'vício', 'troca', 'assistência'],
+            template="""🛠️ **Garantia e Vícios em Produtos de E-commerce**
 
 **Tipos de Garantia:**
 
@@ -663,7 +640,46 @@ Tem dúvidas sobre como seus dados estão sendo tratados ou quer exercer algum d
 **⚖️ Base Legal:**
 CDC Art. 18 a 25 sobre vícios e garantia de produtos.
 
-Está enfrentando problemas com garantia ou defeito em produto comprado online?"""
+Está enfrentando problemas com garantia ou defeito em produto comprado online?""",
+        ),
+    ]
+    
+    def __init__(self):
+        self.specialization = "E-commerce"
+        self.icon = "🛒"
+        
+    def generate_response(self, question: str, contract_text: str = "") -> str:
+        """Gera resposta especializada para e-commerce"""
+        
+        if not question:
+            return """🛒 **E-commerce - Análise Especializada**
+
+Olá! Sou especialista em contratos de e-commerce e compras online. Posso ajudar com:
+
+**📋 Principais Análises:**
+• Termos de uso e políticas de privacidade
+• Direito de arrependimento (7 dias)
+• Políticas de troca e devolução
+• Garantias de produtos online
+• Marketplaces e vendedores terceiros
+
+**⚠️ Pontos Críticos:**
+• Cláusulas abusivas nos termos de uso
+• Dificuldades no direito de arrependimento
+• Problemas com entregas e prazos
+• Segurança de dados pessoais
+
+**🏪 Órgãos de Defesa:**
+• PROCON - Defesa do consumidor
+• SENACON - Secretaria Nacional do Consumidor
+• Marco Civil da Internet
+
+Como posso ajudar com sua compra ou contrato online?"""
+        
+        # Análise baseada na pergunta
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
         
         # Resposta geral com análise do contrato se disponível
         if contract_text:
@@ -1,45 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class EducationAgent(BaseContractAgent):
     """Agente especializado em contratos de educação"""
     
-    def __init__(self):
-        self.specialization = "Educação"
-        self.icon = "🎓"
-        
-    def generate_response(self, question: str, contract_text: str = "") -> str:
-        """Gera resposta especializada para contratos educacionais"""
-        
-        if not question:
-            return """🎓 **Educação - Análise Especializada**
-
-Olá! Sou especialista em contratos educacionais. Posso ajudar com:
-
-**📋 Principais Análises:**
-• Contratos de matrícula escolar/universitária
-• Mensalidades e reajustes
-• Material didático e taxas extras
-• Transferência e trancamento
-• Serviços educacionais adicionais
-
-**⚠️ Pontos Críticos:**
-• Reajustes acima da inflação
-• Cobrança de material obrigatório
-• Multas por cancelamento
-• Cláusulas de rematrícula automática
-
-**📚 Órgãos de Defesa:**
-• MEC - Ministério da Educação
-• PROCON - Defesa do consumidor
-• INEP - Supervisão da qualidade
-
-Como posso ajudar com seu contrato educacional?"""
-        
-        # Análise baseada na pergunta
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ['mensalidade', 'reajuste', 'valor', 'aumento', 'preço']):
-            return """💰 **Mensalidades e Reajustes Escolares**
+    INTENTS = [
+        Intent(
+            name="mensalidade",
+            keywords=['mensalidade', 'reajuste', 'valor', 'aumento', 'preço'],
+            template="""💰 **Mensalidades e Reajustes Escolares**
 
 **Cobrança de Mensalidades:**
 
@@ -102,10 +71,12 @@ Como posso ajudar com seu contrato educacional?"""
 **⚖️ Base Legal:**
 CDC e Lei 9.870/99 sobre cobrança de anuidades escolares.
 
-Está enfrentando problemas com reajuste de mensalidade ou cobrança irregular?"""
-        
-        if any(word in question_lower for word in ['matrícula', 'rematrícula', 'renovação', 'contrato']):
-            return """📝 **Matrícula e Rematrícula Escolar**
+Está enfrentando problemas com reajuste de mensalidade ou cobrança irregular?""",
+        ),
+        Intent(
+            name="matricula",
+            keywords=['matrícula', 'rematrícula', 'renovação', 'contrato'],
+            template="""📝 **Matrícula e Rematrícula Escolar**
 
 **Processo de Matrícula:**
 
@@ -181,10 +152,12 @@ Está enfrentando problemas com reajuste de mensalidade ou cobrança irregular?"
 **⚖️ Base Legal:**
 Lei 9.870/99 e CDC sobre relações de consumo educacional.
 
-Precisa de orientação sobre matrícula, rematrícula ou transferência escolar?"""
-        
-        if any(word in question_lower for word in ['material', 'didático', 'livro', 'apostila', 'uniforme']):
-            return """📚 **Material Didático e Uniformes**
+Precisa de orientação sobre matrícula, rematrícula ou transferência escolar?""",
+        ),
+        Intent(
+            name="material",
+            keywords=['material', 'didático', 'livro', 'apostila', 'uniforme'],
+            template="""📚 **Material Didático e Uniformes**
 
 **Material Didático:**
 
@@ -273,10 +246,12 @@ Precisa de orientação sobre matrícula, rematrícula ou transferência escolar
 **⚖️ Base Legal:**
 CDC sobre venda casada e transparência na cobrança.
 
-Está enfrentando problemas com cobrança de material ou uniformes obrigatórios?"""
-        
-        if any(word in question_lower for word in ['cancelar', 'cancelamento', 'transferência', 'trancar', 'desistir']):
-            return """❌ **Cancelamento e Transferência Escolar**
+Está enfrentando problemas com cobrança de material ou uniformes obrigatórios?""",
+        ),
+        Intent(
+            name="cancelar",
+            keywords=['cancelar', 'cancelamento', 'transferência', 'trancar', 'desistir'],
+            template="""❌ **Cancelamento e Transferência Escolar**
 
 **Cancelamento de Matrícula:**
 
@@ -364,10 +339,12 @@ Está enfrentando problemas com cobrança de material ou uniformes obrigatórios
 **⚖️ Base Legal:**
 CDC sobre direito de cancelamento e Lei 9.870/99 sobre anuidades escolares.
 
-Precisa cancelar matrícula, fazer transferência ou está enfrentando dificuldades nesse processo?"""
-        
-        if any(word in question_lower for word in ['superior', 'universidade', 'faculdade', 'graduação', 'pós']):
-            return """🎓 **Ensino Superior - Contratos Universitários**
+Precisa cancelar matrícula, fazer transferência ou está enfrentando dificuldades nesse processo?""",
+        ),
+        Intent(
+            name="superior",
+            keywords=['superior', 'universidade', 'faculdade', 'graduação', 'pós'],
+            template="""🎓 **Ensino Superior - Contratos Universitários**
 
 **Contratos de Ensino Superior:**
 
@@ -474,7 +451,46 @@ Precisa cancelar matrícula, fazer transferência ou está enfrentando dificulda
 **Base Legal:**
 LDB, CDC e regulamentações específicas do MEC.
 
-Está enfrentando problemas com seu curso superior ou precisa de orientação sobre direitos universitários?"""
+Está enfrentando problemas com seu curso superior ou precisa de orientação sobre direitos universitários?""",
+        ),
+    ]
+    
+    def __init__(self):
+        self.specialization = "Educação"
+        self.icon = "🎓"
+        
+    def generate_response(self, question: str, contract_text: str = "") -> str:
+        """Gera resposta especializada para contratos educacionais"""
+        
+        if not question:
+            return """🎓 **Educação - Análise Especializada**
+
+Olá! Sou especialista em contratos educacionais. Posso ajudar com:
+
+**📋 Principais Análises:**
+• Contratos de matrícula escolar/universitária
+• Mensalidades e reajustes
+• Material didático e taxas extras
+• Transferência e trancamento
+• Serviços educacionais adicionais
+
+**⚠️ Pontos Críticos:**
+• Reajustes acima da inflação
+• Cobrança de material obrigatório
+• Multas por cancelamento
+• Cláusulas de rematrícula automática
+
+**📚 Órgãos de Defesa:**
+• MEC - Ministério da Educação
+• PROCON - Defesa do consumidor
+• INEP - Supervisão da qualidade
+
+Como posso ajudar com seu contrato educacional?"""
+        
+        # Análise baseada na pergunta
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
         
         # Resposta geral com análise do contrato se disponível
         if contract_text:
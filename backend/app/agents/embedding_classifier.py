@@ -0,0 +1,328 @@
+"""
+Classificador local por similaridade de embeddings (segundo nível)
+Quando as palavras-chave não bastam, o contrato é comparado (kNN ou centroides) com
+exemplos rotulados de cada categoria, em processo e com NumPy, antes de recorrer ao LLM
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.contract_dedup import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Temperaturas candidatas na calibração (softmax sobre as pontuações por categoria)
+CALIBRATION_TEMPERATURES = tuple(float(t) for t in np.geomspace(1, 1024, 21))
+
+
+def _features(text: str, max_chars: int) -> Counter:
+    """Unigramas e bigramas de palavras (ignora números e palavras muito curtas)"""
+    words = [w for w in normalize_text(text[:max_chars]).split() if len(w) > 2 and not w.isdigit()]
+    return Counter(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+def hashed_embedding(text: str, dim: int = 4096, max_chars: int = 20000) -> np.ndarray:
+    """
+    Embedding local por feature hashing (tf sublinear, sem normalização)
+
+    Determinístico entre processos (crc32) e sem dependências externas; o sinal do hash
+    reduz o viés das colisões.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, count in _features(text, max_chars).items():
+        digest = zlib.crc32(feature.encode("utf-8"))
+        vector[digest % dim] += (1.0 if digest & 0x80000000 else -1.0) * (1.0 + math.log(count))
+    return vector
+
+
+@dataclass
+class EmbeddingPrediction:
+    """Resultado do classificador: categoria, confiança calibrada e pontuações"""
+    label: Optional[str]
+    confidence: float
+    scores: Dict[str, float] = field(default_factory=dict)
+    method: str = "embedding_knn"
+    shared_features: int = 0  # Termos do texto presentes nos exemplos da categoria
+
+
+class EmbeddingClassifier:
+    """
+    kNN (ou centroides) sobre embeddings de contratos rotulados
+
+    Os vetores recebem peso IDF calculado nos próprios exemplos e são normalizados, de
+    modo que a similaridade é um produto escalar contra a matriz de exemplos. A confiança
+    é o softmax das pontuações por categoria com temperatura calibrada por leave-one-out
+    nos exemplos (menor log-loss), e pode ser comparada diretamente a um limiar.
+
+    O softmax só compara as categorias entre si: um texto fora do domínio ainda teria
+    confiança alta na categoria "menos pior". Por isso a categoria vencedora precisa
+    compartilhar ao menos `min_shared_features` termos com os seus exemplos; senão o
+    texto fica sem categoria (agente geral ou LLM).
+    """
+
+    def __init__(self, examples: Optional[Dict[str, List[str]]] = None,
+                 k: int = 5, mode: str = "knn", dim: int = 4096, max_chars: int = 20000,
+                 min_shared_features: int = 3):
+        if mode not in ("knn", "centroid"):
+            raise ValueError(f"Modo inválido: {mode}")
+        self.k = k
+        self.mode = mode
+        self.dim = dim
+        self.max_chars = max_chars
+        self.min_shared_features = min_shared_features
+        self.examples: Dict[str, List[str]] = {}
+        self.temperature = CALIBRATION_TEMPERATURES[len(CALIBRATION_TEMPERATURES) // 2]
+
+        self._labels: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._example_labels: Optional[np.ndarray] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._class_features: Optional[np.ndarray] = None
+        self._idf: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+        for label, texts in (examples or {}).items():
+            self.add_examples(label, texts)
+
+    def add_examples(self, label: str, texts: List[str]) -> None:
+        """Acrescenta exemplos rotulados; o índice é reconstruído na próxima classificação"""
+        with self._lock:
+            self.examples.setdefault(label, []).extend(t for t in texts if t and t.strip())
+            self._matrix = None
+
+    def load_examples(self, path: str) -> int:
+        """Carrega exemplos extras de um JSON {categoria: [textos]}; retorna quantos"""
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        for label, texts in data.items():
+            self.add_examples(label, texts)
+        return sum(len(texts) for texts in data.values())
+
+    def classify(self, text: str) -> EmbeddingPrediction:
+        """Categoria mais provável com confiança calibrada em [0, 1]"""
+        self._ensure_fitted()
+        if not self._labels or not text or not text.strip():
+            return EmbeddingPrediction(None, 0.0, method=self._method)
+
+        vector = self._embed(text)
+        scores = self._class_scores(vector)
+        probabilities = self._softmax(scores, self.temperature)
+        best = int(np.argmax(probabilities))
+        shared = int(np.count_nonzero(self._class_features[best] & (vector != 0)))
+        accepted = shared >= self.min_shared_features
+        return EmbeddingPrediction(
+            label=self._labels[best] if accepted else None,
+            confidence=round(float(probabilities[best]), 4) if accepted else 0.0,
+            scores={label: round(float(score), 4) for label, score in zip(self._labels, scores)},
+            method=self._method,
+            shared_features=shared
+        )
+
+    @property
+    def _method(self) -> str:
+        return f"embedding_{self.mode}"
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = hashed_embedding(text, self.dim, self.max_chars)
+        if self._idf is not None:
+            vector *= self._idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _ensure_fitted(self) -> None:
+        if self._matrix is not None:
+            return
+        with self._lock:
+            if self._matrix is None:
+                self._fit()
+
+    def _fit(self) -> None:
+        self._labels = sorted(label for label, texts in self.examples.items() if texts)
+        texts = [text for label in self._labels for text in self.examples[label]]
+        example_labels = np.array([index for index, label in enumerate(self._labels)
+                                   for _ in self.examples[label]], dtype=np.int64)
+
+        raw = np.stack([hashed_embedding(t, self.dim, self.max_chars) for t in texts]) if texts \
+            else np.zeros((0, self.dim), dtype=np.float32)
+        document_frequency = (raw != 0).sum(axis=0)
+        self._idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        matrix = raw * self._idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1, norms)
+
+        centroids = np.zeros((len(self._labels), self.dim), dtype=np.float32)
+        for index in range(len(self._labels)):
+            centroid = matrix[example_labels == index].mean(axis=0)
+            norm = np.linalg.norm(centroid)
+            centroids[index] = centroid / norm if norm else centroid
+
+        self._example_labels = example_labels
+        self._centroids = centroids
+        self._class_features = np.stack([(raw[example_labels == index] != 0).any(axis=0)
+                                         for index in range(len(self._labels))]) if texts \
+            else np.zeros((0, self.dim), dtype=bool)
+        self._calibrate(matrix, example_labels)
+        self._matrix = matrix
+
+    def _class_scores(self, vector: np.ndarray, matrix: Optional[np.ndarray] = None,
+                      example_labels: Optional[np.ndarray] = None,
+                      centroids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Pontuação por categoria: similaridade dos k vizinhos de cada uma, ou ao centroide"""
+        if self.mode == "centroid":
+            return (self._centroids if centroids is None else centroids) @ vector
+
+        matrix = self._matrix if matrix is None else matrix
+        example_labels = self._example_labels if example_labels is None else example_labels
+        similarities = matrix @ vector
+        k = min(self.k, len(similarities))
+        nearest = np.argpartition(-similarities, k - 1)[:k]
+        # Voto ponderado pela similaridade, normalizado por k (vizinhos fracos pesam pouco)
+        return np.bincount(example_labels[nearest], weights=np.clip(similarities[nearest], 0, None),
+                           minlength=len(self._labels)) / k
+
+    @staticmethod
+    def _softmax(scores: np.ndarray, temperature: float) -> np.ndarray:
+        logits = scores * temperature
+        exp = np.exp(logits - logits.max())
+        return exp / exp.sum()
+
+    def _calibrate(self, matrix: np.ndarray, example_labels: np.ndarray) -> None:
+        """Escolhe a temperatura de menor log-loss nas previsões leave-one-out dos exemplos"""
+        counts = np.bincount(example_labels, minlength=len(self._labels))
+        if len(self._labels) < 2 or counts.min() < 2:
+            return  # Sem exemplos suficientes para deixar um de fora em cada categoria
+
+        held_out_scores = []
+        for index in range(len(example_labels)):
+            keep = np.arange(len(example_labels)) != index
+            centroids = None
+            if self.mode == "centroid":
+                centroids = np.stack([matrix[keep & (example_labels == c)].mean(axis=0)
+                                      for c in range(len(self._labels))])
+                centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-9)
+            held_out_scores.append(self._class_scores(matrix[index], matrix[keep],
+                                                      example_labels[keep], centroids))
+
+        def log_loss(temperature: float) -> float:
+            return -sum(
+                math.log(max(self._softmax(scores, temperature)[label], 1e-9))
+                for scores, label in zip(held_out_scores, example_labels)
+            )
+
+        self.temperature = float(min(CALIBRATION_TEMPERATURES, key=log_loss))
+
+    def get_stats(self) -> Dict[str, object]:
+        self._ensure_fitted()
+        return {
+            "mode": self.mode,
+            "k": self.k,
+            "categories": len(self._labels),
+            "examples": {label: len(self.examples[label]) for label in self._labels},
+            "temperature": self.temperature,
+            "min_shared_features": self.min_shared_features,
+        }
+
+
+# Exemplos rotulados das categorias do ClassifierAgent (complementáveis via JSON)
+CONTRACT_TYPE_EXAMPLES: Dict[str, List[str]] = {
+    "locacao": [
+        "Contrato de locação residencial. O locador cede ao locatário o uso do imóvel situado na rua indicada, "
+        "mediante aluguel mensal reajustado anualmente pelo IGP-M.",
+        "O inquilino entregará o apartamento nas mesmas condições da vistoria de entrada. Fica vedada a "
+        "sublocação sem consentimento do proprietário.",
+        "Como garantia o locatário presta caução equivalente a três aluguéis ou apresenta fiador com imóvel "
+        "quitado na mesma comarca.",
+        "Multa de três aluguéis em caso de devolução antecipada do imóvel, proporcional ao tempo restante "
+        "do prazo de trinta meses da locação.",
+        "Correrão por conta do locatário o IPTU, as despesas ordinárias de condomínio e as contas de consumo "
+        "do imóvel locado.",
+    ],
+    "telecom": [
+        "Contrato de prestação de serviço de internet banda larga por fibra óptica com velocidade contratada "
+        "de 300 megas e comodato do roteador wifi.",
+        "Plano de telefonia móvel pós-pago com franquia de dados de 20 GB, ligações ilimitadas e roaming "
+        "nacional, conforme regulamento da ANATEL.",
+        "O assinante adere ao período de fidelidade de doze meses em troca de desconto na mensalidade; o "
+        "cancelamento antecipado gera multa proporcional.",
+        "A operadora garante disponibilidade mensal do serviço de conexão e compensará o assinante por "
+        "interrupções superiores a trinta minutos.",
+        "Pacote combinado de TV por assinatura, telefone fixo e internet com instalação gratuita e "
+        "atendimento técnico em até 24 horas.",
+    ],
+    "financeiro": [
+        "Contrato de empréstimo pessoal com taxa de juros remuneratórios de 2,5% ao mês, custo efetivo total "
+        "informado e pagamento em 24 parcelas.",
+        "Cédula de crédito bancário para financiamento de veículo com alienação fiduciária em garantia do "
+        "credor até a quitação integral.",
+        "O emitente autoriza o banco a debitar as prestações em conta corrente; o atraso implica juros de "
+        "mora de 1% ao mês e multa de 2%.",
+        "Crédito consignado com desconto das parcelas diretamente na folha de pagamento do devedor, "
+        "observada a margem consignável.",
+        "Vencimento antecipado da dívida em caso de inadimplemento de três prestações, com inclusão do "
+        "nome do devedor nos cadastros de proteção ao crédito.",
+    ],
+    "trabalho": [
+        "Contrato individual de trabalho por prazo indeterminado. O empregado exercerá a função de "
+        "assistente administrativo mediante salário mensal.",
+        "Jornada de trabalho de 44 horas semanais, com intervalo para refeição, pagamento de horas extras "
+        "com adicional de 50% e registro em carteira.",
+        "O empregador concederá férias anuais remuneradas acrescidas de um terço, décimo terceiro salário "
+        "e vale-transporte na forma da CLT.",
+        "Período de experiência de noventa dias, findo o qual o contrato passa a vigorar por prazo "
+        "indeterminado, com aviso prévio na rescisão.",
+        "O trabalhador se obriga a cumprir o regulamento interno da empresa; depósitos de FGTS serão feitos "
+        "mensalmente em conta vinculada.",
+    ],
+    "servicos": [
+        "Contrato de prestação de serviços de consultoria empresarial. A contratada executará os serviços "
+        "descritos no escopo mediante remuneração mensal.",
+        "O prestador emitirá nota fiscal ao final de cada mês e responderá pela qualidade técnica das "
+        "entregas acordadas com o contratante.",
+        "Serviços de manutenção predial preventiva e corretiva com atendimento em até quatro horas e "
+        "fornecimento de mão de obra especializada.",
+        "A contratada não possui vínculo empregatício com o contratante e arcará com os encargos de seus "
+        "profissionais alocados ao projeto.",
+        "Acordo de nível de serviço com indicadores de desempenho, glosas por descumprimento e relatório "
+        "mensal de atividades executadas.",
+    ],
+    "compra_venda": [
+        "Contrato de compra e venda de mercadorias. O vendedor se obriga a entregar os produtos descritos "
+        "e o comprador a pagar o preço ajustado.",
+        "A propriedade das mercadorias transfere-se ao comprador com a tradição, após a conferência da "
+        "nota fiscal e da quantidade entregue.",
+        "O vendedor garante os produtos contra vícios ocultos pelo prazo de noventa dias a contar do "
+        "recebimento pelo adquirente.",
+        "Pagamento do preço à vista mediante boleto bancário, com frete por conta do vendedor e entrega no "
+        "endereço do comprador.",
+        "Compromisso de compra e venda de equipamento industrial com sinal de 20% e saldo na entrega, "
+        "incluindo instalação e treinamento.",
+    ],
+}
+
+
+def _create_contract_type_classifier() -> EmbeddingClassifier:
+    classifier = EmbeddingClassifier(CONTRACT_TYPE_EXAMPLES, k=settings.EMBEDDING_CLASSIFIER_K,
+                                     min_shared_features=settings.EMBEDDING_CLASSIFIER_MIN_SHARED_FEATURES)
+    path = settings.EMBEDDING_CLASSIFIER_EXAMPLES_PATH
+    if path and os.path.exists(path):
+        try:
+            loaded = classifier.load_examples(path)
+            logger.info(f"Classificador por embeddings: {loaded} exemplos extras de {path}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Não foi possível carregar exemplos de {path}: {e}")
+    return classifier
+
+
+# Instância global (o índice é montado na primeira classificação)
+contract_type_classifier = _create_contract_type_classifier()
@@ -1,46 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class EmploymentCLTAgent(BaseContractAgent):
     """Agente especializado em contratos de trabalho CLT"""
     
-    def __init__(self):
-        self.specialization = "Contrato CLT"
-        self.icon = "👷"
-        
-    def generate_response(self, question: str, contract_text: str = "") -> str:
-        """Gera resposta especializada para contratos CLT"""
-        
-        if not question:
-            return """👷 **Contrato de Trabalho CLT - Análise Especializada**
-
-Olá! Sou especialista em contratos de trabalho CLT. Posso ajudar com:
-
-**📋 Principais Análises:**
-• Salário, benefícios e adicionais
-• Jornada de trabalho e horas extras
-• Férias, 13º salário e FGTS
-• Cláusulas abusivas e ilegalidades
-• Direitos trabalhistas garantidos
-
-**⚠️ Pontos Críticos:**
-• Jornada máxima (44h semanais/8h diárias)
-• Banco de horas e compensação
-• Cláusulas que violem direitos mínimos
-• Períodos de experiência (máx. 90 dias)
-
-**📞 Órgãos de Proteção:**
-• Ministério do Trabalho e Emprego
-• Superintendência Regional do Trabalho
-• Justiça do Trabalho
-• Sindicatos da categoria
-
-Como posso ajudar com seu contrato de trabalho?"""
-        
-        # Análise baseada na pergunta
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ['salário', 'remuneração', 'vencimento', 'pagamento']):
-            return """💰 **Salário e Remuneração CLT**
+    INTENTS = [
+        Intent(
+            name="salario",
+            keywords=['salário', 'remuneração', 'vencimento', 'pagamento'],
+            template="""💰 **Salário e Remuneração CLT**
 
 **Componentes da Remuneração:**
 • **Salário base**: Valor fixo mensal
@@ -69,10 +37,12 @@ Como posso ajudar com seu contrato de trabalho?"""
 **🛡️ Base Legal:**
 Arts. 457 a 467 da CLT e CF/88, Art. 7º.
 
-Tem dúvidas sobre algum componente salarial específico?"""
-        
-        if any(word in question_lower for word in ['jornada', 'horário', 'horas', 'extra', 'banco']):
-            return """⏰ **Jornada de Trabalho e Horas Extras**
+Tem dúvidas sobre algum componente salarial específico?""",
+        ),
+        Intent(
+            name="jornada",
+            keywords=['jornada', 'horário', 'horas', 'extra', 'banco'],
+            template="""⏰ **Jornada de Trabalho e Horas Extras**
 
 **Limites de Jornada:**
 • **Diária**: Máximo 8 horas normais + 2 horas extras
@@ -107,10 +77,12 @@ Tem dúvidas sobre algum componente salarial específico?"""
 **🛡️ Base Legal:**
 Arts. 58 a 75 da CLT e Lei nº 13.467/2017.
 
-Precisa esclarecer algo sobre sua jornada de trabalho?"""
-        
-        if any(word in question_lower for word in ['férias', 'descanso', '13', 'décimo', 'fgts']):
-            return """🏖️ **Férias, 13º Salário e FGTS**
+Precisa esclarecer algo sobre sua jornada de trabalho?""",
+        ),
+        Intent(
+            name="ferias",
+            keywords=['férias', 'descanso', '13', 'décimo', 'fgts'],
+            template="""🏖️ **Férias, 13º Salário e FGTS**
 
 **Férias Anuais:**
 • **Período**: 30 dias corridos por ano
@@ -145,10 +117,12 @@ Precisa esclarecer algo sobre sua jornada de trabalho?"""
 **🛡️ Base Legal:**
 Arts. 129-153 da CLT (férias), Lei nº 4.090/62 (13º) e Lei nº 8.036/90 (FGTS).
 
-Tem dúvidas sobre cálculo ou pagamento desses direitos?"""
-        
-        if any(word in question_lower for word in ['demissão', 'rescisão', 'demitir', 'justa causa', 'aviso']):
-            return """📋 **Demissão e Rescisão de Contrato**
+Tem dúvidas sobre cálculo ou pagamento desses direitos?""",
+        ),
+        Intent(
+            name="demissao",
+            keywords=['demissão', 'rescisão', 'demitir', 'justa causa', 'aviso'],
+            template="""📋 **Demissão e Rescisão de Contrato**
 
 **Tipos de Rescisão:**
 
@@ -193,10 +167,12 @@ Tem dúvidas sobre cálculo ou pagamento desses direitos?"""
 **🛡️ Base Legal:**
 Arts. 477-486 da CLT e Lei nº 13.467/2017.
 
-Está enfrentando alguma situação de demissão específica?"""
-        
-        if any(word in question_lower for word in ['experiência', 'período', 'teste', 'probatório']):
-            return """🧪 **Período de Experiência**
+Está enfrentando alguma situação de demissão específica?""",
+        ),
+        Intent(
+            name="experiencia",
+            keywords=['experiência', 'período', 'teste', 'probatório'],
+            template="""🧪 **Período de Experiência**
 
 **Características do Contrato de Experiência:**
 • **Finalidade**: Testar aptidão e adaptação mútua
@@ -238,10 +214,12 @@ Está enfrentando alguma situação de demissão específica?"""
 **🛡️ Base Legal:**
 Art. 443, §2º da CLT e Súmula 188 do TST.
 
-Tem dúvidas sobre seu período de experiência?"""
-        
-        if any(word in question_lower for word in ['benefício', 'vale', 'auxílio', 'plano', 'convênio']):
-            return """🎁 **Benefícios e Auxílios Trabalhistas**
+Tem dúvidas sobre seu período de experiência?""",
+        ),
+        Intent(
+            name="beneficio",
+            keywords=['benefício', 'vale', 'auxílio', 'plano', 'convênio'],
+            template="""🎁 **Benefícios e Auxílios Trabalhistas**
 
 **Benefícios Obrigatórios:**
 • **Vale-transporte**: Desconto máx. 6% do salário
@@ -285,7 +263,47 @@ Súmula 241 do TST - benefício habitual integra salário.
 **💡 Dica:**
 Verifique na convenção coletiva quais benefícios são obrigatórios na sua categoria.
 
-Tem dúvidas sobre algum benefício específico?"""
+Tem dúvidas sobre algum benefício específico?""",
+        ),
+    ]
+    
+    def __init__(self):
+        self.specialization = "Contrato CLT"
+        self.icon = "👷"
+        
+    def generate_response(self, question: str, contract_text: str = "") -> str:
+        """Gera resposta especializada para contratos CLT"""
+        
+        if not question:
+            return """👷 **Contrato de Trabalho CLT - Análise Especializada**
+
+Olá! Sou especialista em contratos de trabalho CLT. Posso ajudar com:
+
+**📋 Principais Análises:**
+• Salário, benefícios e adicionais
+• Jornada de trabalho e horas extras
+• Férias, 13º salário e FGTS
+• Cláusulas abusivas e ilegalidades
+• Direitos trabalhistas garantidos
+
+**⚠️ Pontos Críticos:**
+• Jornada máxima (44h semanais/8h diárias)
+• Banco de horas e compensação
+• Cláusulas que violem direitos mínimos
+• Períodos de experiência (máx. 90 dias)
+
+**📞 Órgãos de Proteção:**
+• Ministério do Trabalho e Emprego
+• Superintendência Regional do Trabalho
+• Justiça do Trabalho
+• Sindicatos da categoria
+
+Como posso ajudar com seu contrato de trabalho?"""
+        
+        # Análise baseada na pergunta
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
         
         # Resposta geral com análise do contrato se disponível
         if contract_text:
@@ -1,45 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class EnergyAgent(BaseContractAgent):
     """Agente especializado em contratos de fornecimento de energia elétrica"""
     
-    def __init__(self):
-        self.specialization = "Energia Elétrica"
-        self.icon = "⚡"
-        
-    def generate_response(self, question: str, contract_text: str = "") -> str:
-        """Gera resposta especializada para energia elétrica"""
-        
-        if not question:
-            return """⚡ **Energia Elétrica - Análise Especializada**
-
-Olá! Sou especialista em contratos de fornecimento de energia elétrica. Posso ajudar com:
-
-**📋 Principais Análises:**
-• Tarifa e modalidade de cobrança
-• Qualidade do fornecimento e interrupções
-• Leitura e faturamento do consumo
-• Ligação nova e transferência de titularidade
-• Direitos do consumidor de energia
-
-**⚠️ Pontos Críticos:**
-• Cobrança por estimativa excessiva
-• Interrupções frequentes sem justificativa
-• Problemas na qualidade da energia
-• Dificuldades para religação
-
-**📞 Órgãos de Defesa:**
-• ANEEL - Agência Nacional de Energia Elétrica
-• PROCON - Defesa do consumidor
-• Ouvidoria da distribuidora local
-
-Como posso ajudar com sua conta de energia?"""
-        
-        # Análise baseada na pergunta
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ['conta', 'fatura', 'cobrança', 'valor', 'tarifa']):
-            return """💡 **Conta de Energia e Tarifas**
+    INTENTS = [
+        Intent(
+            name="conta",
+            keywords=['conta', 'fatura', 'cobrança', 'valor', 'tarifa'],
+            template="""💡 **Conta de Energia e Tarifas**
 
 **Composição da Conta:**
 • **Energia consumida**: kWh multiplicado pela tarifa
@@ -91,10 +60,12 @@ Como posso ajudar com sua conta de energia?"""
 **⚖️ Base Legal:**
 Resolução ANEEL 414/10 sobre condições gerais de fornecimento.
 
-Está com problemas na sua conta de energia? Posso ajudar a analisar!"""
-        
-        if any(word in question_lower for word in ['interrupção', 'falta', 'corte', 'religação']):
-            return """🔌 **Interrupções e Religação de Energia**
+Está com problemas na sua conta de energia? Posso ajudar a analisar!""",
+        ),
+        Intent(
+            name="interrupcao",
+            keywords=['interrupção', 'falta', 'corte', 'religação'],
+            template="""🔌 **Interrupções e Religação de Energia**
 
 **Tipos de Interrupção:**
 
@@ -160,10 +131,12 @@ Está com problemas na sua conta de energia? Posso ajudar a analisar!"""
 **⚖️ Regulamentação:**
 Resolução ANEEL 414/10 sobre prazos e procedimentos de religação.
 
-Está enfrentando cortes ou demoras na religação? Posso orientar seus direitos!"""
-        
-        if any(word in question_lower for word in ['medidor', 'leitura', 'consumo', 'estimativa']):
-            return """📊 **Medição e Leitura de Consumo**
+Está enfrentando cortes ou demoras na religação? Posso orientar seus direitos!""",
+        ),
+        Intent(
+            name="medidor",
+            keywords=['medidor', 'leitura', 'consumo', 'estimativa'],
+            template="""📊 **Medição e Leitura de Consumo**
 
 **Como Funciona a Medição:**
 • **Leitura mensal**: Obrigatória todos os meses
@@ -232,10 +205,12 @@ Anote leitura do medidor todo dia 1º do mês. Isso ajuda a identificar problema
 **⚖️ Regulamentação:**
 Resolução ANEEL 414/10 sobre procedimentos de medição.
 
-Está com dúvidas sobre sua leitura ou consumo? Posso ajudar a analisar!"""
-        
-        if any(word in question_lower for word in ['ligação', 'instalação', 'nova', 'transferência']):
-            return """🔌 **Ligação Nova e Transferência**
+Está com dúvidas sobre sua leitura ou consumo? Posso ajudar a analisar!""",
+        ),
+        Intent(
+            name="ligacao",
+            keywords=['ligação', 'instalação', 'nova', 'transferência'],
+            template="""🔌 **Ligação Nova e Transferência**
 
 **Ligação Nova de Energia:**
 
@@ -316,10 +291,12 @@ Está com dúvidas sobre sua leitura ou consumo? Posso ajudar a analisar!"""
 **⚖️ Regulamentação:**
 Resolução ANEEL 414/10 sobre condições de fornecimento.
 
-Precisa fazer ligação nova ou transferência? Posso orientar sobre o processo!"""
-        
-        if any(word in question_lower for word in ['qualidade', 'problema', 'oscilação', 'tensão']):
-            return """⚡ **Qualidade da Energia Elétrica**
+Precisa fazer ligação nova ou transferência? Posso orientar sobre o processo!""",
+        ),
+        Intent(
+            name="qualidade",
+            keywords=['qualidade', 'problema', 'oscilação', 'tensão'],
+            template="""⚡ **Qualidade da Energia Elétrica**
 
 **Parâmetros de Qualidade:**
 
@@ -405,7 +382,46 @@ Precisa fazer ligação nova ou transferência? Posso orientar sobre o processo!
 **⚖️ Base Legal:**
 Módulo 8 dos Procedimentos de Distribuição (PRODIST) da ANEEL.
 
-Está com problemas na qualidade da energia? Posso orientar sobre medições e direitos!"""
+Está com problemas na qualidade da energia? Posso orientar sobre medições e direitos!""",
+        ),
+    ]
+    
+    def __init__(self):
+        self.specialization = "Energia Elétrica"
+        self.icon = "⚡"
+        
+    def generate_response(self, question: str, contract_text: str = "") -> str:
+        """Gera resposta especializada para energia elétrica"""
+        
+        if not question:
+            return """⚡ **Energia Elétrica - Análise Especializada**
+
+Olá! Sou especialista em contratos de fornecimento de energia elétrica. Posso ajudar com:
+
+**📋 Principais Análises:**
+• Tarifa e modalidade de cobrança
+• Qualidade do fornecimento e interrupções
+• Leitura e faturamento do consumo
+• Ligação nova e transferência de titularidade
+• Direitos do consumidor de energia
+
+**⚠️ Pontos Críticos:**
+• Cobrança por estimativa excessiva
+• Interrupções frequentes sem justificativa
+• Problemas na qualidade da energia
+• Dificuldades para religação
+
+**📞 Órgãos de Defesa:**
+• ANEEL - Agência Nacional de Energia Elétrica
+• PROCON - Defesa do consumidor
+• Ouvidoria da distribuidora local
+
+Como posso ajudar com sua conta de energia?"""
+        
+        # Análise baseada na pergunta
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
         
         # Resposta geral com análise do contrato se disponível
         if contract_text:
@@ -1,6 +1,9 @@
-import re
+from collections import Counter
 from typing import Dict, Any, Literal, List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from app.agents.text_sampler import progressive_windows, top_two_margin
+from app.core.config import settings
+from app.services.rule_engine import Rule, RuleMatch, RuleSet, rule_engine
 
 @dataclass
 class EntityInfo:
@@ -12,84 +15,43 @@ class EntityInfo:
     identified_entities: List[Dict[str, Any]]
     confidence_score: float
 
+def _keywords(tag: str, *terms: str) -> List[Rule]:
+    return [Rule(id=f"{tag}:{term}", keywords=(term,), tag=tag) for term in terms]
+
+# Padrões de identificação de partes (CPF/CNPJ) e de indicadores de relação
+ENTITY_RULES = RuleSet("entity", [
+    # Números de documento: o rótulo ("CPF nº") é consumido junto com o número
+    Rule("cpf_labeled", pattern=r'\bCPF\s*n?º?\s*\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b', tag="cpf"),
+    Rule("cnpj_labeled", pattern=r'\bCNPJ\s*n?º?\s*\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}\b', tag="cnpj"),
+    Rule("cpf_number", pattern=r'\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b', tag="cpf"),
+    Rule("cnpj_number", pattern=r'\b\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}\b', tag="cnpj"),
+    
+    *_keywords("cpf", "pessoa física", "cidadão", "consumidor", "contratante pessoa física", "particular"),
+    *_keywords("cnpj", "pessoa jurídica", "empresa", "sociedade", "organização", "corporação",
+               "fornecedor", "prestador", "operadora", "distribuidora", "companhia", "ltda",
+               "s.a", "sa", "microempresa", "me", "epp"),
+    
+    # Indicadores específicos de relação B2C (empresa → pessoa física)
+    *_keywords("b2c", "consumidor", "clientela", "serviços ao consumidor", "produtos ou serviços",
+               "relação de consumo", "direitos do consumidor", "contrato de adesão",
+               "fornecimento de produtos", "prestação de serviços", "usuário final",
+               "destinário final", "proteção do consumidor"),
+    
+    # Indicadores específicos de relação B2B (empresa → empresa)
+    *_keywords("b2b", "contratante e contratada", "partes contraentes", "relação comercial",
+               "negociação empresarial", "fornecimento empresarial", "parceria comercial",
+               "atividade empresarial", "insumos", "matérias-primas", "revenda", "distribuição",
+               "representação comercial"),
+    
+    # Indicadores de relação P2P (pessoa → pessoa)
+    *_keywords("p2p", "entre as partes", "relação civil", "contrato particular", "entre particulares",
+               "boa-fé objetiva", "função social do contrato"),
+])
+rule_engine.register(ENTITY_RULES)
+
 class EntityClassifier:
     """Classifier for identifying contract parties (CPF/CNPJ) and determining legal framework"""
     
-    def __init__(self):
-        # Padrões para identificação de CPF
-        self.cpf_patterns = [
-            r'\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b',  # CPF format variations
-            r'\bCPF\s*n?º?\s*\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b',
-            r'\bpessoa\s+física\b',
-            r'\bcidadão\b',
-            r'\bconsumidor\b',
-            r'\bcontratante\s+pessoa\s+física\b',
-            r'\bparticular\b',
-        ]
-        
-        # Padrões para identificação de CNPJ  
-        self.cnpj_patterns = [
-            r'\b\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}\b',  # CNPJ format variations
-            r'\bCNPJ\s*n?º?\s*\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}\b',
-            r'\bpessoa\s+jurídica\b',
-            r'\bempresa\b',
-            r'\bsociedade\b',
-            r'\borganização\b',
-            r'\bcorporação\b',
-            r'\bfornecedor\b',
-            r'\bprestador\b',
-            r'\boperadora\b',
-            r'\bdistribuidora\b',
-            r'\bcompanhia\b',
-            r'\bltda\.?\b',
-            r'\bs\.?a\.?\b',
-            r'\bmicroempresa\b',
-            r'\bme\b',
-            r'\bepp\b',
-        ]
-        
-        # Indicadores específicos de relação B2C (empresa → pessoa física)
-        self.b2c_indicators = [
-            r'\bconsumidor\b',
-            r'\bclientela\b', 
-            r'\bserviços\s+ao\s+consumidor\b',
-            r'\bprodutos\s+ou\s+serviços\b',
-            r'\brelação\s+de\s+consumo\b',
-            r'\bdireitos\s+do\s+consumidor\b',
-            r'\bcontrato\s+de\s+adesão\b',
-            r'\bfornecimento\s+de\s+produtos\b',
-            r'\bprestação\s+de\s+serviços\b',
-            r'\busuário\s+final\b',
-            r'\bdestinário\s+final\b',
-            r'\bproteção\s+do\s+consumidor\b',
-        ]
-        
-        # Indicadores específicos de relação B2B (empresa → empresa)
-        self.b2b_indicators = [
-            r'\bcontratante\s+e\s+contratada\b',
-            r'\bpartes\s+contraentes\b',
-            r'\brelação\s+comercial\b',
-            r'\bnegociação\s+empresarial\b',
-            r'\bfornecimento\s+empresarial\b',
-            r'\bparceria\s+comercial\b',
-            r'\batividade\s+empresarial\b',
-            r'\binsumos\b',
-            r'\bmatérias-primas\b',
-            r'\brevenda\b',
-            r'\bdistribuição\b',
-            r'\brepresentação\s+comercial\b',
-        ]
-        
-        # Indicadores de relação P2P (pessoa → pessoa)
-        self.p2p_indicators = [
-            r'\bentre\s+as\s+partes\b',
-            r'\brelação\s+civil\b',
-            r'\bcontrato\s+particular\b',
-            r'\bentre\s+particulares\b',
-            r'\bboa-fé\s+objetiva\b',
-            r'\bfunção\s+social\s+do\s+contrato\b',
-        ]
-        
     def identify_entities(self, contract_text: str) -> EntityInfo:
         """
         Identify the types of entities in the contract and determine legal framework
@@ -103,16 +65,11 @@ class EntityClassifier:
         if not contract_text:
             return self._create_unknown_entity_info()
             
-        text_lower = contract_text.lower()
-        
-        # Find and count entity matches
-        cpf_matches = self._find_entity_matches(contract_text, self.cpf_patterns, "CPF")
-        cnpj_matches = self._find_entity_matches(contract_text, self.cnpj_patterns, "CNPJ")
-        
-        # Count relationship indicators
-        b2c_score = self._count_pattern_matches(text_lower, self.b2c_indicators)
-        b2b_score = self._count_pattern_matches(text_lower, self.b2b_indicators) 
-        p2p_score = self._count_pattern_matches(text_lower, self.p2p_indicators)
+        # Single pass over sampled windows for every entity and relationship pattern
+        matches, counts = self._scan_entities(contract_text)
+        cpf_matches = [self._entity_match(match, "CPF") for match in matches if match.tag == "cpf"]
+        cnpj_matches = [self._entity_match(match, "CNPJ") for match in matches if match.tag == "cnpj"]
+        b2c_score, b2b_score, p2p_score = counts["b2c"], counts["b2b"], counts["p2p"]
         
         # Classify relationship and entity type
         entity_type, party_relationship, confidence = self._classify_relationship(
@@ -133,32 +90,37 @@ class EntityClassifier:
             confidence_score=confidence
         )
     
-    def _find_entity_matches(self, text: str, patterns: List[str], entity_type: str) -> List[Dict[str, Any]]:
-        """Find and extract entity matches from text"""
-        matches = []
-        for pattern in patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                matches.append({
-                    "text": match.group().strip(),
-                    "start": match.start(),
-                    "end": match.end(),
-                    "pattern": pattern,
-                    "entity_type": entity_type,
-                    "is_document_number": self._is_document_pattern(pattern)
-                })
-        return matches
-    
-    def _is_document_pattern(self, pattern: str) -> bool:
-        """Check if pattern matches actual document numbers (CPF/CNPJ)"""
-        return any(char in pattern for char in [r'\d', '\\d'])
+    def _scan_entities(self, contract_text: str) -> tuple:
+        """
+        Scan head, tail and evenly spaced windows within CLASSIFIER_SCAN_BUDGET_CHARS,
+        widening the sample only while no party document was found or the
+        b2c/b2b/p2p indicators are too close to call. Match offsets refer to the full text.
+        """
+        for windows in progressive_windows(len(contract_text), settings.CLASSIFIER_SCAN_BUDGET_CHARS,
+                                           settings.CLASSIFIER_SCAN_GROWTH):
+            matches: List[RuleMatch] = []
+            for start, end in windows:
+                window_matches = rule_engine.scan(contract_text[start:end], ENTITY_RULES.name)
+                matches.extend(
+                    replace(match, start=match.start + start, end=match.end + start) if start else match
+                    for match in window_matches
+                )
+            counts = Counter(match.tag for match in matches)
+            if (counts["cpf"] or counts["cnpj"]) and top_two_margin(
+                    [counts["b2c"], counts["b2b"], counts["p2p"]]) >= settings.CLASSIFIER_SCAN_MIN_MARGIN:
+                break
+        return matches, counts
     
-    def _count_pattern_matches(self, text: str, patterns: List[str]) -> int:
-        """Count total pattern matches in text"""
-        count = 0
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            count += len(matches)
-        return count
+    def _entity_match(self, match: RuleMatch, entity_type: str) -> Dict[str, Any]:
+        """Describe a CPF/CNPJ match for EntityInfo.identified_entities"""
+        return {
+            "text": match.text.strip(),
+            "start": match.start,
+            "end": match.end,
+            "pattern": match.rule.pattern or match.rule.keywords[0],
+            "entity_type": entity_type,
+            "is_document_number": match.rule.pattern is not None
+        }
     
     def _classify_relationship(self, cpf_count: int, cnpj_count: int, 
                              b2c_score: int, b2b_score: int, p2p_score: int) -> tuple:
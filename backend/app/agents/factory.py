@@ -1,4 +1,5 @@
-from typing import Dict, Any, Optional, List
+import inspect
+from typing import Dict, Any, AsyncIterator, Optional, List
 from app.agents.classifier_agent import ClassifierAgent
 from app.agents.intelligent_factory import agent_factory as intelligent_agent_factory
 from app.agents.base_agent import BaseContractAgent
@@ -98,12 +99,22 @@ class AgentFactory:
         contract_type = classification["contract_type"]
         
         # Create the appropriate specialized agent
-        if contract_type in self._agents:
-            agent_class = self._agents[contract_type]
-            return agent_class(self.claude_client, self.rag_service, self.db_session)
-        else:
-            # Fallback to a generic agent or raise an error
+        return self.get_agent(contract_type)
+    
+    def get_agent(self, contract_type: str) -> BaseContractAgent:
+        """Create the specialized agent for an already known contract type
+        
+        Raises ValueError when the type has no agent able to analyze contracts (unknown
+        types and the template-only chat agents, which are abstract).
+        """
+        agent_class = self._agents.get(contract_type)
+        if agent_class is None or inspect.isabstract(agent_class):
             raise ValueError(f"No specialized agent available for contract type: {contract_type}")
+        
+        # Not every agent takes a database session
+        if "db_session" in inspect.signature(agent_class.__init__).parameters:
+            return agent_class(self.claude_client, self.rag_service, self.db_session)
+        return agent_class(self.claude_client, self.rag_service)
     
     async def analyze_contract_intelligent(self, contract_text: str, question: str = "", context: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -156,6 +167,41 @@ class AgentFactory:
                 "version": "intelligent_v1"
             }
     
+    async def stream_contract_intelligent(self, contract_text: str, question: str = "",
+                                          context: Dict[str, Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming version of analyze_contract_intelligent
+        
+        Yields a "start" event with classification and agent info, then "delta"
+        events carrying the response text as it is produced.
+        """
+        selection = intelligent_agent_factory.select_agent(
+            text=contract_text,
+            question=question
+        )
+        agent = selection['agent']
+        
+        yield {
+            "type": "start",
+            "classification": {
+                "contract_type": selection['classification'],
+                "agent_type": selection['agent_type'],
+                "confidence": selection['confidence'],
+                "method": selection['method'],
+                "is_automatic": selection['is_automatic'],
+                "matched_keywords": selection.get('matched_keywords', [])
+            },
+            "agent_info": {
+                "name": selection['agent_name'],
+                "icon": selection['agent_icon'],
+                "type": selection['agent_type']
+            },
+            "version": "intelligent_v1"
+        }
+        
+        async for delta in agent.stream_response(question, contract_text):
+            yield {"type": "delta", "text": delta}
+    
     async def analyze_contract_intelligent_with_entities(self, contract_text: str, 
                                                        question: str = "", 
                                                        context: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -238,8 +284,8 @@ class AgentFactory:
         try:
             agent = await self.create_agent(contract_text)
             
-            # Step 3: Perform specialized analysis
-            analysis = await agent.analyze_contract(contract_text, context)
+            # Step 3: Perform specialized analysis (classification confidence drives model routing)
+            analysis = await agent.analyze_contract(contract_text, {**(context or {}), "classification": classification})
             
             return {
                 "classification": classification,
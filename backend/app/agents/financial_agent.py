@@ -1,10 +1,11 @@
 from typing import Dict, Any, List
-import json
 from app.agents.base_agent import BaseContractAgent, ContractAnalysis
 
 class FinancialAgent(BaseContractAgent):
     """Specialized agent for financial contract analysis"""
     
+    LEGAL_DOMAIN = "contratos financeiros (regulamentação BACEN/CMN)"
+    
     def __init__(self, claude_client, rag_service):
         super().__init__(claude_client, rag_service)
         self.agent_type = "financeiro"
@@ -12,23 +13,23 @@ class FinancialAgent(BaseContractAgent):
     async def analyze_contract(self, contract_text: str, context: Dict[str, Any] = None) -> ContractAnalysis:
         """Analyze financial contract with specialized knowledge"""
         
+        if self.should_segment(contract_text):
+            segmented = await self.analyze_contract_by_clauses(contract_text, context)
+            if segmented is not None:
+                return segmented
+        
         # Get relevant RAG context
         rag_context = await self.get_rag_context(contract_text)
         
-        # Create specialized prompt
-        prompt = self.get_specialized_prompt(contract_text, rag_context)
+        # Variable suffix after the static, provider-cacheable prefix
+        prompt = self.get_prompt_suffix(contract_text, rag_context)
         
         try:
-            response = await self.claude_client.completions.create(
-                model="claude-3-sonnet-20240229",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=4000,
-                temperature=0.1
+            # Cheapest route first (rules, fast model), escalating only when needed
+            analysis_data, routing = await self._complete_analysis(
+                prompt, contract_text, context, system=self.get_prompt_prefix()
             )
             
-            # Parse structured response
-            analysis_data = json.loads(response.content[0].text.strip())
-            
             return ContractAnalysis(
                 contract_type="financeiro",
                 risk_level=self._calculate_risk_level(analysis_data.get("risk_factors", [])),
@@ -37,7 +38,8 @@ class FinancialAgent(BaseContractAgent):
                 risk_factors=analysis_data.get("risk_factors", []),
                 recommendations=analysis_data.get("recommendations", []),
                 clauses_analysis=analysis_data.get("clauses_analysis", []),
-                confidence_score=analysis_data.get("confidence_score", 0.0)
+                confidence_score=analysis_data.get("confidence_score", 0.0),
+                metadata={"routing": routing}
             )
             
         except Exception as e:
@@ -46,57 +48,99 @@ class FinancialAgent(BaseContractAgent):
     
     def get_specialized_prompt(self, contract_text: str, rag_context: str = "") -> str:
         """Get financial-specific analysis prompt"""
+        return self._join_prompt(self.get_prompt_prefix(), self.get_prompt_suffix(contract_text, rag_context))
+    
+    def get_prompt_prefix(self) -> str:
+        """Static financial instructions, checklist, guidelines and output schema, shared by every request"""
         
-        return f"""
-        Você é um especialista em contratos financeiros no Brasil. Analise o seguinte contrato considerando a regulamentação do Banco Central (BACEN), Conselho Monetário Nacional (CMN), Código de Defesa do Consumidor e legislação específica do setor financeiro.
-
-        Contexto de conhecimento especializado:
-        {rag_context}
-
-        Contrato para análise:
-        {contract_text}
+        return """
+        Você é um especialista em contratos financeiros no Brasil. Analise o contrato apresentado ao final considerando a regulamentação do Banco Central (BACEN), Conselho Monetário Nacional (CMN), Código de Defesa do Consumidor e legislação específica do setor financeiro.
 
         Analise os seguintes aspectos específicos de contratos financeiros:
 
         1. **Taxa de juros**: Verificar se estão dentro dos limites legais e market standards
+           - A limitação da Lei de Usura não se aplica às instituições financeiras (Súmula 596 do STF)
+           - A abusividade se caracteriza por discrepância significativa em relação à taxa média de mercado divulgada pelo Banco Central para a mesma operação
+           - Capitalização de juros em periodicidade inferior à anual exige pactuação expressa; basta a taxa anual superior ao duodécuplo da mensal (Súmulas 539 e 541 do STJ)
         2. **CET (Custo Efetivo Total)**: Transparência na divulgação de todos os custos
+           - O CET deve ser informado antes da contratação, em taxa percentual anual, incluindo juros, tarifas, tributos e seguros (Resolução CMN 3.517/2007)
+           - O contrato deve informar preço à vista, juros, acréscimos, número e periodicidade das prestações e soma total a pagar (art. 52 do CDC)
         3. **Garantias**: Tipos exigidos e proporcionalidade
+           - Alienação fiduciária: verificar o bem dado em garantia, o procedimento de consolidação da propriedade e as regras de leilão (Lei 9.514/97 para imóveis; Decreto-Lei 911/69 para móveis)
+           - A garantia deve ser proporcional ao valor financiado; aval e fiança de cônjuge exigem outorga
         4. **Seguros**: Obrigatoriedade e custos
+           - O consumidor não pode ser obrigado a contratar seguro com a própria instituição ou com seguradora por ela indicada (tese do Tema 972 do STJ)
+           - Verificar se o seguro prestamista foi opcional, destacado e com valor informado no CET
         5. **Amortização**: Sistema utilizado (SAC, Price, etc.) e impactos
+           - O sistema de amortização deve estar identificado, com planilha de evolução do saldo devedor
+           - Verificar indexadores de correção do saldo e seu impacto nas prestações
         6. **Vencimento antecipado**: Condições que permitem cobrança integral
+           - As hipóteses devem ser objetivas e relacionadas ao crédito; cláusulas genéricas ("qualquer descumprimento") são desproporcionais
+           - Verificar se há notificação prévia e prazo para purgar a mora
         7. **Comissão de permanência**: Aplicação e limitações legais
+           - Não pode ser cumulada com juros remuneratórios, juros moratórios ou multa, e fica limitada à soma dos encargos contratados (Súmula 472 do STJ)
         8. **Taxas e tarifas**: Legalidade e transparência das cobranças
+           - Só podem ser cobradas tarifas previstas na regulamentação e por serviço efetivamente prestado (Resolução CMN 3.919/2010)
+           - TAC e TEC são vedadas em contratos posteriores a 30/04/2008; a tarifa de cadastro só vale no início do relacionamento (Súmula 566 do STJ)
+           - Tarifas de registro de contrato e avaliação do bem exigem comprovação do serviço (tese do Tema 958 do STJ)
         9. **Quitação antecipada**: Direitos do devedor e desconto proporcional
+           - A liquidação antecipada, total ou parcial, garante redução proporcional dos juros e encargos (art. 52, § 2º, do CDC)
+           - É vedada a cobrança de tarifa pela liquidação antecipada em contratos firmados a partir de 10/12/2007 (Resolução CMN 3.516/2007)
         10. **Renegociação**: Condições para refinanciamento
+           - Verificar se a renegociação preserva o mínimo existencial e respeita o crédito responsável (Lei 14.181/2021 - superendividamento)
+           - Refinanciamentos não podem incorporar encargos abusivos do contrato original
         11. **Dados pessoais**: Uso em bureaus de crédito e proteção (LGPD)
+           - A inscrição em cadastro de inadimplentes exige comunicação prévia ao consumidor (art. 43, § 2º, do CDC e Súmula 359 do STJ)
+           - Compartilhamento com birôs e com o cadastro positivo deve observar a Lei 12.414/2011 e a LGPD (Lei 13.709/18)
         12. **Execução**: Procedimentos em caso de inadimplência
+           - Multa moratória limitada a 2% do valor da prestação em contratos de consumo (art. 52, § 1º, do CDC)
+           - Juros moratórios em contratos bancários sem legislação específica limitados a 1% ao mês (Súmula 379 do STJ)
+           - A busca e apreensão exige comprovação da mora por notificação (Súmula 72 do STJ)
 
-        Identifique cláusulas abusivas segundo CDC e normativas BACEN.
+        Verifique também:
+        - O Código de Defesa do Consumidor se aplica às instituições financeiras (Súmula 297 do STJ)
+        - Venda casada de produtos como título de capitalização, consórcio ou cartão (art. 39, I, do CDC)
+        - Direito de arrependimento em contratações fora da agência, em até 7 dias (art. 49 do CDC)
 
+        Identifique cláusulas abusivas segundo CDC e normativas BACEN.
+        """ + self.ANALYSIS_GUIDELINES + """
         Responda APENAS com um JSON válido no seguinte formato:
-        {{
+        {
             "summary": "Resumo executivo do contrato",
             "key_findings": ["achado1", "achado2", "achado3"],
             "risk_factors": [
-                {{
+                {
                     "type": "tipo_do_risco",
                     "description": "descrição detalhada",
                     "severity": "high|medium|low",
                     "clause": "cláusula específica",
                     "recommendation": "recomendação específica"
-                }}
+                }
             ],
             "recommendations": ["recomendação1", "recomendação2"],
             "clauses_analysis": [
-                {{
+                {
                     "clause": "texto da cláusula",
                     "analysis": "análise financeira/jurídica",
                     "risk_level": "alto|médio|baixo",
                     "legal_basis": "base legal/normativa aplicável"
-                }}
+                }
             ],
             "confidence_score": 0.95
-        }}
+        }
+        """
+    
+    def get_prompt_suffix(self, contract_text: str, rag_context: str = "") -> str:
+        """Per-request part of the prompt: RAG context and the contract"""
+        
+        return f"""
+        Contexto de conhecimento especializado:
+        {rag_context}
+
+        Contrato para análise:
+        {contract_text}
+
+        Responda APENAS com o JSON no formato especificado acima.
         """
     
     def _create_fallback_analysis(self, contract_text: str, error: str) -> ContractAnalysis:
@@ -1,45 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class GasAgent(BaseContractAgent):
     """Agente especializado em contratos de fornecimento de gás"""
     
-    def __init__(self):
-        self.specialization = "Gás"
-        self.icon = "🔥"
-        
-    def generate_response(self, question: str, contract_text: str = "") -> str:
-        """Gera resposta especializada para fornecimento de gás"""
-        
-        if not question:
-            return """🔥 **Gás - Análise Especializada**
-
-Olá! Sou especialista em contratos de fornecimento de gás. Posso ajudar com:
-
-**📋 Principais Análises:**
-• Gás natural canalizado (distribuidoras)
-• GLP - Gás Liquefeito de Petróleo (botijão)
-• Tarifas e modalidades de cobrança
-• Ligação nova e transferência de titularidade
-• Segurança e manutenção
-
-**⚠️ Pontos Críticos:**
-• Reajustes tarifários
-• Cobrança de taxas irregulares
-• Problemas de fornecimento
-• Segurança das instalações
-
-**🏭 Órgãos Reguladores:**
-• ANP - Agência Nacional do Petróleo
-• PROCON - Defesa do consumidor
-• Agências estaduais reguladoras
-
-Como posso ajudar com seu contrato de gás?"""
-        
-        # Análise baseada na pergunta
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ['natural', 'canalizado', 'encanado', 'rede']):
-            return """🏢 **Gás Natural Canalizado**
+    INTENTS = [
+        Intent(
+            name="natural",
+            keywords=['natural', 'canalizado', 'encanado', 'rede'],
+            template="""🏢 **Gás Natural Canalizado**
 
 **O que é Gás Natural:**
 • **Composição**: Principalmente metano (CH₄)
@@ -165,10 +134,12 @@ Como posso ajudar com seu contrato de gás?"""
 **Base Legal:**
 Lei do Gás (11.909/09) e regulamentações da ANP.
 
-Precisa de orientação sobre ligação nova, tarifas ou problemas com gás natural?"""
-        
-        if any(word in question_lower for word in ['glp', 'botijão', 'p13', 'liquefeito', 'engarrafado']):
-            return """🔥 **GLP - Gás Liquefeito de Petróleo**
+Precisa de orientação sobre ligação nova, tarifas ou problemas com gás natural?""",
+        ),
+        Intent(
+            name="glp",
+            keywords=['glp', 'botijão', 'p13', 'liquefeito', 'engarrafado'],
+            template="""🔥 **GLP - Gás Liquefeito de Petróleo**
 
 **O que é GLP:**
 • **Composição**: Propano e Butano liquefeitos
@@ -304,10 +275,12 @@ Precisa de orientação sobre ligação nova, tarifas ou problemas com gás natu
 **Base Legal:**
 Regulamentações ANP e normas ABNT de segurança.
 
-Está com dúvidas sobre GLP, segurança ou problemas com fornecedor?"""
-        
-        if any(word in question_lower for word in ['tarifa', 'conta', 'cobrança', 'valor', 'reajuste']):
-            return """💰 **Tarifas e Cobrança de Gás**
+Está com dúvidas sobre GLP, segurança ou problemas com fornecedor?""",
+        ),
+        Intent(
+            name="tarifa",
+            keywords=['tarifa', 'conta', 'cobrança', 'valor', 'reajuste'],
+            template="""💰 **Tarifas e Cobrança de Gás**
 
 **Gás Natural - Estrutura Tarifária:**
 
@@ -438,10 +411,12 @@ Está com dúvidas sobre GLP, segurança ou problemas com fornecedor?"""
 **⚖️ Base Legal:**
 Lei do Gás, regulamentações ANP e contratos de concessão.
 
-Está com problemas na conta de gás ou dúvidas sobre tarifas?"""
-        
-        if any(word in question_lower for word in ['ligação', 'nova', 'instalação', 'ramal', 'medidor']):
-            return """🔧 **Ligação Nova e Instalação de Gás**
+Está com problemas na conta de gás ou dúvidas sobre tarifas?""",
+        ),
+        Intent(
+            name="ligacao",
+            keywords=['ligação', 'nova', 'instalação', 'ramal', 'medidor'],
+            template="""🔧 **Ligação Nova e Instalação de Gás**
 
 **Gás Natural - Ligação Nova:**
 
@@ -574,10 +549,12 @@ Está com problemas na conta de gás ou dúvidas sobre tarifas?"""
 **⚖️ Base Legal:**
 Normas ABNT, regulamentações ANP e código de obras municipal.
 
-Precisa de orientação sobre ligação nova ou instalação de gás?"""
-        
-        if any(word in question_lower for word in ['emergência', 'vazamento', 'segurança', 'acidente']):
-            return """🚨 **Segurança e Emergências com Gás**
+Precisa de orientação sobre ligação nova ou instalação de gás?""",
+        ),
+        Intent(
+            name="emergencia",
+            keywords=['emergência', 'vazamento', 'segurança', 'acidente'],
+            template="""🚨 **Segurança e Emergências com Gás**
 
 **🔥 Características do Gás:**
 
@@ -723,7 +700,46 @@ Precisa de orientação sobre ligação nova ou instalação de gás?"""
 **Base Legal:**
 Normas ABNT, regulamentos ANP e código de defesa civil.
 
-Tem dúvidas sobre segurança ou está enfrentando emergência com gás?"""
+Tem dúvidas sobre segurança ou está enfrentando emergência com gás?""",
+        ),
+    ]
+    
+    def __init__(self):
+        self.specialization = "Gás"
+        self.icon = "🔥"
+        
+    def generate_response(self, question: str, contract_text: str = "") -> str:
+        """Gera resposta especializada para fornecimento de gás"""
+        
+        if not question:
+            return """🔥 **Gás - Análise Especializada**
+
+Olá! Sou especialista em contratos de fornecimento de gás. Posso ajudar com:
+
+**📋 Principais Análises:**
+• Gás natural canalizado (distribuidoras)
+• GLP - Gás Liquefeito de Petróleo (botijão)
+• Tarifas e modalidades de cobrança
+• Ligação nova e transferência de titularidade
+• Segurança e manutenção
+
+**⚠️ Pontos Críticos:**
+• Reajustes tarifários
+• Cobrança de taxas irregulares
+• Problemas de fornecimento
+• Segurança das instalações
+
+**🏭 Órgãos Reguladores:**
+• ANP - Agência Nacional do Petróleo
+• PROCON - Defesa do consumidor
+• Agências estaduais reguladoras
+
+Como posso ajudar com seu contrato de gás?"""
+        
+        # Análise baseada na pergunta
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
         
         # Resposta geral com análise do contrato se disponível
         if contract_text:
@@ -1,20 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class HealthInsuranceAgent(BaseContractAgent):
     """Agente especializado em contratos de plano de saúde"""
     
-    def __init__(self):
-        super().__init__()
-        self.specialization = "Planos de Saúde"
-        self.icon = "🏥"
-        
-    def generate_response(self, question: str, context: str = None) -> str:
-        """Gera resposta especializada para planos de saúde"""
-        
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ["carência", "prazo", "espera"]):
-            return """🏥 **CARÊNCIAS DOS PLANOS**:
+    INTENTS = [
+        Intent(
+            name="carencia",
+            keywords=["carência", "prazo", "espera"],
+            template="""🏥 **CARÊNCIAS DOS PLANOS**:
             
 ⏰ **PRAZOS MÁXIMOS** (Lei 9.656/98):
 🔸 **Urgência/Emergência** → 24h
@@ -26,10 +20,12 @@ class HealthInsuranceAgent(BaseContractAgent):
 
 ✅ **SEM CARÊNCIA**: Urgência/emergência nas primeiras 12h, doenças preexistentes declaradas após 24 meses (CPO).
 
-⚖️ **REDUÇÃO**: Portabilidade entre planos pode reduzir ou zerar carências conforme tempo de cobertura anterior."""
-
-        elif any(word in question_lower for word in ["cobertura", "negativa", "autorização", "não cobre"]):
-            return """🏥 **COBERTURA OBRIGATÓRIA**:
+⚖️ **REDUÇÃO**: Portabilidade entre planos pode reduzir ou zerar carências conforme tempo de cobertura anterior.""",
+        ),
+        Intent(
+            name="cobertura",
+            keywords=["cobertura", "negativa", "autorização", "não cobre"],
+            template="""🏥 **COBERTURA OBRIGATÓRIA**:
             
 ✅ **DEVE COBRIR** (Rol ANS 2023):
 🔸 **Consultas** médicas ilimitadas
@@ -42,10 +38,12 @@ class HealthInsuranceAgent(BaseContractAgent):
 
 🚨 **NEGATIVA INDEVIDA**: Plano não pode negar tratamento no rol. **Direito**: Liminar judicial, multa, ressarcimento.
 
-📞 **CANAIS**: ANS (0800 701 9656), Procon, Ministério Público, Judiciário."""
-
-        elif any(word in question_lower for word in ["coparticipação", "copagamento", "franquia"]):
-            return """🏥 **COPARTICIPAÇÃO**:
+📞 **CANAIS**: ANS (0800 701 9656), Procon, Ministério Público, Judiciário.""",
+        ),
+        Intent(
+            name="coparticipacao",
+            keywords=["coparticipação", "copagamento", "franquia"],
+            template="""🏥 **COPARTICIPAÇÃO**:
             
 💰 **DEFINIÇÃO**: Valor pago pelo beneficiário por procedimento utilizado. **Objetivo**: Uso racional dos serviços.
 
@@ -53,10 +51,12 @@ class HealthInsuranceAgent(BaseContractAgent):
 
 🚫 **PROIBIDO COBRAR**: Urgência/emergência nas primeiras 12h, prevenção (vacinas, check-up), alguns exames específicos.
 
-⚖️ **ABUSO**: Valores excessivos ou cobrança indevida podem ser contestados na ANS ou judicialmente."""
-
-        elif any(word in question_lower for word in ["reembolso", "livre escolha", "médico particular"]):
-            return """🏥 **REEMBOLSO**:
+⚖️ **ABUSO**: Valores excessivos ou cobrança indevida podem ser contestados na ANS ou judicialmente.""",
+        ),
+        Intent(
+            name="reembolso",
+            keywords=["reembolso", "livre escolha", "médico particular"],
+            template="""🏥 **REEMBOLSO**:
             
 💵 **FUNCIONAMENTO**: Paciente paga médico particular e solicita reembolso conforme tabela do plano.
 
@@ -66,10 +66,12 @@ class HealthInsuranceAgent(BaseContractAgent):
 
 ⏰ **PRAZO**: Plano tem até **30 dias** para analisar e pagar após entrega completa da documentação.
 
-💡 **DICA**: Confirme percentual de reembolso antes do atendimento para evitar surpresas."""
-
-        elif any(word in question_lower for word in ["ans", "reclamação", "denúncia", "problema"]):
-            return """🏥 **RECLAMAÇÕES ANS**:
+💡 **DICA**: Confirme percentual de reembolso antes do atendimento para evitar surpresas.""",
+        ),
+        Intent(
+            name="ans",
+            keywords=["ans", "reclamação", "denúncia", "problema"],
+            template="""🏥 **RECLAMAÇÕES ANS**:
             
 📞 **CANAIS ANS**:
 🔸 **Telefone** → 0800 701 9656
@@ -81,10 +83,12 @@ class HealthInsuranceAgent(BaseContractAgent):
 
 ⚖️ **DIREITOS**: Resposta em até 10 dias úteis, instauração de processo administrativo, aplicação de multas à operadora.
 
-🏛️ **OUTROS CANAIS**: Procon estadual, Ministério Público, Defensoria Pública, Poder Judiciário."""
-
-        elif any(word in question_lower for word in ["cancelamento", "rescisão", "sair do plano"]):
-            return """🏥 **CANCELAMENTO DO PLANO**:
+🏛️ **OUTROS CANAIS**: Procon estadual, Ministério Público, Defensoria Pública, Poder Judiciário.""",
+        ),
+        Intent(
+            name="cancelamento",
+            keywords=["cancelamento", "rescisão", "sair do plano"],
+            template="""🏥 **CANCELAMENTO DO PLANO**:
             
 📝 **PELO BENEFICIÁRIO**: Comunicação por escrito com 30 dias de antecedência. **Direito**: Cancelar a qualquer momento.
 
@@ -92,10 +96,23 @@ class HealthInsuranceAgent(BaseContractAgent):
 
 💰 **DEVOLUÇÃO**: Valores pagos antecipadamente devem ser devolvidos proporcionalmente.
 
-⚖️ **PROTEÇÃO**: Lei proíbe cancelamento discriminatório. Cancelamento abusivo gera direito a indenização e reintegração."""
-
-        else:
-            return f"""🏥 **PLANOS DE SAÚDE**: Analisando sua questão sobre "{question}".
+⚖️ **PROTEÇÃO**: Lei proíbe cancelamento discriminatório. Cancelamento abusivo gera direito a indenização e reintegração.""",
+        ),
+    ]
+    
+    def __init__(self):
+        super().__init__()
+        self.specialization = "Planos de Saúde"
+        self.icon = "🏥"
+        
+    def generate_response(self, question: str, context: str = None) -> str:
+        """Gera resposta especializada para planos de saúde"""
+        
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
+        
+        return f"""🏥 **PLANOS DE SAÚDE**: Analisando sua questão sobre "{question}".
 
 **Especialidades**: ⏰ **Carências**, ✅ **Coberturas Obrigatórias**, 💰 **Coparticipação**, 💵 **Reembolso**, 📞 **Reclamações ANS**, ⚖️ **Direitos do Beneficiário**.
 
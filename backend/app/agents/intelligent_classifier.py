@@ -1,6 +1,13 @@
+import os
 import re
-from typing import Dict, Any, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from app.agents.embedding_classifier import EmbeddingClassifier
 from app.agents.entity_classifier import EntityClassifier, EntityInfo
+from app.agents.text_sampler import progressive_windows, scanned_chars, top_two_margin
+from app.core.config import settings
+from app.services.rule_engine import keyword_trie_pattern
 
 class IntelligentClassifier:
     """Sistema inteligente de classificação automática de contratos"""
@@ -242,6 +249,8 @@ class IntelligentClassifier:
                 'priority': 5
             }
         }
+        
+        self._build_keyword_index()
     
     def classify_contract(self, text: str) -> Dict[str, Any]:
         """
@@ -251,34 +260,139 @@ class IntelligentClassifier:
         if not text or not text.strip():
             return self._create_general_classification("Texto vazio")
         
-        text_lower = text.lower()
-        scores = {}
+        counts, scanned = self._scan_counts(text)
+        indptr = np.array([0, len(counts)], dtype=np.int64)
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        result = self._classification_from_scores(text, self._score_matrix(indptr, indices)[0], counts)
+        result['scanned_chars'] = scanned
+        return result
+    
+    def classify_many(self, texts: List[str], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Classificação em lote (backfills de milhares de contratos)
         
-        # Calcular pontuação para cada categoria
-        for category, config in self.classification_rules.items():
-            score = 0
-            matched_keywords = []
-            
+        Monta uma matriz esparsa documento x palavra-chave (uma varredura por documento) e
+        pontua todas as categorias com uma multiplicação contra a matriz de pesos. Lotes a
+        partir de BULK_CLASSIFICATION_PARALLEL_MIN_BATCH são divididos entre processos.
+        O resultado de cada texto é idêntico ao de classify_contract.
+        """
+        workers = max_workers or settings.BULK_CLASSIFICATION_MAX_WORKERS or os.cpu_count() or 1
+        if workers <= 1 or len(texts) < settings.BULK_CLASSIFICATION_PARALLEL_MIN_BATCH:
+            return self._classify_batch(texts)
+        
+        chunk_size = -(-len(texts) // workers)
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_bulk_worker,
+                                 initargs=(self.classification_rules,)) as pool:
+            return [result for chunk in pool.map(_classify_bulk_chunk, chunks) for result in chunk]
+    
+    def _classify_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        scans = [self._scan_counts(text) if text and text.strip() else ({}, 0) for text in texts]
+        rows = [counts for counts, _ in scans]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(row) for row in rows])
+        indices = np.fromiter((index for row in rows for index in row), dtype=np.int64, count=int(indptr[-1]))
+        scores = self._score_matrix(indptr, indices)
+        
+        results = []
+        for position, text in enumerate(texts):
+            if not text or not text.strip():
+                results.append(self._create_general_classification("Texto vazio"))
+                continue
+            result = self._classification_from_scores(text, scores[position], rows[position])
+            result['scanned_chars'] = scans[position][1]
+            results.append(result)
+        return results
+    
+    def _build_keyword_index(self) -> None:
+        """Índices derivados das regras: vocabulário, matcher de varredura única, matriz de
+        pesos e o classificador por embeddings do segundo nível"""
+        self._categories = list(self.classification_rules)
+        self._vocabulary = sorted({kw for config in self.classification_rules.values() for kw in config['keywords']})
+        self._keyword_ids = {keyword: index for index, keyword in enumerate(self._vocabulary)}
+        # Termos presentes na posição de um termo casado = ele e os seus prefixos no vocabulário
+        self._keyword_prefixes = [
+            [self._keyword_ids[other] for other in self._vocabulary if keyword.startswith(other)]
+            for keyword in self._vocabulary
+        ]
+        self._keyword_matcher = re.compile(
+            f"(?=({keyword_trie_pattern(self._vocabulary, flexible_whitespace=False)}))"
+        )
+        
+        # Pesos em décimos (inteiros): frases valem mais (2 por palavra) + prioridade * 0.1,
+        # para que a soma independa da ordem e o lote reproduza o documento único
+        self._weights = np.zeros((len(self._vocabulary), len(self._categories)), dtype=np.int64)
+        for column, config in enumerate(self.classification_rules.values()):
             for keyword in config['keywords']:
-                if keyword in text_lower:
-                    # Peso baseado no tamanho da palavra-chave (frases valem mais)
-                    word_weight = len(keyword.split()) * 2
-                    # Prioridade da categoria
-                    priority_weight = config['priority'] * 0.1
-                    score += word_weight + priority_weight
-                    matched_keywords.append(keyword)
-            
-            if score > 0:
-                scores[category] = {
-                    'score': score,
-                    'matched_keywords': matched_keywords,
-                    'agent': config['agent'],
-                    'priority': config['priority']
-                }
+                self._weights[self._keyword_ids[keyword], column] += len(keyword.split()) * 20 + config['priority']
+        
+        # Segundo nível: similaridade com as palavras-chave de cada categoria (grupos de 4
+        # termos como exemplos rotulados); o índice só é montado no primeiro uso
+        self.embedding_classifier = EmbeddingClassifier(
+            {
+                category: [' '.join(config['keywords'][i:i + 4]) for i in range(0, len(config['keywords']), 4)]
+                for category, config in self.classification_rules.items()
+            },
+            k=settings.EMBEDDING_CLASSIFIER_K,
+            min_shared_features=settings.EMBEDDING_CLASSIFIER_MIN_SHARED_FEATURES
+        )
+    
+    def _keyword_counts(self, text_lower: str) -> Dict[int, int]:
+        """Ocorrências de cada palavra-chave (por id) numa única varredura do texto"""
+        counts: Dict[int, int] = {}
+        for match in self._keyword_matcher.finditer(text_lower):
+            for index in self._keyword_prefixes[self._keyword_ids[match.group(1)]]:
+                counts[index] = counts.get(index, 0) + 1
+        return counts
+    
+    def _scan_counts(self, text: str) -> Tuple[Dict[int, int], int]:
+        """
+        Contagens com custo limitado: lê início, fim e janelas espaçadas até
+        CLASSIFIER_SCAN_BUDGET_CHARS e só amplia a leitura (x CLASSIFIER_SCAN_GROWTH)
+        enquanto a categoria vencedora não se destaca da segunda
+        
+        Retorna as contagens e quantos caracteres foram lidos.
+        """
+        for windows in progressive_windows(len(text), settings.CLASSIFIER_SCAN_BUDGET_CHARS,
+                                           settings.CLASSIFIER_SCAN_GROWTH):
+            counts: Dict[int, int] = {}
+            for start, end in windows:
+                for index, count in self._keyword_counts(text[start:end].lower()).items():
+                    counts[index] = counts.get(index, 0) + count
+            if self._is_decisive(counts):
+                break
+        return counts, scanned_chars(windows)
+    
+    def _is_decisive(self, counts: Dict[int, int]) -> bool:
+        """Vencedora acima do limiar mínimo (4.0) e com margem suficiente sobre a segunda"""
+        if not counts:
+            return False
+        scores = self._weights[list(counts)].sum(axis=0)
+        return scores.max() >= 40 and top_two_margin(scores.tolist()) >= settings.CLASSIFIER_SCAN_MIN_MARGIN
+    
+    def _score_matrix(self, indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """Pontuação (em décimos) documento x categoria: presença esparsa (CSR) @ pesos"""
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        scores = np.zeros((len(indptr) - 1, len(self._categories)), dtype=np.int64)
+        np.add.at(scores, rows, self._weights[indices])
+        return scores
+    
+    def _classification_from_scores(self, text: str, score_row: np.ndarray,
+                                    counts: Dict[int, int]) -> Dict[str, Any]:
+        scores = {}
+        for column in np.flatnonzero(score_row):
+            category = self._categories[column]
+            config = self.classification_rules[category]
+            scores[category] = {
+                'score': int(score_row[column]) / 10,
+                'matched_keywords': [kw for kw in config['keywords'] if self._keyword_ids[kw] in counts],
+                'agent': config['agent'],
+                'priority': config['priority']
+            }
         
         # Se não encontrou correspondências, usar agente geral
         if not scores:
-            return self._create_general_classification("Nenhuma palavra-chave encontrada")
+            return self._classify_by_embedding(text, scores, "Nenhuma palavra-chave encontrada")
         
         # Encontrar a melhor classificação
         best_category = max(scores.items(), key=lambda x: x[1]['score'])
@@ -287,7 +401,7 @@ class IntelligentClassifier:
         
         # Verificar confiança mínima
         if category_data['score'] < 4:  # Threshold mínimo
-            return self._create_general_classification(f"Confiança baixa: {category_data['score']}")
+            return self._classify_by_embedding(text, scores, f"Confiança baixa: {category_data['score']}")
         
         return {
             'classification': category_name,
@@ -356,6 +470,28 @@ class IntelligentClassifier:
         
         return enhanced_classification
     
+    def _classify_by_embedding(self, text: str, scores: Dict[str, Any], reason: str) -> Dict[str, Any]:
+        """Segundo nível local antes de desistir para o agente geral"""
+        if not settings.EMBEDDING_CLASSIFIER_ENABLED:
+            return self._create_general_classification(reason)
+        
+        prediction = self.embedding_classifier.classify(text)
+        if prediction.label is None or prediction.confidence < settings.EMBEDDING_CLASSIFIER_MIN_CONFIDENCE:
+            return self._create_general_classification(f"{reason}; embedding ambíguo ({prediction.confidence})")
+        
+        config = self.classification_rules[prediction.label]
+        return {
+            'classification': prediction.label,
+            'agent_type': config['agent'],
+            'confidence': prediction.confidence,
+            'matched_keywords': scores.get(prediction.label, {}).get('matched_keywords', []),
+            'priority': config['priority'],
+            'is_automatic': True,
+            'method': prediction.method,
+            'total_categories_evaluated': len(self.classification_rules),
+            'categories_with_matches': len(scores)
+        }
+    
     def _create_general_classification(self, reason: str) -> Dict[str, Any]:
         """Cria classificação para agente geral"""
         return {
@@ -387,4 +523,18 @@ class IntelligentClassifier:
             'priority': config['priority'],
             'keywords_count': len(config['keywords']),
             'sample_keywords': config['keywords'][:5]  # Primeiras 5 palavras-chave
-        }
\ No newline at end of file
+        }
+
+# Classificador de cada processo do pool de classify_many (mesmas regras do processo pai)
+_bulk_worker_classifier: Optional[IntelligentClassifier] = None
+
+
+def _init_bulk_worker(classification_rules: Dict[str, Any]) -> None:
+    global _bulk_worker_classifier
+    _bulk_worker_classifier = IntelligentClassifier()
+    _bulk_worker_classifier.classification_rules = classification_rules
+    _bulk_worker_classifier._build_keyword_index()
+
+
+def _classify_bulk_chunk(texts: List[str]) -> List[Dict[str, Any]]:
+    return _bulk_worker_classifier._classify_batch(texts)
@@ -1,5 +1,6 @@
 from typing import Dict, Any, Optional
 from app.agents.intelligent_classifier import IntelligentClassifier
+from app.agents.intent_router import intent_router
 
 # Importar todos os agentes especializados
 from app.agents.base_agent import BaseContractAgent
@@ -89,6 +90,28 @@ class IntelligentAgentFactory:
             Dict com classificação, agente e resposta
         """
         
+        selection = self.select_agent(text, question)
+        
+        # Gerar resposta especializada
+        response = selection.pop('agent').generate_response(question, text)
+        
+        return {
+            **selection,
+            
+            # Resposta gerada
+            'response': response,
+            'question': question,
+            'has_context': bool(text and text.strip())
+        }
+    
+    def select_agent(self, text: str, question: str = "") -> Dict[str, Any]:
+        """
+        Classifica e instancia o agente especializado, sem gerar a resposta
+        
+        Usado tanto pela resposta completa quanto pelo caminho de streaming.
+        O agente criado fica na chave 'agent'.
+        """
+        
         # Usar tanto texto do contrato quanto pergunta para classificação
         classification_text = f"{text} {question}".strip()
         
@@ -102,9 +125,6 @@ class IntelligentAgentFactory:
         # Criar instância do agente
         agent_instance = agent_class()
         
-        # Gerar resposta especializada
-        response = agent_instance.generate_response(question, text)
-        
         return {
             # Informações da classificação
             'classification': classification_result['classification'],
@@ -117,11 +137,7 @@ class IntelligentAgentFactory:
             # Informações do agente
             'agent_name': getattr(agent_instance, 'specialization', 'Assistente Geral'),
             'agent_icon': getattr(agent_instance, 'icon', '🤖'),
-            
-            # Resposta gerada
-            'response': response,
-            'question': question,
-            'has_context': bool(text and text.strip())
+            'agent': agent_instance
         }
     
     def classify_and_create_agent_with_entities(self, text: str, question: str = "") -> Dict[str, Any]:
@@ -210,6 +226,10 @@ class IntelligentAgentFactory:
     def get_classification_info(self, text: str) -> Dict[str, Any]:
         """Retorna apenas informações de classificação sem criar agente"""
         return self.classifier.classify_contract(text)
+    
+    def get_intent_stats(self, top: int = 20) -> Dict[str, Any]:
+        """Retorna as intenções mais acionadas nas respostas por template"""
+        return intent_router.get_intent_stats(top)
 
 # Instância global para uso em toda aplicação
 agent_factory = IntelligentAgentFactory()
\ No newline at end of file
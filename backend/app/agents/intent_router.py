@@ -0,0 +1,128 @@
+"""
+Roteador de intenções para as respostas por template dos agentes
+Compila as tabelas declarativas de todos os agentes em um único índice de palavras-chave
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Intent:
+    """Intenção declarativa: palavras-chave que disparam um template de resposta"""
+    name: str
+    keywords: Tuple[str, ...]
+    template: str
+
+    def __post_init__(self):
+        # Aceita listas na declaração, mas mantém a intenção imutável
+        object.__setattr__(self, "keywords", tuple(k.lower() for k in self.keywords))
+
+
+class IntentRouter:
+    """
+    Índice compartilhado de palavras-chave -> (agente, intenção)
+
+    Preserva a semântica das antigas cadeias `if any(word in question_lower ...)`:
+    casamento por substring e vitória da primeira intenção declarada no agente,
+    mas varre a pergunta uma única vez para todos os agentes.
+    """
+
+    def __init__(self):
+        self._tables: Dict[str, List[Intent]] = {}
+        self._pattern: Optional[re.Pattern] = None
+        # palavra-chave -> {agente: menor posição de intenção que a contém}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # palavra-chave -> palavras-chave que são prefixo dela (inclusive ela mesma)
+        self._prefixes: Dict[str, Tuple[str, ...]] = {}
+        # Respostas renderizadas por (agente, intenção)
+        self._responses: Dict[Tuple[str, str], str] = {}
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def register(self, agent: str, intents: Sequence[Intent]) -> None:
+        """Registra (ou substitui) a tabela de intenções de um agente"""
+        names = [intent.name for intent in intents]
+        if len(names) != len(set(names)):
+            raise ValueError(f"Intenções duplicadas na tabela do agente {agent}")
+
+        self._tables[agent] = list(intents)
+        self._pattern = None  # Recompila no próximo uso
+
+    def compile(self) -> None:
+        """Compila todas as tabelas registradas em um único matcher"""
+        postings: Dict[str, Dict[str, int]] = {}
+        responses: Dict[Tuple[str, str], str] = {}
+
+        for agent, intents in self._tables.items():
+            for position, intent in enumerate(intents):
+                responses[(agent, intent.name)] = intent.template
+                for keyword in intent.keywords:
+                    agents = postings.setdefault(keyword, {})
+                    agents.setdefault(agent, position)
+
+        keywords = sorted(postings, key=len, reverse=True)
+        self._prefixes = {
+            keyword: tuple(other for other in keywords if keyword.startswith(other))
+            for keyword in keywords
+        }
+
+        # Lookahead permite casamentos sobrepostos; em cada posição a alternativa
+        # mais longa vence e as mais curtas são recuperadas via `_prefixes`
+        if keywords:
+            alternation = "|".join(re.escape(keyword) for keyword in keywords)
+            self._pattern = re.compile(f"(?=({alternation}))")
+        else:
+            self._pattern = re.compile(r"(?!)")
+
+        self._postings = postings
+        self._responses = responses
+
+    def match(self, agent: str, question: str) -> Optional[Intent]:
+        """Retorna a intenção vencedora do agente para a pergunta, se houver"""
+        if self._pattern is None:
+            self.compile()
+
+        intents = self._tables.get(agent)
+        if not intents or not question:
+            return None
+
+        best = len(intents)
+        for match in self._pattern.finditer(question.lower()):
+            for keyword in self._prefixes[match.group(1)]:
+                position = self._postings[keyword].get(agent)
+                if position is not None and position < best:
+                    best = position
+                    if best == 0:
+                        return intents[0]
+
+        return intents[best] if best < len(intents) else None
+
+    def respond(self, agent: str, question: str) -> Optional[str]:
+        """Retorna a resposta renderizada da intenção vencedora e contabiliza o acerto"""
+        intent = self.match(agent, question)
+        if intent is None:
+            self.misses[agent] += 1
+            return None
+
+        self.hits[(agent, intent.name)] += 1
+        return self._responses[(agent, intent.name)]
+
+    def get_intent_stats(self, top: int = 20) -> Dict[str, object]:
+        """Retorna as intenções mais acionadas e perguntas sem intenção por agente"""
+        return {
+            "registered_agents": len(self._tables),
+            "registered_intents": sum(len(intents) for intents in self._tables.values()),
+            "indexed_keywords": len(self._postings),
+            "top_intents": [
+                {"agent": agent, "intent": name, "hits": count}
+                for (agent, name), count in self.hits.most_common(top)
+            ],
+            "unmatched_by_agent": dict(self.misses),
+        }
+
+
+# Instância global compartilhada por todos os agentes
+intent_router = IntentRouter()
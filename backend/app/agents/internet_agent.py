@@ -1,20 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class InternetAgent(BaseContractAgent):
     """Agente especializado em contratos de internet banda larga"""
     
-    def __init__(self):
-        super().__init__()
-        self.specialization = "Internet Banda Larga"
-        self.icon = "🌐"
-        
-    def generate_response(self, question: str, context: str = None) -> str:
-        """Gera resposta especializada para contratos de internet"""
-        
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ["velocidade", "mega", "fibra", "lenta"]):
-            return """🌐 **VELOCIDADE DA INTERNET**:
+    INTENTS = [
+        Intent(
+            name="velocidade",
+            keywords=["velocidade", "mega", "fibra", "lenta"],
+            template="""🌐 **VELOCIDADE DA INTERNET**:
             
 📊 **GARANTIAS ANATEL**: 
 🔸 **Fibra Óptica** → Mínimo 40% da velocidade contratada
@@ -25,10 +19,12 @@ class InternetAgent(BaseContractAgent):
 
 ⚖️ **DIREITOS**: 🔸 **Desconto proporcional** na fatura, 🔸 **Rescisão sem multa** por descumprimento, 🔸 **Upgrade gratuito** se disponível.
 
-📞 **RECLAMAÇÃO**: Primeiro com operadora (protocolo), depois ANATEL 1331 ou anatel.gov.br."""
-
-        elif any(word in question_lower for word in ["instabilidade", "oscilação", "cai", "falha"]):
-            return """🌐 **INSTABILIDADE/OSCILAÇÃO**:
+📞 **RECLAMAÇÃO**: Primeiro com operadora (protocolo), depois ANATEL 1331 ou anatel.gov.br.""",
+        ),
+        Intent(
+            name="instabilidade",
+            keywords=["instabilidade", "oscilação", "cai", "falha"],
+            template="""🌐 **INSTABILIDADE/OSCILAÇÃO**:
             
 📋 **REGISTRO**: Anote data/hora das falhas, faça testes no site da ANATEL, guarde protocolos de atendimento.
 
@@ -36,10 +32,12 @@ class InternetAgent(BaseContractAgent):
 
 ⚖️ **DIREITOS**: 🔸 **Desconto** proporcional ao tempo sem serviço, 🔸 **Visita técnica gratuita**, 🔸 **Troca de equipamentos** defeituosos.
 
-📱 **TESTE**: Use app "Brasil Banda Larga" da ANATEL para medições oficiais. **Mínimo 6 testes** em dias/horários diferentes."""
-
-        elif any(word in question_lower for word in ["fidelidade", "cancelar", "multa", "rescisão"]):
-            return """🌐 **FIDELIDADE INTERNET**:
+📱 **TESTE**: Use app "Brasil Banda Larga" da ANATEL para medições oficiais. **Mínimo 6 testes** em dias/horários diferentes.""",
+        ),
+        Intent(
+            name="fidelidade",
+            keywords=["fidelidade", "cancelar", "multa", "rescisão"],
+            template="""🌐 **FIDELIDADE INTERNET**:
             
 ⏰ **PRAZOS**: Máximo **24 meses** de fidelidade (Decreto 10.771/21). **Após período** → Cancelamento livre.
 
@@ -51,10 +49,12 @@ class InternetAgent(BaseContractAgent):
 🔸 **Alteração unilateral** prejudicial
 🔸 **Desemprego** (comprovado)
 
-📞 **PROCEDIMENTO**: Comunicar por escrito, exigir protocolo, confirmar data de corte e quitação final."""
-
-        elif any(word in question_lower for word in ["equipamento", "modem", "roteador", "wifi"]):
-            return """🌐 **EQUIPAMENTOS**:
+📞 **PROCEDIMENTO**: Comunicar por escrito, exigir protocolo, confirmar data de corte e quitação final.""",
+        ),
+        Intent(
+            name="equipamento",
+            keywords=["equipamento", "modem", "roteador", "wifi"],
+            template="""🌐 **EQUIPAMENTOS**:
             
 📡 **FORNECIMENTO**: Operadora deve fornecer **modem básico gratuito** para acesso ao serviço contratado.
 
@@ -62,10 +62,12 @@ class InternetAgent(BaseContractAgent):
 
 📶 **WI-FI**: Roteador Wi-Fi pode ter custo adicional, mas muitas operadoras incluem no combo. **Verifique contrato**.
 
-⚖️ **TROCA/DEFEITO**: Equipamento defeituoso deve ser trocado **gratuitamente**. Operadora não pode cobrar por problemas técnicos dela."""
-
-        elif any(word in question_lower for word in ["franquia", "limite", "dados", "ilimitado"]):
-            return """🌐 **FRANQUIA DE DADOS**:
+⚖️ **TROCA/DEFEITO**: Equipamento defeituoso deve ser trocado **gratuitamente**. Operadora não pode cobrar por problemas técnicos dela.""",
+        ),
+        Intent(
+            name="franquia",
+            keywords=["franquia", "limite", "dados", "ilimitado"],
+            template="""🌐 **FRANQUIA DE DADOS**:
             
 📊 **BANDA LARGA FIXA**: Não pode ter franquia ou limite de dados (Resolução ANATEL 614/13). **Ilimitado real**.
 
@@ -73,10 +75,12 @@ class InternetAgent(BaseContractAgent):
 
 📱 **DIFERENÇA**: Internet móvel (celular) pode ter franquia, mas fixa domiciliar não.
 
-⚖️ **DENÚNCIA**: Cobrança por excesso em internet fixa é **irregular**. Procure ANATEL 1331 para denunciar."""
-
-        elif any(word in question_lower for word in ["mudança", "endereço", "transferir"]):
-            return """🌐 **MUDANÇA DE ENDEREÇO**:
+⚖️ **DENÚNCIA**: Cobrança por excesso em internet fixa é **irregular**. Procure ANATEL 1331 para denunciar.""",
+        ),
+        Intent(
+            name="mudanca",
+            keywords=["mudança", "endereço", "transferir"],
+            template="""🌐 **MUDANÇA DE ENDEREÇO**:
             
 📍 **COBERTURA EXISTE**: Transferência gratuita ou taxa máxima de instalação. Manter mesmo plano e condições.
 
@@ -84,10 +88,23 @@ class InternetAgent(BaseContractAgent):
 
 📋 **PROCEDIMENTO**: 🔸 Consultar cobertura no novo endereço, 🔸 Protocolar solicitação, 🔸 Agendar transferência/desinstalação.
 
-⏰ **PRAZO**: Até **7 dias** para instalar no novo endereço com cobertura existente."""
-
-        else:
-            return f"""🌐 **INTERNET BANDA LARGA**: Analisando sua questão sobre "{question}".
+⏰ **PRAZO**: Até **7 dias** para instalar no novo endereço com cobertura existente.""",
+        ),
+    ]
+    
+    def __init__(self):
+        super().__init__()
+        self.specialization = "Internet Banda Larga"
+        self.icon = "🌐"
+        
+    def generate_response(self, question: str, context: str = None) -> str:
+        """Gera resposta especializada para contratos de internet"""
+        
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
+        
+        return f"""🌐 **INTERNET BANDA LARGA**: Analisando sua questão sobre "{question}".
 
 **Especialidades**: 📊 **Velocidade** (testes, garantias), 🔧 **Problemas Técnicos** (instabilidade, equipamentos), ⏰ **Fidelidade**, 📋 **Mudança de Endereço**, ⚖️ **Direitos ANATEL**.
 
@@ -1,45 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class LifeInsuranceAgent(BaseContractAgent):
     """Agente especializado em seguros de vida"""
     
-    def __init__(self):
-        self.specialization = "Seguro de Vida"
-        self.icon = "🛡️"
-        
-    def generate_response(self, question: str, contract_text: str = "") -> str:
-        """Gera resposta especializada para seguros de vida"""
-        
-        if not question:
-            return """🛡️ **Seguro de Vida - Análise Especializada**
-
-Olá! Sou especialista em seguros de vida. Posso ajudar com:
-
-**📋 Principais Análises:**
-• Coberturas básicas e adicionais
-• Capital segurado e beneficiários
-• Carência e exclusões de cobertura
-• Prêmio e forma de pagamento
-• Resgate e portabilidade
-
-**⚠️ Pontos Críticos:**
-• Declarações de saúde incorretas
-• Carência excessiva para algumas coberturas
-• Exclusões não informadas claramente
-• Cláusulas abusivas de cancelamento
-
-**📞 Órgãos de Defesa:**
-• SUSEP - Superintendência de Seguros Privados
-• PROCON - Defesa do consumidor
-• CNseg - Confederação Nacional das Seguradoras
-
-Como posso ajudar com seu seguro de vida?"""
-        
-        # Análise baseada na pergunta
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ['cobertura', 'cobrir', 'proteção', 'benefício']):
-            return """🛡️ **Coberturas do Seguro de Vida**
+    INTENTS = [
+        Intent(
+            name="cobertura",
+            keywords=['cobertura', 'cobrir', 'proteção', 'benefício'],
+            template="""🛡️ **Coberturas do Seguro de Vida**
 
 **Cobertura Básica (Morte):**
 • **Morte natural**: Por doença ou causas naturais
@@ -91,10 +60,12 @@ Leia SEMPRE as condições gerais da apólice - é lá que estão detalhadas tod
 **🚨 Contestação de Negativa:**
 Se seguradora negar sinistro indevidamente, você pode contestar via SUSEP ou buscar orientação jurídica.
 
-Precisa de esclarecimento sobre alguma cobertura específica?"""
-        
-        if any(word in question_lower for word in ['beneficiário', 'herança', 'família', 'dependente']):
-            return """👨‍👩‍👧‍👦 **Beneficiários do Seguro de Vida**
+Precisa de esclarecimento sobre alguma cobertura específica?""",
+        ),
+        Intent(
+            name="beneficiario",
+            keywords=['beneficiário', 'herança', 'família', 'dependente'],
+            template="""👨‍👩‍👧‍👦 **Beneficiários do Seguro de Vida**
 
 **Quem Pode Ser Beneficiário:**
 • **Pessoas físicas**: Familiares, amigos, qualquer pessoa
@@ -153,10 +124,12 @@ Código Civil garante livre escolha de beneficiários, exceto legítima do cônj
 **🚨 Dica Importante:**
 Mantenha sempre atualizada a indicação de beneficiários, especialmente após mudanças familiares (casamento, nascimento, divórcio).
 
-Precisa de orientação sobre como indicar ou alterar beneficiários?"""
-        
-        if any(word in question_lower for word in ['prêmio', 'pagamento', 'valor', 'custo']):
-            return """💰 **Prêmio e Pagamento do Seguro**
+Precisa de orientação sobre como indicar ou alterar beneficiários?""",
+        ),
+        Intent(
+            name="premio",
+            keywords=['prêmio', 'pagamento', 'valor', 'custo'],
+            template="""💰 **Prêmio e Pagamento do Seguro**
 
 **Como é Calculado o Prêmio:**
 • **Idade**: Fator principal - quanto maior, mais caro
@@ -227,10 +200,12 @@ SUSEP regula reajustes e condições de pagamento do seguro de vida.
 **🚨 Atraso no Pagamento:**
 Não deixe o seguro vencer! Reativação pode exigir nova análise de saúde e carência.
 
-Precisa de ajuda para calcular o valor ideal do seu seguro?"""
-        
-        if any(word in question_lower for word in ['carência', 'prazo', 'cobertura', 'quando']):
-            return """⏰ **Carência do Seguro de Vida**
+Precisa de ajuda para calcular o valor ideal do seu seguro?""",
+        ),
+        Intent(
+            name="carencia",
+            keywords=['carência', 'prazo', 'cobertura', 'quando'],
+            template="""⏰ **Carência do Seguro de Vida**
 
 **O que é Carência:**
 • **Período de espera**: Tempo entre contratação e cobertura efetiva
@@ -303,10 +278,12 @@ Precisa de ajuda para calcular o valor ideal do seu seguro?"""
 **🚨 Cuidado com Omissões:**
 Omitir doença preexistente pode anular completamente o seguro, mesmo após anos de pagamento!
 
-Tem dúvidas sobre carências no seu seguro específico?"""
-        
-        if any(word in question_lower for word in ['resgate', 'cancelar', 'sair', 'devolver']):
-            return """💵 **Resgate e Cancelamento do Seguro**
+Tem dúvidas sobre carências no seu seguro específico?""",
+        ),
+        Intent(
+            name="resgate",
+            keywords=['resgate', 'cancelar', 'sair', 'devolver'],
+            template="""💵 **Resgate e Cancelamento do Seguro**
 
 **Tipos de Seguro e Resgate:**
 
@@ -382,7 +359,46 @@ CDC garante direito de cancelamento e resgate conforme condições contratuais.
 **🚨 Importante:**
 Antes de cancelar, certifique-se de que conseguirá fazer novo seguro se necessário - idade e saúde podem ser impeditivos!
 
-Está considerando cancelar seu seguro? Posso ajudar a avaliar alternativas!"""
+Está considerando cancelar seu seguro? Posso ajudar a avaliar alternativas!""",
+        ),
+    ]
+    
+    def __init__(self):
+        self.specialization = "Seguro de Vida"
+        self.icon = "🛡️"
+        
+    def generate_response(self, question: str, contract_text: str = "") -> str:
+        """Gera resposta especializada para seguros de vida"""
+        
+        if not question:
+            return """🛡️ **Seguro de Vida - Análise Especializada**
+
+Olá! Sou especialista em seguros de vida. Posso ajudar com:
+
+**📋 Principais Análises:**
+• Coberturas básicas e adicionais
+• Capital segurado e beneficiários
+• Carência e exclusões de cobertura
+• Prêmio e forma de pagamento
+• Resgate e portabilidade
+
+**⚠️ Pontos Críticos:**
+• Declarações de saúde incorretas
+• Carência excessiva para algumas coberturas
+• Exclusões não informadas claramente
+• Cláusulas abusivas de cancelamento
+
+**📞 Órgãos de Defesa:**
+• SUSEP - Superintendência de Seguros Privados
+• PROCON - Defesa do consumidor
+• CNseg - Confederação Nacional das Seguradoras
+
+Como posso ajudar com seu seguro de vida?"""
+        
+        # Análise baseada na pergunta
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
         
         # Resposta geral com análise do contrato se disponível
         if contract_text:
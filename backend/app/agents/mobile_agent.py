@@ -1,45 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class MobileAgent(BaseContractAgent):
     """Agente especializado em contratos de telefonia móvel"""
     
-    def __init__(self):
-        self.specialization = "Telefonia Móvel"
-        self.icon = "📱"
-        
-    def generate_response(self, question: str, contract_text: str = "") -> str:
-        """Gera resposta especializada para telefonia móvel"""
-        
-        if not question:
-            return """📱 **Telefonia Móvel - Análise Especializada**
-
-Olá! Sou especialista em contratos de telefonia móvel. Posso ajudar com:
-
-**📋 Principais Análises:**
-• Planos pré e pós-pago
-• Fidelidade e multas contratuais  
-• Cobertura e qualidade do sinal
-• Portabilidade numérica
-• Cobrança de serviços adicionais
-
-**⚠️ Pontos Críticos:**
-• Fidelidade superior a 12 meses
-• Serviços premium não solicitados
-• Cobertura inadequada na região
-• Dificuldades no cancelamento
-
-**📞 Órgãos de Defesa:**
-• ANATEL - Regulamentação de telecomunicações
-• PROCON - Defesa do consumidor
-• Portal da ANATEL (anatel.gov.br)
-
-Como posso ajudar com seu plano móvel?"""
-        
-        # Análise baseada na pergunta
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ['plano', 'pré', 'pós', 'franquia', 'dados']):
-            return """📱 **Planos de Telefonia Móvel**
+    INTENTS = [
+        Intent(
+            name="plano",
+            keywords=['plano', 'pré', 'pós', 'franquia', 'dados'],
+            template="""📱 **Planos de Telefonia Móvel**
 
 **Tipos de Plano:**
 
@@ -116,10 +85,12 @@ Como posso ajudar com seu plano móvel?"""
 **⚖️ Base Legal:**
 Regulamento da ANATEL sobre Serviços de Telecomunicações.
 
-Precisa de orientação sobre qual tipo de plano escolher ou problemas com seu plano atual?"""
-        
-        if any(word in question_lower for word in ['portabilidade', 'trocar', 'mudar', 'operadora']):
-            return """🔄 **Portabilidade Numérica**
+Precisa de orientação sobre qual tipo de plano escolher ou problemas com seu plano atual?""",
+        ),
+        Intent(
+            name="portabilidade",
+            keywords=['portabilidade', 'trocar', 'mudar', 'operadora'],
+            template="""🔄 **Portabilidade Numérica**
 
 **O que é Portabilidade:**
 • **Direito garantido**: Manter seu número ao trocar de operadora
@@ -199,10 +170,12 @@ Precisa de orientação sobre qual tipo de plano escolher ou problemas com seu p
 **⚖️ Regulamentação:**
 Resolução ANATEL 85/98 sobre portabilidade numérica.
 
-Está pensando em fazer portabilidade ou enfrentou problemas no processo?"""
-        
-        if any(word in question_lower for word in ['cobertura', 'sinal', 'qualidade', 'área']):
-            return """📡 **Cobertura e Qualidade do Sinal**
+Está pensando em fazer portabilidade ou enfrentou problemas no processo?""",
+        ),
+        Intent(
+            name="cobertura",
+            keywords=['cobertura', 'sinal', 'qualidade', 'área'],
+            template="""📡 **Cobertura e Qualidade do Sinal**
 
 **Tipos de Cobertura:**
 
@@ -303,10 +276,12 @@ Está pensando em fazer portabilidade ou enfrentou problemas no processo?"""
 **⚖️ Regulamentação:**
 Regulamento de Gestão da Qualidade da ANATEL.
 
-Está enfrentando problemas de sinal ou cobertura na sua região?"""
-        
-        if any(word in question_lower for word in ['cancelar', 'cancelamento', 'fidelidade', 'multa']):
-            return """❌ **Cancelamento e Fidelidade**
+Está enfrentando problemas de sinal ou cobertura na sua região?""",
+        ),
+        Intent(
+            name="cancelar",
+            keywords=['cancelar', 'cancelamento', 'fidelidade', 'multa'],
+            template="""❌ **Cancelamento e Fidelidade**
 
 **Cancelamento de Linha Móvel:**
 
@@ -396,10 +371,12 @@ Multa = (6/12) × R$ 240 = R$ 120
 **⚖️ Base Legal:**
 CDC e Regulamento da ANATEL sobre direito de cancelamento.
 
-Está enfrentando dificuldades para cancelar ou tem dúvidas sobre multa de fidelidade?"""
-        
-        if any(word in question_lower for word in ['cobrança', 'fatura', 'conta', 'valor', 'serviço']):
-            return """💰 **Cobrança e Faturamento Móvel**
+Está enfrentando dificuldades para cancelar ou tem dúvidas sobre multa de fidelidade?""",
+        ),
+        Intent(
+            name="cobranca",
+            keywords=['cobrança', 'fatura', 'conta', 'valor', 'serviço'],
+            template="""💰 **Cobrança e Faturamento Móvel**
 
 **Composição da Fatura:**
 
@@ -499,7 +476,46 @@ Está enfrentando dificuldades para cancelar ou tem dúvidas sobre multa de fide
 **⚖️ Base Legal:**
 CDC sobre direito de contestação e transparência na cobrança.
 
-Está com problemas na sua fatura ou cobranças não reconhecidas?"""
+Está com problemas na sua fatura ou cobranças não reconhecidas?""",
+        ),
+    ]
+    
+    def __init__(self):
+        self.specialization = "Telefonia Móvel"
+        self.icon = "📱"
+        
+    def generate_response(self, question: str, contract_text: str = "") -> str:
+        """Gera resposta especializada para telefonia móvel"""
+        
+        if not question:
+            return """📱 **Telefonia Móvel - Análise Especializada**
+
+Olá! Sou especialista em contratos de telefonia móvel. Posso ajudar com:
+
+**📋 Principais Análises:**
+• Planos pré e pós-pago
+• Fidelidade e multas contratuais  
+• Cobertura e qualidade do sinal
+• Portabilidade numérica
+• Cobrança de serviços adicionais
+
+**⚠️ Pontos Críticos:**
+• Fidelidade superior a 12 meses
+• Serviços premium não solicitados
+• Cobertura inadequada na região
+• Dificuldades no cancelamento
+
+**📞 Órgãos de Defesa:**
+• ANATEL - Regulamentação de telecomunicações
+• PROCON - Defesa do consumidor
+• Portal da ANATEL (anatel.gov.br)
+
+Como posso ajudar com seu plano móvel?"""
+        
+        # Análise baseada na pergunta
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
         
         # Resposta geral com análise do contrato se disponível
         if contract_text:
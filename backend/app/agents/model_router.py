@@ -0,0 +1,157 @@
+"""
+Roteamento de modelos "mais barato primeiro" para a análise de contratos
+Tenta a análise por regras ou um modelo rápido e escala para o modelo maior apenas
+quando a confiança é baixa, surgem riscos graves ou o usuário pede análise completa
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.llm_gateway import Histogram, estimate_tokens
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """Degrau da escada de roteamento"""
+    name: str
+    model: Optional[str]  # None = análise determinística por regras (sem LLM)
+    max_tokens: int = 0
+    input_price: float = 0.0  # USD por milhão de tokens
+    output_price: float = 0.0
+
+
+# Severidades que sempre justificam a análise do modelo maior
+ESCALATION_SEVERITIES = {"high", "critical", "alto", "crítico", "critico"}
+
+
+class ModelRouter:
+    """
+    Escada de rotas rules -> fast -> full
+
+    plan() escolhe o degrau inicial (contratos curtos e bem classificados começam pelas
+    regras; contratos longos ou pedidos explícitos vão direto ao modelo completo) e
+    escalation_reason() decide, após cada degrau, se o resultado pode ser aceito.
+    """
+
+    def __init__(self, routes: List[ModelRoute],
+                 min_confidence: float = 0.75,
+                 rules_max_chars: int = 3000,
+                 rules_min_classification_confidence: float = 0.85,
+                 fast_max_chars: int = 20000):
+        self.routes = {route.name: route for route in routes}
+        self.ladder = [route.name for route in routes]
+        self.min_confidence = min_confidence
+        self.rules_max_chars = rules_max_chars
+        self.rules_min_classification_confidence = rules_min_classification_confidence
+        self.fast_max_chars = fast_max_chars
+
+        self.outcomes: Dict[str, Counter] = defaultdict(Counter)
+        self.escalation_reasons: Counter = Counter()
+        self.latency: Dict[str, Histogram] = defaultdict(Histogram)
+        self.tokens: Dict[str, Counter] = defaultdict(Counter)
+        self.cost_usd: Dict[str, float] = defaultdict(float)
+
+    def plan(self, contract_text: str, context: Optional[Dict[str, Any]] = None) -> List[ModelRoute]:
+        """Rotas a tentar, em ordem, para este contrato"""
+        context = context or {}
+        if context.get("analysis_depth") == "full":
+            start = "full"
+        elif (len(contract_text) <= self.rules_max_chars
+              and self.classification_confidence(context) >= self.rules_min_classification_confidence):
+            start = "rules"
+        elif len(contract_text) <= self.fast_max_chars:
+            start = "fast"
+        else:
+            start = "full"
+
+        names = self.ladder[self.ladder.index(start):] if start in self.ladder else self.ladder[-1:]
+        return [self.routes[name] for name in names]
+
+    def escalation_reason(self, route: ModelRoute, analysis_data: Dict[str, Any],
+                          context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Motivo para subir de degrau, ou None se o resultado pode ser aceito"""
+        severities = {
+            str(risk.get("severity", "")).lower()
+            for risk in analysis_data.get("risk_factors", [])
+            if isinstance(risk, dict)
+        }
+        if severities & ESCALATION_SEVERITIES:
+            return "high_severity_risk"
+
+        if route.model is None:
+            # A análise por regras não se autoavalia: vale a confiança da classificação
+            confidence = self.classification_confidence(context or {})
+        else:
+            confidence = float(analysis_data.get("confidence_score") or 0.0)
+        if confidence < self.min_confidence:
+            return "low_confidence"
+        return None
+
+    @staticmethod
+    def classification_confidence(context: Dict[str, Any]) -> float:
+        classification = context.get("classification") or {}
+        return float(classification.get("confidence") or 0.0)
+
+    def record(self, route: ModelRoute, duration: float, outcome: str,
+               prompt: str = "", response: str = "", reason: Optional[str] = None) -> float:
+        """Contabiliza latência, tokens estimados e custo de uma tentativa; retorna o custo"""
+        self.outcomes[route.name][outcome] += 1
+        if reason:
+            self.escalation_reasons[reason] += 1
+        self.latency[route.name].observe(duration)
+
+        cost = 0.0
+        if route.model is not None:
+            input_tokens = estimate_tokens(prompt)
+            output_tokens = estimate_tokens(response) if response else 0
+            self.tokens[route.name]["input"] += input_tokens
+            self.tokens[route.name]["output"] += output_tokens
+            cost = (input_tokens * route.input_price + output_tokens * route.output_price) / 1_000_000
+            self.cost_usd[route.name] += cost
+        return cost
+
+    def get_stats(self) -> Dict[str, Any]:
+        routes = {}
+        for name in self.ladder:
+            outcomes = self.outcomes[name]
+            attempts = sum(outcomes.values())
+            routes[name] = {
+                "model": self.routes[name].model or "rules",
+                "attempts": attempts,
+                "accepted": outcomes["accepted"],
+                "escalated": outcomes["escalated"],
+                "errors": outcomes["error"],
+                "acceptance_rate": outcomes["accepted"] / attempts if attempts else 0.0,
+                "latency_seconds": self.latency[name].snapshot(),
+                "estimated_tokens": dict(self.tokens[name]),
+                "estimated_cost_usd": round(self.cost_usd[name], 6),
+            }
+        return {
+            "routes": routes,
+            "escalation_reasons": dict(self.escalation_reasons),
+            "total_estimated_cost_usd": round(sum(self.cost_usd.values()), 6),
+            "thresholds": {
+                "min_confidence": self.min_confidence,
+                "rules_max_chars": self.rules_max_chars,
+                "rules_min_classification_confidence": self.rules_min_classification_confidence,
+                "fast_max_chars": self.fast_max_chars,
+            },
+        }
+
+
+# Instância global
+model_router = ModelRouter(
+    routes=[
+        ModelRoute("rules", None),
+        ModelRoute("fast", settings.MODEL_ROUTING_FAST_MODEL, max_tokens=2000,
+                   input_price=0.25, output_price=1.25),
+        ModelRoute("full", settings.MODEL_ROUTING_FULL_MODEL, max_tokens=4000,
+                   input_price=3.0, output_price=15.0),
+    ],
+    min_confidence=settings.MODEL_ROUTING_MIN_CONFIDENCE,
+    rules_max_chars=settings.MODEL_ROUTING_RULES_MAX_CHARS,
+    rules_min_classification_confidence=settings.MODEL_ROUTING_RULES_MIN_CLASSIFICATION_CONFIDENCE,
+    fast_max_chars=settings.MODEL_ROUTING_FAST_MAX_CHARS
+)
@@ -1,20 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class PersonalLoanAgent(BaseContractAgent):
     """Agente especializado em empréstimos pessoais"""
     
-    def __init__(self):
-        super().__init__()
-        self.specialization = "Empréstimos Pessoais"
-        self.icon = "💰"
-        
-    def generate_response(self, question: str, context: str = None) -> str:
-        """Gera resposta especializada para empréstimos pessoais"""
-        
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ["juros", "taxa", "cet", "abusivo"]):
-            return """💰 **JUROS EM EMPRÉSTIMOS**:
+    INTENTS = [
+        Intent(
+            name="juros",
+            keywords=["juros", "taxa", "cet", "abusivo"],
+            template="""💰 **JUROS EM EMPRÉSTIMOS**:
             
 📊 **LIMITES LEGAIS**: **Pessoa Física** → Até 2% ao mês + multa 2% (CDC). **Consignado** → Taxa regulamentada pelo BACEN (aprox. 2,14% ao mês).
 
@@ -22,10 +16,12 @@ class PersonalLoanAgent(BaseContractAgent):
 
 🚨 **JUROS ABUSIVOS**: Superiores a **4x** a taxa SELIC ou que tornem prestação >30% da renda. **Direito**: Revisão judicial.
 
-⚖️ **AÇÃO**: Busque advogado se suspeitar de abuso. Guarde contratos e comprovantes de pagamento."""
-
-        elif any(word in question_lower for word in ["consignado", "desconto", "folha", "aposentado"]):
-            return """💰 **CRÉDITO CONSIGNADO**:
+⚖️ **AÇÃO**: Busque advogado se suspeitar de abuso. Guarde contratos e comprovantes de pagamento.""",
+        ),
+        Intent(
+            name="consignado",
+            keywords=["consignado", "desconto", "folha", "aposentado"],
+            template="""💰 **CRÉDITO CONSIGNADO**:
             
 ✅ **VANTAGENS**: Menores juros (garantia no salário), aprovação mais fácil, sem consulta SPC/Serasa severa.
 
@@ -33,10 +29,12 @@ class PersonalLoanAgent(BaseContractAgent):
 
 👥 **QUEM PODE**: CLT, servidor público, aposentado/pensionista INSS, Forças Armadas.
 
-⚠️ **CUIDADO**: Portabilidade gratuita entre bancos. **Não aceite**: Pressão para contratar seguros desnecessários ou produtos casados."""
-
-        elif any(word in question_lower for word in ["avalista", "fiador", "garantia"]):
-            return """💰 **GARANTIAS EM EMPRÉSTIMOS**:
+⚠️ **CUIDADO**: Portabilidade gratuita entre bancos. **Não aceite**: Pressão para contratar seguros desnecessários ou produtos casados.""",
+        ),
+        Intent(
+            name="avalista",
+            keywords=["avalista", "fiador", "garantia"],
+            template="""💰 **GARANTIAS EM EMPRÉSTIMOS**:
             
 🛡️ **AVALISTA**: Garante o pagamento sem benefício de ordem (cobrança direta). **Risco**: Bens próprios podem ser executados.
 
@@ -44,10 +42,12 @@ class PersonalLoanAgent(BaseContractAgent):
 
 ⚖️ **DIREITOS**: 🔸 **Exoneração** após 2 anos (Súmula 214 STJ), 🔸 **Sub-rogação** nos direitos contra devedor principal.
 
-🚨 **ATENÇÃO**: Avalista/fiador respondem mesmo após morte do devedor. **Analise bem** antes de assinar qualquer garantia!"""
-
-        elif any(word in question_lower for word in ["antecipação", "quitação", "desconto"]):
-            return """💰 **QUITAÇÃO ANTECIPADA**:
+🚨 **ATENÇÃO**: Avalista/fiador respondem mesmo após morte do devedor. **Analise bem** antes de assinar qualquer garantia!""",
+        ),
+        Intent(
+            name="antecipacao",
+            keywords=["antecipação", "quitação", "desconto"],
+            template="""💰 **QUITAÇÃO ANTECIPADA**:
             
 ⚖️ **DIREITO CDC**: Redução proporcional dos juros e acréscimos (Art. 52, §2º). **Não podem**: Cobrar multa por antecipação.
 
@@ -55,10 +55,12 @@ class PersonalLoanAgent(BaseContractAgent):
 
 📞 **NEGOCIAÇÃO**: Ligue para banco e solicite **simulação oficial**. Compare com cálculo próprio. **Exija desconto** de IOF proporcional.
 
-💡 **DICA**: Guarde protocolos e confirme desconto por escrito. Em caso de recusa, procure Procon ou Bacen."""
-
-        elif any(word in question_lower for word in ["renegociação", "acordo", "dívida", "parcelamento"]):
-            return """💰 **RENEGOCIAÇÃO DE DÍVIDAS**:
+💡 **DICA**: Guarde protocolos e confirme desconto por escrito. Em caso de recusa, procure Procon ou Bacen.""",
+        ),
+        Intent(
+            name="renegociacao",
+            keywords=["renegociação", "acordo", "dívida", "parcelamento"],
+            template="""💰 **RENEGOCIAÇÃO DE DÍVIDAS**:
             
 📞 **CANAIS**: Serasa Limpa Nome, SPC Quero Quitar, Registrato (Bacen), WhatsApp do banco, app oficial.
 
@@ -66,10 +68,12 @@ class PersonalLoanAgent(BaseContractAgent):
 
 📋 **DOCUMENTOS**: CPF, comprovante renda atualizado, proposta por escrito, protocolo de atendimento.
 
-⚠️ **CUIDADO**: Não assine sem ler. **Confirme**: Retirada do nome dos órgãos, ausência de juros abusivos no acordo."""
-
-        elif any(word in question_lower for word in ["spc", "serasa", "score", "nome sujo"]):
-            return """💰 **NOME NEGATIVADO**:
+⚠️ **CUIDADO**: Não assine sem ler. **Confirme**: Retirada do nome dos órgãos, ausência de juros abusivos no acordo.""",
+        ),
+        Intent(
+            name="spc",
+            keywords=["spc", "serasa", "score", "nome sujo"],
+            template="""💰 **NOME NEGATIVADO**:
             
 📱 **CONSULTA GRATUITA**: SPC/Serasa apps oficiais, Registrato (Bacen), ou presencial com documento.
 
@@ -77,10 +81,23 @@ class PersonalLoanAgent(BaseContractAgent):
 
 📊 **SCORE**: Pontuação de 0-1000. **Melhora com**: Pagamentos em dia, relacionamento bancário, atualização de dados.
 
-🔍 **DIREITOS**: Contestar informações incorretas gratuitamente. **Prazo**: 5 dias úteis para correção após solicitação."""
-
-        else:
-            return f"""💰 **EMPRÉSTIMOS PESSOAIS**: Analisando sua questão sobre "{question}".
+🔍 **DIREITOS**: Contestar informações incorretas gratuitamente. **Prazo**: 5 dias úteis para correção após solicitação.""",
+        ),
+    ]
+    
+    def __init__(self):
+        super().__init__()
+        self.specialization = "Empréstimos Pessoais"
+        self.icon = "💰"
+        
+    def generate_response(self, question: str, context: str = None) -> str:
+        """Gera resposta especializada para empréstimos pessoais"""
+        
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
+        
+        return f"""💰 **EMPRÉSTIMOS PESSOAIS**: Analisando sua questão sobre "{question}".
 
 **Especialidades**: 📊 **Juros e Taxas** (CET, limites legais), 🛡️ **Garantias** (avalista, fiador), 💵 **Quitação Antecipada**, 🔄 **Renegociação**, 📋 **Direitos CDC**.
 
@@ -1,20 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class RealEstateAgent(BaseContractAgent):
     """Agente especializado em contratos de compra e venda de imóveis"""
     
-    def __init__(self):
-        super().__init__()
-        self.specialization = "Compra e Venda de Imóveis"
-        self.icon = "🏠"
-        
-    def generate_response(self, question: str, context: str = None) -> str:
-        """Gera resposta especializada para contratos de compra e venda"""
-        
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ["vício", "defeito", "oculto", "problema"]):
-            return """🏠 **VÍCIOS OCULTOS**:
+    INTENTS = [
+        Intent(
+            name="vicio",
+            keywords=["vício", "defeito", "oculto", "problema"],
+            template="""🏠 **VÍCIOS OCULTOS**:
             
 ⚖️ **DEFINIÇÃO**: Defeitos não aparentes na vistoria que diminuem valor/utilidade do imóvel. **Prazo**: 1 ano para vícios aparentes, 3 anos para estruturais (Art. 618 CC).
 
@@ -22,10 +16,12 @@ class RealEstateAgent(BaseContractAgent):
 
 💰 **DIREITOS**: 🔸 **Abatimento proporcional** do preço, 🔸 **Rescisão** + devolução + perdas e danos, 🔸 **Reparação** por conta do vendedor.
 
-📋 **PROVA**: Laudo técnico, fotos, orçamentos. **Ação**: Dentro dos prazos legais no judiciário."""
-
-        elif any(word in question_lower for word in ["escritura", "cartório", "registro"]):
-            return """🏠 **ESCRITURA E REGISTRO**:
+📋 **PROVA**: Laudo técnico, fotos, orçamentos. **Ação**: Dentro dos prazos legais no judiciário.""",
+        ),
+        Intent(
+            name="escritura",
+            keywords=["escritura", "cartório", "registro"],
+            template="""🏠 **ESCRITURA E REGISTRO**:
             
 📄 **ESCRITURA**: Formaliza a compra no cartório de notas. **Documentos**: CPF, RG, certidões, matrícula atualizada, ITBI quitado.
 
@@ -33,10 +29,12 @@ class RealEstateAgent(BaseContractAgent):
 
 💰 **CUSTOS**: 🔸 **ITBI** (2-3% valor venal), 🔸 **Cartório** (varia por estado), 🔸 **Registro** (conforme tabela).
 
-⚠️ **ATENÇÃO**: Verificar débitos anteriores, ônus, hipotecas na matrícula. Exigir **certidões negativas** atualizadas."""
-
-        elif any(word in question_lower for word in ["sinal", "arras", "entrada", "como funcionam"]):
-            return """🏠 **SINAL/ARRAS**:
+⚠️ **ATENÇÃO**: Verificar débitos anteriores, ônus, hipotecas na matrícula. Exigir **certidões negativas** atualizadas.""",
+        ),
+        Intent(
+            name="sinal",
+            keywords=["sinal", "arras", "entrada", "como funcionam"],
+            template="""🏠 **SINAL/ARRAS**:
             
 💰 **FUNÇÃO**: Confirma negócio e demonstra seriedade das partes. **Valor**: Geralmente 10-30% do valor total.
 
@@ -44,10 +42,12 @@ class RealEstateAgent(BaseContractAgent):
 
 📋 **ARREPENDIMENTO**: **Comprador** → Perde sinal, **Vendedor** → Devolve em dobro (se penitenciais).
 
-🚨 **CUIDADO**: Definir claramente no contrato tipo de arras, condições e consequências do descumprimento."""
-
-        elif any(word in question_lower for word in ["financiamento", "banco", "aprovação"]):
-            return """🏠 **FINANCIAMENTO IMOBILIÁRIO**:
+🚨 **CUIDADO**: Definir claramente no contrato tipo de arras, condições e consequências do descumprimento.""",
+        ),
+        Intent(
+            name="financiamento",
+            keywords=["financiamento", "banco", "aprovação"],
+            template="""🏠 **FINANCIAMENTO IMOBILIÁRIO**:
             
 🏦 **APROVAÇÃO**: Contrato geralmente condicionado à aprovação do crédito. **Prazo**: 30-60 dias para análise.
 
@@ -55,10 +55,12 @@ class RealEstateAgent(BaseContractAgent):
 
 ⚠️ **SE NEGADO**: 🔸 **Cláusula resolutiva** → Contrato cancelado sem penalidades, 🔸 **Sem cláusula** → Comprador deve honrar ou pagar multa.
 
-💡 **DICA**: Sempre incluir cláusula de resolução por negativa de financiamento para proteção do comprador."""
-
-        elif any(word in question_lower for word in ["itbi", "imposto", "transmissão"]):
-            return """🏠 **ITBI - Imposto de Transmissão**:
+💡 **DICA**: Sempre incluir cláusula de resolução por negativa de financiamento para proteção do comprador.""",
+        ),
+        Intent(
+            name="itbi",
+            keywords=["itbi", "imposto", "transmissão"],
+            template="""🏠 **ITBI - Imposto de Transmissão**:
             
 💰 **CÁLCULO**: 2-3% sobre valor venal ou declarado (o maior). **Responsabilidade**: Geralmente do comprador, mas negociável.
 
@@ -66,10 +68,23 @@ class RealEstateAgent(BaseContractAgent):
 
 🔍 **ISENÇÕES**: Primeira casa (alguns municípios), SFH até valor limite, permuta por imóvel menor valor.
 
-⚖️ **VERIFICAÇÃO**: Confirmar quitação antes do registro, pois débito pode gerar problemas futuros."""
-
-        else:
-            return f"""🏠 **COMPRA E VENDA**: Analisando sua questão sobre "{question}".
+⚖️ **VERIFICAÇÃO**: Confirmar quitação antes do registro, pois débito pode gerar problemas futuros.""",
+        ),
+    ]
+    
+    def __init__(self):
+        super().__init__()
+        self.specialization = "Compra e Venda de Imóveis"
+        self.icon = "🏠"
+        
+    def generate_response(self, question: str, context: str = None) -> str:
+        """Gera resposta especializada para contratos de compra e venda"""
+        
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
+        
+        return f"""🏠 **COMPRA E VENDA**: Analisando sua questão sobre "{question}".
 
 **Especialidades**: 📄 **Documentação** (escritura, registro, matrícula), 💰 **Aspectos Financeiros** (financiamento, ITBI, custos), ⚖️ **Vícios e Problemas**, 🔒 **Garantias e Direitos**.
 
@@ -1,10 +1,12 @@
 from typing import Dict, Any, List
-import json
+import time
 from app.agents.base_agent import BaseContractAgent, ContractAnalysis
 
 class RentalAgent(BaseContractAgent):
     """Specialized agent for rental/lease contract analysis with entity context support"""
     
+    LEGAL_DOMAIN = "contratos de locação residencial (Lei do Inquilinato - Lei 8.245/91)"
+    
     def __init__(self, claude_client, rag_service, db_session=None):
         super().__init__(claude_client, rag_service, db_session)
         self.agent_type = "locacao"
@@ -14,34 +16,35 @@ class RentalAgent(BaseContractAgent):
     async def analyze_contract(self, contract_text: str, context: Dict[str, Any] = None) -> ContractAnalysis:
         """Analyze rental contract with specialized knowledge and entity context"""
         
-        # Perform entity analysis first
-        entity_info = self.entity_classifier.identify_entities(contract_text)
+        if self.should_segment(contract_text):
+            segmented = await self.analyze_contract_by_clauses(contract_text, context)
+            if segmented is not None:
+                return segmented
         
-        # Get enriched RAG context
-        enriched_context = await self.get_enriched_context(
-            contract_text, 
-            analysis_type="rental_analysis"
-        )
+        # Entity scan, RAG retrieval and precedent lookup run concurrently
+        stages = self.get_analysis_stages(contract_text, "rental_analysis", context)
+        inputs, stage_timings = await self.run_stage_graph(stages)
         
         # Format context for prompt
-        rag_context = self._format_context_for_prompt(enriched_context)
+        rag_context = self._format_context_for_prompt(inputs["rag_context"])
+        rag_context += self._format_precedents_for_prompt(inputs["precedents"])
         
         # Get entity-specific context
-        entity_context = self._get_entity_context_for_prompt(entity_info)
+        entity_context = self._get_entity_context_for_prompt(inputs["entities"])
         
-        # Create specialized prompt with entity context
-        prompt = self.get_specialized_prompt(contract_text, rag_context, entity_context)
+        # Variable suffix after the static, provider-cacheable prefix
+        prompt = self.get_prompt_suffix(contract_text, rag_context, entity_context)
         
+        llm_started = time.perf_counter()
         try:
-            response = await self.claude_client.completions.create(
-                model="claude-3-sonnet-20240229",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=4000,
-                temperature=0.1
+            # Cheapest route first (rules, fast model), escalating only when needed
+            analysis_data, routing = await self._complete_analysis(
+                prompt, contract_text, context, system=self.get_prompt_prefix()
             )
-            
-            # Parse structured response
-            analysis_data = json.loads(response.content[0].text.strip())
+            stage_timings["llm"] = {
+                "duration_ms": round((time.perf_counter() - llm_started) * 1000, 1),
+                "status": "ok"
+            }
             
             return ContractAnalysis(
                 contract_type="locacao",
@@ -51,12 +54,19 @@ class RentalAgent(BaseContractAgent):
                 risk_factors=analysis_data.get("risk_factors", []),
                 recommendations=analysis_data.get("recommendations", []),
                 clauses_analysis=analysis_data.get("clauses_analysis", []),
-                confidence_score=analysis_data.get("confidence_score", 0.0)
+                confidence_score=analysis_data.get("confidence_score", 0.0),
+                metadata={"stage_timings": stage_timings, "routing": routing}
             )
             
         except Exception as e:
+            stage_timings["llm"] = {
+                "duration_ms": round((time.perf_counter() - llm_started) * 1000, 1),
+                "status": "error"
+            }
             # Fallback analysis
-            return self._create_fallback_analysis(contract_text, str(e))
+            analysis = self._create_fallback_analysis(contract_text, str(e))
+            analysis.metadata["stage_timings"] = stage_timings
+            return analysis
     
     def _get_entity_context_for_prompt(self, entity_info) -> str:
         """Generate entity-specific context for rental analysis"""
@@ -108,63 +118,105 @@ class RentalAgent(BaseContractAgent):
     
     def get_specialized_prompt(self, contract_text: str, rag_context: str = "", entity_context: str = "") -> str:
         """Get rental-specific analysis prompt with entity awareness"""
+        return self._join_prompt(
+            self.get_prompt_prefix(),
+            self.get_prompt_suffix(contract_text, rag_context, entity_context)
+        )
+    
+    def get_prompt_prefix(self) -> str:
+        """Static rental instructions, checklist, guidelines and output schema, shared by every request"""
         
-        base_intro = "Você é um especialista em contratos de locação imobiliária no Brasil. Analise o seguinte contrato de locação considerando a legislação brasileira (Lei do Inquilinato - Lei 8.245/91) e práticas do mercado."
-        
-        # Add entity-specific context if available
-        if entity_context:
-            intro = f"{base_intro}\n\n{entity_context}"
-        else:
-            intro = base_intro
-        
-        return f"""
-        {intro}
-
-        Contexto de conhecimento especializado:
-        {rag_context}
-
-        Contrato para análise:
-        {contract_text}
+        return """
+        Você é um especialista em contratos de locação imobiliária no Brasil. Analise o contrato de locação apresentado ao final considerando a legislação brasileira (Lei do Inquilinato - Lei 8.245/91) e práticas do mercado.
 
         Analise os seguintes aspectos específicos de contratos de locação:
 
         1. **Valor do aluguel e reajustes**: Verificar se os valores e índices de reajuste estão adequados
+           - O reajuste deve ter periodicidade mínima anual (Lei 10.192/01) e índice definido (IGP-M, IPCA ou outro)
+           - É vedada a estipulação do aluguel em moeda estrangeira ou vinculada à variação cambial ou ao salário mínimo (art. 17)
+           - Após três anos de vigência, qualquer das partes pode pedir a revisão judicial do aluguel (art. 19)
+           - A cobrança antecipada do aluguel só é permitida sem garantia ou na locação para temporada (arts. 20 e 42)
         2. **Caução e garantias**: Analisar tipos de garantia exigidos e valores
+           - Apenas uma modalidade de garantia por contrato: caução, fiança, seguro-fiança ou cessão fiduciária de quotas (art. 37)
+           - Exigir mais de uma garantia é nulo e constitui contravenção penal (art. 43)
+           - Caução em dinheiro limitada a três meses de aluguel, depositada em caderneta de poupança em favor do locatário (art. 38)
+           - Fiança: verificar renúncia ao benefício de ordem, responsabilidade até a entrega das chaves e direito de exoneração do fiador (art. 40)
         3. **Prazo de locação**: Verificar se está de acordo com a Lei do Inquilinato
+           - Contratos de 30 meses ou mais permitem a retomada sem motivo ao final do prazo (art. 46)
+           - Prazos menores só permitem a retomada nas hipóteses do art. 47 após a prorrogação automática
+           - Prazo igual ou superior a dez anos depende de vênia conjugal (art. 3º)
         4. **Responsabilidades de conservação**: Distribuição entre locador e locatário
+           - O locador entrega o imóvel em estado de servir e responde por vícios anteriores e despesas extraordinárias de condomínio (art. 22)
+           - O locatário responde pelas despesas ordinárias de condomínio e pelos danos que causar (art. 23)
+           - Taxas de administração imobiliária e de intermediação cabem ao locador (art. 22, VII)
         5. **Cláusulas de rescisão**: Condições para término antecipado
+           - Durante o prazo, o locador não pode reaver o imóvel; o locatário pode devolvê-lo pagando multa proporcional ao período restante (art. 4º)
+           - O locatário fica dispensado da multa se transferido pelo empregador, com aviso de 30 dias (art. 4º, parágrafo único)
+           - Verificar prazos de aviso prévio e hipóteses de despejo previstas
         6. **Multas e penalidades**: Verificar se estão dentro dos limites legais
+           - Distinguir multa moratória (atraso) de multa compensatória (rescisão) e verificar cumulação indevida
+           - Penalidade manifestamente excessiva pode ser reduzida pelo juiz (art. 413 do Código Civil)
+           - Juros de mora e correção monetária devem ter índice e termo inicial definidos
         7. **Reformas e benfeitorias**: Direitos e obrigações
+           - Benfeitorias necessárias são indenizáveis mesmo sem autorização; úteis, se autorizadas; ambas geram direito de retenção (art. 35)
+           - A renúncia à indenização por benfeitorias é válida (Súmula 335 do STJ), mas deve ser expressa
+           - Benfeitorias voluptuárias podem ser retiradas se não afetarem a estrutura do imóvel (art. 36)
         8. **Sublocação**: Permissões e restrições
+           - Cessão, sublocação e empréstimo dependem de consentimento prévio e escrito do locador (art. 13)
         9. **IPTU e taxas**: Responsabilidade pelo pagamento
+           - Impostos, taxas e seguro contra incêndio cabem ao locador, salvo disposição expressa em contrário (art. 22, VIII)
+           - Repasses ao locatário devem ser discriminados e comprováveis (art. 22, IX e art. 23, XII)
         10. **Vistoria**: Procedimentos de entrada e saída
+           - O locatário pode exigir descrição minuciosa do estado do imóvel na entrega (art. 22, V)
+           - A devolução é no estado em que recebeu, salvo deteriorações decorrentes do uso normal (art. 23, III)
+           - Verificar se há laudo de vistoria anexo, com fotos, e prazo para contestação
 
-        Identifique cláusulas potencialmente abusivas segundo o CDC e Lei do Inquilinato.
+        Verifique também:
+        - Direito de preferência do locatário na venda do imóvel (art. 27) e cláusula de vigência em caso de alienação averbada na matrícula (art. 8º)
+        - Cláusulas que visem elidir os objetivos da Lei do Inquilinato são nulas de pleno direito (art. 45)
+        - Foro de eleição, forma das notificações e obrigações do locatário ao final da locação
 
+        Identifique cláusulas potencialmente abusivas segundo o CDC e Lei do Inquilinato.
+        """ + self.ANALYSIS_GUIDELINES + """
         Responda APENAS com um JSON válido no seguinte formato:
-        {{
+        {
             "summary": "Resumo executivo do contrato",
             "key_findings": ["achado1", "achado2", "achado3"],
             "risk_factors": [
-                {{
+                {
                     "type": "tipo_do_risco",
                     "description": "descrição detalhada",
                     "severity": "high|medium|low",
                     "clause": "cláusula específica",
                     "recommendation": "recomendação específica"
-                }}
+                }
             ],
             "recommendations": ["recomendação1", "recomendação2"],
             "clauses_analysis": [
-                {{
+                {
                     "clause": "texto da cláusula",
                     "analysis": "análise jurídica",
                     "risk_level": "alto|médio|baixo",
                     "legal_basis": "base legal aplicável"
-                }}
+                }
             ],
             "confidence_score": 0.95
-        }}
+        }
+        """
+    
+    def get_prompt_suffix(self, contract_text: str, rag_context: str = "", entity_context: str = "") -> str:
+        """Per-request part of the prompt: entity context, RAG context and the contract"""
+        
+        return f"""
+        {entity_context}
+
+        Contexto de conhecimento especializado:
+        {rag_context}
+
+        Contrato para análise:
+        {contract_text}
+
+        Responda APENAS com o JSON no formato especificado acima.
         """
     
     def _create_fallback_analysis(self, contract_text: str, error: str) -> ContractAnalysis:
@@ -267,14 +319,7 @@ class RentalAgent(BaseContractAgent):
         """
         
         try:
-            response = await self.claude_client.completions.create(
-                model="claude-3-sonnet-20240229",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=2000,
-                temperature=0.1
-            )
-            
-            return json.loads(response.content[0].text.strip())
+            return await self._complete_json(prompt, max_tokens=2000)
             
         except Exception as e:
             return {
@@ -1,11 +1,12 @@
-from typing import Dict, Any, List
-import json
-from app.agents.base_agent import BaseContractAgent, ContractAnalysis
+from typing import Dict, Any, List, Optional
+from app.agents.base_agent import AnalysisStage, BaseContractAgent, ContractAnalysis
 from app.services.cnpj_service import CNPJService
 
 class TelecomAgent(BaseContractAgent):
     """Specialized agent for telecommunications contract analysis"""
     
+    STAGE_TIMEOUTS = {**BaseContractAgent.STAGE_TIMEOUTS, "company": 5.0}
+    
     def __init__(self, claude_client, rag_service):
         super().__init__(claude_client, rag_service)
         self.cnpj_service = CNPJService()
@@ -14,33 +15,25 @@ class TelecomAgent(BaseContractAgent):
     async def analyze_contract(self, contract_text: str, context: Dict[str, Any] = None) -> ContractAnalysis:
         """Analyze telecom contract with specialized knowledge"""
         
-        # 1. Análise de CNPJ da empresa prestadora
-        cnpj = self.cnpj_service.extract_cnpj_from_text(contract_text)
-        company_analysis = None
-        if cnpj:
-            company_data = await self.cnpj_service.get_company_data(cnpj)
-            company_analysis = self.cnpj_service.analyze_company_risk(
-                company_data, 
-                {"contract_type": "telecom"}
-            )
-        
-        # Get relevant RAG context
-        rag_context = await self.get_rag_context(contract_text)
+        # Company (CNPJ) lookup and RAG retrieval are independent I/O stages
+        inputs, stage_timings = await self.run_stage_graph([
+            AnalysisStage("company", lambda: self._analyze_company(contract_text),
+                          self.STAGE_TIMEOUTS["company"]),
+            AnalysisStage("rag_context", lambda: self.get_rag_context(contract_text),
+                          self.STAGE_TIMEOUTS["rag_context"], default=""),
+        ])
+        company_analysis = inputs["company"]
+        rag_context = inputs["rag_context"]
         
-        # Create specialized prompt
-        prompt = self.get_specialized_prompt(contract_text, rag_context)
+        # Variable suffix after the static, provider-cacheable prefix
+        prompt = self.get_prompt_suffix(contract_text, rag_context)
         
         try:
-            response = await self.claude_client.completions.create(
-                model="claude-3-sonnet-20240229",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=4000,
-                temperature=0.1
+            # Cheapest route first (rules, fast model), escalating only when needed
+            analysis_data, routing = await self._complete_analysis(
+                prompt, contract_text, context, system=self.get_prompt_prefix()
             )
             
-            # Parse structured response
-            analysis_data = json.loads(response.content[0].text.strip())
-            
             # Integrar análise da empresa (CNPJ) se disponível
             if company_analysis:
                 # Adicionar riscos da empresa aos riscos do contrato
@@ -83,64 +76,123 @@ class TelecomAgent(BaseContractAgent):
                 risk_factors=all_risk_factors,
                 recommendations=analysis_data.get("recommendations", []),
                 clauses_analysis=analysis_data.get("clauses_analysis", []),
-                confidence_score=analysis_data.get("confidence_score", 0.0)
+                confidence_score=analysis_data.get("confidence_score", 0.0),
+                metadata={"stage_timings": stage_timings, "routing": routing}
             )
             
         except Exception as e:
             # Fallback analysis
-            return self._create_fallback_analysis(contract_text, str(e))
+            analysis = self._create_fallback_analysis(contract_text, str(e))
+            analysis.metadata["stage_timings"] = stage_timings
+            return analysis
+    
+    async def _analyze_company(self, contract_text: str) -> Optional[Dict[str, Any]]:
+        """Análise de CNPJ da empresa prestadora"""
+        cnpj = self.cnpj_service.extract_cnpj_from_text(contract_text)
+        if not cnpj:
+            return None
+        
+        company_data = await self.cnpj_service.get_company_data(cnpj)
+        return self.cnpj_service.analyze_company_risk(
+            company_data, 
+            {"contract_type": "telecom"}
+        )
     
     def get_specialized_prompt(self, contract_text: str, rag_context: str = "") -> str:
         """Get telecom-specific analysis prompt"""
+        return self._join_prompt(self.get_prompt_prefix(), self.get_prompt_suffix(contract_text, rag_context))
+    
+    def get_prompt_prefix(self) -> str:
+        """Static telecom instructions, checklist, guidelines and output schema, shared by every request"""
         
-        return f"""
-        Você é um especialista em contratos de telecomunicações no Brasil. Analise o seguinte contrato considerando a regulamentação da ANATEL, Lei Geral de Telecomunicações (Lei 9.472/97), Marco Civil da Internet e direitos do consumidor.
-
-        Contexto de conhecimento especializado:
-        {rag_context}
-
-        Contrato para análise:
-        {contract_text}
+        return """
+        Você é um especialista em contratos de telecomunicações no Brasil. Analise o contrato apresentado ao final considerando a regulamentação da ANATEL, Lei Geral de Telecomunicações (Lei 9.472/97), Marco Civil da Internet e direitos do consumidor.
 
         Analise os seguintes aspectos específicos de contratos de telecomunicações:
 
         1. **Planos e velocidades**: Verificar se as velocidades prometidas são claras e realistas
+           - Banda larga fixa: velocidade instantânea de no mínimo 40% e média mensal de no mínimo 80% da contratada (Resolução ANATEL 574/2011)
+           - A oferta e a publicidade vinculam a prestadora e integram o contrato (arts. 30 e 35 do CDC)
+           - Verificar se o contrato informa a forma de medição e a ferramenta para o consumidor aferir a velocidade
         2. **Franquia de dados**: Limites de uso e consequências do excesso
+           - O consumidor deve ser avisado ao se aproximar do fim da franquia, antes de redução de velocidade ou cobrança adicional
+           - A consequência do excesso (bloqueio, redução ou pacote adicional) deve estar expressa e não pode ser alterada unilateralmente
         3. **Fidelização**: Períodos de carência e multas por rescisão
+           - O prazo de permanência para consumidor pessoa física é de no máximo 12 meses e exige benefício efetivo em troca (Regulamento Geral de Direitos do Consumidor de Telecomunicações - RGC)
+           - A multa deve ser proporcional ao tempo restante e ao valor do benefício concedido
+           - Não há multa quando o cancelamento decorre de descumprimento da prestadora
         4. **Qualidade do serviço**: SLA, disponibilidade e compensações
+           - Interrupções dão direito a desconto ou ressarcimento proporcional ao período sem serviço (RGC)
+           - Verificar prazos de reparo, janelas de manutenção programada e aviso prévio das interrupções
+           - Contratos empresariais devem trazer SLA mensurável e multa ou crédito por descumprimento
         5. **Cobrança**: Valores, taxas adicionais e formas de pagamento
+           - A fatura deve discriminar cada serviço e valor; cobranças não contratadas são indevidas
+           - Valores pagos indevidamente devem ser devolvidos em dobro (art. 42, parágrafo único, do CDC)
+           - Serviços de valor adicionado só podem ser cobrados com adesão expressa do consumidor
+           - Não pode haver cobrança por período posterior ao pedido de cancelamento
         6. **Instalação**: Custos, prazos e responsabilidades
+           - Prazo de instalação e valor da taxa devem estar definidos antes da contratação
+           - Equipamentos em comodato: verificar obrigação de devolução, forma de retirada e valor cobrado em caso de não devolução
         7. **Suporte técnico**: Canais de atendimento e prazos de resposta
+           - Atendimento com número de protocolo e histórico das demandas (Decreto 11.034/2022 - Lei do SAC)
+           - Reclamações devem ter prazo de resposta definido; verificar canais disponíveis e horários
         8. **Rescisão**: Procedimentos e custos para cancelamento
+           - O cancelamento pode ser pedido por qualquer canal de atendimento, inclusive sem intervenção de atendente, com efeito imediato (RGC)
+           - Exigir carta, presença física ou prazo de aviso longo para cancelar é abusivo
+           - Suspensão por inadimplência exige notificação prévia e segue etapas (redução, suspensão parcial, suspensão total)
         9. **Alterações contratuais**: Como e quando podem ser feitas
+           - Alteração unilateral de preço, velocidade ou conteúdo do plano é abusiva (art. 51, XIII, do CDC)
+           - Mudanças de oferta exigem comunicação prévia e dão direito a rescisão sem multa
+           - Reajuste apenas anual e por índice definido no contrato
         10. **Privacidade de dados**: Uso e proteção de dados pessoais (LGPD)
+           - Sigilo das comunicações e vedação de fornecer dados pessoais e registros de conexão a terceiros sem consentimento livre, expresso e informado (art. 7º do Marco Civil da Internet)
+           - Registros de conexão devem ser guardados por um ano, em sigilo (art. 13 do Marco Civil da Internet)
+           - Verificar finalidade, base legal e compartilhamento de dados conforme a LGPD (Lei 13.709/18)
 
-        Identifique cláusulas abusivas segundo CDC e regulamentação ANATEL.
+        Verifique também:
+        - Venda casada de serviços, aparelhos ou seguros (art. 39, I, do CDC)
+        - Neutralidade de rede: tratamento isonômico dos pacotes de dados, sem bloqueio ou degradação por conteúdo (art. 9º do Marco Civil da Internet)
+        - Direito de arrependimento em contratações fora do estabelecimento, em até 7 dias (art. 49 do CDC)
 
+        Identifique cláusulas abusivas segundo CDC e regulamentação ANATEL.
+        """ + self.ANALYSIS_GUIDELINES + """
         Responda APENAS com um JSON válido no seguinte formato:
-        {{
+        {
             "summary": "Resumo executivo do contrato",
             "key_findings": ["achado1", "achado2", "achado3"],
             "risk_factors": [
-                {{
+                {
                     "type": "tipo_do_risco",
                     "description": "descrição detalhada",
                     "severity": "high|medium|low",
                     "clause": "cláusula específica",
                     "recommendation": "recomendação específica"
-                }}
+                }
             ],
             "recommendations": ["recomendação1", "recomendação2"],
             "clauses_analysis": [
-                {{
+                {
                     "clause": "texto da cláusula",
                     "analysis": "análise regulatória",
                     "risk_level": "alto|médio|baixo",
                     "legal_basis": "base legal/regulatória aplicável"
-                }}
+                }
             ],
             "confidence_score": 0.95
-        }}
+        }
+        """
+    
+    def get_prompt_suffix(self, contract_text: str, rag_context: str = "") -> str:
+        """Per-request part of the prompt: RAG context and the contract"""
+        
+        return f"""
+        Contexto de conhecimento especializado:
+        {rag_context}
+
+        Contrato para análise:
+        {contract_text}
+
+        Responda APENAS com o JSON no formato especificado acima.
         """
     
     def _create_fallback_analysis(self, contract_text: str, error: str) -> ContractAnalysis:
@@ -0,0 +1,72 @@
+"""
+Amostragem de documentos longos com custo limitado
+Os classificadores leem o início, o fim e janelas uniformemente espaçadas até um orçamento
+de caracteres, e ampliam a leitura apenas enquanto a decisão continua incerta
+"""
+
+from typing import Iterator, List, Sequence, Tuple
+
+Window = Tuple[int, int]
+
+
+def sample_windows(length: int, budget: int, window_size: int = 2000,
+                   head_share: float = 0.5, tail_share: float = 0.15) -> List[Window]:
+    """
+    Trechos [início, fim) a ler de um texto de `length` caracteres
+
+    Metade do orçamento vai para o início (título, preâmbulo, primeiras cláusulas), uma
+    fração para o fim (assinaturas, qualificação das partes) e o restante para janelas
+    centradas em intervalos iguais do miolo. Orçamento >= tamanho (ou <= 0) lê tudo.
+    """
+    if budget <= 0 or budget >= length:
+        return [(0, length)]
+
+    head = int(budget * head_share)
+    tail = int(budget * tail_share)
+    middle = budget - head - tail
+    windows = [(0, head)]
+
+    count = max(1, middle // window_size)
+    size = middle // count
+    span = length - tail - head
+    step = span / count
+    for index in range(count):
+        start = max(head, int(head + step * (index + 0.5) - size / 2))
+        windows.append((start, min(start + size, length - tail)))
+    windows.append((length - tail, length))
+    return _merge(windows)
+
+
+def progressive_windows(length: int, budget: int, growth: int = 4) -> Iterator[List[Window]]:
+    """Amostras sucessivas com orçamento multiplicado por `growth` até cobrir o texto todo"""
+    while True:
+        windows = sample_windows(length, budget)
+        yield windows
+        if windows == [(0, length)]:
+            return
+        budget *= growth
+
+
+def scanned_chars(windows: Sequence[Window]) -> int:
+    return sum(end - start for start, end in windows)
+
+
+def top_two_margin(scores: Sequence[float]) -> float:
+    """Margem relativa entre as duas maiores pontuações (1.0 = sem concorrente)"""
+    ordered = sorted(scores, reverse=True)
+    if not ordered or ordered[0] <= 0:
+        return 0.0
+    second = ordered[1] if len(ordered) > 1 else 0
+    return (ordered[0] - second) / ordered[0]
+
+
+def _merge(windows: List[Window]) -> List[Window]:
+    merged: List[Window] = []
+    for start, end in sorted(windows):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
@@ -1,45 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class TVSubscriptionAgent(BaseContractAgent):
     """Agente especializado em contratos de TV por assinatura"""
     
-    def __init__(self):
-        self.specialization = "TV por Assinatura"
-        self.icon = "📺"
-        
-    def generate_response(self, question: str, contract_text: str = "") -> str:
-        """Gera resposta especializada para TV por assinatura"""
-        
-        if not question:
-            return """📺 **TV por Assinatura - Análise Especializada**
-
-Olá! Sou especialista em contratos de TV por assinatura. Posso ajudar com:
-
-**📋 Principais Análises:**
-• Planos, canais e qualidade de imagem
-• Período de fidelidade e multas
-• Equipamentos e instalação
-• Mudança de endereço e portabilidade
-• Cancelamento e devolução de aparelhos
-
-**⚠️ Pontos Críticos:**
-• Fidelidade superior a 12 meses
-• Cobrança de canais não solicitados
-• Dificuldades no cancelamento
-• Multa desproporcional por rescisão
-
-**📞 Órgãos de Defesa:**
-• ANATEL - Regulamentação de telecomunicações
-• PROCON - Defesa do consumidor
-• Anatel.gov.br - Portal de reclamações
-
-Como posso ajudar com sua TV por assinatura?"""
-        
-        # Análise baseada na pergunta
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ['cancelar', 'cancelamento', 'rescindir', 'sair']):
-            return """❌ **Cancelamento de TV por Assinatura**
+    INTENTS = [
+        Intent(
+            name="cancelar",
+            keywords=['cancelar', 'cancelamento', 'rescindir', 'sair'],
+            template="""❌ **Cancelamento de TV por Assinatura**
 
 **Seu Direito de Cancelar:**
 • **Após fidelidade**: Cancelamento livre e gratuito
@@ -88,10 +57,12 @@ Sempre confirme cancelamento por escrito e guarde protocolo. Muitas operadoras "
 **⚖️ Base Legal:**
 Lei 9.472/97 (Lei Geral de Telecomunicações) e CDC.
 
-Está enfrentando dificuldades para cancelar? Posso orientar sobre os próximos passos!"""
-        
-        if any(word in question_lower for word in ['fidelidade', 'multa', 'prazo', 'contrato']):
-            return """⏰ **Fidelidade e Multas - TV por Assinatura**
+Está enfrentando dificuldades para cancelar? Posso orientar sobre os próximos passos!""",
+        ),
+        Intent(
+            name="fidelidade",
+            keywords=['fidelidade', 'multa', 'prazo', 'contrato'],
+            template="""⏰ **Fidelidade e Multas - TV por Assinatura**
 
 **Período de Fidelidade:**
 • **Duração máxima**: 12 meses por lei (ANATEL)
@@ -145,10 +116,12 @@ Multa = 4 × desconto recebido por mês
 **🚨 Multa Abusiva?**
 Se multa for superior ao benefício recebido ou sem contrapartida clara, conteste na ANATEL!
 
-Precisa de ajuda para calcular ou contestar sua multa?"""
-        
-        if any(word in question_lower for word in ['canais', 'programação', 'qualidade', 'sinal']):
-            return """📺 **Canais e Qualidade do Serviço**
+Precisa de ajuda para calcular ou contestar sua multa?""",
+        ),
+        Intent(
+            name="canais",
+            keywords=['canais', 'programação', 'qualidade', 'sinal'],
+            template="""📺 **Canais e Qualidade do Serviço**
 
 **Obrigações da Operadora:**
 • **Canais contratados**: Fornecer TODOS os canais do plano
@@ -203,10 +176,12 @@ Documente SEMPRE os problemas: data, horário, canais afetados, protocolo de ate
 **📊 Medição de Qualidade:**
 ANATEL possui sistema de medição de qualidade. Operadoras que não cumprem metas podem ser multadas e você pode usar isso como argumento.
 
-Está enfrentando problemas com canais ou qualidade? Posso orientar sobre como documentar e reclamar!"""
-        
-        if any(word in question_lower for word in ['equipamento', 'aparelho', 'decoder', 'instalação']):
-            return """📡 **Equipamentos e Instalação**
+Está enfrentando problemas com canais ou qualidade? Posso orientar sobre como documentar e reclamar!""",
+        ),
+        Intent(
+            name="equipamento",
+            keywords=['equipamento', 'aparelho', 'decoder', 'instalação'],
+            template="""📡 **Equipamentos e Instalação**
 
 **Tipos de Equipamentos:**
 • **Receptor/Decoder**: Principal (HD/4K/DVR)
@@ -273,10 +248,12 @@ Está enfrentando problemas com canais ou qualidade? Posso orientar sobre como d
 **💡 Dica Importante:**
 Na instalação, teste TUDO antes de liberar o técnico. Problemas detectados depois podem gerar nova visita com possível custo.
 
-Precisa de orientação sobre instalação ou problemas com equipamentos?"""
-        
-        if any(word in question_lower for word in ['mudança', 'endereço', 'mudar', 'transferir']):
-            return """🏠 **Mudança de Endereço**
+Precisa de orientação sobre instalação ou problemas com equipamentos?""",
+        ),
+        Intent(
+            name="mudanca",
+            keywords=['mudança', 'endereço', 'mudar', 'transferir'],
+            template="""🏠 **Mudança de Endereço**
 
 **Seu Direito à Portabilidade:**
 • **Serviço disponível**: Transferência gratuita se operadora atende novo endereço
@@ -339,10 +316,12 @@ Resolução ANATEL 632/14 sobre mudança de endereço.
 **🚨 Operadora se recusa?**
 Se operadora cobrar taxa ou se recusar a transferir serviço disponível, registre reclamação na ANATEL imediatamente!
 
-Está planejando mudança ou enfrentando problemas? Posso orientar sobre seus direitos!"""
-        
-        if any(word in question_lower for word in ['cobrança', 'fatura', 'valor', 'desconto']):
-            return """💰 **Cobrança e Faturamento**
+Está planejando mudança ou enfrentando problemas? Posso orientar sobre seus direitos!""",
+        ),
+        Intent(
+            name="cobranca",
+            keywords=['cobrança', 'fatura', 'valor', 'desconto'],
+            template="""💰 **Cobrança e Faturamento**
 
 **Composição da Fatura:**
 • **Mensalidade do plano**: Valor fixo contratado
@@ -408,7 +387,46 @@ Está planejando mudança ou enfrentando problemas? Posso orientar sobre seus di
 **⚖️ Base Legal:**
 CDC e Regulamento da ANATEL sobre cobrança de telecomunicações.
 
-Está com problemas na sua fatura? Posso ajudar a identificar cobranças irregulares!"""
+Está com problemas na sua fatura? Posso ajudar a identificar cobranças irregulares!""",
+        ),
+    ]
+    
+    def __init__(self):
+        self.specialization = "TV por Assinatura"
+        self.icon = "📺"
+        
+    def generate_response(self, question: str, contract_text: str = "") -> str:
+        """Gera resposta especializada para TV por assinatura"""
+        
+        if not question:
+            return """📺 **TV por Assinatura - Análise Especializada**
+
+Olá! Sou especialista em contratos de TV por assinatura. Posso ajudar com:
+
+**📋 Principais Análises:**
+• Planos, canais e qualidade de imagem
+• Período de fidelidade e multas
+• Equipamentos e instalação
+• Mudança de endereço e portabilidade
+• Cancelamento e devolução de aparelhos
+
+**⚠️ Pontos Críticos:**
+• Fidelidade superior a 12 meses
+• Cobrança de canais não solicitados
+• Dificuldades no cancelamento
+• Multa desproporcional por rescisão
+
+**📞 Órgãos de Defesa:**
+• ANATEL - Regulamentação de telecomunicações
+• PROCON - Defesa do consumidor
+• Anatel.gov.br - Portal de reclamações
+
+Como posso ajudar com sua TV por assinatura?"""
+        
+        # Análise baseada na pergunta
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
         
         # Resposta geral com análise do contrato se disponível
         if contract_text:
@@ -1,45 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class VehicleFinancingAgent(BaseContractAgent):
     """Agente especializado em financiamento de veículos"""
     
-    def __init__(self):
-        self.specialization = "Financiamento Veicular"
-        self.icon = "🚗"
-        
-    def generate_response(self, question: str, contract_text: str = "") -> str:
-        """Gera resposta especializada para financiamento de veículos"""
-        
-        if not question:
-            return """🚗 **Financiamento Veicular - Análise Especializada**
-
-Olá! Sou especialista em financiamento de veículos. Posso ajudar com:
-
-**📋 Principais Análises:**
-• Taxas de juros e CET
-• Valor do bem e valor financiado
-• Prazo e forma de pagamento
-• Seguros obrigatórios e opcionais
-• Transferência de propriedade
-
-**⚠️ Pontos Críticos:**
-• Taxa de juros acima da média (consulte BACEN)
-• Seguros com sobrepreço
-• Cláusulas de alienação fiduciária
-• IOF e tarifas bancárias
-
-**📞 Órgãos de Defesa:**
-• BACEN (Banco Central) - SCR/Registrato
-• PROCON - Defesa do consumidor
-• DETRAN - Documentação veicular
-
-Como posso ajudar com seu financiamento?"""
-        
-        # Análise baseada na pergunta
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ['juros', 'taxa', 'cet', 'percentual']):
-            return """📊 **Juros e Taxas - Financiamento Veicular**
+    INTENTS = [
+        Intent(
+            name="juros",
+            keywords=['juros', 'taxa', 'cet', 'percentual'],
+            template="""📊 **Juros e Taxas - Financiamento Veicular**
 
 **Taxa de Juros:**
 • **Pessoa Física**: Média 1,5% a 3,5% ao mês
@@ -68,10 +37,12 @@ Como posso ajudar com seu financiamento?"""
 **💡 Dica Importante:**
 Use o calculadora do BACEN para comparar taxas: bcb.gov.br/calculadora
 
-Precisa que eu analise suas taxas específicas?"""
-        
-        if any(word in question_lower for word in ['seguro', 'proteção', 'cobertura', 'obrigatório']):
-            return """🛡️ **Seguros no Financiamento Veicular**
+Precisa que eu analise suas taxas específicas?""",
+        ),
+        Intent(
+            name="seguro",
+            keywords=['seguro', 'proteção', 'cobertura', 'obrigatório'],
+            template="""🛡️ **Seguros no Financiamento Veicular**
 
 **Seguros Obrigatórios:**
 • **Seguro Auto** (proteção do bem financiado)
@@ -107,10 +78,12 @@ Precisa que eu analise suas taxas específicas?"""
 **💡 Dica Legal:**
 Seguro auto pode ser contratado em qualquer seguradora, não necessariamente do banco.
 
-Tem dúvidas sobre algum seguro específico no seu contrato?"""
-        
-        if any(word in question_lower for word in ['alienação', 'propriedade', 'documento', 'transferência']):
-            return """📋 **Alienação Fiduciária e Documentação**
+Tem dúvidas sobre algum seguro específico no seu contrato?""",
+        ),
+        Intent(
+            name="alienacao",
+            keywords=['alienação', 'propriedade', 'documento', 'transferência'],
+            template="""📋 **Alienação Fiduciária e Documentação**
 
 **O que é Alienação Fiduciária:**
 • O banco fica como proprietário fiduciário até quitação
@@ -150,10 +123,12 @@ Tem dúvidas sobre algum seguro específico no seu contrato?"""
 **💡 Quitação Antecipada:**
 Sempre há desconto dos juros futuros - calcule se vale a pena!
 
-Precisa de orientação sobre algum aspecto da documentação?"""
-        
-        if any(word in question_lower for word in ['prazo', 'parcela', 'entrada', 'valor']):
-            return """💰 **Prazo, Parcelas e Condições**
+Precisa de orientação sobre algum aspecto da documentação?""",
+        ),
+        Intent(
+            name="prazo",
+            keywords=['prazo', 'parcela', 'entrada', 'valor'],
+            template="""💰 **Prazo, Parcelas e Condições**
 
 **Prazos Comuns:**
 • **Veículo Novo**: 12 a 60 meses (até 5 anos)
@@ -196,10 +171,12 @@ Sempre simule cenários: entrada maior vs. prazo maior vs. investimento da entra
 **📊 Dica Prática:**
 Use planilhas de simulação ou calculadora do BACEN para comparar opções.
 
-Precisa de ajuda para calcular a melhor opção para seu caso?"""
-        
-        if any(word in question_lower for word in ['quitar', 'quitação', 'antecipada', 'saldo']):
-            return """💵 **Quitação Antecipada do Financiamento**
+Precisa de ajuda para calcular a melhor opção para seu caso?""",
+        ),
+        Intent(
+            name="quitar",
+            keywords=['quitar', 'quitação', 'antecipada', 'saldo'],
+            template="""💵 **Quitação Antecipada do Financiamento**
 
 **Como Funciona:**
 • Direito garantido por lei (pode quitar quando quiser)
@@ -246,10 +223,12 @@ Compare: quitação antecipada vs. investimento do dinheiro. Às vezes compensar
 3. Efetue pagamento
 4. Acompanhe liberação do gravame
 
-Quer que eu ajude a avaliar se vale a pena quitar antecipadamente?"""
-        
-        if any(word in question_lower for word in ['atraso', 'inadimplência', 'busca', 'apreensão']):
-            return """⚠️ **Atraso e Inadimplência no Financiamento**
+Quer que eu ajude a avaliar se vale a pena quitar antecipadamente?""",
+        ),
+        Intent(
+            name="atraso",
+            keywords=['atraso', 'inadimplência', 'busca', 'apreensão'],
+            template="""⚠️ **Atraso e Inadimplência no Financiamento**
 
 **Consequências do Atraso:**
 • **Multa**: Máximo 2% sobre valor da parcela
@@ -301,7 +280,46 @@ Quer que eu ajude a avaliar se vale a pena quitar antecipadamente?"""
 **🚨 Urgente:**
 Se já está atrasado, contate o banco HOJE para negociar!
 
-Precisa de orientação para negociar com o banco?"""
+Precisa de orientação para negociar com o banco?""",
+        ),
+    ]
+    
+    def __init__(self):
+        self.specialization = "Financiamento Veicular"
+        self.icon = "🚗"
+        
+    def generate_response(self, question: str, contract_text: str = "") -> str:
+        """Gera resposta especializada para financiamento de veículos"""
+        
+        if not question:
+            return """🚗 **Financiamento Veicular - Análise Especializada**
+
+Olá! Sou especialista em financiamento de veículos. Posso ajudar com:
+
+**📋 Principais Análises:**
+• Taxas de juros e CET
+• Valor do bem e valor financiado
+• Prazo e forma de pagamento
+• Seguros obrigatórios e opcionais
+• Transferência de propriedade
+
+**⚠️ Pontos Críticos:**
+• Taxa de juros acima da média (consulte BACEN)
+• Seguros com sobrepreço
+• Cláusulas de alienação fiduciária
+• IOF e tarifas bancárias
+
+**📞 Órgãos de Defesa:**
+• BACEN (Banco Central) - SCR/Registrato
+• PROCON - Defesa do consumidor
+• DETRAN - Documentação veicular
+
+Como posso ajudar com seu financiamento?"""
+        
+        # Análise baseada na pergunta
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
         
         # Resposta geral com análise do contrato se disponível
         if contract_text:
@@ -1,44 +1,14 @@
 from app.agents.base_agent import BaseContractAgent
+from app.agents.intent_router import Intent
 
 class VehicleInsuranceAgent(BaseContractAgent):
     """Agente especializado em contratos de seguro de veículos"""
     
-    def __init__(self):
-        self.specialization = "Seguro Veicular"
-        self.icon = "🚗"
-        
-    def generate_response(self, question: str, contract_text: str = "") -> str:
-        """Gera resposta especializada para seguros de veículos"""
-        
-        if not question:
-            return """🚗 **Seguro Veicular - Análise Especializada**
-
-Olá! Sou especialista em contratos de seguro de veículos. Posso ajudar com:
-
-**📋 Principais Análises:**
-• Coberturas obrigatórias vs. opcionais
-• Franquia e valor da indenização
-• Cláusulas de exclusão de cobertura
-• Perfil do condutor e agravamento de risco
-• Procedimentos em caso de sinistro
-
-**⚠️ Pontos Críticos:**
-• Declarações incorretas podem anular o seguro
-• Prazo para comunicar sinistros (geralmente 24h)
-• Limitações para condutores não habilitados
-• Uso comercial vs. particular do veículo
-
-**📞 Órgão Regulador:**
-• SUSEP (Superintendência de Seguros Privados)
-• Resolução CNSP nº 416/2021 (seguro auto)
-
-Como posso ajudar com seu seguro veicular?"""
-        
-        # Análise baseada na pergunta
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ['cobertura', 'cobrir', 'indenizar', 'indenização']):
-            return """🔍 **Coberturas do Seguro Veicular**
+    INTENTS = [
+        Intent(
+            name="cobertura",
+            keywords=['cobertura', 'cobrir', 'indenizar', 'indenização'],
+            template="""🔍 **Coberturas do Seguro Veicular**
 
 **Coberturas Básicas (obrigatórias):**
 • Danos materiais a terceiros
@@ -58,10 +28,12 @@ Como posso ajudar com seu seguro veicular?"""
 • Cheque limitações geográficas
 • Veja se há restrições por idade do condutor
 
-Precisa de análise específica sobre alguma cobertura?"""
-        
-        if any(word in question_lower for word in ['franquia', 'participação', 'valor', 'pagar']):
-            return """💰 **Franquia no Seguro Veicular**
+Precisa de análise específica sobre alguma cobertura?""",
+        ),
+        Intent(
+            name="franquia",
+            keywords=['franquia', 'participação', 'valor', 'pagar'],
+            template="""💰 **Franquia no Seguro Veicular**
 
 **O que é a franquia:**
 • Valor que você paga em caso de sinistro com culpa
@@ -82,10 +54,12 @@ Precisa de análise específica sobre alguma cobertura?"""
 **💡 Dica Legal:**
 Pela Circular SUSEP nº 555/2017, a franquia deve ser clara e destacada no contrato.
 
-Tem dúvidas sobre o valor da franquia no seu contrato?"""
-        
-        if any(word in question_lower for word in ['sinistro', 'acidente', 'batida', 'roubo', 'furto']):
-            return """🚨 **Procedimentos em Caso de Sinistro**
+Tem dúvidas sobre o valor da franquia no seu contrato?""",
+        ),
+        Intent(
+            name="sinistro",
+            keywords=['sinistro', 'acidente', 'batida', 'roubo', 'furto'],
+            template="""🚨 **Procedimentos em Caso de Sinistro**
 
 **Primeiros passos (primeiras 24h):**
 1. Preserve o local se possível
@@ -111,10 +85,12 @@ Tem dúvidas sobre o valor da franquia no seu contrato?"""
 • Art. 771 do Código Civil sobre boa-fé
 • Lei nº 8.078/90 (CDC) se pessoa física
 
-Precisa de orientação sobre algum sinistro específico?"""
-        
-        if any(word in question_lower for word in ['cancelar', 'cancelamento', 'rescindir', 'rescisão']):
-            return """❌ **Cancelamento do Seguro Veicular**
+Precisa de orientação sobre algum sinistro específico?""",
+        ),
+        Intent(
+            name="cancelar",
+            keywords=['cancelar', 'cancelamento', 'rescindir', 'rescisão'],
+            template="""❌ **Cancelamento do Seguro Veicular**
 
 **Cancelamento pela seguradora:**
 • Inadimplência do prêmio
@@ -141,10 +117,12 @@ Precisa de orientação sobre algum sinistro específico?"""
 **🛡️ Base Legal:**
 Art. 760 do Código Civil e Circular SUSEP nº 541/2016.
 
-Tem dúvidas sobre cancelamento do seu seguro?"""
-        
-        if any(word in question_lower for word in ['renovação', 'renovar', 'vencimento', 'prazo']):
-            return """🔄 **Renovação do Seguro Veicular**
+Tem dúvidas sobre cancelamento do seu seguro?""",
+        ),
+        Intent(
+            name="renovacao",
+            keywords=['renovação', 'renovar', 'vencimento', 'prazo'],
+            template="""🔄 **Renovação do Seguro Veicular**
 
 **Processo de Renovação:**
 • Seguradora deve oferecer renovação com 30 dias de antecedência
@@ -173,7 +151,45 @@ Tem dúvidas sobre cancelamento do seu seguro?"""
 **🛡️ Base Legal:**
 Resolução CNSP nº 416/2021 sobre seguro auto.
 
-Precisa de ajuda com renovação do seguro?"""
+Precisa de ajuda com renovação do seguro?""",
+        ),
+    ]
+    
+    def __init__(self):
+        self.specialization = "Seguro Veicular"
+        self.icon = "🚗"
+        
+    def generate_response(self, question: str, contract_text: str = "") -> str:
+        """Gera resposta especializada para seguros de veículos"""
+        
+        if not question:
+            return """🚗 **Seguro Veicular - Análise Especializada**
+
+Olá! Sou especialista em contratos de seguro de veículos. Posso ajudar com:
+
+**📋 Principais Análises:**
+• Coberturas obrigatórias vs. opcionais
+• Franquia e valor da indenização
+• Cláusulas de exclusão de cobertura
+• Perfil do condutor e agravamento de risco
+• Procedimentos em caso de sinistro
+
+**⚠️ Pontos Críticos:**
+• Declarações incorretas podem anular o seguro
+• Prazo para comunicar sinistros (geralmente 24h)
+• Limitações para condutores não habilitados
+• Uso comercial vs. particular do veículo
+
+**📞 Órgão Regulador:**
+• SUSEP (Superintendência de Seguros Privados)
+• Resolução CNSP nº 416/2021 (seguro auto)
+
+Como posso ajudar com seu seguro veicular?"""
+        
+        # Análise baseada na pergunta
+        intent_response = self.respond_to_intent(question)
+        if intent_response is not None:
+            return intent_response
         
         # Resposta geral com análise do contrato se disponível
         if contract_text:
@@ -6,6 +6,8 @@ Permite tracking de jobs e notificações instantâneas
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Depends
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
+from app.api.v1.auth import get_current_user
+from app.db.models import User
 from app.services.async_processor import async_processor, JobType, JobStatus
 import json
 import logging
@@ -36,10 +38,15 @@ class JobResponse(BaseModel):
 @router.post("/jobs", response_model=Dict[str, str])
 async def create_job(
     request: JobCreateRequest,
-    user_id: str = "demo_user"  # Em produção, extrair do token JWT
+    user_id: str = "demo_user",  # Em produção, extrair do token JWT
+    reprocess: bool = False,
+    current_user: User = Depends(get_current_user)
 ):
     """
     Cria um novo job de processamento assíncrono
+    Entradas idênticas a um job em andamento ou concluído há pouco retornam esse job
+    (use reprocess=true para processar de novo). O plano (prioridade e cotas) vem da
+    assinatura do usuário autenticado, nunca do cliente.
     """
     try:
         job_id = await async_processor.create_job(
@@ -48,13 +55,16 @@ async def create_job(
             job_type=request.job_type,
             files=request.files,
             contract_title=request.contract_title,
-            options=request.options
+            options=request.options,
+            plan=current_user.subscription_type or "free",
+            reprocess=reprocess
         )
+        job = await async_processor.get_job(job_id)
         
         return {
             "job_id": job_id,
-            "message": "Job criado com sucesso",
-            "status": "pending"
+            "message": "Resultado já disponível" if job.status == JobStatus.COMPLETED else "Job criado com sucesso",
+            "status": job.status.value
         }
         
     except Exception as e:
@@ -69,7 +79,7 @@ async def get_job_status(
     """
     Retorna status detalhado de um job
     """
-    job = async_processor.get_job(job_id)
+    job = await async_processor.get_job(job_id)
     
     if not job:
         raise HTTPException(status_code=404, detail="Job não encontrado")
@@ -100,14 +110,8 @@ async def get_user_jobs(
     """
     Lista jobs do usuário com filtros opcionais
     """
-    jobs = async_processor.get_user_jobs(user_id)
-    
-    # Filtrar por status se especificado
-    if status:
-        jobs = [job for job in jobs if job.status == status]
-    
-    # Limitar resultados
-    jobs = jobs[-limit:]
+    # Filtro por status e limite aplicados na consulta ao repositório
+    jobs = await async_processor.get_user_jobs(user_id, status=status, limit=limit)
     
     # Converter para response format
     responses = []
@@ -135,7 +139,7 @@ async def cancel_job(
     """
     Cancela um job em andamento
     """
-    job = async_processor.get_job(job_id)
+    job = await async_processor.get_job(job_id)
     
     if not job:
         raise HTTPException(status_code=404, detail="Job não encontrado")
@@ -143,7 +147,7 @@ async def cancel_job(
     if job.user_id != user_id:
         raise HTTPException(status_code=403, detail="Acesso negado ao job")
     
-    if job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]:
+    if job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED, JobStatus.TIMED_OUT]:
         raise HTTPException(status_code=400, detail="Job não pode ser cancelado")
     
     success = await async_processor.cancel_job(job_id)
@@ -161,7 +165,7 @@ async def get_job_result(
     """
     Retorna resultado de um job concluído
     """
-    job = async_processor.get_job(job_id)
+    job = await async_processor.get_job(job_id)
     
     if not job:
         raise HTTPException(status_code=404, detail="Job não encontrado")
@@ -177,7 +181,7 @@ async def get_job_result(
     
     return {
         "job_id": job_id,
-        "result": job.result,
+        "result": await async_processor.get_job_result(job),
         "completed_at": job.updated_at.isoformat()
     }
 
@@ -187,9 +191,9 @@ async def get_job_progress_history(
     user_id: str = "demo_user"
 ):
     """
-    Retorna histórico completo de progresso do job
+    Retorna o histórico de progresso do job (últimas JOB_PROGRESS_HISTORY_SIZE entradas)
     """
-    job = async_processor.get_job(job_id)
+    job = await async_processor.get_job(job_id)
     
     if not job:
         raise HTTPException(status_code=404, detail="Job não encontrado")
@@ -224,11 +228,11 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
     Envia atualizações de progresso e notificações
     """
     try:
-        await async_processor.connect_websocket(user_id, websocket)
+        connection = await async_processor.connect_websocket(user_id, websocket)
         logger.info(f"WebSocket conectado para usuário {user_id}")
         
         # Enviar mensagem de boas-vindas
-        await websocket.send_json({
+        connection.enqueue({
             "type": "connection_established",
             "user_id": user_id,
             "message": "Conectado ao sistema de tracking"
@@ -242,20 +246,20 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
                 
                 # Processar diferentes tipos de mensagem
                 if data.get("type") == "ping":
-                    await websocket.send_json({
+                    connection.enqueue({
                         "type": "pong",
                         "timestamp": "2025-09-26T10:00:00Z"
                     })
                 
                 elif data.get("type") == "get_active_jobs":
                     # Enviar lista de jobs ativos
-                    user_jobs = async_processor.get_user_jobs(user_id)
+                    user_jobs = await async_processor.get_user_jobs(user_id)
                     active_jobs = [
                         job.to_dict() for job in user_jobs 
                         if job.status in [JobStatus.PENDING, JobStatus.PROCESSING]
                     ]
                     
-                    await websocket.send_json({
+                    connection.enqueue({
                         "type": "active_jobs",
                         "jobs": active_jobs
                     })
@@ -263,26 +267,29 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
                 elif data.get("type") == "subscribe_job":
                     # Cliente quer receber atualizações específicas de um job
                     job_id = data.get("job_id")
-                    job = async_processor.get_job(job_id)
+                    job = await async_processor.get_job(job_id)
                     
                     if job and job.user_id == user_id:
-                        await websocket.send_json({
+                        connection.enqueue({
                             "type": "job_subscribed",
                             "job_id": job_id,
                             "job": job.to_dict()
                         })
                     else:
-                        await websocket.send_json({
+                        connection.enqueue({
                             "type": "error",
                             "message": "Job não encontrado ou acesso negado"
                         })
-                
+
+            except WebSocketDisconnect:
+                raise
             except Exception as e:
                 logger.error(f"Erro processando mensagem WebSocket: {str(e)}")
-                await websocket.send_json({
+                if not connection.enqueue({
                     "type": "error",
                     "message": "Erro interno do servidor"
-                })
+                }):
+                    break  # Conexão descartada (cliente lento ou fechado)
     
     except WebSocketDisconnect:
         logger.info(f"WebSocket desconectado para usuário {user_id}")
@@ -300,7 +307,7 @@ async def get_system_stats():
     """
     Retorna estatísticas do sistema de processamento
     """
-    return async_processor.get_system_stats()
+    return await async_processor.get_system_stats()
 
 # Helper endpoints para desenvolvimento
 
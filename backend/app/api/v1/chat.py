@@ -2,15 +2,17 @@ from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSoc
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any
 from datetime import datetime
 import json
+import time
 import uuid
 
 from app.db.database import get_db
 from app.db.models import ChatSession, ChatMessage, User, Contract
 from app.api.v1.auth import get_current_user
 from app.agents.factory import AgentFactory
+from app.services.llm_gateway import Histogram
 from app.core.config import settings
 
 router = APIRouter()
@@ -59,10 +61,33 @@ class ConnectionManager:
 
     async def send_personal_message(self, message: str, session_id: str):
         if session_id in self.active_connections:
-            await self.active_connections[session_id].send_text(message)
+            try:
+                await self.active_connections[session_id].send_text(message)
+            except Exception:
+                # Client went away mid-stream; keep generating and persist the answer
+                self.disconnect(session_id)
 
 manager = ConnectionManager()
 
+class StreamingMetrics:
+    """Time-to-first-token and total generation time for streamed chat answers"""
+    
+    def __init__(self):
+        self.time_to_first_token = Histogram()
+        self.total_time = Histogram()
+    
+    def record(self, time_to_first_token_ms: float, total_ms: float):
+        self.time_to_first_token.observe(time_to_first_token_ms / 1000)
+        self.total_time.observe(total_ms / 1000)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "time_to_first_token_seconds": self.time_to_first_token.snapshot(),
+            "total_seconds": self.total_time.snapshot()
+        }
+
+streaming_metrics = StreamingMetrics()
+
 # Chat endpoints
 @router.post("/sessions", response_model=ChatSessionResponse)
 async def create_chat_session(
@@ -222,28 +247,62 @@ async def send_chat_message(
     await db.refresh(user_message)
     
     try:
-        # Generate AI response
-        ai_response = await generate_ai_response(session, message_data.content, db)
+        # Stream AI response; the message id is fixed up front so deltas can reference it
+        ai_message_id = uuid.uuid4()
+        context = {"session_id": str(session.id)}
+        chunks: List[str] = []
+        started = time.perf_counter()
+        first_token_ms = None
+        
+        await manager.send_personal_message(
+            json.dumps({"type": "ai_response_start", "message_id": str(ai_message_id)}),
+            session_id
+        )
         
-        # Save AI message
+        async for delta in stream_ai_response(session, message_data.content, db, context):
+            if first_token_ms is None:
+                first_token_ms = (time.perf_counter() - started) * 1000
+            chunks.append(delta)
+            
+            await manager.send_personal_message(
+                json.dumps({
+                    "type": "ai_response_delta",
+                    "message_id": str(ai_message_id),
+                    "index": len(chunks) - 1,
+                    "delta": delta
+                }),
+                session_id
+            )
+        
+        total_ms = (time.perf_counter() - started) * 1000
+        context["streaming"] = {
+            "time_to_first_token_ms": round(first_token_ms or total_ms, 1),
+            "total_ms": round(total_ms, 1),
+            "chunks": len(chunks)
+        }
+        streaming_metrics.record(first_token_ms or total_ms, total_ms)
+        
+        # Save AI message once, after the stream completes
         ai_message = ChatMessage(
+            id=ai_message_id,
             session_id=session.id,
-            content=ai_response["message"],
+            content="".join(chunks),
             role="assistant",
             message_type="text",
-            metadata=ai_response.get("context")
+            metadata=context
         )
         
         db.add(ai_message)
         await db.commit()
         await db.refresh(ai_message)
         
-        # Send response via WebSocket if connected
+        # Final frame carries the full text for clients that ignore deltas
         await manager.send_personal_message(
             json.dumps({
                 "type": "ai_response",
-                "message": ai_response["message"],
-                "message_id": str(ai_message.id)
+                "message": ai_message.content,
+                "message_id": str(ai_message.id),
+                "time_to_first_token_ms": context["streaming"]["time_to_first_token_ms"]
             }),
             session_id
         )
@@ -284,6 +343,17 @@ async def generate_ai_response(session: ChatSession, message: str, db: AsyncSess
     """Generate AI response using intelligent agent system"""
     
     context = {"session_id": str(session.id)}
+    chunks = [delta async for delta in stream_ai_response(session, message, db, context)]
+    
+    return {
+        "message": "".join(chunks),
+        "context": context
+    }
+
+async def stream_ai_response(session: ChatSession, message: str, db: AsyncSession,
+                             context: Dict[str, Any]) -> AsyncIterator[str]:
+    """Yield the AI response incrementally, filling `context` with agent metadata"""
+    
     contract_text = ""
     
     # If session has a contract, get contract context
@@ -300,41 +370,37 @@ async def generate_ai_response(session: ChatSession, message: str, db: AsyncSess
             context["contract_title"] = contract.title
         else:
             # No contract text available
-            return {
-                "message": "Este contrato ainda não foi analisado. Aguarde o processamento ser concluído.",
-                "context": context
-            }
+            yield "Este contrato ainda não foi analisado. Aguarde o processamento ser concluído."
+            return
     
     # Use intelligent agent factory for automatic classification and response
+    emitted = False
     try:
         agent_factory = AgentFactory(None, None)  # Initialize with minimal setup
         
-        # Use the new intelligent analysis method
-        result = await agent_factory.analyze_contract_intelligent(
+        async for event in agent_factory.stream_contract_intelligent(
             contract_text=contract_text,
             question=message,
             context=context
-        )
-        
-        if result["status"] == "success":
-            # Successful intelligent analysis
-            context.update({
-                "agent_type": result["agent_info"]["type"],
-                "agent_name": result["agent_info"]["name"], 
-                "agent_icon": result["agent_info"]["icon"],
-                "classification": result["classification"],
-                "intelligent_version": result["version"]
-            })
-            
-            response = result["response"]
-            
-        else:
-            # Error in intelligent analysis - fallback
-            response = "Desculpe, ocorreu um erro na análise. Vou tentar responder de forma geral."
-            if "error" in result:
-                context["error"] = result["error"]
+        ):
+            if event["type"] == "start":
+                context.update({
+                    "agent_type": event["agent_info"]["type"],
+                    "agent_name": event["agent_info"]["name"], 
+                    "agent_icon": event["agent_info"]["icon"],
+                    "classification": event["classification"],
+                    "intelligent_version": event["version"]
+                })
+            else:
+                emitted = True
+                yield event["text"]
             
     except Exception as e:
+        if emitted:
+            # Part of the answer already reached the user; keep it and flag the error
+            context["stream_error"] = str(e)
+            return
+        
         # Complete fallback for any errors
         if contract_text:
             response = f"Entendi sua pergunta sobre o contrato. Devido a um erro técnico temporário, "
@@ -346,11 +412,7 @@ async def generate_ai_response(session: ChatSession, message: str, db: AsyncSess
             response += "ou tirar dúvidas gerais sobre direitos do consumidor."
         
         context["fallback_error"] = str(e)
-    
-    return {
-        "message": response,
-        "context": context
-    }
+        yield response
 
 # WebSocket endpoint
 @router.websocket("/ws/{session_id}")
@@ -375,6 +437,14 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     except WebSocketDisconnect:
         manager.disconnect(session_id)
 
+@router.get("/metrics/streaming")
+async def get_streaming_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """Get time-to-first-token metrics for streamed chat answers"""
+    
+    return streaming_metrics.get_stats()
+
 @router.delete("/sessions/{session_id}")
 async def delete_chat_session(
     session_id: str,
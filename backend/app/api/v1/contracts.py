@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File,
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 import uuid
 
@@ -428,6 +428,7 @@ class EnhancedAnalysisRequest(BaseModel):
     contract_text: str
     contract_category: Optional[str] = None
     analysis_type: str = "analysis"
+    analysis_depth: str = "auto"  # "full" = sempre o modelo completo, sem roteamento econômico
 
 @router.post("/{contract_id}/enhanced-analysis")
 async def get_enhanced_contract_analysis(
@@ -465,7 +466,8 @@ async def get_enhanced_contract_analysis(
         # Get enhanced analysis using RAG
         enhanced_analysis = await agent_factory.analyze_contract(
             contract_text=request.contract_text or contract.extracted_text,
-            context={"contract_id": contract_id, "enhanced_rag": True}
+            context={"contract_id": contract_id, "enhanced_rag": True,
+                     "analysis_depth": request.analysis_depth}
         )
         
         # Update contract with enhanced analysis
@@ -545,6 +547,116 @@ async def get_rag_statistics(
             detail=f"Error retrieving RAG statistics: {str(e)}"
         )
 
+@router.get("/agents/intent-stats")
+async def get_agent_intent_statistics(
+    top: int = 20,
+    current_user: User = Depends(get_current_user)
+):
+    """Get the most requested template intents across keyword agents"""
+    
+    from app.agents.intelligent_factory import agent_factory as intelligent_agent_factory
+    
+    return intelligent_agent_factory.get_intent_stats(top)
+
+@router.get("/agents/llm-cache-stats")
+async def get_llm_cache_statistics(
+    current_user: User = Depends(get_current_user)
+):
+    """Get LLM response cache hit rates per agent"""
+    
+    from app.services.llm_cache import llm_cache
+    
+    return llm_cache.get_stats()
+
+@router.get("/agents/llm-gateway-stats")
+async def get_llm_gateway_statistics(
+    current_user: User = Depends(get_current_user)
+):
+    """Get LLM gateway concurrency, retry and latency metrics"""
+    
+    from app.services.llm_gateway import llm_gateway
+    
+    return llm_gateway.get_stats()
+
+@router.get("/agents/model-routing-stats")
+async def get_model_routing_statistics(
+    current_user: User = Depends(get_current_user)
+):
+    """Get per-route acceptance, escalation, latency and estimated cost"""
+    
+    from app.agents.model_router import model_router
+    
+    return model_router.get_stats()
+
+@router.get("/agents/dedup-stats")
+async def get_contract_dedup_statistics(
+    current_user: User = Depends(get_current_user)
+):
+    """Get near-duplicate contract reuse statistics"""
+    
+    from app.services.contract_dedup import contract_dedup
+    
+    return contract_dedup.get_stats()
+
+class ClauseReviewRequest(BaseModel):
+    category: str
+    verdict: Optional[Dict[str, Any]] = None  # Veredito corrigido pelo revisor (padrão: o do LLM)
+
+@router.get("/agents/clause-library/stats")
+async def get_clause_library_statistics(
+    current_user: User = Depends(get_current_user)
+):
+    """Get standard-clause library hit rate and size"""
+    
+    from app.services.clause_library import clause_library
+    
+    return clause_library.get_stats()
+
+@router.get("/agents/clause-library/pending")
+async def list_pending_library_clauses(
+    limit: int = 50,
+    current_user: User = Depends(get_current_user)
+):
+    """List LLM clause verdicts awaiting review, most frequent first"""
+    
+    from app.services.clause_library import clause_library
+    
+    return {"pending": clause_library.list_pending(limit)}
+
+@router.post("/agents/clause-library/pending/{pending_id}/approve")
+async def approve_library_clause(
+    pending_id: str,
+    request: ClauseReviewRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Promote a reviewed clause verdict into the standard-clause library"""
+    
+    # if not current_user.is_admin:
+    #     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado")
+    
+    from app.services.clause_library import clause_library
+    
+    if not clause_library.has_pending(pending_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cláusula pendente não encontrada")
+    
+    clause = await clause_library.approve(pending_id, request.category, request.verdict)
+    return {"clause_id": clause.id, "category": clause.category}
+
+@router.delete("/agents/clause-library/pending/{pending_id}")
+async def reject_library_clause(
+    pending_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Discard a clause verdict that should not enter the library"""
+    
+    from app.services.clause_library import clause_library
+    
+    if not clause_library.has_pending(pending_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cláusula pendente não encontrada")
+    
+    clause_library.reject(pending_id)
+    return {"message": "Cláusula descartada"}
+
 # ===============================
 # ETHICAL FOUNDATION ENDPOINTS
 # ===============================
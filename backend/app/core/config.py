@@ -56,9 +56,102 @@ class Settings(BaseSettings):
     MAX_TOKENS: int = 4000
     TEMPERATURE: float = 0.1
     
+    # LLM Gateway
+    LLM_BACKEND: str = "anthropic"  # anthropic, fake
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_MAX_CONCURRENCY_PER_MODEL: int = 8
+    LLM_TOKENS_PER_MINUTE: int = 80000
+    LLM_MAX_RETRIES: int = 4
+    LLM_RETRY_BASE_DELAY: float = 0.5
+    LLM_RETRY_MAX_DELAY: float = 8.0
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 120.0
+    LLM_PROMPT_CACHING_ENABLED: bool = True  # cache_control on the stable prompt prefix
+    LLM_HEDGING_ENABLED: bool = False  # Duplicate slow agent requests (tail latency vs. cost)
+    LLM_HEDGE_PERCENTILE: float = 0.95  # Hedge once a request outlives this latency percentile
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 1.0
+    LLM_HEDGE_FALLBACK_MODEL: str = ""  # Empty = hedge on the same model
+    LLM_ANALYSIS_DEADLINE_SECONDS: float = 90.0  # Hard limit before the fallback analysis
+    
+    # LLM Response Cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_BACKEND: str = "memory"  # memory, sqlite, postgres
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    LLM_CACHE_MAX_TEMPERATURE: float = 0.1  # Only (near-)deterministic calls are cached
+    LLM_CACHE_SQLITE_PATH: str = "llm_cache.db"
+    
+    # Async job processing
+    ASYNC_MAX_CONCURRENT_JOBS: int = 5  # Worker pool size per process
+    ASYNC_JOB_TIMEOUT_SECONDS: float = 1800.0  # Whole-job deadline
+    ASYNC_STAGE_TIMEOUT_SECONDS: float = 300.0  # Stages without an entry in STAGE_DEADLINES
+    PIPELINE_QUEUE_SIZE: int = 32  # Bounded queue in front of each stage (backpressure)
+    PIPELINE_IO_WORKERS: int = 8  # Async workers per I/O stage (OCR, LLM, RAG, notifications)
+    PIPELINE_CPU_WORKERS: int = 0  # Process pool for CPU stages; 0 = one per core
+    
+    # Job notifications over WebSocket
+    WS_PROGRESS_MAX_PER_SECOND: float = 4.0  # Progress pushes per job and connection (latest wins)
+    WS_SEND_TIMEOUT_SECONDS: float = 5.0  # Slower sends drop the connection
+    WS_MAX_QUEUED_MESSAGES: int = 100  # Per-connection backlog before dropping a slow consumer
+    
+    # Async job store
+    JOB_STORE_BACKEND: str = "memory"  # memory, sqlite, postgres
+    JOB_STORE_SQLITE_PATH: str = "async_jobs.db"
+    JOB_STORE_FLUSH_INTERVAL_SECONDS: float = 0.5  # Write-behind: progress is batched this long
+    JOB_STORE_MAX_BATCH: int = 200  # Flush right away once this many jobs are pending
+    
+    # Finished job retention
+    JOB_RETENTION_SECONDS: float = 86400.0  # Finished jobs are purged after this long; 0 = keep forever
+    JOB_RETENTION_SWEEP_SECONDS: float = 60.0
+    JOB_PROGRESS_HISTORY_SIZE: int = 50  # Ring buffer: older progress entries are discarded
+    JOB_RESULT_SPILL_BYTES: int = 32768  # Larger results are moved out of memory, loaded on demand
+    JOB_RESULT_SPILL_BACKEND: str = "disk"  # disk, r2
+    JOB_RESULT_SPILL_DIR: str = "job_results"
+    JOB_DEDUP_TTL_SECONDS: float = 3600.0  # Identical requests reuse a job completed this recently
+    JOB_DEDUP_MAX_ENTRIES: int = 10000
+    JOB_ETA_EWMA_ALPHA: float = 0.2  # Weight of the latest duration in each stage estimate
+    JOB_ETA_SAMPLE_SIZE: int = 200  # Recent durations kept per stage profile for quantiles
+    JOB_ETA_MIN_SAMPLES: int = 3  # Fewer observations fall back to a broader profile
+    
+    # Job distribution across workers/nodes
+    JOB_BROKER_BACKEND: str = "memory"  # memory (single process), sqlite (one node), redis
+    JOB_BROKER_SQLITE_PATH: str = "job_broker.db"
+    JOB_BROKER_PREFETCH: int = 8  # Jobs a worker pulls beyond its free slots
+    JOB_BROKER_VISIBILITY_TIMEOUT_SECONDS: float = 300.0  # Unacked jobs are redelivered; held jobs are renewed every third of it
+    REDIS_URL: str = "redis://localhost:6379/0"
+    
     # Application Base URL (for webhooks)
     API_BASE_URL: str = "https://yourdomain.com"  # Update in production
     
+    # Near-duplicate contract reuse (MinHash LSH)
+    CONTRACT_DEDUP_ENABLED: bool = True
+    CONTRACT_DEDUP_THRESHOLD: float = 0.8  # Estimated Jaccard of 5-word shingles
+    CONTRACT_DEDUP_MAX_CHANGED_FRACTION: float = 0.3  # Above this, run a full analysis
+    CLAUSE_LIBRARY_ENABLED: bool = True
+    CLAUSE_LIBRARY_PATH: str = ""  # JSON file with reviewed and pending clauses, shared by API and workers (empty = in-memory only)
+    CLAUSE_LIBRARY_MAX_HAMMING: int = 10  # SimHash bits (of 64) for a near-identical match
+    CLAUSE_LIBRARY_USE_EMBEDDINGS: bool = False  # Paraphrase lookup via RAG embeddings (costs one call per clause)
+    CLAUSE_LIBRARY_MIN_SIMILARITY: float = 0.92
+    MODEL_ROUTING_ENABLED: bool = True  # Cheap-first routing: rules -> fast model -> full model
+    MODEL_ROUTING_FAST_MODEL: str = "claude-3-haiku-20240307"
+    MODEL_ROUTING_FULL_MODEL: str = "claude-3-5-sonnet-20241022"  # Must support prompt caching
+    MODEL_ROUTING_MIN_CONFIDENCE: float = 0.75  # Below this, escalate to the next route
+    MODEL_ROUTING_RULES_MAX_CHARS: int = 3000  # Longer contracts skip the rule-based route
+    MODEL_ROUTING_RULES_MIN_CLASSIFICATION_CONFIDENCE: float = 0.85
+    MODEL_ROUTING_FAST_MAX_CHARS: int = 20000  # Longer contracts go straight to the full model
+    
+    # Local embedding classifier (second tier between keywords and the LLM)
+    EMBEDDING_CLASSIFIER_ENABLED: bool = True
+    EMBEDDING_CLASSIFIER_K: int = 5
+    EMBEDDING_CLASSIFIER_MIN_CONFIDENCE: float = 0.6  # Below this, the contract is ambiguous
+    EMBEDDING_CLASSIFIER_MIN_SHARED_FEATURES: int = 3  # Terms shared with the winning category's examples (out-of-domain guard)
+    EMBEDDING_CLASSIFIER_EXAMPLES_PATH: str = ""  # JSON {category: [texts]} with extra labelled contracts
+    BULK_CLASSIFICATION_PARALLEL_MIN_BATCH: int = 2000  # classify_many uses a process pool from here
+    BULK_CLASSIFICATION_MAX_WORKERS: int = 0  # 0 = one per CPU
+    CLASSIFIER_SCAN_BUDGET_CHARS: int = 32000  # Head/tail/spaced windows read first; 0 = whole document
+    CLASSIFIER_SCAN_GROWTH: int = 4  # Budget multiplier for each extension of an undecided scan
+    CLASSIFIER_SCAN_MIN_MARGIN: float = 0.3  # Relative top-two margin that ends the scan early
+    
     # RAG Configuration
     EMBEDDING_DIMENSION: int = 1536
     CHUNK_SIZE: int = 1000
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, ForeignKey, Float, LargeBinary
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, ForeignKey, Float, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
@@ -282,3 +282,34 @@ class AuditLog(Base):
     
     # Relationships
     user = relationship("User")
+
+class LLMResponseCacheEntry(Base):
+    __tablename__ = "llm_response_cache"
+    
+    # Fingerprint: modelo + temperatura + hash do prompt normalizado
+    key = Column(String, primary_key=True)
+    model = Column(String, nullable=False)
+    response_text = Column(Text, nullable=False)
+    
+    # Epoch seconds (TTL e eviction LRU)
+    created_at = Column(Float, nullable=False)
+    expires_at = Column(Float, nullable=False, index=True)
+    last_accessed_at = Column(Float, nullable=False, index=True)
+
+class AsyncJobRecord(Base):
+    __tablename__ = "async_jobs"
+    
+    id = Column(String, primary_key=True)
+    user_id = Column(String, nullable=False)
+    job_type = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)  # UTC
+    updated_at = Column(DateTime, nullable=False)
+    
+    # ContractJob.to_dict() completo (progresso, resultado, opções)
+    data = Column(JSON, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_async_jobs_user_id_created_at", "user_id", "created_at"),
+        Index("ix_async_jobs_status", "status"),
+    )
@@ -10,7 +10,8 @@ from datetime import datetime, timedelta
 import json
 import statistics
 from collections import defaultdict, Counter
-import re
+
+from app.services.rule_engine import Rule, RuleSet, rule_engine
 
 class BiasType(Enum):
     """Tipos de viés identificáveis"""
@@ -39,6 +40,7 @@ class BiasIndicator:
     detection_pattern: str  # Regex ou descrição do padrão
     mitigation_strategy: str
     examples: List[str] = field(default_factory=list)
+    keywords: List[str] = field(default_factory=list)  # Termos literais (dispensa a regex)
     
 @dataclass
 class BiasAuditResult:
@@ -68,6 +70,8 @@ class AIBiasAuditor:
         self.bias_indicators = self._initialize_bias_indicators()
         self.audit_history: List[BiasAuditResult] = []
         self.bias_patterns = self._compile_bias_patterns()
+        self.rule_set = self._build_rule_set()
+        rule_engine.register(self.rule_set)
         
     def _initialize_bias_indicators(self) -> List[BiasIndicator]:
         """Inicializa indicadores de viés conhecidos"""
@@ -93,6 +97,7 @@ class AIBiasAuditor:
             category=BiasCategory.CRITICAL,
             description="Discriminação baseada em classe social ou poder econômico",
             detection_pattern=r"\b(pobre|rico|classe baixa|elite|privilegiado|carente)\b",
+            keywords=["pobre", "rico", "classe baixa", "elite", "privilegiado", "carente"],
             mitigation_strategy="Focar em análise técnica objetiva. Evitar julgamentos socioeconômicos.",
             examples=[
                 "Pessoas de baixa renda não compreendem...",
@@ -135,6 +140,7 @@ class AIBiasAuditor:
             category=BiasCategory.CRITICAL,
             description="Avaliação de risco desproporcional ou enviesada",
             detection_pattern=r"\b(extremamente perigoso|nunca assine|fuja|golpe|armadilha)\b",
+            keywords=["extremamente perigoso", "nunca assine", "fuja", "golpe", "armadilha"],
             mitigation_strategy="Usar escala proporcional de risco. Explicar riscos objetivamente sem alarmismo.",
             examples=[
                 "Extremamente perigoso para qualquer pessoa...",
@@ -149,6 +155,7 @@ class AIBiasAuditor:
             category=BiasCategory.MEDIUM,
             description="Linguagem excessivamente técnica ou excludente",
             detection_pattern=r"\b(obviamente|evidentemente|qualquer pessoa sabe|é óbvio)\b",
+            keywords=["obviamente", "evidentemente", "qualquer pessoa sabe", "é óbvio"],
             mitigation_strategy="Explicar conceitos de forma acessível. Não assumir conhecimento prévio.",
             examples=[
                 "Obviamente você deveria saber que...",
@@ -168,6 +175,27 @@ class AIBiasAuditor:
         
         return dict(patterns)
     
+    def _build_rule_set(self) -> RuleSet:
+        """Indicadores e termos contextuais como um único conjunto de regras"""
+        rules = [
+            Rule(
+                id=indicator.bias_type.value,
+                keywords=tuple(indicator.keywords),
+                pattern=None if indicator.keywords else indicator.detection_pattern,
+                tag="indicator",
+                data=indicator
+            )
+            for indicator in self.bias_indicators
+        ]
+        rules += [
+            Rule(id="risk_words", keywords=("risco", "perigo", "cuidado", "atenção"), tag="context"),
+            Rule(id="negative_words", keywords=("nunca", "jamais", "evite", "fuja", "perigoso"), tag="context"),
+            Rule(id="complex_terms", keywords=("ipso facto", "ad hoc", "stricto sensu", "lato sensu"),
+                 tag="context", case_sensitive=True),
+        ]
+        # Indicadores com ".*" podem se sobrepor: cada regex é avaliada de forma independente
+        return RuleSet("bias", rules, exclusive=False)
+    
     def audit_response(self, 
                       response_text: str,
                       contract_type: str = "",
@@ -179,9 +207,12 @@ class AIBiasAuditor:
         detected_biases = []
         confidence_scores = {}
         
+        # Uma única varredura para todos os indicadores e termos contextuais
+        match_counts = Counter(match.rule_id for match in rule_engine.scan(response_text, self.rule_set.name))
+        
         # Detecta cada tipo de viés
         for indicator in self.bias_indicators:
-            score = self._detect_bias_indicator(response_text, indicator)
+            score = self._detect_bias_indicator(match_counts[indicator.bias_type.value], indicator)
             confidence_scores[indicator.bias_type.value] = score
             
             if score > 0.5:  # Threshold para detecção
@@ -189,7 +220,7 @@ class AIBiasAuditor:
         
         # Análises específicas adicionais
         detected_biases.extend(self._detect_contextual_biases(
-            response_text, contract_type, entity_type, context or {}
+            match_counts, contract_type, entity_type, context or {}
         ))
         
         # Determina se requer revisão humana
@@ -215,17 +246,14 @@ class AIBiasAuditor:
         self.audit_history.append(result)
         return result
     
-    def _detect_bias_indicator(self, text: str, indicator: BiasIndicator) -> float:
-        """Detecta indicador específico de viés no texto"""
-        
-        # Detecção por padrão regex
-        matches = re.findall(indicator.detection_pattern, text.lower(), re.IGNORECASE)
+    def _detect_bias_indicator(self, match_count: int, indicator: BiasIndicator) -> float:
+        """Converte o número de ocorrências de um indicador em confiança"""
         
-        if not matches:
+        if not match_count:
             return 0.0
         
         # Calcula confiança baseada no número de matches
-        confidence = min(len(matches) / 3.0, 1.0)  # Máximo 1.0 com 3+ matches
+        confidence = min(match_count / 3.0, 1.0)  # Máximo 1.0 com 3+ matches
         
         # Ajusta confiança baseada na categoria
         if indicator.category == BiasCategory.CRITICAL:
@@ -236,7 +264,7 @@ class AIBiasAuditor:
         return min(confidence, 1.0)
     
     def _detect_contextual_biases(self, 
-                                text: str, 
+                                match_counts: Counter, 
                                 contract_type: str,
                                 entity_type: str,
                                 context: Dict[str, Any]) -> List[BiasIndicator]:
@@ -245,10 +273,7 @@ class AIBiasAuditor:
         contextual_biases = []
         
         # Viés de avaliação de risco desproporcional
-        risk_words = re.findall(r'\b(risco|perigo|cuidado|atenção)\b', text.lower())
-        negative_words = re.findall(r'\b(nunca|jamais|evite|fuja|perigoso)\b', text.lower())
-        
-        if len(risk_words) > 3 and len(negative_words) > 2:
+        if match_counts["risk_words"] > 3 and match_counts["negative_words"] > 2:
             contextual_biases.append(BiasIndicator(
                 bias_type=BiasType.RISK_ASSESSMENT,
                 category=BiasCategory.HIGH,
@@ -259,8 +284,7 @@ class AIBiasAuditor:
         
         # Viés de complexidade vs tipo de entidade
         if entity_type == "CPF":
-            complex_terms = re.findall(r'\b(ipso facto|ad hoc|stricto sensu|lato sensu)\b', text)
-            if len(complex_terms) > 2:
+            if match_counts["complex_terms"] > 2:
                 contextual_biases.append(BiasIndicator(
                     bias_type=BiasType.LANGUAGE,
                     category=BiasCategory.MEDIUM,
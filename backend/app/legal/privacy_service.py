@@ -15,6 +15,19 @@ from cryptography.fernet import Fernet
 import base64
 import os
 
+from app.services.rule_engine import Rule, RuleSet, rule_engine
+
+# Padrões comuns de dados pessoais. Conjunto exclusivo: cada trecho recebe um único tipo,
+# e a ordem resolve ambiguidades (14 dígitos são CNPJ antes de serem lidos como CPF)
+PERSONAL_DATA_RULES = RuleSet("personal_data", [
+    Rule("email", pattern=r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', case_sensitive=True),
+    Rule("cnpj", pattern=r'\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}|\d{14}'),
+    Rule("cpf", pattern=r'\d{3}\.\d{3}\.\d{3}-\d{2}|\d{11}'),
+    Rule("phone", pattern=r'\(\d{2}\)\s?\d{4,5}-?\d{4}'),
+    Rule("cep", pattern=r'\d{5}-?\d{3}'),
+])
+rule_engine.register(PERSONAL_DATA_RULES)
+
 class DataCategory(Enum):
     """Categorias de dados pessoais segundo LGPD"""
     IDENTIFICACAO = "identificacao"  # Nome, CPF, RG, etc.
@@ -189,30 +202,21 @@ class PrivacyService:
     def anonymize_text(self, text: str, user_id: str) -> str:
         """Anonimiza texto substituindo dados pessoais (Art. 12 LGPD)"""
         
-        # Padrões comuns de dados pessoais
-        patterns = {
-            'cpf': r'\d{3}\.\d{3}\.\d{3}-\d{2}|\d{11}',
-            'cnpj': r'\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}|\d{14}',
-            'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            'phone': r'\(\d{2}\)\s?\d{4,5}-?\d{4}',
-            'cep': r'\d{5}-?\d{3}'
-        }
-        
-        anonymized_text = text
-        
-        import re
-        for pattern_name, pattern in patterns.items():
-            matches = re.findall(pattern, text)
-            for match in matches:
-                # Gera hash consistente para o mesmo valor
-                hash_key = f"{user_id}:{match}"
-                if hash_key not in self.anonymization_mappings:
-                    hash_value = hashlib.sha256(hash_key.encode()).hexdigest()[:8]
-                    self.anonymization_mappings[hash_key] = f"[{pattern_name.upper()}_{hash_value}]"
-                
-                anonymized_text = anonymized_text.replace(match, self.anonymization_mappings[hash_key])
-        
-        return anonymized_text
+        pieces = []
+        position = 0
+        for match in rule_engine.scan(text, PERSONAL_DATA_RULES.name):
+            # Gera hash consistente para o mesmo valor
+            hash_key = f"{user_id}:{match.text}"
+            if hash_key not in self.anonymization_mappings:
+                hash_value = hashlib.sha256(hash_key.encode()).hexdigest()[:8]
+                self.anonymization_mappings[hash_key] = f"[{match.rule_id.upper()}_{hash_value}]"
+            
+            pieces.append(text[position:match.start])
+            pieces.append(self.anonymization_mappings[hash_key])
+            position = match.end
+        
+        pieces.append(text[position:])
+        return "".join(pieces)
     
     def encrypt_sensitive_data(self, data: str) -> str:
         """Criptografa dados sensíveis"""
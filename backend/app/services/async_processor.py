@@ -4,10 +4,14 @@ Gerencia jobs de análise com tracking completo e notificações em tempo real
 """
 
 import asyncio
+import functools
 import json
+import os
 import uuid
+from collections import deque
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable
+from typing import Deque, Dict, List, Optional, Any, Callable, Tuple
 from enum import Enum
 from dataclasses import dataclass, asdict
 from fastapi import WebSocket
@@ -15,7 +19,18 @@ import logging
 from app.services.email_service import EmailService
 from app.agents.factory import AgentFactory
 from app.services.image_processor import DocumentImageProcessor
+from app.services.job_broker import CONTROL_CHANNEL, USER_CHANNEL_PREFIX, Delivery, create_job_broker
+from app.services.job_cancellation import CancellationToken, JobCancelled, StageTimeoutError, run_cancellable
+from app.services.job_dedup import JobDedupIndex
+from app.services.job_eta import QUEUE_STAGE, StageDurationModel, job_profile
+from app.services.job_pipeline import PipelineItem, PipelineStage, StagePipeline
+from app.services.job_results import create_result_spill
+from app.services.job_scheduler import FairJobScheduler
+from app.services.job_store import JobStore, create_job_store
 from app.services.rag_service import RAGService
+from app.services.websocket_fanout import OutboundConnection, WebSocketFanout
+from app.services.llm_gateway import llm_gateway
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +40,7 @@ class JobStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
     CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
 
 class JobType(str, Enum):
     CONTRACT_ANALYSIS = "contract_analysis"
@@ -32,7 +48,7 @@ class JobType(str, Enum):
     DOCUMENT_OCR = "document_ocr"
     FULL_PIPELINE = "full_pipeline"
 
-@dataclass
+@dataclass(slots=True)
 class JobProgress:
     stage: str
     progress: float  # 0.0 to 1.0
@@ -54,18 +70,23 @@ class ContractJob:
     contract_title: str
     user_email: str
     
-    # Processing data
-    progress_history: List[JobProgress]
+    # Processing data (últimas JOB_PROGRESS_HISTORY_SIZE entradas)
+    progress_history: Deque[JobProgress]
     current_stage: str
     total_stages: int
     estimated_completion: Optional[datetime]
     
-    # Results
+    # Results (resultados grandes ficam fora da memória; `result_ref` aponta para eles)
     result: Optional[Dict[str, Any]] = None
+    result_ref: Optional[str] = None
     error_message: Optional[str] = None
     
     # Configuration
     options: Dict[str, Any] = None
+    input_hash: Optional[str] = None  # Deduplicação por conteúdo (JobDedupIndex)
+    
+    def __post_init__(self):
+        self.progress_history = deque(self.progress_history, maxlen=settings.JOB_PROGRESS_HISTORY_SIZE)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
@@ -86,24 +107,123 @@ class ContractJob:
         ]
         
         return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ContractJob":
+        """Rebuild a job from to_dict() output (durable job store)"""
+        estimated_completion = data.get('estimated_completion')
+        return cls(**{
+            **data,
+            'job_type': JobType(data['job_type']),
+            'status': JobStatus(data['status']),
+            'created_at': datetime.fromisoformat(data['created_at']),
+            'updated_at': datetime.fromisoformat(data['updated_at']),
+            'estimated_completion': datetime.fromisoformat(estimated_completion) if estimated_completion else None,
+            'progress_history': [
+                JobProgress(**{**p, 'timestamp': datetime.fromisoformat(p['timestamp'])})
+                for p in data.get('progress_history', [])
+            ]
+        })
+
+TERMINAL_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED, JobStatus.TIMED_OUT)
 
 class AsyncContractProcessor:
     """Processador assíncrono de contratos com tracking completo"""
     
-    def __init__(self):
+    STAGE_MESSAGES = {
+        "file_validation": "Validando arquivos...",
+        "image_validation": "Validando imagens...",
+        "image_processing": "Otimizando imagens para OCR...",
+        "image_enhancement": "Processando imagens...",
+        "ocr_extraction": "Extraindo texto dos documentos...",
+        "contract_classification": "Classificando tipo de contrato...",
+        "agent_analysis": "Analisando contrato com agente especializado...",
+        "result_compilation": "Compilando resultado final...",
+        "notification": "Enviando notificações...",
+    }
+    
+    # Prazo (segundos) por etapa; as demais usam ASYNC_STAGE_TIMEOUT_SECONDS
+    STAGE_DEADLINES = {
+        "file_validation": 30,
+        "image_processing": 600,
+        "image_enhancement": 600,
+        "ocr_extraction": 300,
+        "contract_classification": 60,
+        "agent_analysis": 180,
+        "result_compilation": 30,
+        "notification": 60,
+    }
+    
+    def __init__(self, store: Optional[JobStore] = None):
+        # Repositório durável (compartilhado entre workers); `jobs` guarda só os jobs
+        # em execução neste processo
+        self.store = store or create_job_store(ContractJob.from_dict)
         self.jobs: Dict[str, ContractJob] = {}
         self.active_jobs: Dict[str, asyncio.Task] = {}
-        self.websocket_connections: Dict[str, List[WebSocket]] = {}
+        self.cancel_tokens: Dict[str, CancellationToken] = {}
+        
+        # Envio por WebSocket em filas por conexão (progresso agregado por job)
+        self.fanout = WebSocketFanout(
+            progress_per_second=settings.WS_PROGRESS_MAX_PER_SECOND,
+            send_timeout=settings.WS_SEND_TIMEOUT_SECONDS,
+            max_queue=settings.WS_MAX_QUEUED_MESSAGES
+        )
         
         # Services
-        self.agent_factory = AgentFactory()
+        self.rag_service = RAGService()
+        self.agent_factory = AgentFactory(llm_gateway.as_client(), self.rag_service)
         self.image_processor = DocumentImageProcessor()
         self.email_service = EmailService()
-        self.rag_service = RAGService()
         
         # Configuration
-        self.max_concurrent_jobs = 5
-        self.job_timeout_minutes = 30
+        self.max_concurrent_jobs = settings.ASYNC_MAX_CONCURRENT_JOBS
+        self.job_timeout_minutes = settings.ASYNC_JOB_TIMEOUT_SECONDS / 60
+        
+        # Desfecho dos jobs (prazo estourado, cancelado e falha contados à parte)
+        self.outcomes: Dict[str, int] = {"completed": 0, "failed": 0, "cancelled": 0, "timed_out": 0}
+        self.timeouts_by_stage: Dict[str, int] = {}
+        
+        # Pool limitado de workers com fila justa por usuário
+        self.scheduler = FairJobScheduler(self._run_job, max_workers=self.max_concurrent_jobs)
+        
+        # Estágios ligados por filas limitadas (CPU em processos, I/O no event loop)
+        self.pipeline = StagePipeline(
+            self._build_pipeline_stages(),
+            queue_size=settings.PIPELINE_QUEUE_SIZE,
+            cpu_workers=settings.PIPELINE_CPU_WORKERS or None
+        )
+        
+        # Retenção: jobs finalizados expiram e resultados grandes saem da memória
+        self.result_spill = create_result_spill()
+        self.retention_seconds = settings.JOB_RETENTION_SECONDS
+        self.purged_jobs = 0
+        self._retention_task: Optional[asyncio.Task] = None
+        
+        # Distribuição dos jobs e dos eventos entre workers (e nós) via broker; cada
+        # worker retira do broker no máximo max_workers + prefetch jobs por vez
+        self.broker = create_job_broker()
+        self._deliveries: Dict[str, Delivery] = {}
+        self._slots = (
+            asyncio.Semaphore(self.max_concurrent_jobs + self.broker.prefetch)
+            if self.broker.prefetch is not None else None
+        )
+        self._started = False
+        self._dispatch_task: Optional[asyncio.Task] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self.skipped_redeliveries = 0
+        
+        # Pedidos idênticos reaproveitam o job em andamento ou concluído há pouco
+        self.dedup = JobDedupIndex(
+            ttl_seconds=settings.JOB_DEDUP_TTL_SECONDS,
+            max_entries=settings.JOB_DEDUP_MAX_ENTRIES
+        )
+        
+        # Duração histórica das etapas para a estimativa de conclusão
+        self.eta_model = StageDurationModel(
+            alpha=settings.JOB_ETA_EWMA_ALPHA,
+            sample_size=settings.JOB_ETA_SAMPLE_SIZE,
+            min_samples=settings.JOB_ETA_MIN_SAMPLES
+        )
         
     async def create_job(
         self,
@@ -112,9 +232,23 @@ class AsyncContractProcessor:
         job_type: JobType,
         files: List[str],
         contract_title: str,
-        options: Optional[Dict[str, Any]] = None
+        options: Optional[Dict[str, Any]] = None,
+        plan: str = "free",
+        reprocess: bool = False
     ) -> str:
-        """Cria um novo job de processamento"""
+        """
+        Cria um novo job de processamento (enfileirado até haver worker livre)
+        
+        Se o usuário já enviou as mesmas entradas, retorna o id do job em andamento ou
+        concluído há menos de JOB_DEDUP_TTL_SECONDS; `reprocess` força um job novo.
+        """
+        
+        await self.start()
+        input_hash = await self.dedup.input_hash(user_id, job_type.value, files, options)
+        if not reprocess:
+            duplicate_id = await self._find_duplicate(input_hash)
+            if duplicate_id:
+                return duplicate_id
         
         job_id = str(uuid.uuid4())
         
@@ -135,19 +269,54 @@ class AsyncContractProcessor:
             current_stage="initialization",
             total_stages=len(stages),
             estimated_completion=None,
-            options=options or {}
+            options=options or {},
+            input_hash=input_hash
+        )
+        
+        # Estimativa inicial: espera típica na fila mais a duração de todas as etapas
+        predicted = self.eta_model.predict(
+            job_type.value, job_profile(files), [QUEUE_STAGE] + self._job_route(job_type)
         )
+        if predicted is not None:
+            job.estimated_completion = job.created_at + timedelta(seconds=predicted)
         
-        self.jobs[job_id] = job
+        self.store.put(job, urgent=True)
+        self.dedup.remember(input_hash, job_id)
         
-        # Iniciar processamento assíncrono
-        task = asyncio.create_task(self._process_job(job_id))
-        self.active_jobs[job_id] = task
+        # Enfileirar no broker; o worker que o retirar executa quando tiver vaga
+        await self.broker.enqueue({
+            'job_id': job_id,
+            'user_id': user_id,
+            'plan': plan,
+            'job': job.to_dict()
+        })
         
-        logger.info(f"Job {job_id} criado para usuário {user_id}")
+        logger.info(f"Job {job_id} enfileirado para usuário {user_id} (plano {plan})")
         
         return job_id
     
+    async def _find_duplicate(self, input_hash: str) -> Optional[str]:
+        """Job reaproveitável para as mesmas entradas (em andamento ou concluído há pouco)"""
+        job_id = self.dedup.lookup(input_hash)
+        job = await self.get_job(job_id) if job_id else None
+        
+        hit = None
+        if job is not None and job.input_hash == input_hash:
+            if job.status in (JobStatus.PENDING, JobStatus.PROCESSING):
+                hit = "running"
+            elif (job.status == JobStatus.COMPLETED
+                  and datetime.utcnow() - job.updated_at <= timedelta(seconds=self.dedup.ttl_seconds)):
+                hit = "completed"
+        
+        self.dedup.record(hit)
+        if hit is None:
+            if job_id:
+                self.dedup.forget(input_hash)
+            return None
+        
+        logger.info(f"Pedido idêntico ao job {job_id} ({hit}) do usuário {job.user_id}")
+        return job_id
+    
     def _get_job_stages(self, job_type: JobType) -> List[str]:
         """Define as etapas de processamento baseado no tipo de job"""
         
@@ -182,6 +351,116 @@ class AsyncContractProcessor:
         else:
             return ["initialization", "processing", "completion"]
     
+    def _job_route(self, job_type: JobType) -> List[str]:
+        """Etapas do job que passam pelo pipeline"""
+        return [stage for stage in self._get_job_stages(job_type) if stage in self.pipeline.stages]
+    
+    async def start(self) -> None:
+        """Conecta ao broker e passa a consumir jobs (startup da aplicação; idempotente)"""
+        if self._started:
+            return
+        self._started = True
+        await self.broker.start(self._on_broker_event)
+        loop = asyncio.get_running_loop()
+        self._dispatch_task = loop.create_task(self._dispatch_loop())
+        if self.broker.heartbeat_interval:
+            self._heartbeat_task = loop.create_task(self._heartbeat_loop())
+        self._ensure_retention()
+    
+    async def _dispatch_loop(self) -> None:
+        """Retira jobs do broker e os entrega ao escalonador local"""
+        while True:
+            if self._slots is not None:
+                await self._slots.acquire()
+            delivery = None
+            while delivery is None:
+                try:
+                    delivery = await self.broker.receive(timeout=1.0)
+                except Exception as e:
+                    logger.error(f"Falha ao consumir jobs do broker: {e}")
+                    await asyncio.sleep(1)
+            
+            job_id = delivery.payload['job_id']
+            if delivery.redelivered:
+                logger.warning(f"Job {job_id} entregue novamente (worker anterior não confirmou)")
+            self._deliveries[job_id] = delivery
+            self.scheduler.submit(job_id, delivery.payload['user_id'], delivery.payload.get('plan', 'free'))
+    
+    async def _heartbeat_loop(self) -> None:
+        """Renova no broker os jobs retirados por este worker (na fila local ou em execução)"""
+        while True:
+            await asyncio.sleep(self.broker.heartbeat_interval)
+            try:
+                await self.broker.extend(list(self._deliveries.values()))
+            except Exception as e:
+                logger.warning(f"Falha ao renovar {len(self._deliveries)} job(s) no broker: {e}")
+    
+    def _running_elsewhere(self, job: ContractJob) -> bool:
+        """Job reentregue que outro worker ainda executa
+
+        A reentrega indica que o worker anterior parou de renovar a entrega por um
+        `visibility_timeout`; só progresso gravado dentro desse prazo mostra que ele segue vivo.
+        """
+        if self.broker.visibility_timeout is None:
+            return False
+        stale = datetime.utcnow() - job.updated_at > timedelta(seconds=self.broker.visibility_timeout)
+        return job.status == JobStatus.PROCESSING and not stale
+    
+    async def _finish_delivery(self, job_id: str, ack: bool = True) -> None:
+        """Libera a vaga do job; com ack ele sai do broker, sem ack volta a ser entregue"""
+        delivery = self._deliveries.pop(job_id, None)
+        if delivery is None:
+            return
+        if self._slots is not None:
+            self._slots.release()
+        if ack:
+            try:
+                await self.broker.ack(delivery)
+            except Exception as e:
+                logger.warning(f"Falha ao confirmar job {job_id} no broker: {e}")
+    
+    async def _run_job(self, job_id: str) -> None:
+        """Executado por um worker do escalonador; a task fica em active_jobs para cancelamento"""
+        ack = True
+        try:
+            job = await self.get_job(job_id)
+            delivery = self._deliveries.get(job_id)
+            if job is None and delivery is not None:
+                # Criado em outro worker e ainda não gravado no repositório (write-behind)
+                job = ContractJob.from_dict(delivery.payload['job'])
+            if job is None or job.status in TERMINAL_STATUSES:
+                return  # Cancelado enquanto esperava na fila
+            if delivery is not None and delivery.redelivered and self._running_elsewhere(job):
+                # Sem ack: o worker que executa confirma; se ele parar, o job volta a ser entregue
+                logger.warning(f"Job {job_id} reentregue ainda em execução em outro worker; ignorado")
+                self.skipped_redeliveries += 1
+                ack = False
+                return
+            self.jobs[job_id] = job
+            
+            token = CancellationToken(job_id)
+            self.cancel_tokens[job_id] = token
+            task = asyncio.create_task(self._process_job(job_id))
+            self.active_jobs[job_id] = task
+            try:
+                await task
+            except asyncio.CancelledError:
+                # Cancelamento do job (cancel_job) não deve derrubar o worker; o do próprio
+                # worker (shutdown) sim
+                if asyncio.current_task().cancelling():
+                    # Volta a pendente para o worker que receber a reentrega não o ignorar
+                    job.status = JobStatus.PENDING
+                    self.store.put(job, urgent=True)
+                    raise
+            finally:
+                # Trabalho ainda rodando em threads/processos para no próximo checkpoint
+                token.cancel("finished")
+                token.close()
+                self.cancel_tokens.pop(job_id, None)
+        finally:
+            # No shutdown o job não é confirmado: outro worker o retoma
+            await self._finish_delivery(job_id, ack=ack and not asyncio.current_task().cancelling())
+    
     async def _process_job(self, job_id: str) -> None:
         """Processa um job de forma assíncrona"""
         
@@ -190,180 +469,143 @@ class AsyncContractProcessor:
         try:
             await self._update_job_status(job_id, JobStatus.PROCESSING)
             
-            if job.job_type == JobType.FULL_PIPELINE:
-                await self._process_full_pipeline(job_id)
-            elif job.job_type == JobType.CONTRACT_ANALYSIS:
-                await self._process_contract_analysis(job_id)
-            elif job.job_type == JobType.IMAGE_PROCESSING:
-                await self._process_image_enhancement(job_id)
+            # Prazo total do job; cada etapa tem também o seu (_stage_deadline)
+            # Os estágios rodam em workers próprios, sobrepondo jobs diferentes
+            route = self._job_route(job.job_type)
+            queued = (datetime.utcnow() - job.created_at).total_seconds()
+            profile = job_profile(job.files)
+            self.eta_model.observe(job.job_type.value, profile, QUEUE_STAGE, queued)
+            self.eta_model.begin(job_id, job.job_type.value, profile)
+            async with asyncio.timeout(self.job_timeout_minutes * 60):
+                await self.pipeline.run(job_id, route)
             
+            # Resultado grande vai para disco/R2 antes do registro final
+            try:
+                await self.result_spill.spill(job)
+            except Exception as e:
+                logger.warning(f"Resultado do job {job_id} mantido em memória: {e}")
+            
+            self.outcomes["completed"] += 1
+            self.eta_model.finish(job_id, completed=True)
             await self._update_job_status(job_id, JobStatus.COMPLETED)
             
+        except TimeoutError as e:
+            stage = e.stage if isinstance(e, StageTimeoutError) else job.current_stage
+            message = str(e) or f"Job excedeu o prazo de {self.job_timeout_minutes:.0f} min"
+            logger.warning(f"Job {job_id} abandonado na etapa {stage}: {message}")
+            self.cancel_tokens[job_id].cancel("timeout")
+            self.outcomes["timed_out"] += 1
+            self.timeouts_by_stage[stage] = self.timeouts_by_stage.get(stage, 0) + 1
+            await self._update_job_status(job_id, JobStatus.TIMED_OUT, message)
+        
+        except JobCancelled:
+            # Checkpoint viu o cancelamento antes da task; cancel_job já registrou o status
+            pass
+        
         except Exception as e:
             logger.error(f"Erro no processamento do job {job_id}: {str(e)}")
+            self.outcomes["failed"] += 1
             await self._update_job_status(job_id, JobStatus.FAILED, str(e))
         
         finally:
-            # Cleanup
+            # Cleanup (o estado final já foi entregue ao repositório)
+            self.eta_model.finish(job_id, completed=False)
             if job_id in self.active_jobs:
                 del self.active_jobs[job_id]
+            self.jobs.pop(job_id, None)
     
-    async def _process_full_pipeline(self, job_id: str) -> None:
-        """Pipeline completo: imagem → OCR → análise → resultado"""
-        
-        job = self.jobs[job_id]
-        
-        # 1. Validação de arquivos
-        await self._update_progress(
-            job_id, "file_validation", 0.1,
-            f"Validando {len(job.files)} arquivo(s)..."
-        )
-        
-        validated_files = await self._validate_files(job.files)
-        
-        # 2. Processamento de imagens (se houver)
-        image_files = [f for f in validated_files if self._is_image_file(f)]
-        
-        if image_files:
-            await self._update_progress(
-                job_id, "image_processing", 0.2,
-                f"Otimizando {len(image_files)} imagem(ns) para OCR..."
-            )
-            
-            enhanced_images = []
-            for i, image_file in enumerate(image_files):
-                result = await self._process_single_image(image_file)
-                enhanced_images.append(result)
-                
-                progress = 0.2 + (0.2 * (i + 1) / len(image_files))
-                await self._update_progress(
-                    job_id, "image_processing", progress,
-                    f"Processada imagem {i + 1}/{len(image_files)}"
-                )
-        
-        # 3. OCR Extraction
-        await self._update_progress(
-            job_id, "ocr_extraction", 0.4,
-            "Extraindo texto dos documentos..."
-        )
-        
-        extracted_text = await self._extract_text_from_files(validated_files)
-        
-        # 4. Classificação do contrato
-        await self._update_progress(
-            job_id, "contract_classification", 0.6,
-            "Classificando tipo de contrato..."
-        )
-        
-        contract_type = await self._classify_contract(extracted_text)
-        
-        # 5. Análise por agente especializado
-        await self._update_progress(
-            job_id, "agent_analysis", 0.7,
-            f"Analisando contrato com agente {contract_type}..."
-        )
-        
-        analysis_result = await self._analyze_with_agent(contract_type, extracted_text)
-        
-        # 6. Compilação final
-        await self._update_progress(
-            job_id, "result_compilation", 0.9,
-            "Compilando resultado final..."
-        )
-        
-        final_result = await self._compile_final_result(
-            job_id, extracted_text, contract_type, analysis_result
-        )
-        
-        # 7. Notificação
-        await self._update_progress(
-            job_id, "notification", 0.95,
-            "Enviando notificações..."
-        )
-        
-        await self._send_completion_notification(job_id, final_result)
-        
-        # Salvar resultado
-        job.result = final_result
-        job.updated_at = datetime.utcnow()
+    @asynccontextmanager
+    async def _stage_deadline(self, stage: str):
+        """Prazo da etapa (asyncio.timeout); estouro vira StageTimeoutError"""
+        deadline = self.STAGE_DEADLINES.get(stage, settings.ASYNC_STAGE_TIMEOUT_SECONDS)
+        scope = asyncio.timeout(deadline)
+        try:
+            async with scope:
+                yield
+        except TimeoutError:
+            if scope.expired():
+                raise StageTimeoutError(stage, deadline) from None
+            raise
     
-    async def _process_contract_analysis(self, job_id: str) -> None:
-        """Pipeline de análise sem processamento de imagem"""
-        
-        job = self.jobs[job_id]
-        
-        # Similar ao pipeline completo, mas sem image_processing
-        await self._update_progress(
-            job_id, "file_validation", 0.2,
-            "Validando arquivos..."
-        )
-        
-        validated_files = await self._validate_files(job.files)
-        
-        await self._update_progress(
-            job_id, "ocr_extraction", 0.4,
-            "Extraindo texto..."
-        )
-        
-        extracted_text = await self._extract_text_from_files(validated_files)
-        
-        await self._update_progress(
-            job_id, "contract_classification", 0.6,
-            "Classificando contrato..."
-        )
-        
-        contract_type = await self._classify_contract(extracted_text)
-        
-        await self._update_progress(
-            job_id, "agent_analysis", 0.8,
-            "Executando análise..."
-        )
-        
-        analysis_result = await self._analyze_with_agent(contract_type, extracted_text)
-        
-        final_result = await self._compile_final_result(
-            job_id, extracted_text, contract_type, analysis_result
-        )
-        
-        await self._send_completion_notification(job_id, final_result)
-        
-        job.result = final_result
-        job.updated_at = datetime.utcnow()
+    def _build_pipeline_stages(self) -> List[PipelineStage]:
+        """Estágios do pipeline: CPU no pool de processos, I/O como workers assíncronos"""
+        handlers = {
+            "file_validation": ("io", self._stage_file_validation),
+            "image_validation": ("io", self._stage_image_validation),
+            "image_processing": ("cpu", self._stage_images),
+            "image_enhancement": ("cpu", self._stage_images),
+            "ocr_extraction": ("io", self._stage_ocr_extraction),
+            "contract_classification": ("cpu", self._stage_contract_classification),
+            "agent_analysis": ("io", self._stage_agent_analysis),
+            "result_compilation": ("io", self._stage_result_compilation),
+            "notification": ("io", self._stage_notification),
+        }
+        return [
+            PipelineStage(name, functools.partial(self._run_stage, handler), kind, settings.PIPELINE_IO_WORKERS)
+            for name, (kind, handler) in handlers.items()
+        ]
     
-    async def _process_image_enhancement(self, job_id: str) -> None:
-        """Pipeline apenas para processamento de imagens"""
-        
-        job = self.jobs[job_id]
-        
-        await self._update_progress(
-            job_id, "image_validation", 0.2,
-            "Validando imagens..."
-        )
-        
-        image_files = [f for f in job.files if self._is_image_file(f)]
-        
-        await self._update_progress(
-            job_id, "image_enhancement", 0.4,
-            f"Processando {len(image_files)} imagens..."
-        )
+    async def _run_stage(self, handler, item: PipelineItem) -> None:
+        """Executa um estágio do job: progresso inicial + prazo da etapa"""
+        start, _ = self._stage_progress_range(item)
+        await self._update_progress(item.job_id, item.stage, start, self.STAGE_MESSAGES[item.stage])
+        async with self._stage_deadline(item.stage):
+            await handler(item)
+        self.eta_model.stage_finished(item.job_id, item.stage)
+    
+    @staticmethod
+    def _stage_progress_range(item: PipelineItem) -> Tuple[float, float]:
+        """Faixa de progresso (início, largura) do estágio atual dentro da rota do job"""
+        span = 1 / (len(item.route) + 1)
+        return (item.position + 1) * span, span
+    
+    async def _stage_file_validation(self, item: PipelineItem) -> None:
+        item.context['files'] = await self._validate_files(self.jobs[item.job_id].files)
+    
+    async def _stage_image_validation(self, item: PipelineItem) -> None:
+        item.context['files'] = [f for f in self.jobs[item.job_id].files if self._is_image_file(f)]
+    
+    async def _stage_images(self, item: PipelineItem) -> None:
+        image_files = [f for f in item.context['files'] if self._is_image_file(f)]
+        start, span = self._stage_progress_range(item)
         
         results = []
         for i, image_file in enumerate(image_files):
-            result = await self._process_single_image(image_file)
-            results.append(result)
-            
-            progress = 0.4 + (0.5 * (i + 1) / len(image_files))
+            results.append(await self._process_single_image(image_file, self.cancel_tokens[item.job_id]))
             await self._update_progress(
-                job_id, "image_enhancement", progress,
-                f"Processada {i + 1}/{len(image_files)}"
+                item.job_id, item.stage, start + span * (i + 1) / len(image_files),
+                f"Processada imagem {i + 1}/{len(image_files)}"
             )
-        
-        job.result = {
-            'processed_images': results,
-            'total_processed': len(results)
-        }
+        item.context['images'] = results
+    
+    async def _stage_ocr_extraction(self, item: PipelineItem) -> None:
+        item.context['text'] = await self._extract_text_from_files(item.context['files'])
+    
+    async def _stage_contract_classification(self, item: PipelineItem) -> None:
+        item.context['contract_type'] = await self._classify_contract(item.context['text'])
+    
+    async def _stage_agent_analysis(self, item: PipelineItem) -> None:
+        item.context['analysis'] = await self._analyze_with_agent(
+            item.context['contract_type'], item.context['text']
+        )
+    
+    async def _stage_result_compilation(self, item: PipelineItem) -> None:
+        job = self.jobs[item.job_id]
+        if 'analysis' in item.context:
+            job.result = await self._compile_final_result(
+                item.job_id, item.context['text'], item.context['contract_type'], item.context['analysis']
+            )
+        else:
+            images = item.context.get('images', [])
+            job.result = {
+                'processed_images': images,
+                'total_processed': len(images)
+            }
         job.updated_at = datetime.utcnow()
     
+    async def _stage_notification(self, item: PipelineItem) -> None:
+        await self._send_completion_notification(item.job_id, self.jobs[item.job_id].result)
+    
     # Métodos auxiliares
     async def _validate_files(self, files: List[str]) -> List[str]:
         """Valida se os arquivos existem e são válidos"""
@@ -376,16 +618,19 @@ class AsyncContractProcessor:
         image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp']
         return any(file_path.lower().endswith(ext) for ext in image_extensions)
     
-    async def _process_single_image(self, image_path: str) -> Dict[str, Any]:
-        """Processa uma única imagem"""
-        # Implementar processamento real
-        await asyncio.sleep(2)  # Simular processamento
-        return {
-            'original_path': image_path,
-            'enhanced_path': f"{image_path}_enhanced",
-            'confidence_score': 0.85,
-            'applied_filters': ['perspective_correction', 'contrast_enhancement']
-        }
+    async def _process_single_image(self, image_path: str, token: CancellationToken) -> Dict[str, Any]:
+        """Processa uma única imagem (filtros OpenCV no pool de CPU, canceláveis pelo token)"""
+        if not os.path.exists(image_path):
+            await asyncio.sleep(2)  # Simular processamento (arquivos de demonstração)
+            return {
+                'original_path': image_path,
+                'enhanced_path': f"{image_path}_enhanced",
+                'confidence_score': 0.85,
+                'applied_filters': ['perspective_correction', 'contrast_enhancement']
+            }
+        return await run_cancellable(
+            _enhance_image_file, image_path, token=token, executor=self.pipeline.cpu_executor
+        )
     
     async def _extract_text_from_files(self, files: List[str]) -> str:
         """Extrai texto dos arquivos usando OCR"""
@@ -394,10 +639,9 @@ class AsyncContractProcessor:
         return "Texto extraído do contrato..."
     
     async def _classify_contract(self, text: str) -> str:
-        """Classifica o tipo de contrato"""
-        # Usar classifier agent
-        await asyncio.sleep(1)
-        return "rental"  # Exemplo
+        """Classifica o tipo de contrato (varredura de regras no pool de CPU)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pipeline.cpu_executor, _classify_contract_text, text)
     
     async def _analyze_with_agent(self, contract_type: str, text: str) -> Dict[str, Any]:
         """Analisa contrato com agente especializado"""
@@ -461,51 +705,39 @@ class AsyncContractProcessor:
         })
     
     # WebSocket methods
-    async def connect_websocket(self, user_id: str, websocket: WebSocket):
-        """Conecta WebSocket do usuário"""
+    async def connect_websocket(self, user_id: str, websocket: WebSocket) -> OutboundConnection:
+        """Conecta WebSocket do usuário; mensagens para o cliente passam pela conexão retornada"""
+        await self.start()
         await websocket.accept()
-        
-        if user_id not in self.websocket_connections:
-            self.websocket_connections[user_id] = []
-        
-        self.websocket_connections[user_id].append(websocket)
+        connection = self.fanout.register(user_id, websocket)
+        # Eventos dos jobs do usuário, venham do worker que for
+        await self.broker.subscribe(USER_CHANNEL_PREFIX + user_id)
         
         # Enviar jobs em andamento
-        user_jobs = [job for job in self.jobs.values() if job.user_id == user_id]
-        for job in user_jobs:
-            await websocket.send_json({
+        for job in await self.get_user_jobs(user_id):
+            connection.enqueue({
                 'type': 'job_status',
                 'job': job.to_dict()
             })
+        return connection
     
     async def disconnect_websocket(self, user_id: str, websocket: WebSocket):
         """Desconecta WebSocket do usuário"""
-        if user_id in self.websocket_connections:
-            try:
-                self.websocket_connections[user_id].remove(websocket)
-                if not self.websocket_connections[user_id]:
-                    del self.websocket_connections[user_id]
-            except ValueError:
-                pass
+        await self.fanout.unregister(user_id, websocket)
+        if user_id not in self.fanout.connections:
+            await self.broker.unsubscribe(USER_CHANNEL_PREFIX + user_id)
     
     async def _broadcast_to_user(self, user_id: str, message: Dict[str, Any]):
-        """Envia mensagem para todos os WebSockets do usuário"""
-        if user_id not in self.websocket_connections:
+        """Publica a mensagem para os WebSockets do usuário em qualquer worker (não espera o envio)"""
+        self.broker.publish(USER_CHANNEL_PREFIX + user_id, message)
+    
+    def _on_broker_event(self, channel: str, message: Dict[str, Any]) -> None:
+        """Eventos recebidos do broker: controle entre workers ou mensagens para WebSockets locais"""
+        if channel == CONTROL_CHANNEL:
+            if message.get('type') == 'cancel_job':
+                asyncio.get_running_loop().create_task(self._apply_remote_cancel(message['job_id']))
             return
-        
-        disconnected = []
-        for websocket in self.websocket_connections[user_id]:
-            try:
-                await websocket.send_json(message)
-            except:
-                disconnected.append(websocket)
-        
-        # Remove conexões inválidas
-        for ws in disconnected:
-            try:
-                self.websocket_connections[user_id].remove(ws)
-            except ValueError:
-                pass
+        self.fanout.publish(channel[len(USER_CHANNEL_PREFIX):], message)
     
     async def _update_job_status(
         self, 
@@ -515,12 +747,15 @@ class AsyncContractProcessor:
     ):
         """Atualiza status do job"""
         
-        job = self.jobs[job_id]
+        job = await self.get_job(job_id)
+        if job is None:
+            return
         job.status = status
         job.updated_at = datetime.utcnow()
         
         if error_message:
             job.error_message = error_message
+        self.store.put(job, urgent=status in TERMINAL_STATUSES)
         
         # Notificar via WebSocket
         await self._broadcast_to_user(job.user_id, {
@@ -554,11 +789,16 @@ class AsyncContractProcessor:
         job.current_stage = stage
         job.updated_at = datetime.utcnow()
         
-        # Calcular estimativa de conclusão
-        if progress > 0:
+        # Estimativa de conclusão pelas durações históricas das etapas restantes; sem
+        # histórico, extrapola o tempo decorrido pelo progresso
+        remaining = self._predict_remaining(job, stage)
+        if remaining is not None:
+            job.estimated_completion = datetime.utcnow() + timedelta(seconds=remaining)
+        elif progress > 0:
             elapsed = datetime.utcnow() - job.created_at
             estimated_total = elapsed / progress
             job.estimated_completion = job.created_at + estimated_total
+        self.store.put(job)
         
         # Notificar via WebSocket
         await self._broadcast_to_user(job.user_id, {
@@ -570,36 +810,163 @@ class AsyncContractProcessor:
             'estimated_completion': job.estimated_completion.isoformat() if job.estimated_completion else None
         })
     
+    def _predict_remaining(self, job: ContractJob, stage: str) -> Optional[float]:
+        route = self._job_route(job.job_type)
+        if stage not in route:
+            return None
+        return self.eta_model.remaining(job.id, stage, route[route.index(stage) + 1:])
+    
     # Public methods para API
-    def get_job(self, job_id: str) -> Optional[ContractJob]:
-        """Retorna job por ID"""
-        return self.jobs.get(job_id)
+    async def get_job(self, job_id: str) -> Optional[ContractJob]:
+        """Retorna job por ID (em execução aqui ou no repositório)"""
+        job = self.jobs.get(job_id)
+        return job if job else await self.store.get(job_id)
     
-    def get_user_jobs(self, user_id: str) -> List[ContractJob]:
-        """Retorna todos os jobs do usuário"""
-        return [job for job in self.jobs.values() if job.user_id == user_id]
+    async def get_user_jobs(
+        self,
+        user_id: str,
+        status: Optional[JobStatus] = None,
+        limit: Optional[int] = None
+    ) -> List[ContractJob]:
+        """Retorna os jobs do usuário em ordem de criação (os `limit` mais recentes)"""
+        jobs = await self.store.list_user_jobs(user_id, status.value if status else None, limit)
+        # Jobs em execução neste processo têm o estado mais recente
+        return [self.jobs.get(job.id, job) for job in jobs]
     
     async def cancel_job(self, job_id: str) -> bool:
-        """Cancela job em andamento"""
+        """Cancela job em andamento (neste ou em outro worker) ou ainda na fila"""
+        await self.start()
+        if not await self._cancel_local(job_id):
+            job = await self.get_job(job_id)
+            if job is None or job.status in TERMINAL_STATUSES:
+                return False
+            # Na fila do broker (será descartado ao ser retirado) ou em outro worker
+            self.broker.publish(CONTROL_CHANNEL, {'type': 'cancel_job', 'job_id': job_id})
+        
+        self.outcomes["cancelled"] += 1
+        await self._update_job_status(job_id, JobStatus.CANCELLED)
+        return True
+    
+    async def _cancel_local(self, job_id: str) -> bool:
+        """Interrompe o job se ele estiver em execução ou na fila deste worker"""
         if job_id in self.active_jobs:
-            task = self.active_jobs[job_id]
-            task.cancel()
-            await self._update_job_status(job_id, JobStatus.CANCELLED)
+            # Token primeiro: threads/processos da etapa atual param no próximo checkpoint
+            self.cancel_tokens[job_id].cancel("cancelled")
+            self.active_jobs[job_id].cancel()
+            return True
+        if self.scheduler.cancel(job_id):
+            # Ainda na fila: nunca chegou a um worker
+            await self._finish_delivery(job_id)
             return True
         return False
     
-    def get_system_stats(self) -> Dict[str, Any]:
+    async def _apply_remote_cancel(self, job_id: str) -> None:
+        """Cancelamento pedido em outro worker (que já gravou o status)"""
+        job = self.jobs.get(job_id)
+        if await self._cancel_local(job_id) and job is not None:
+            # Estado local atualizado para o write-behind deste worker não sobrescrevê-lo
+            job.status = JobStatus.CANCELLED
+            self.store.put(job, urgent=True)
+    
+    async def get_job_result(self, job: ContractJob) -> Optional[Dict[str, Any]]:
+        """Resultado do job (lido do disco/R2 quando foi descarregado)"""
+        return await self.result_spill.load(job)
+    
+    def _ensure_retention(self) -> None:
+        if self.retention_seconds and (self._retention_task is None or self._retention_task.done()):
+            self._retention_task = asyncio.get_running_loop().create_task(self._retention_loop())
+    
+    async def _retention_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_RETENTION_SWEEP_SECONDS)
+            try:
+                await self.purge_expired_jobs()
+            except Exception as e:
+                logger.error(f"Falha ao remover jobs expirados: {e}")
+    
+    async def purge_expired_jobs(self) -> int:
+        """Remove jobs finalizados há mais de JOB_RETENTION_SECONDS e os seus resultados"""
+        before = datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+        purged = await self.store.purge(before, [status.value for status in TERMINAL_STATUSES])
+        await self.result_spill.discard(purged)
+        self.purged_jobs += len(purged)
+        if purged:
+            logger.info(f"{len(purged)} job(s) finalizados removidos pela retenção")
+        return len(purged)
+    
+    async def shutdown(self) -> None:
+        """Para os workers e grava o progresso pendente (write-behind) antes de encerrar"""
+        for task in (self._dispatch_task, self._heartbeat_task, self._retention_task):
+            if task is not None:
+                task.cancel()
+        await self.scheduler.shutdown()
+        await self.pipeline.shutdown()
+        await self.store.flush()
+        await self.broker.close()
+    
+    async def get_system_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas do sistema"""
+        counts = await self.store.count_by_status()
         return {
-            'total_jobs': len(self.jobs),
+            'total_jobs': sum(counts.values()),
             'active_jobs': len(self.active_jobs),
-            'connected_users': len(self.websocket_connections),
+            'connected_users': len(self.fanout.connections),
+            'scheduler': self.scheduler.get_stats(),
+            'broker': {**self.broker.get_stats(), 'skipped_redeliveries': self.skipped_redeliveries},
+            'pipeline': self.pipeline.get_stats(),
+            'websocket': self.fanout.get_stats(),
+            'outcomes': {**self.outcomes, 'timeouts_by_stage': dict(self.timeouts_by_stage)},
             'jobs_by_status': {
-                status.value: sum(1 for job in self.jobs.values() if job.status == status)
+                status.value: counts.get(status.value, 0)
                 for status in JobStatus
+            },
+            'job_store': self.store.get_stats(),
+            'dedup': self.dedup.get_stats(),
+            'eta': self.eta_model.get_stats(),
+            'retention': {
+                'ttl_seconds': self.retention_seconds,
+                'purged_jobs': self.purged_jobs,
+                'progress_history_size': settings.JOB_PROGRESS_HISTORY_SIZE,
+                'result_spill': self.result_spill.get_stats()
             }
         }
 
 
+# Trabalho dos estágios de CPU: funções de módulo (picklable) executadas no pool de
+# processos, com instâncias próprias de cada processo
+_worker_image_processor: Optional[DocumentImageProcessor] = None
+_worker_classifier = None
+
+def _enhance_image_file(image_path: str, token: CancellationToken) -> Dict[str, Any]:
+    """Filtros OpenCV de uma imagem; token.check() entre os filtros abandona o job"""
+    global _worker_image_processor
+    if _worker_image_processor is None:
+        _worker_image_processor = DocumentImageProcessor()
+    
+    with open(image_path, 'rb') as f:
+        image_data = f.read()
+    token.check()
+    
+    result = _worker_image_processor.process_document_image(image_data, checkpoint=token.check)
+    enhanced_path = f"{image_path}_enhanced.png"
+    with open(enhanced_path, 'wb') as f:
+        f.write(_worker_image_processor.get_enhanced_image_bytes(result))
+    
+    return {
+        'original_path': image_path,
+        'enhanced_path': enhanced_path,
+        'confidence_score': result.confidence_score,
+        'applied_filters': result.applied_filters
+    }
+
+def _classify_contract_text(text: str) -> str:
+    """Agente indicado pela varredura de regras do IntelligentClassifier"""
+    global _worker_classifier
+    if _worker_classifier is None:
+        from app.agents.intelligent_classifier import IntelligentClassifier
+        _worker_classifier = IntelligentClassifier()
+    return _worker_classifier.classify_contract(text)['agent_type']
+
+
 # Singleton instance
 async_processor = AsyncContractProcessor()
\ No newline at end of file
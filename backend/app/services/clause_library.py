@@ -0,0 +1,608 @@
+"""
+Biblioteca de cláusulas padrão com vereditos pré-computados
+Cláusulas recorrentes (fidelidade de 12 meses, multa de 3 aluguéis, foro de eleição...)
+são reconhecidas por SimHash (quase idênticas) ou embedding (paráfrases) sem chamar o LLM
+"""
+
+import copy
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.contract_dedup import normalize_text
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """SimHash de 64 bits sobre shingles de palavras"""
+    words = normalize_text(text).split()
+    if len(words) < shingle_size:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = [" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    if not shingles:
+        return 0
+
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+         for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    votes = bits.sum(axis=0) * 2 > len(shingles)
+    return int(sum(1 << int(bit) for bit in np.flatnonzero(votes)))
+
+
+# Números por extenso (sem "um/uma", que também são artigos) e termos que invertem o sentido
+_NUMBER_WORDS = {
+    "dois": 2, "duas": 2, "três": 3, "quatro": 4, "cinco": 5, "seis": 6, "sete": 7, "oito": 8,
+    "nove": 9, "dez": 10, "onze": 11, "doze": 12, "treze": 13, "catorze": 14, "quatorze": 14,
+    "quinze": 15, "dezesseis": 16, "dezessete": 17, "dezoito": 18, "dezenove": 19, "vinte": 20,
+    "trinta": 30, "quarenta": 40, "cinquenta": 50, "sessenta": 60, "noventa": 90, "cem": 100,
+}
+_NEGATIONS = frozenset({
+    "não", "nunca", "nem", "sem", "vedado", "vedada", "proibido", "proibida",
+    "exceto", "salvo", "independentemente",
+})
+
+
+def salient_terms(text: str) -> Tuple[frozenset, frozenset]:
+    """
+    Valores (prazos, multas, percentuais) e negações da cláusula
+
+    Os algarismos prevalecem; números por extenso só contam quando a cláusula não
+    traz nenhum, para que "3 (três) aluguéis" e "três aluguéis" coincidam.
+    """
+    words = normalize_text(text).split()
+    numbers = frozenset(int(word) for word in words if word.isdigit())
+    if not numbers:
+        numbers = frozenset(_NUMBER_WORDS[word] for word in words if word in _NUMBER_WORDS)
+    return numbers, frozenset(word for word in words if word in _NEGATIONS)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Bits ligados de cada elemento de um vetor uint64"""
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+@dataclass
+class LibraryClause:
+    """Cláusula canônica com veredito revisado"""
+    id: str
+    category: str
+    canonical_text: str
+    verdict: Dict[str, Any]  # analysis, risk_level, legal_basis, key_finding, risk_factors
+    agent_types: List[str] = field(default_factory=list)
+    simhash: int = 0
+    embedding: Optional[List[float]] = None
+    hits: int = 0
+    terms: Tuple[frozenset, frozenset] = (frozenset(), frozenset())
+
+
+@dataclass
+class PendingClause:
+    """Veredito gerado pelo LLM aguardando revisão para entrar na biblioteca"""
+    id: str
+    clause_text: str
+    verdict: Dict[str, Any]
+    agent_type: str
+    simhash: int = 0
+    terms: Tuple[frozenset, frozenset] = (frozenset(), frozenset())
+    occurrences: int = 1
+    first_seen: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+
+# Vereditos revisados para as cláusulas mais recorrentes
+STANDARD_CLAUSES: List[Dict[str, Any]] = [
+    {
+        "category": "fidelidade",
+        "agent_types": ["telecom"],
+        "canonical_text": "O assinante se compromete a permanecer vinculado ao plano pelo prazo mínimo de 12 (doze) meses, "
+                          "sob pena de pagamento de multa proporcional ao período restante em caso de cancelamento antecipado.",
+        "verdict": {
+            "analysis": "Fidelidade de 12 meses é admitida pela ANATEL quando há benefício concedido ao consumidor; a multa deve ser proporcional ao tempo restante.",
+            "risk_level": "médio",
+            "legal_basis": "Resolução ANATEL 632/2014, art. 57; CDC art. 51, IV",
+            "key_finding": "Fidelidade de 12 meses com multa proporcional",
+            "risk_factors": [{
+                "type": "fidelidade",
+                "description": "Permanência mínima de 12 meses com multa por cancelamento antecipado",
+                "severity": "medium",
+                "recommendation": "Confirme qual benefício justifica a fidelidade e se a multa é proporcional ao período restante"
+            }]
+        }
+    },
+    {
+        "category": "multa_rescisoria_locacao",
+        "agent_types": ["locacao"],
+        "canonical_text": "Em caso de rescisão antecipada do contrato pelo locatário, este pagará multa equivalente a 3 (três) aluguéis "
+                          "vigentes, proporcional ao tempo restante do contrato.",
+        "verdict": {
+            "analysis": "Multa de 3 aluguéis é usual e aceita pela jurisprudência, desde que reduzida proporcionalmente ao prazo cumprido.",
+            "risk_level": "baixo",
+            "legal_basis": "Lei 8.245/91, art. 4º; Código Civil art. 413",
+            "key_finding": "Multa rescisória de 3 aluguéis proporcional",
+            "risk_factors": []
+        }
+    },
+    {
+        "category": "multa_rescisoria_integral",
+        "agent_types": ["locacao"],
+        "canonical_text": "Em caso de rescisão antecipada, o locatário pagará multa equivalente a 3 (três) aluguéis integrais, "
+                          "independentemente do tempo decorrido do contrato.",
+        "verdict": {
+            "analysis": "Multa integral sem proporcionalidade contraria a Lei do Inquilinato, que exige redução proporcional ao prazo cumprido.",
+            "risk_level": "alto",
+            "legal_basis": "Lei 8.245/91, art. 4º; Código Civil art. 413",
+            "key_finding": "Multa rescisória sem redução proporcional",
+            "risk_factors": [{
+                "type": "multa_abusiva",
+                "description": "Multa rescisória cobrada integralmente, sem proporcionalidade ao prazo cumprido",
+                "severity": "high",
+                "recommendation": "Exija a redução proporcional prevista no art. 4º da Lei 8.245/91"
+            }]
+        }
+    },
+    {
+        "category": "foro_eleicao",
+        "agent_types": [],
+        "canonical_text": "Fica eleito o foro da comarca da sede da contratada para dirimir quaisquer dúvidas oriundas deste contrato, "
+                          "com renúncia expressa a qualquer outro, por mais privilegiado que seja.",
+        "verdict": {
+            "analysis": "Em relações de consumo, a eleição de foro diverso do domicílio do consumidor é nula quando dificulta sua defesa.",
+            "risk_level": "alto",
+            "legal_basis": "CDC art. 6º, VIII, art. 51, IV e art. 101, I",
+            "key_finding": "Foro de eleição afastado do domicílio do consumidor",
+            "risk_factors": [{
+                "type": "foro_abusivo",
+                "description": "Foro eleito na sede da empresa, dificultando a defesa do consumidor",
+                "severity": "high",
+                "recommendation": "Em relação de consumo, você pode ajuizar ação no seu próprio domicílio"
+            }]
+        }
+    },
+    {
+        "category": "reajuste_anual_indice",
+        "agent_types": [],
+        "canonical_text": "O valor será reajustado anualmente, a cada período de 12 (doze) meses, pela variação positiva do IGP-M/FGV "
+                          "ou, na sua falta, pelo IPCA/IBGE.",
+        "verdict": {
+            "analysis": "Reajuste anual por índice oficial previamente definido é válido e transparente.",
+            "risk_level": "baixo",
+            "legal_basis": "Lei 10.192/2001, art. 2º; Lei 8.245/91, art. 17",
+            "key_finding": "Reajuste anual por índice oficial",
+            "risk_factors": []
+        }
+    },
+    {
+        "category": "renovacao_automatica",
+        "agent_types": [],
+        "canonical_text": "O presente contrato será renovado automaticamente por iguais e sucessivos períodos, salvo manifestação "
+                          "em contrário de qualquer das partes com antecedência mínima de 30 (trinta) dias.",
+        "verdict": {
+            "analysis": "Renovação automática com aviso prévio é permitida, mas o consumidor deve ser informado de forma clara sobre o cancelamento.",
+            "risk_level": "médio",
+            "legal_basis": "CDC art. 6º, III e art. 46",
+            "key_finding": "Renovação automática com aviso de 30 dias",
+            "risk_factors": [{
+                "type": "renovacao_automatica",
+                "description": "Contrato renova automaticamente se não houver manifestação com 30 dias de antecedência",
+                "severity": "medium",
+                "recommendation": "Anote o prazo para cancelar antes da renovação"
+            }]
+        }
+    },
+    {
+        "category": "alteracao_unilateral",
+        "agent_types": [],
+        "canonical_text": "A contratada poderá alterar unilateralmente as condições, preços e características do serviço "
+                          "a qualquer tempo, independentemente de aviso prévio ao contratante.",
+        "verdict": {
+            "analysis": "Alteração unilateral de preço e condições sem anuência do consumidor é cláusula abusiva.",
+            "risk_level": "alto",
+            "legal_basis": "CDC art. 51, X e XIII",
+            "key_finding": "Fornecedor pode alterar o contrato unilateralmente",
+            "risk_factors": [{
+                "type": "alteracao_unilateral",
+                "description": "Permite alterar preço e condições sem aviso ou concordância do consumidor",
+                "severity": "high",
+                "recommendation": "Cláusula nula de pleno direito; conteste alterações não informadas"
+            }]
+        }
+    },
+    {
+        "category": "juros_mora_multa_2",
+        "agent_types": ["financeiro"],
+        "canonical_text": "O atraso no pagamento acarretará multa moratória de 2% (dois por cento) sobre o valor da parcela, "
+                          "acrescida de juros de mora de 1% (um por cento) ao mês, calculados pro rata die.",
+        "verdict": {
+            "analysis": "Multa moratória de 2% e juros de mora de 1% ao mês estão dentro dos limites legais.",
+            "risk_level": "baixo",
+            "legal_basis": "CDC art. 52, §1º; Código Civil art. 406",
+            "key_finding": "Encargos de atraso dentro do limite legal",
+            "risk_factors": []
+        }
+    },
+]
+
+
+class ClauseLibrary:
+    """
+    Biblioteca de cláusulas canônicas com busca em dois níveis
+
+    1. SimHash (64 bits): quase idênticas, distância de Hamming <= max_hamming_distance.
+       As assinaturas ficam num vetor uint64 e a distância é calculada para toda a
+       biblioteca de uma vez (XOR + popcount), o que para alguns milhares de cláusulas
+       custa microssegundos.
+    2. Embedding (opcional): paráfrases, similaridade de cosseno >= min_cosine_similarity.
+
+    Nos dois níveis o candidato só é aceito se tiver os mesmos valores e negações da
+    cláusula consultada: "12 aluguéis" ou "não proporcional" mudam o veredito, mas
+    quase não mudam a assinatura.
+
+    Com `path`, aprovadas e pendentes ficam no mesmo arquivo JSON, compartilhado entre
+    os workers (que registram os misses) e a API (que revisa): cada alteração relê o
+    arquivo e o regrava sob um lock de arquivo. Se o embedder falhar, o nível de
+    embedding fica desligado por `embedder_retry_seconds` em vez de falhar a cada consulta.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 embedder: Optional[Embedder] = None,
+                 max_hamming_distance: int = 10,
+                 min_cosine_similarity: float = 0.92,
+                 max_pending: int = 1000,
+                 embedder_retry_seconds: float = 300.0,
+                 reload_interval: float = 30.0):
+        self.path = path
+        self.embedder = embedder
+        self.max_hamming_distance = max_hamming_distance
+        self.min_cosine_similarity = min_cosine_similarity
+        self.max_pending = max_pending
+        self.embedder_retry_seconds = embedder_retry_seconds
+        self.reload_interval = reload_interval
+
+        self.clauses: Dict[str, LibraryClause] = {}
+        self.pending: Dict[str, PendingClause] = {}
+        self._simhash_ids: List[str] = []
+        self._simhash_array: Optional[np.ndarray] = None
+        self._embedding_ids: List[str] = []
+        self._embedding_matrix: Optional[np.ndarray] = None
+        self._loaded_mtime: Optional[float] = None
+        self._last_reload_check = 0.0
+        self._embedder_failed_at: Optional[float] = None
+        self.stats: Dict[str, int] = {"lookups": 0, "simhash_hits": 0, "embedding_hits": 0, "misses": 0,
+                                      "term_mismatches": 0, "embedder_failures": 0}
+
+        for entry in STANDARD_CLAUSES:
+            self.add(entry["canonical_text"], entry["verdict"], entry["category"],
+                     entry.get("agent_types", []), clause_id=f"std_{entry['category']}")
+        self._load()
+
+    def add(self, canonical_text: str, verdict: Dict[str, Any], category: str,
+            agent_types: Optional[List[str]] = None, clause_id: Optional[str] = None,
+            embedding: Optional[List[float]] = None) -> LibraryClause:
+        """Adiciona (ou substitui) uma cláusula canônica"""
+        clause = LibraryClause(
+            id=clause_id or f"lib_{uuid.uuid4().hex[:12]}",
+            category=category,
+            canonical_text=canonical_text,
+            verdict=verdict,
+            agent_types=agent_types or [],
+            simhash=simhash(canonical_text),
+            embedding=embedding,
+            terms=salient_terms(canonical_text)
+        )
+        self.clauses[clause.id] = clause
+        self._simhash_array = None
+        self._embedding_matrix = None
+        return clause
+
+    async def lookup(self, clause_text: str, agent_type: Optional[str] = None) -> Optional[Tuple[LibraryClause, str, float]]:
+        """Retorna (cláusula, método, score) quando há veredito pré-computado aplicável"""
+        self._maybe_reload()
+        self.stats["lookups"] += 1
+
+        terms = salient_terms(clause_text)
+        match = self._lookup_simhash(clause_text, agent_type, terms)
+        if match:
+            self.stats["simhash_hits"] += 1
+        elif self._embedder_available():
+            match = await self._lookup_embedding(clause_text, agent_type, terms)
+            if match:
+                self.stats["embedding_hits"] += 1
+
+        if not match:
+            self.stats["misses"] += 1
+            return None
+
+        match[0].hits += 1
+        return match
+
+    def verdict_for(self, clause: LibraryClause, method: str, score: float) -> Dict[str, Any]:
+        """Cópia do veredito anotada com a origem"""
+        verdict = copy.deepcopy(clause.verdict)
+        verdict.setdefault("confidence_score", 0.9)
+        verdict["library_match"] = {"clause_id": clause.id, "category": clause.category,
+                                    "method": method, "score": round(score, 3)}
+        return verdict
+
+    def record_miss(self, clause_text: str, verdict: Dict[str, Any], agent_type: str) -> Optional[str]:
+        """Guarda o veredito do LLM para revisão; repetições da mesma cláusula são agrupadas"""
+        if not verdict or "error" in verdict:
+            return None
+
+        fingerprint = simhash(clause_text)
+        terms = salient_terms(clause_text)
+        with self._store_lock():
+            self.refresh()
+            for pending in self.pending.values():
+                if (hamming_distance(pending.simhash, fingerprint) <= self.max_hamming_distance
+                        and pending.terms == terms):
+                    pending.occurrences += 1
+                    self._save()
+                    return pending.id
+
+            if len(self.pending) >= self.max_pending:
+                # Descarta o pendente menos recorrente
+                least = min(self.pending.values(), key=lambda p: p.occurrences)
+                del self.pending[least.id]
+
+            pending = PendingClause(
+                id=f"pend_{uuid.uuid4().hex[:12]}",
+                clause_text=clause_text,
+                verdict=verdict,
+                agent_type=agent_type,
+                simhash=fingerprint,
+                terms=terms
+            )
+            self.pending[pending.id] = pending
+            self._save()
+        return pending.id
+
+    def has_pending(self, pending_id: str) -> bool:
+        self.refresh()
+        return pending_id in self.pending
+
+    def list_pending(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Pendentes mais recorrentes primeiro (maior economia ao aprovar)"""
+        self.refresh()
+        ordered = sorted(self.pending.values(), key=lambda p: p.occurrences, reverse=True)
+        return [
+            {key: value for key, value in asdict(pending).items() if key not in ("simhash", "terms")}
+            for pending in ordered[:limit]
+        ]
+
+    async def approve(self, pending_id: str, category: str,
+                      verdict: Optional[Dict[str, Any]] = None) -> LibraryClause:
+        """Promove um pendente revisado para a biblioteca (veredito pode ser corrigido)"""
+        self.refresh()
+        embedding = None
+        if self.embedder is not None:
+            embedding = (await self.embedder([self.pending[pending_id].clause_text]))[0]
+
+        with self._store_lock():
+            self.refresh()
+            pending = self.pending.pop(pending_id)
+            clause = self.add(pending.clause_text, verdict or pending.verdict, category,
+                              [pending.agent_type], embedding=embedding)
+            self._save()
+        return clause
+
+    def reject(self, pending_id: str) -> None:
+        with self._store_lock():
+            self.refresh()
+            self.pending.pop(pending_id)
+            self._save()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["lookups"]
+        hits = self.stats["simhash_hits"] + self.stats["embedding_hits"]
+        return {
+            **self.stats,
+            "library_size": len(self.clauses),
+            "pending_review": len(self.pending),
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "top_clauses": [
+                {"clause_id": c.id, "category": c.category, "hits": c.hits}
+                for c in sorted(self.clauses.values(), key=lambda c: c.hits, reverse=True)[:10]
+                if c.hits
+            ]
+        }
+
+    def _applies_to(self, clause: LibraryClause, agent_type: Optional[str]) -> bool:
+        return not clause.agent_types or not agent_type or agent_type in clause.agent_types
+
+    def _agrees(self, clause: LibraryClause, terms: Tuple[frozenset, frozenset]) -> bool:
+        """Mesmos valores e negações; senão o veredito da biblioteca não vale para a cláusula"""
+        if clause.terms == terms:
+            return True
+        self.stats["term_mismatches"] += 1
+        return False
+
+    def _lookup_simhash(self, clause_text: str, agent_type: Optional[str],
+                        terms: Tuple[frozenset, frozenset]):
+        if self._simhash_array is None:
+            self._simhash_ids = list(self.clauses)
+            self._simhash_array = np.array(
+                [self.clauses[i].simhash for i in self._simhash_ids], dtype=np.uint64
+            )
+        if not self._simhash_ids:
+            return None
+
+        distances = _popcount(self._simhash_array ^ np.uint64(simhash(clause_text)))
+        for index in np.argsort(distances, kind="stable"):
+            if distances[index] > self.max_hamming_distance:
+                break
+            clause = self.clauses[self._simhash_ids[index]]
+            if self._applies_to(clause, agent_type) and self._agrees(clause, terms):
+                return clause, "simhash", 1 - float(distances[index]) / 64
+        return None
+
+    async def _lookup_embedding(self, clause_text: str, agent_type: Optional[str],
+                                terms: Tuple[frozenset, frozenset]):
+        matrix = await self._get_embedding_matrix()
+        if matrix is None:
+            return None
+
+        try:
+            query = np.asarray((await self.embedder([clause_text]))[0], dtype=np.float32)
+        except Exception as e:
+            self._embedder_failed(f"Falha ao gerar embedding da cláusula: {e}")
+            return None
+
+        scores = matrix @ (query / (np.linalg.norm(query) or 1.0))
+        for index in np.argsort(-scores):
+            if scores[index] < self.min_cosine_similarity:
+                break
+            clause = self.clauses[self._embedding_ids[index]]
+            if self._applies_to(clause, agent_type) and self._agrees(clause, terms):
+                return clause, "embedding", float(scores[index])
+        return None
+
+    async def _get_embedding_matrix(self) -> Optional[np.ndarray]:
+        """Matriz normalizada das cláusulas; calcula embeddings faltantes em lote"""
+        if self._embedding_matrix is not None:
+            return self._embedding_matrix
+
+        missing = [clause for clause in self.clauses.values() if clause.embedding is None]
+        if missing:
+            try:
+                embeddings = await self.embedder([clause.canonical_text for clause in missing])
+                for clause, embedding in zip(missing, embeddings):
+                    clause.embedding = embedding
+            except Exception as e:
+                self._embedder_failed(f"Falha ao gerar embeddings da biblioteca de cláusulas: {e}")
+                return None
+
+        self._embedding_ids = list(self.clauses)
+        matrix = np.asarray([self.clauses[i].embedding for i in self._embedding_ids], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self._embedding_matrix = matrix / np.where(norms == 0, 1.0, norms)
+        return self._embedding_matrix
+
+    def _embedder_available(self) -> bool:
+        if self.embedder is None:
+            return False
+        return (self._embedder_failed_at is None
+                or time.monotonic() - self._embedder_failed_at >= self.embedder_retry_seconds)
+
+    def _embedder_failed(self, message: str) -> None:
+        """Desliga o nível de embedding até `embedder_retry_seconds`; as consultas seguem pelo SimHash"""
+        self._embedder_failed_at = time.monotonic()
+        self.stats["embedder_failures"] += 1
+        logger.warning(f"{message}; embeddings desativados por {self.embedder_retry_seconds:.0f}s")
+
+    @contextmanager
+    def _store_lock(self):
+        """Lock entre processos para reler, alterar e regravar o arquivo"""
+        if not self.path:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save(self) -> None:
+        """Persiste as cláusulas aprovadas (as padrão vêm do código) e as pendentes"""
+        if not self.path:
+            return
+        approved = [
+            {
+                "id": clause.id,
+                "category": clause.category,
+                "canonical_text": clause.canonical_text,
+                "verdict": clause.verdict,
+                "agent_types": clause.agent_types,
+                "embedding": clause.embedding
+            }
+            for clause in self.clauses.values() if not clause.id.startswith("std_")
+        ]
+        pending = [
+            {key: value for key, value in asdict(entry).items() if key not in ("simhash", "terms")}
+            for entry in self.pending.values()
+        ]
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"clauses": approved, "pending": pending}, f, ensure_ascii=False)
+        os.replace(temporary, self.path)
+        self._loaded_mtime = os.path.getmtime(self.path)
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                stored = json.load(f)
+            if isinstance(stored, list):
+                stored = {"clauses": stored, "pending": []}  # Formato antigo: só aprovadas
+            for entry in stored.get("clauses", []):
+                hits = self.clauses[entry["id"]].hits if entry["id"] in self.clauses else 0
+                clause = self.add(entry["canonical_text"], entry["verdict"], entry["category"],
+                                  entry.get("agent_types", []), clause_id=entry["id"],
+                                  embedding=entry.get("embedding"))
+                clause.hits = hits
+            self.pending = {
+                entry["id"]: PendingClause(**entry, simhash=simhash(entry["clause_text"]),
+                                           terms=salient_terms(entry["clause_text"]))
+                for entry in stored.get("pending", [])
+            }
+            self._loaded_mtime = os.path.getmtime(self.path)
+        except Exception as e:
+            logger.error(f"Falha ao carregar biblioteca de cláusulas de {self.path}: {e}")
+
+    def refresh(self) -> None:
+        """Aplica o que outros processos gravaram (misses dos workers, revisões da API)"""
+        if not self.path:
+            return
+        try:
+            if os.path.exists(self.path) and os.path.getmtime(self.path) != self._loaded_mtime:
+                self._load()
+        except OSError:
+            pass
+
+    def _maybe_reload(self) -> None:
+        """Na consulta, recarrega as aprovações de outro processo no máximo a cada `reload_interval`"""
+        now = time.monotonic()
+        if not self.path or now - self._last_reload_check < self.reload_interval:
+            return
+        self._last_reload_check = now
+        self.refresh()
+
+
+def _create_embedder() -> Optional[Embedder]:
+    if not settings.CLAUSE_LIBRARY_USE_EMBEDDINGS:
+        return None
+    from app.services.rag_service import rag_service
+    return rag_service.create_embeddings
+
+
+# Instância global
+clause_library = ClauseLibrary(
+    path=settings.CLAUSE_LIBRARY_PATH,
+    embedder=_create_embedder(),
+    max_hamming_distance=settings.CLAUSE_LIBRARY_MAX_HAMMING,
+    min_cosine_similarity=settings.CLAUSE_LIBRARY_MIN_SIMILARITY
+)
@@ -6,6 +6,13 @@ import re
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 from app.core.config import settings
+from app.services.rule_engine import Rule, RuleSet, rule_engine
+
+# Regex para CNPJ (com ou sem formatação)
+CNPJ_RULES = RuleSet("cnpj", [
+    Rule("cnpj", pattern=r'\b\d{2}\.?\d{3}\.?\d{3}\/?\d{4}-?\d{2}\b'),
+])
+rule_engine.register(CNPJ_RULES)
 
 class CNPJService:
     """Service for CNPJ consultation and company analysis"""
@@ -16,13 +23,11 @@ class CNPJService:
     
     def extract_cnpj_from_text(self, contract_text: str) -> Optional[str]:
         """Extract CNPJ from contract text"""
-        # Regex para CNPJ (com ou sem formatação)
-        cnpj_pattern = r'\b\d{2}\.?\d{3}\.?\d{3}\/?\d{4}-?\d{2}\b'
-        matches = re.findall(cnpj_pattern, contract_text)
+        matches = rule_engine.scan(contract_text, CNPJ_RULES.name)
         
         if matches:
             # Limpar formatação
-            cnpj = re.sub(r'[^\d]', '', matches[0])
+            cnpj = re.sub(r'[^\d]', '', matches[0].text)
             if len(cnpj) == 14:
                 return cnpj
         return None
@@ -0,0 +1,448 @@
+"""
+Detecção de contratos quase duplicados (MinHash + LSH)
+Contratos de adesão (telecom, cartão, streaming) são 95%+ idênticos entre usuários:
+reaproveitamos a análise anterior e re-analisamos apenas as cláusulas que mudaram
+"""
+
+import asyncio
+import copy
+import hashlib
+import logging
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.agents.clause_segmenter import Clause, clause_segmenter
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Identificadores pessoais do contrato de origem não podem vazar para outro usuário
+_PERSONAL_DATA = re.compile(
+    r'\d{3}\.\d{3}\.\d{3}-\d{2}'
+    r'|\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}'
+    r'|\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b'
+    r'|\(\d{2}\)\s?\d{4,5}-?\d{4}'
+    r'|\b\d{5}-\d{3}\b'
+)
+
+# Nomes próprios, razões sociais e endereços (palavras capitalizadas em sequência)
+_PROPER_NOUN = re.compile(r"\b[A-ZÀ-Ý][\wÀ-ÿ]{2,}(?:\s+(?:d[aeo]s?\s+)?[A-ZÀ-Ý][\wÀ-ÿ]{2,})*")
+_REDACTED = "[dado pessoal]"
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sem pontuação e com espaçamento único"""
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def fingerprint_text(text: str) -> str:
+    """Hash estável do texto normalizado (identidade de cláusulas)"""
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def source_only_terms(prior_text: str, new_text: str) -> List[str]:
+    """Nomes próprios e endereços do contrato anterior que não aparecem no novo"""
+    return sorted(
+        {term for term in _PROPER_NOUN.findall(prior_text) if term not in new_text},
+        key=len, reverse=True
+    )
+
+
+def scrub_personal_data(value: Any, terms: List[str]) -> Any:
+    """Remove documentos, contatos e os termos do contrato anterior de todos os textos"""
+    if isinstance(value, str):
+        value = _PERSONAL_DATA.sub(_REDACTED, value)
+        for term in terms:
+            value = value.replace(term, _REDACTED)
+        return value
+    if isinstance(value, dict):
+        return {key: scrub_personal_data(item, terms) for key, item in value.items()}
+    if isinstance(value, list):
+        return [scrub_personal_data(item, terms) for item in value]
+    return value
+
+
+class MinHasher:
+    """Assinaturas MinHash sobre shingles de palavras"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 42):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> Set[str]:
+        words = normalize_text(text).split()
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)} if words else set()
+        return {
+            " ".join(words[i:i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = self.shingles(text)
+        if not shingles:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+             for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        # Permutações universais (a*x + b) mod p; o overflow de uint64 é intencional
+        with np.errstate(over="ignore"):
+            permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return np.bitwise_and(permuted, _MAX_HASH).min(axis=0)
+
+    @staticmethod
+    def jaccard(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+        """Estimativa de similaridade de Jaccard a partir das assinaturas"""
+        return float(np.mean(signature_a == signature_b))
+
+
+class MinHashLSH:
+    """Índice LSH por bandas: candidatos são contratos que colidem em ao menos uma banda"""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = self._optimal_params(threshold, num_perm)
+        self._buckets: List[Dict[bytes, Set[str]]] = [defaultdict(set) for _ in range(self.bands)]
+        self._keys: Dict[str, List[bytes]] = {}
+
+    # Falsos positivos são baratos (candidatos são verificados pela assinatura);
+    # falsos negativos custam uma análise completa
+    FALSE_POSITIVE_WEIGHT = 0.2
+    FALSE_NEGATIVE_WEIGHT = 0.8
+
+    @classmethod
+    def _optimal_params(cls, threshold: float, num_perm: int) -> Tuple[int, int]:
+        """Escolhe (bandas, linhas) minimizando falsos positivos + falsos negativos ponderados"""
+
+        def _area(bands: int, rows: int, start: float, end: float, above: bool) -> float:
+            points = np.linspace(start, end, 200)
+            probability = 1 - (1 - points ** rows) ** bands
+            values = 1 - probability if above else probability
+            return float(values.mean() * (end - start))
+
+        best, best_error = (1, num_perm), float("inf")
+        for bands in range(1, num_perm + 1):
+            if num_perm % bands:
+                continue
+            rows = num_perm // bands
+            error = (cls.FALSE_POSITIVE_WEIGHT * _area(bands, rows, 0.0, threshold, above=False)
+                     + cls.FALSE_NEGATIVE_WEIGHT * _area(bands, rows, threshold, 1.0, above=True))
+            if error < best_error:
+                best, best_error = (bands, rows), error
+        return best
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def insert(self, key: str, signature: np.ndarray) -> None:
+        if key in self._keys:
+            self.remove(key)
+        band_keys = self._band_keys(signature)
+        for band, band_key in enumerate(band_keys):
+            self._buckets[band][band_key].add(key)
+        self._keys[key] = band_keys
+
+    def remove(self, key: str) -> None:
+        for band, band_key in enumerate(self._keys.pop(key, [])):
+            bucket = self._buckets[band].get(band_key)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def query(self, signature: np.ndarray) -> Set[str]:
+        candidates: Set[str] = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            candidates |= self._buckets[band].get(band_key, set())
+        return candidates
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+@dataclass
+class ReusePlan:
+    """Diferença por cláusula entre o contrato novo e o já analisado"""
+    changed: List[Clause]  # Cláusulas novas/alteradas: precisam de análise
+    removed: List[Clause]  # Cláusulas do contrato anterior que não existem mais
+    reused: int  # Cláusulas idênticas cujo veredito é reaproveitado
+    source_terms: List[str] = field(default_factory=list)  # Dados do contrato anterior a remover
+
+    @property
+    def changed_fraction(self) -> float:
+        total = len(self.changed) + self.reused
+        return len(self.changed) / total if total else 0.0
+
+
+class ContractDedupIndex:
+    """
+    Índice incremental de contratos analisados para reaproveitamento de análises
+
+    O índice guarda apenas as assinaturas; texto e resultados do contrato
+    anterior são carregados do banco quando há um quase duplicado.
+    """
+
+    def __init__(self,
+                 threshold: float = 0.8,
+                 max_changed_fraction: float = 0.3,
+                 num_perm: int = 128):
+        self.threshold = threshold
+        self.max_changed_fraction = max_changed_fraction
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.lsh = MinHashLSH(threshold=threshold, num_perm=num_perm)
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._contract_types: Dict[str, str] = {}
+        # Último (analyzed_at, id) indexado: cursor da paginação por chave de `refresh`
+        self._watermark: Optional[Tuple[datetime, Any]] = None
+        self._refresh_lock = asyncio.Lock()
+        self.stats: Dict[str, int] = defaultdict(int)
+
+    def add(self, contract_id: str, text: str, contract_type: str = "") -> None:
+        """Indexa um contrato cuja análise foi concluída"""
+        if not text or not text.strip():
+            return
+        signature = self.hasher.signature(text)
+        self.lsh.insert(contract_id, signature)
+        self._signatures[contract_id] = signature
+        self._contract_types[contract_id] = contract_type
+
+    def remove(self, contract_id: str) -> None:
+        self.lsh.remove(contract_id)
+        self._signatures.pop(contract_id, None)
+        self._contract_types.pop(contract_id, None)
+
+    def find_near_duplicate(self, text: str, exclude: Optional[str] = None,
+                            contract_type: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """
+        Retorna (contract_id, similaridade estimada) do contrato mais parecido acima do limiar
+
+        Com `contract_type`, só considera contratos analisados como desse tipo.
+        """
+        signature = self.hasher.signature(text)
+        best: Optional[Tuple[str, float]] = None
+        for candidate in self.lsh.query(signature):
+            if candidate == exclude:
+                continue
+            if contract_type is not None and self._contract_types.get(candidate) != contract_type:
+                continue
+            similarity = MinHasher.jaccard(signature, self._signatures[candidate])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        return best
+
+    def plan_reuse(self, new_text: str, prior_text: str) -> ReusePlan:
+        """Compara os contratos cláusula a cláusula (o preâmbulo com as partes é ignorado)"""
+        new_clauses = [c for c in clause_segmenter.segment(new_text) if c.number is not None]
+        prior_clauses = [c for c in clause_segmenter.segment(prior_text) if c.number is not None]
+
+        prior_fingerprints = {fingerprint_text(c.text) for c in prior_clauses}
+        new_fingerprints = {fingerprint_text(c.text) for c in new_clauses}
+
+        changed = [c for c in new_clauses if fingerprint_text(c.text) not in prior_fingerprints]
+        removed = [c for c in prior_clauses if fingerprint_text(c.text) not in new_fingerprints]
+        return ReusePlan(changed=changed, removed=removed, reused=len(new_clauses) - len(changed),
+                         source_terms=source_only_terms(prior_text, new_text))
+
+    async def apply_reuse(self, prior_results: Dict[str, Any], plan: ReusePlan, agent,
+                          source_contract_id: str, similarity: float) -> Dict[str, Any]:
+        """Copia a análise anterior, trocando os vereditos das cláusulas alteradas
+
+        `agent` (do tipo do contrato) só é usado quando há cláusulas alteradas.
+        """
+        analysis = copy.deepcopy(prior_results["analysis"])
+
+        if plan.removed or plan.changed:
+            stale = plan.removed + plan.changed
+            analysis["clauses_analysis"] = [
+                item for item in analysis.get("clauses_analysis", [])
+                if not self._refers_to_any(item.get("clause", ""), stale)
+            ]
+            analysis["risk_factors"] = [
+                item for item in analysis.get("risk_factors", [])
+                if not self._refers_to_any(item.get("clause", ""), stale)
+            ]
+
+        # Nada do contrato de origem chega ao novo usuário sem passar pela limpeza
+        results = scrub_personal_data(
+            {**prior_results, "analysis": analysis}, plan.source_terms
+        )
+        analysis = results["analysis"]
+        analysis.setdefault("clauses_analysis", [])
+        analysis.setdefault("risk_factors", [])
+
+        if plan.changed:
+            semaphore = asyncio.Semaphore(agent.CLAUSE_CONCURRENCY)
+
+            async def _analyze(clause: Clause) -> Dict[str, Any]:
+                async with semaphore:
+                    try:
+                        return await agent.analyze_clause(clause)
+                    except Exception as e:
+                        logger.warning(f"Re-análise da cláusula {clause.heading!r} falhou: {e}")
+                        return {"error": str(e)}
+
+            verdicts = await asyncio.gather(*(_analyze(clause) for clause in plan.changed))
+            partial = agent._reduce_clause_results(plan.changed, verdicts)
+            analysis["clauses_analysis"].extend(partial.clauses_analysis)
+            analysis["risk_factors"].extend(partial.risk_factors)
+            for recommendation in partial.recommendations:
+                if recommendation not in analysis.get("recommendations", []):
+                    analysis.setdefault("recommendations", []).append(recommendation)
+            analysis["risk_level"] = agent._calculate_risk_level(analysis["risk_factors"])
+
+        analysis.setdefault("metadata", {})["dedup"] = {
+            "reused_from": source_contract_id,
+            "similarity": round(similarity, 3),
+            "reused_clauses": plan.reused,
+            "reanalysed_clauses": len(plan.changed)
+        }
+
+        self.stats["full_reuse" if not plan.changed else "partial_reuse"] += 1
+        self.stats["clauses_reused"] += plan.reused
+        self.stats["clauses_reanalysed"] += len(plan.changed)
+        return results
+
+    async def reuse_analysis(self, contract_text: str, agent_factory, db,
+                             contract_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Reaproveita a análise de um contrato quase idêntico e do mesmo tipo, se houver
+
+        Retorna None quando não há duplicata utilizável e a análise completa deve ser feita.
+        """
+        await self.refresh(db)
+        self.stats["lookups"] += 1
+
+        if not self.find_near_duplicate(contract_text, exclude=contract_id):
+            return None
+
+        # Só reaproveita análise de contrato do mesmo tipo (classificação do novo texto)
+        classification = await agent_factory.classifier.classify_contract(contract_text)
+        contract_type = classification.get("contract_type")
+        match = self.find_near_duplicate(contract_text, exclude=contract_id, contract_type=contract_type)
+        if not match:
+            self.stats["rejected_other_type"] += 1
+            return None
+        source_id, similarity = match
+        self.stats["near_duplicates"] += 1
+
+        prior, prior_text = await self._load_source(db, source_id)
+        if not prior or prior.get("status") != "success" or not prior.get("analysis"):
+            self.remove(source_id)
+            return None
+
+        plan = self.plan_reuse(contract_text, prior_text)
+        if plan.changed_fraction > self.max_changed_fraction:
+            self.stats["rejected_too_different"] += 1
+            return None
+
+        # O agente só é necessário para re-analisar cláusulas alteradas
+        agent = None
+        if plan.changed:
+            try:
+                agent = agent_factory.get_agent(contract_type)
+            except ValueError as e:
+                logger.info(f"Análise de {source_id} não reaproveitada: {e}")
+                self.stats["rejected_no_agent"] += 1
+                return None
+
+        results = await self.apply_reuse(prior, plan, agent, source_id, similarity)
+        results["classification"] = classification
+        return results
+
+    async def _load_source(self, db, contract_id: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Resultados da análise e texto do contrato de origem"""
+        from sqlalchemy import select
+        from app.db.models import Contract
+
+        result = await db.execute(select(Contract).where(Contract.id == contract_id))
+        source = result.scalar_one_or_none()
+        if source is None:
+            return None, ""
+        return source.analysis_results, source.extracted_text or ""
+
+    async def refresh(self, db, batch_size: int = 500) -> int:
+        """
+        Indexa contratos concluídos desde a última atualização (vários workers/processos)
+
+        Lê lotes de `batch_size` até esgotar, paginando por (analyzed_at, id): contratos
+        com o mesmo analyzed_at do fim de um lote entram no lote seguinte.
+        """
+        async with self._refresh_lock:
+            indexed = 0
+            while True:
+                rows = await self._fetch_completed(db, self._watermark, batch_size)
+                for contract_id, text, contract_type, analyzed_at in rows:
+                    self.add(str(contract_id), text or "", contract_type or "")
+                    self._watermark = (analyzed_at, contract_id)
+                indexed += len(rows)
+                if len(rows) < batch_size:
+                    return indexed
+
+    async def _fetch_completed(self, db, after: Optional[Tuple[datetime, Any]], limit: int) -> List[Any]:
+        """Próximo lote de contratos concluídos depois de `after`, em ordem de (analyzed_at, id)"""
+        from sqlalchemy import or_, select
+        from app.db.models import Contract
+
+        query = (
+            select(Contract.id, Contract.extracted_text, Contract.contract_type, Contract.analyzed_at)
+            .where(Contract.processing_status == "completed", Contract.analyzed_at.isnot(None))
+            .order_by(Contract.analyzed_at, Contract.id)
+            .limit(limit)
+        )
+        if after is not None:
+            analyzed_at, contract_id = after
+            query = query.where(
+                Contract.analyzed_at >= analyzed_at,
+                or_(Contract.analyzed_at > analyzed_at, Contract.id > contract_id)
+            )
+        return (await db.execute(query)).all()
+
+    @staticmethod
+    def _refers_to_any(reference: str, clauses: List[Clause]) -> bool:
+        """Verifica se um item da análise (campo 'clause') aponta para alguma das cláusulas"""
+        reference_norm = normalize_text(reference or "")
+        if not reference_norm:
+            return False
+        for clause in clauses:
+            heading = normalize_text(clause.heading)
+            if reference_norm == heading or reference_norm in normalize_text(clause.text):
+                return True
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["lookups"]
+        reused = self.stats["full_reuse"] + self.stats["partial_reuse"]
+        return {
+            "indexed_contracts": len(self.lsh),
+            "threshold": self.threshold,
+            "lsh_bands": self.lsh.bands,
+            "lsh_rows": self.lsh.rows,
+            **self.stats,
+            "reuse_rate": reused / lookups if lookups else 0.0
+        }
+
+
+# Instância global
+contract_dedup = ContractDedupIndex(
+    threshold=settings.CONTRACT_DEDUP_THRESHOLD,
+    max_changed_fraction=settings.CONTRACT_DEDUP_MAX_CHANGED_FRACTION
+)
@@ -7,7 +7,7 @@ import cv2
 import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
 import io
-from typing import Tuple, Optional, List
+from typing import Callable, Tuple, Optional, List
 import base64
 from dataclasses import dataclass
 
@@ -31,7 +31,8 @@ class DocumentImageProcessor:
         self, 
         image_data: bytes,
         auto_enhance: bool = True,
-        preserve_colors: bool = False
+        preserve_colors: bool = False,
+        checkpoint: Optional[Callable[[], None]] = None
     ) -> ImageProcessingResult:
         """
         Processa uma imagem de documento para otimizar OCR
@@ -40,10 +41,14 @@ class DocumentImageProcessor:
             image_data: Dados binários da imagem
             auto_enhance: Se deve aplicar melhorias automáticas
             preserve_colors: Se deve preservar cores originais
+            checkpoint: Chamado entre os filtros; pode levantar exceção para
+                abandonar o processamento (job cancelado ou com prazo estourado)
             
         Returns:
             ImageProcessingResult com imagem otimizada
         """
+        check = checkpoint or (lambda: None)
+        
         # Converter para OpenCV
         image = self._bytes_to_opencv(image_data)
         original_size = image.shape[:2]
@@ -53,37 +58,45 @@ class DocumentImageProcessor:
         
         # Pipeline de processamento
         if auto_enhance:
+            check()
             # 1. Correção de perspectiva
             image, perspective_applied = self._correct_perspective(image)
             if perspective_applied:
                 applied_filters.append("perspective_correction")
                 
+            check()
             # 2. Redimensionamento inteligente
             image = self._smart_resize(image)
             applied_filters.append("smart_resize")
             
+            check()
             # 3. Redução de ruído
             image = self._reduce_noise(image)
             applied_filters.append("noise_reduction")
             
+            check()
             # 4. Melhoria de contraste
             image = self._enhance_contrast(image)
             applied_filters.append("contrast_enhancement")
             
+            check()
             # 5. Correção de iluminação
             image = self._correct_lighting(image)
             applied_filters.append("lighting_correction")
             
+            check()
             # 6. Nitidez adaptativa
             image = self._adaptive_sharpening(image)
             applied_filters.append("adaptive_sharpening")
             
             if not preserve_colors:
+                check()
                 # 7. Binarização inteligente
                 image = self._intelligent_binarization(image)
                 applied_filters.append("binarization")
         
         # Calcular score de confiança
+        check()
         confidence_score = self._calculate_confidence_score(image)
         
         enhanced_size = image.shape[:2]
@@ -0,0 +1,487 @@
+"""
+Broker de jobs para vários workers (uvicorn/gunicorn em um ou mais nós)
+Fila de trabalho com confirmação (ack) para distribuir os jobs e pub/sub para os eventos
+de progresso: qualquer worker executa qualquer job e qualquer worker atende o WebSocket
+de um usuário. Redis Streams em produção; memória (um processo) e SQLite (vários
+processos no mesmo nó, testes) como alternativas.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Canal de controle entre workers (ex.: cancelamento de job em execução em outro worker)
+CONTROL_CHANNEL = "jobs:control"
+USER_CHANNEL_PREFIX = "jobs:user:"
+
+EventListener = Callable[[str, Dict[str, Any]], None]
+
+
+@dataclass
+class Delivery:
+    """Job entregue a um worker; fica pendente no broker até ack()"""
+    id: str
+    payload: Dict[str, Any]
+    redelivered: bool = False
+
+
+class JobBroker(ABC):
+    """Interface do broker usada pelo AsyncContractProcessor"""
+
+    # Jobs que um worker retira do broker além das vagas livres; None = sem limite
+    prefetch: Optional[int] = None
+    # Segundos sem extend até a entrega voltar à fila; None = entregas não expiram
+    visibility_timeout: Optional[float] = None
+
+    def __init__(self):
+        self._listener: Optional[EventListener] = None
+        self._channels: Set[str] = set()
+        self._stats = {
+            "enqueued": 0, "delivered": 0, "redelivered": 0, "acked": 0, "extended": 0,
+            "published": 0, "publish_dropped": 0, "events_received": 0,
+        }
+
+    async def start(self, listener: EventListener) -> None:
+        """Passa a entregar ao `listener` os eventos dos canais assinados"""
+        self._listener = listener
+        await self.subscribe(CONTROL_CHANNEL)
+
+    @abstractmethod
+    async def enqueue(self, payload: Dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    async def receive(self, timeout: float) -> Optional[Delivery]:
+        """Próximo job (espera até `timeout` segundos); None se não houver"""
+        pass
+
+    async def ack(self, delivery: Delivery) -> None:
+        """Confirma o job; sem ack ele volta a ser entregue (worker caiu)"""
+        self._stats["acked"] += 1
+
+    @property
+    def heartbeat_interval(self) -> Optional[float]:
+        """Período de renovação das entregas em poder do worker; None = não expiram"""
+        return None
+
+    async def extend(self, deliveries: List[Delivery]) -> None:
+        """Renova o prazo de visibilidade de entregas ainda na fila local ou em execução"""
+        self._stats["extended"] += len(deliveries)
+
+    @abstractmethod
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        """Publica um evento sem bloquear o chamador"""
+        pass
+
+    async def subscribe(self, channel: str) -> None:
+        self._channels.add(channel)
+
+    async def unsubscribe(self, channel: str) -> None:
+        self._channels.discard(channel)
+
+    def _deliver_event(self, channel: str, message: Dict[str, Any]) -> None:
+        if self._listener is None or channel not in self._channels:
+            return
+        self._stats["events_received"] += 1
+        try:
+            self._listener(channel, message)
+        except Exception as e:
+            logger.error(f"Falha ao tratar evento do canal {channel}: {e}")
+
+    async def close(self) -> None:
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "prefetch": self.prefetch,
+            "subscriptions": len(self._channels),
+            **self._stats,
+        }
+
+
+class MemoryJobBroker(JobBroker):
+    """Um processo só: fila asyncio e entrega direta dos eventos (comportamento original)"""
+
+    def __init__(self):
+        super().__init__()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._next_id = 0
+
+    async def enqueue(self, payload: Dict[str, Any]) -> None:
+        self._queue.put_nowait(payload)
+        self._stats["enqueued"] += 1
+
+    async def receive(self, timeout: float) -> Optional[Delivery]:
+        try:
+            payload = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._next_id += 1
+        self._stats["delivered"] += 1
+        return Delivery(str(self._next_id), payload)
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        self._stats["published"] += 1
+        self._deliver_event(channel, message)
+
+
+class RemoteJobBroker(JobBroker):
+    """
+    Base dos brokers entre processos
+
+    Eventos publicados vão para uma fila local limitada e são enviados em lote por uma
+    tarefa própria (com a fila cheia o evento é descartado e contado); outra tarefa
+    escuta os canais assinados. Jobs sem ack por `visibility_timeout` segundos são
+    entregues de novo; o worker renova (extend) a cada terço desse prazo os jobs que
+    ainda tem, na fila local ou em execução, então só os de um worker parado expiram.
+    """
+
+    def __init__(self, prefetch: int = 8, visibility_timeout: float = 300.0, outbox_size: int = 10000):
+        super().__init__()
+        self.prefetch = prefetch
+        self.visibility_timeout = visibility_timeout
+        self._outbox: asyncio.Queue = asyncio.Queue(maxsize=outbox_size)
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def heartbeat_interval(self) -> Optional[float]:
+        return self.visibility_timeout / 3
+
+    async def start(self, listener: EventListener) -> None:
+        await super().start(listener)
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._publish_loop()), loop.create_task(self._listen_loop())]
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        try:
+            self._outbox.put_nowait((channel, message))
+        except asyncio.QueueFull:
+            self._stats["publish_dropped"] += 1
+
+    async def _publish_loop(self) -> None:
+        while True:
+            batch = [await self._outbox.get()]
+            while not self._outbox.empty() and len(batch) < 500:
+                batch.append(self._outbox.get_nowait())
+            try:
+                await self._publish_batch(batch)
+                self._stats["published"] += len(batch)
+            except Exception as e:
+                self._stats["publish_dropped"] += len(batch)
+                logger.warning(f"Falha ao publicar {len(batch)} evento(s) no broker: {e}")
+
+    async def _listen_loop(self) -> None:
+        while True:
+            try:
+                for channel, message in await self._poll_events():
+                    self._deliver_event(channel, message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Falha ao receber eventos do broker: {e}")
+                await asyncio.sleep(1)
+
+    @abstractmethod
+    async def _publish_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        pass
+
+    @abstractmethod
+    async def _poll_events(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Eventos novos dos canais assinados (pode esperar até ~1s)"""
+        pass
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **super().get_stats(),
+            "visibility_timeout": self.visibility_timeout,
+            "outbox_depth": self._outbox.qsize(),
+        }
+
+
+class SQLiteJobBroker(RemoteJobBroker):
+    """Broker num arquivo SQLite (WAL): vários processos no mesmo nó e testes"""
+
+    def __init__(self, path: str, poll_interval: float = 0.1, event_ttl: float = 60.0, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.poll_interval = poll_interval
+        self.event_ttl = event_ttl
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = asyncio.Lock()
+        self._last_event_id = 0
+        self._last_prune = 0.0
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS broker_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload TEXT NOT NULL,
+                claimed_at REAL,
+                deliveries INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS broker_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_broker_events_channel ON broker_events (channel, id)")
+        self._conn.commit()
+
+    async def _run(self, fn: Callable[[], Any]) -> Any:
+        async with self._lock:
+            return await asyncio.to_thread(fn)
+
+    async def start(self, listener: EventListener) -> None:
+        # Só eventos publicados a partir de agora
+        row = await self._run(lambda: self._conn.execute("SELECT MAX(id) FROM broker_events").fetchone())
+        self._last_event_id = row[0] or 0
+        await super().start(listener)
+
+    async def enqueue(self, payload: Dict[str, Any]) -> None:
+        def _insert():
+            self._conn.execute("INSERT INTO broker_jobs (payload) VALUES (?)", (json.dumps(payload, default=str),))
+            self._conn.commit()
+
+        await self._run(_insert)
+        self._stats["enqueued"] += 1
+
+    async def receive(self, timeout: float) -> Optional[Delivery]:
+        def _claim():
+            now = time.time()
+            row = self._conn.execute(
+                """
+                UPDATE broker_jobs SET claimed_at = ?, deliveries = deliveries + 1
+                WHERE id = (
+                    SELECT id FROM broker_jobs
+                    WHERE claimed_at IS NULL OR claimed_at < ?
+                    ORDER BY id LIMIT 1
+                )
+                RETURNING id, payload, deliveries
+                """,
+                (now, now - self.visibility_timeout)
+            ).fetchone()
+            self._conn.commit()
+            return row
+
+        deadline = time.monotonic() + timeout
+        while True:
+            row = await self._run(_claim)
+            if row:
+                redelivered = row[2] > 1
+                self._stats["redelivered" if redelivered else "delivered"] += 1
+                return Delivery(str(row[0]), json.loads(row[1]), redelivered)
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(self.poll_interval)
+
+    async def ack(self, delivery: Delivery) -> None:
+        def _delete():
+            self._conn.execute("DELETE FROM broker_jobs WHERE id = ?", (int(delivery.id),))
+            self._conn.commit()
+
+        await self._run(_delete)
+        await super().ack(delivery)
+
+    async def extend(self, deliveries: List[Delivery]) -> None:
+        if not deliveries:
+            return
+        ids = [int(delivery.id) for delivery in deliveries]
+
+        def _touch():
+            self._conn.execute(
+                f"UPDATE broker_jobs SET claimed_at = ? WHERE id IN ({', '.join('?' * len(ids))})",
+                (time.time(), *ids)
+            )
+            self._conn.commit()
+
+        await self._run(_touch)
+        await super().extend(deliveries)
+
+    async def _publish_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        now = time.time()
+        prune = now - self._last_prune > self.event_ttl
+        if prune:
+            self._last_prune = now
+
+        def _insert():
+            self._conn.executemany(
+                "INSERT INTO broker_events (channel, payload, created_at) VALUES (?, ?, ?)",
+                [(channel, json.dumps(message, default=str), now) for channel, message in batch]
+            )
+            if prune:
+                self._conn.execute("DELETE FROM broker_events WHERE created_at < ?", (now - self.event_ttl,))
+            self._conn.commit()
+
+        await self._run(_insert)
+
+    async def _poll_events(self) -> List[Tuple[str, Dict[str, Any]]]:
+        channels = list(self._channels)
+
+        def _select():
+            return self._conn.execute(
+                f"SELECT id, channel, payload FROM broker_events "
+                f"WHERE id > ? AND channel IN ({', '.join('?' * len(channels))}) ORDER BY id LIMIT 500",
+                (self._last_event_id, *channels)
+            ).fetchall()
+
+        rows = await self._run(_select)
+        if not rows:
+            await asyncio.sleep(self.poll_interval)
+            return []
+        self._last_event_id = rows[-1][0]
+        return [(channel, json.loads(payload)) for _, channel, payload in rows]
+
+
+class RedisJobBroker(RemoteJobBroker):
+    """
+    Redis Streams (grupo de consumidores) para os jobs e Redis pub/sub para os eventos
+
+    Cada worker é um consumidor do grupo; entregas sem XACK de um worker que caiu são
+    reassumidas com XAUTOCLAIM depois de `visibility_timeout`. O worker que ainda tem a
+    entrega zera o tempo ocioso dela com XCLAIM para si mesmo (extend), desde que ela
+    continue pendente em seu nome.
+    """
+
+    STREAM = "jobs:dispatch"
+    GROUP = "workers"
+
+    def __init__(self, url: str, consumer: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self._redis = None
+        self._pubsub = None
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(self.url, decode_responses=True)
+        return self._redis
+
+    async def start(self, listener: EventListener) -> None:
+        try:
+            await self.redis.xgroup_create(self.STREAM, self.GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._pubsub = self.redis.pubsub()
+        await super().start(listener)
+
+    async def enqueue(self, payload: Dict[str, Any]) -> None:
+        await self.redis.xadd(self.STREAM, {"payload": json.dumps(payload, default=str)})
+        self._stats["enqueued"] += 1
+
+    async def receive(self, timeout: float) -> Optional[Delivery]:
+        # Primeiro, entregas abandonadas por workers que caíram
+        _, claimed, *_ = await self.redis.xautoclaim(
+            self.STREAM, self.GROUP, self.consumer,
+            min_idle_time=int(self.visibility_timeout * 1000), start_id="0-0", count=1
+        )
+        if claimed and claimed[0][1]:
+            entry_id, fields = claimed[0]
+            self._stats["redelivered"] += 1
+            return Delivery(entry_id, json.loads(fields["payload"]), redelivered=True)
+
+        response = await self.redis.xreadgroup(
+            self.GROUP, self.consumer, {self.STREAM: ">"}, count=1, block=int(timeout * 1000)
+        )
+        if not response:
+            return None
+        entry_id, fields = response[0][1][0]
+        self._stats["delivered"] += 1
+        return Delivery(entry_id, json.loads(fields["payload"]))
+
+    async def ack(self, delivery: Delivery) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self.STREAM, self.GROUP, delivery.id)
+            pipe.xdel(self.STREAM, delivery.id)
+            await pipe.execute()
+        await super().ack(delivery)
+
+    async def extend(self, deliveries: List[Delivery]) -> None:
+        if not deliveries:
+            return
+        # Só renova o que ainda é deste consumidor: se o prazo expirou e outro worker
+        # reassumiu a entrega (XAUTOCLAIM), um XCLAIM incondicional a tomaria de volta
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for delivery in deliveries:
+                pipe.xpending_range(self.STREAM, self.GROUP, min=delivery.id, max=delivery.id,
+                                    count=1, consumername=self.consumer)
+            pending = await pipe.execute()
+        owned = {entries[0]["message_id"]: entries[0]["time_since_delivered"] for entries in pending if entries}
+        if owned:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for entry_id, idle in owned.items():
+                    # Com a ociosidade observada como mínimo, uma entrega reassumida por outro
+                    # consumidor entre as duas chamadas (ociosidade zerada) não é movida;
+                    # JUSTID não incrementa o contador de entregas
+                    pipe.xclaim(self.STREAM, self.GROUP, self.consumer, min_idle_time=idle,
+                                message_ids=[entry_id], justid=True)
+                await pipe.execute()
+        await super().extend([delivery for delivery in deliveries if delivery.id in owned])
+
+    async def subscribe(self, channel: str) -> None:
+        await super().subscribe(channel)
+        await self._pubsub.subscribe(channel)
+
+    async def unsubscribe(self, channel: str) -> None:
+        await super().unsubscribe(channel)
+        await self._pubsub.unsubscribe(channel)
+
+    async def _publish_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for channel, message in batch:
+                pipe.publish(channel, json.dumps(message, default=str))
+            await pipe.execute()
+
+    async def _poll_events(self) -> List[Tuple[str, Dict[str, Any]]]:
+        message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+        if not message:
+            return []
+        return [(message["channel"], json.loads(message["data"]))]
+
+    async def close(self) -> None:
+        await super().close()
+        if self._pubsub is not None:
+            await self._pubsub.close()
+        if self._redis is not None:
+            await self._redis.close()
+
+
+def create_job_broker() -> JobBroker:
+    """Seleciona o broker conforme configuração (JOB_BROKER_BACKEND)"""
+    options = {
+        "prefetch": settings.JOB_BROKER_PREFETCH,
+        "visibility_timeout": settings.JOB_BROKER_VISIBILITY_TIMEOUT_SECONDS,
+    }
+    if settings.JOB_BROKER_BACKEND == "redis":
+        return RedisJobBroker(settings.REDIS_URL, **options)
+    if settings.JOB_BROKER_BACKEND == "sqlite":
+        return SQLiteJobBroker(settings.JOB_BROKER_SQLITE_PATH, **options)
+    return MemoryJobBroker()
@@ -0,0 +1,94 @@
+"""
+Cancelamento cooperativo de jobs
+Tokens de cancelamento propagados para trabalho em threads e processos (OpenCV, OCR, SDKs
+bloqueantes), para que jobs cancelados ou com prazo estourado parem de consumir CPU
+"""
+
+import asyncio
+import functools
+import os
+import tempfile
+import threading
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional
+
+
+class JobCancelled(Exception):
+    """Levantada num checkpoint quando o token do job foi cancelado"""
+
+
+class StageTimeoutError(TimeoutError):
+    """Etapa do pipeline excedeu o seu prazo"""
+
+    def __init__(self, stage: str, deadline: float):
+        super().__init__(f"Etapa {stage} excedeu o prazo de {deadline:g}s")
+        self.stage = stage
+        self.deadline = deadline
+
+
+class CancellationToken:
+    """
+    Sinal de cancelamento de um job
+
+    Dentro do processo é um threading.Event. Quando o token é enviado a outro processo
+    (pickle para um ProcessPoolExecutor), a cópia passa a consultar um arquivo sentinela,
+    criado por cancel() no processo de origem.
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.reason: Optional[str] = None
+        self._event: Optional[threading.Event] = threading.Event()
+        self._sentinel = os.path.join(tempfile.gettempdir(), f"job-cancel-{job_id}")
+        self._shared = False
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event is not None:
+            return self._event.is_set()
+        return os.path.exists(self._sentinel)
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if self.cancelled:
+            return
+        self.reason = reason
+        if self._event is not None:
+            self._event.set()
+        if self._shared:
+            open(self._sentinel, "w").close()
+
+    def check(self) -> None:
+        """Checkpoint para código síncrono: interrompe o trabalho se o job foi cancelado"""
+        if self.cancelled:
+            raise JobCancelled(f"Job {self.job_id} interrompido ({self.reason or 'cancelled'})")
+
+    def close(self) -> None:
+        """Remove o sentinela (fim do job)"""
+        if self._shared:
+            try:
+                os.remove(self._sentinel)
+            except FileNotFoundError:
+                pass
+
+    def __getstate__(self):
+        self._shared = True
+        state = dict(self.__dict__)
+        state["_event"] = None
+        return state
+
+
+async def run_cancellable(fn: Callable[..., Any], *args: Any, token: CancellationToken,
+                          executor: Optional[Executor] = None, **kwargs: Any) -> Any:
+    """
+    Executa fn(*args, token=token, **kwargs) num executor (threads por padrão)
+
+    Se a task que aguarda for cancelada (cancel_job, prazo da etapa), o token é acionado
+    e a função para no próximo token.check(), liberando a thread/processo.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, functools.partial(fn, *args, token=token, **kwargs))
+    try:
+        return await future
+    except asyncio.CancelledError:
+        token.cancel("abandoned")
+        raise
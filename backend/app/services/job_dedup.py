@@ -0,0 +1,80 @@
+"""
+Deduplicação de jobs por conteúdo
+create_job calcula um hash das entradas (bytes dos arquivos, tipo do job e opções): um
+pedido idêntico a um job em andamento se junta a ele, e um idêntico a um job concluído
+há pouco recebe o resultado pronto, sem rodar o pipeline de novo
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def file_digest(ref: str) -> str:
+    """Hash dos bytes de um arquivo local; URLs e caminhos inexistentes entram pelo nome"""
+    if os.path.isfile(ref):
+        with open(ref, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    return f"ref:{ref}"
+
+
+class JobDedupIndex:
+    """
+    Hash das entradas -> job que as processou
+
+    O hash inclui o usuário: resultados nunca são compartilhados entre contas. O índice
+    é um LRU limitado a `max_entries`; o processador valida o job encontrado (status e
+    idade) antes de reaproveitá-lo.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._stats = {"lookups": 0, "hits_running": 0, "hits_completed": 0}
+
+    async def input_hash(self, user_id: str, job_type: str, files: List[str],
+                         options: Optional[Dict[str, Any]]) -> str:
+        """Hash das entradas do job (leitura dos arquivos numa thread)"""
+        digests = await asyncio.to_thread(lambda: [file_digest(ref) for ref in files])
+        payload = json.dumps(
+            {"user_id": user_id, "job_type": job_type, "files": digests, "options": options or {}},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> Optional[str]:
+        job_id = self._entries.get(key)
+        if job_id is not None:
+            self._entries.move_to_end(key)
+        return job_id
+
+    def remember(self, key: str, job_id: str) -> None:
+        self._entries[key] = job_id
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def forget(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def record(self, hit: Optional[str]) -> None:
+        """Registra o resultado de uma consulta: "running", "completed" ou None (novo job)"""
+        self._stats["lookups"] += 1
+        if hit:
+            self._stats[f"hits_{hit}"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self._stats["hits_running"] + self._stats["hits_completed"]
+        return {
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": hits / self._stats["lookups"] if self._stats["lookups"] else 0.0,
+            **self._stats,
+        }
@@ -0,0 +1,192 @@
+"""
+Previsão de conclusão dos jobs a partir do histórico de duração das etapas
+Cada etapa concluída alimenta estatísticas (EWMA e quantis) por tipo de job, número de
+arquivos e tamanho total; a estimativa de conclusão é a soma das durações previstas das
+etapas restantes (mais a espera na fila), e o erro de cada previsão é medido no fim do job
+"""
+
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.services.llm_gateway import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Pseudo-etapa: da criação do job até um worker começar a executá-lo
+QUEUE_STAGE = "queue"
+
+# Faixas de número de arquivos (páginas) e de tamanho total (bytes) dos jobs
+FILE_COUNT_BUCKETS = ((1, "1"), (5, "2-5"), (20, "6-20"))
+SIZE_BUCKETS = ((1 << 20, "<1MB"), (10 << 20, "1-10MB"), (50 << 20, "10-50MB"))
+
+ERROR_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+RELATIVE_ERROR_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0)
+
+Profile = Tuple[str, str]
+
+
+def job_profile(files: List[str]) -> Profile:
+    """Faixa de número de arquivos e de tamanho total (arquivos remotos não entram no tamanho)"""
+    count = len(files)
+    count_bucket = next((label for bound, label in FILE_COUNT_BUCKETS if count <= bound), "21+")
+
+    sizes = [os.path.getsize(ref) for ref in files if os.path.isfile(ref)]
+    if not sizes:
+        return count_bucket, "unknown"
+    total = sum(sizes)
+    size_bucket = next((label for bound, label in SIZE_BUCKETS if total < bound), "50MB+")
+    return count_bucket, size_bucket
+
+
+class StageStats:
+    """Duração de uma etapa: EWMA para a previsão e amostra recente para os quantis"""
+
+    __slots__ = ("alpha", "ewma", "count", "samples")
+
+    def __init__(self, alpha: float, sample_size: int):
+        self.alpha = alpha
+        self.ewma: Optional[float] = None
+        self.count = 0
+        self.samples: Deque[float] = deque(maxlen=sample_size)
+
+    def observe(self, seconds: float) -> None:
+        self.ewma = seconds if self.ewma is None else self.alpha * seconds + (1 - self.alpha) * self.ewma
+        self.count += 1
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50, p90 = self.quantile(0.50), self.quantile(0.90)
+        return {
+            "count": self.count,
+            "ewma": round(self.ewma, 3) if self.ewma is not None else None,
+            "p50": round(p50, 3) if p50 is not None else None,
+            "p90": round(p90, 3) if p90 is not None else None,
+        }
+
+
+@dataclass
+class _JobTrack:
+    """Estado de um job em execução neste worker"""
+    job_type: str
+    profile: Profile
+    mark: float  # Fim da etapa anterior (ou início da execução)
+    predictions: List[Tuple[float, float]] = field(default_factory=list)  # (emitida em, restante previsto)
+
+
+class StageDurationModel:
+    """
+    Durações históricas das etapas por (etapa, tipo de job, arquivos, tamanho)
+
+    A previsão usa o perfil exato do job quando ele já tem `min_samples` observações;
+    senão cai para o tipo de job e, por fim, para a etapa em qualquer job. A duração de
+    uma etapa inclui a espera na fila do estágio, que também faz parte do tempo restante.
+    """
+
+    def __init__(self, alpha: float = 0.2, sample_size: int = 200, min_samples: int = 3):
+        self.alpha = alpha
+        self.sample_size = sample_size
+        self.min_samples = min_samples
+        self._stats: Dict[Tuple[str, str, str, str], StageStats] = {}
+        self._jobs: Dict[str, _JobTrack] = {}
+
+        self.absolute_error = Histogram(ERROR_BUCKETS)
+        self.relative_error = Histogram(RELATIVE_ERROR_BUCKETS)
+        self._counters = {"predictions": 0, "fallbacks": 0, "jobs_evaluated": 0}
+
+    @staticmethod
+    def _keys(stage: str, job_type: str, profile: Profile) -> List[Tuple[str, str, str, str]]:
+        """Chaves do perfil mais específico ao mais geral"""
+        return [(stage, job_type, *profile), (stage, job_type, "*", "*"), (stage, "*", "*", "*")]
+
+    def observe(self, job_type: str, profile: Profile, stage: str, seconds: float) -> None:
+        for key in self._keys(stage, job_type, profile):
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = StageStats(self.alpha, self.sample_size)
+            stats.observe(seconds)
+
+    def stage_duration(self, job_type: str, profile: Profile, stage: str) -> Optional[float]:
+        """Duração prevista da etapa (EWMA do perfil mais específico com histórico suficiente)"""
+        for key in self._keys(stage, job_type, profile):
+            stats = self._stats.get(key)
+            if stats is not None and stats.count >= self.min_samples:
+                return stats.ewma
+        return None
+
+    def predict(self, job_type: str, profile: Profile, stages: List[str]) -> Optional[float]:
+        """Soma das durações previstas; None se alguma etapa ainda não tem histórico"""
+        total = 0.0
+        for stage in stages:
+            seconds = self.stage_duration(job_type, profile, stage)
+            if seconds is None:
+                return None
+            total += seconds
+        return total
+
+    # Acompanhamento dos jobs em execução
+    def begin(self, job_id: str, job_type: str, profile: Profile, now: Optional[float] = None) -> None:
+        self._jobs[job_id] = _JobTrack(job_type, profile, time.monotonic() if now is None else now)
+
+    def stage_finished(self, job_id: str, stage: str, now: Optional[float] = None) -> None:
+        track = self._jobs.get(job_id)
+        if track is None:
+            return
+        now = time.monotonic() if now is None else now
+        self.observe(track.job_type, track.profile, stage, now - track.mark)
+        track.mark = now
+
+    def remaining(self, job_id: str, current: str, following: List[str],
+                  now: Optional[float] = None) -> Optional[float]:
+        """Tempo restante previsto: o que falta da etapa atual mais as etapas seguintes"""
+        track = self._jobs.get(job_id)
+        if track is None:
+            return None
+        now = time.monotonic() if now is None else now
+        current_seconds = self.stage_duration(track.job_type, track.profile, current)
+        rest = self.predict(track.job_type, track.profile, following)
+        if current_seconds is None or rest is None:
+            self._counters["fallbacks"] += 1
+            return None
+
+        seconds = max(current_seconds - (now - track.mark), 0.0) + rest
+        track.predictions.append((now, seconds))
+        self._counters["predictions"] += 1
+        return seconds
+
+    def finish(self, job_id: str, completed: bool, now: Optional[float] = None) -> None:
+        """Encerra o acompanhamento; jobs concluídos têm as previsões comparadas ao real"""
+        track = self._jobs.pop(job_id, None)
+        if track is None or not completed or not track.predictions:
+            return
+        now = time.monotonic() if now is None else now
+        for issued_at, predicted in track.predictions:
+            actual = now - issued_at
+            error = abs(predicted - actual)
+            self.absolute_error.observe(error)
+            if actual > 0:
+                self.relative_error.observe(error / actual)
+        self._counters["jobs_evaluated"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "alpha": self.alpha,
+            "min_samples": self.min_samples,
+            "tracked_jobs": len(self._jobs),
+            **self._counters,
+            "absolute_error_seconds": self.absolute_error.snapshot(),
+            "relative_error": self.relative_error.snapshot(),
+            "stages": {
+                f"{stage}/{job_type}/{files}/{size}": stats.snapshot()
+                for (stage, job_type, files, size), stats in self._stats.items()
+            },
+        }
@@ -0,0 +1,171 @@
+"""
+Pipeline de jobs em estágios ligados por filas limitadas
+Estágios de CPU (OpenCV, varredura de regras) usam um ProcessPoolExecutor do tamanho do
+número de núcleos; estágios de I/O (OCR, LLM, RAG) rodam como workers assíncronos. Jobs
+diferentes ocupam estágios diferentes ao mesmo tempo e o event loop fica livre para os
+pushes de WebSocket.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.services.llm_gateway import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PipelineItem:
+    """Job em trânsito pelos estágios; `context` carrega os resultados intermediários"""
+    job_id: str
+    route: List[str]
+    done: asyncio.Future
+    context: Dict[str, Any] = field(default_factory=dict)
+    position: int = 0
+    cancelled: bool = False
+    task: Optional[asyncio.Task] = None
+
+    @property
+    def stage(self) -> str:
+        return self.route[self.position]
+
+    def cancel(self) -> None:
+        """Descarta o item nas filas e interrompe o estágio em execução"""
+        self.cancelled = True
+        if self.task is not None:
+            self.task.cancel()
+
+
+@dataclass
+class PipelineStage:
+    """Estágio do pipeline: `kind` "cpu" usa o pool de processos (um worker por núcleo)"""
+    name: str
+    handler: Callable[[PipelineItem], Awaitable[None]]
+    kind: str = "io"
+    workers: int = 4
+
+
+class StagePipeline:
+    """
+    Estágios com fila própria (asyncio.Queue limitada) e workers dedicados
+
+    Um item passa de um estágio ao seguinte pela fila do próximo; com a fila cheia o
+    worker anterior espera (backpressure), em vez de acumular jobs na memória.
+    """
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int = 32,
+                 cpu_workers: Optional[int] = None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.queue_size = queue_size
+        self.cpu_workers = cpu_workers or os.cpu_count() or 1
+
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: List[asyncio.Task] = []
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._metrics: Dict[str, Dict[str, Any]] = {
+            name: {"processed": 0, "failed": 0, "busy": 0, "seconds": Histogram()}
+            for name in self.stages
+        }
+
+    @property
+    def cpu_executor(self) -> ProcessPoolExecutor:
+        """Pool de processos compartilhado pelos estágios de CPU (criado no primeiro uso)"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.cpu_workers)
+        return self._executor
+
+    def _ensure_started(self) -> None:
+        if self._workers:
+            return
+        loop = asyncio.get_running_loop()
+        for stage in self.stages.values():
+            self._queues[stage.name] = asyncio.Queue(maxsize=self.queue_size)
+            workers = self.cpu_workers if stage.kind == "cpu" else stage.workers
+            self._workers.extend(loop.create_task(self._worker(stage)) for _ in range(workers))
+
+    async def run(self, job_id: str, route: List[str],
+                  context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Passa o job por `route` e devolve o contexto final (ou a exceção do estágio)"""
+        unknown = [name for name in route if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Estágio(s) desconhecido(s): {', '.join(unknown)}")
+        if not route:
+            return context or {}
+
+        self._ensure_started()
+        item = PipelineItem(job_id, route, asyncio.get_running_loop().create_future(), context or {})
+        try:
+            await self._queues[route[0]].put(item)
+            return await item.done
+        except asyncio.CancelledError:
+            # Job cancelado ou com prazo estourado: sai das filas e do estágio atual
+            item.cancel()
+            raise
+
+    async def _worker(self, stage: PipelineStage) -> None:
+        queue = self._queues[stage.name]
+        metrics = self._metrics[stage.name]
+        while True:
+            item = await queue.get()
+            if item.cancelled or item.done.done():
+                continue
+
+            started = time.perf_counter()
+            metrics["busy"] += 1
+            item.task = asyncio.create_task(stage.handler(item))
+            try:
+                await item.task
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise  # Shutdown do próprio worker
+                continue
+            except Exception as e:
+                metrics["failed"] += 1
+                if not item.cancelled and not item.done.done():
+                    item.done.set_exception(e)
+                continue
+            finally:
+                item.task = None
+                metrics["busy"] -= 1
+                metrics["seconds"].observe(time.perf_counter() - started)
+
+            metrics["processed"] += 1
+            item.position += 1
+            if item.position < len(item.route):
+                await self._queues[item.stage].put(item)
+            elif not item.done.done():
+                item.done.set_result(item.context)
+
+    async def shutdown(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queues = {}
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Fila, ocupação e tempo de cada estágio"""
+        return {
+            "cpu_workers": self.cpu_workers,
+            "queue_size": self.queue_size,
+            "stages": {
+                name: {
+                    "kind": stage.kind,
+                    "workers": self.cpu_workers if stage.kind == "cpu" else stage.workers,
+                    "queue_depth": self._queues[name].qsize() if name in self._queues else 0,
+                    "busy": self._metrics[name]["busy"],
+                    "processed": self._metrics[name]["processed"],
+                    "failed": self._metrics[name]["failed"],
+                    "seconds": self._metrics[name]["seconds"].snapshot(),
+                }
+                for name, stage in self.stages.items()
+            },
+        }
@@ -0,0 +1,163 @@
+"""
+Resultados grandes de jobs fora da memória
+Ao fim do job, resultados acima de JOB_RESULT_SPILL_BYTES são gravados em disco (ou no
+bucket R2) e o job guarda só a referência; /jobs/{id}/result carrega sob demanda.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ResultSpill(ABC):
+    """Destino dos resultados descarregados; os objetos são identificados pelo job_id"""
+
+    def __init__(self, threshold_bytes: int = 32768):
+        self.threshold_bytes = threshold_bytes
+        self._stats = {"spilled": 0, "spilled_bytes": 0, "loads": 0, "discarded": 0}
+
+    @abstractmethod
+    async def _save(self, job_id: str, payload: bytes) -> str:
+        """Grava o payload e devolve a referência (caminho ou chave)"""
+        pass
+
+    @abstractmethod
+    async def _load(self, job_id: str) -> bytes:
+        pass
+
+    @abstractmethod
+    async def _delete(self, job_ids: List[str]) -> None:
+        """Remove os objetos existentes (ids sem resultado descarregado são ignorados)"""
+        pass
+
+    async def spill(self, job: Any) -> bool:
+        """Move job.result para fora da memória se passar do limite"""
+        if job.result is None:
+            return False
+        payload = json.dumps(job.result, default=str).encode("utf-8")
+        if len(payload) < self.threshold_bytes:
+            return False
+
+        job.result_ref = await self._save(job.id, payload)
+        job.result = None
+        self._stats["spilled"] += 1
+        self._stats["spilled_bytes"] += len(payload)
+        return True
+
+    async def load(self, job: Any) -> Optional[Dict[str, Any]]:
+        """Resultado do job, lido do destino quando foi descarregado"""
+        if job.result is not None or not job.result_ref:
+            return job.result
+        self._stats["loads"] += 1
+        return json.loads(await self._load(job.id))
+
+    async def discard(self, job_ids: List[str]) -> None:
+        """Apaga os resultados de jobs removidos pela retenção"""
+        if not job_ids:
+            return
+        try:
+            await self._delete(job_ids)
+            self._stats["discarded"] += len(job_ids)
+        except Exception as e:
+            logger.warning(f"Falha ao apagar resultados de {len(job_ids)} job(s): {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "threshold_bytes": self.threshold_bytes, **self._stats}
+
+
+class DiskResultSpill(ResultSpill):
+    """Um arquivo JSON por job num diretório local (compartilhado pelos workers do nó)"""
+
+    def __init__(self, directory: str, threshold_bytes: int = 32768):
+        super().__init__(threshold_bytes)
+        self.directory = directory
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    async def _save(self, job_id: str, payload: bytes) -> str:
+        path = self._path(job_id)
+
+        def _write():
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(payload)
+
+        await asyncio.to_thread(_write)
+        return path
+
+    async def _load(self, job_id: str) -> bytes:
+        def _read():
+            with open(self._path(job_id), "rb") as f:
+                return f.read()
+
+        return await asyncio.to_thread(_read)
+
+    async def _delete(self, job_ids: List[str]) -> None:
+        def _remove():
+            for job_id in job_ids:
+                try:
+                    os.remove(self._path(job_id))
+                except FileNotFoundError:
+                    pass
+
+        await asyncio.to_thread(_remove)
+
+
+class ObjectStorageResultSpill(ResultSpill):
+    """Objetos no bucket R2 (API S3), visíveis para workers de todos os nós"""
+
+    PREFIX = "job-results/"
+
+    def __init__(self, threshold_bytes: int = 32768):
+        super().__init__(threshold_bytes)
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client(
+                "s3",
+                endpoint_url=settings.R2_ENDPOINT_URL,
+                aws_access_key_id=settings.R2_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY
+            )
+        return self._client
+
+    async def _save(self, job_id: str, payload: bytes) -> str:
+        key = f"{self.PREFIX}{job_id}.json"
+        await asyncio.to_thread(
+            self.client.put_object, Bucket=settings.R2_BUCKET_NAME, Key=key,
+            Body=payload, ContentType="application/json"
+        )
+        return key
+
+    async def _load(self, job_id: str) -> bytes:
+        response = await asyncio.to_thread(
+            self.client.get_object, Bucket=settings.R2_BUCKET_NAME, Key=f"{self.PREFIX}{job_id}.json"
+        )
+        return response["Body"].read()
+
+    async def _delete(self, job_ids: List[str]) -> None:
+        # delete_objects aceita até 1000 chaves por chamada
+        for start in range(0, len(job_ids), 1000):
+            keys = [{"Key": f"{self.PREFIX}{job_id}.json"} for job_id in job_ids[start:start + 1000]]
+            await asyncio.to_thread(
+                self.client.delete_objects, Bucket=settings.R2_BUCKET_NAME,
+                Delete={"Objects": keys, "Quiet": True}
+            )
+
+
+def create_result_spill() -> ResultSpill:
+    """Seleciona o destino conforme configuração (JOB_RESULT_SPILL_BACKEND)"""
+    if settings.JOB_RESULT_SPILL_BACKEND == "r2":
+        return ObjectStorageResultSpill(settings.JOB_RESULT_SPILL_BYTES)
+    return DiskResultSpill(settings.JOB_RESULT_SPILL_DIR, settings.JOB_RESULT_SPILL_BYTES)
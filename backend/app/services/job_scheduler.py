@@ -0,0 +1,151 @@
+"""
+Escalonador de jobs assíncronos com pool limitado de workers
+Fila justa por usuário (round-robin ponderado pelo plano de assinatura), para que um lote
+grande de um único cliente não deixe os demais usuários esperando
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from app.services.llm_gateway import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Jobs despachados por vez quando chega a vez do usuário no round-robin
+PLAN_WEIGHTS = {"premium": 4, "basic": 2, "free": 1}
+
+WAIT_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+@dataclass
+class QueuedJob:
+    """Job aguardando um worker"""
+    job_id: str
+    user_id: str
+    plan: str
+    enqueued_at: float
+    cancelled: bool = False
+
+
+class FairJobScheduler:
+    """
+    Fila de prioridade + N workers
+
+    Cada usuário tem a sua fila FIFO; os usuários com jobs pendentes formam um anel
+    atendido em round-robin (deficit round-robin): na sua vez, o usuário despacha até
+    PLAN_WEIGHTS[plano] jobs e volta para o fim do anel. Planos pagos andam mais rápido,
+    mas nenhum usuário fica sem vez, por maior que seja a fila dos outros.
+    """
+
+    def __init__(self, runner: Callable[[str], Awaitable[Any]], max_workers: int = 5,
+                 plan_weights: Optional[Dict[str, int]] = None):
+        self.runner = runner
+        self.max_workers = max_workers
+        self.plan_weights = plan_weights or PLAN_WEIGHTS
+
+        self._queues: "OrderedDict[str, Deque[QueuedJob]]" = OrderedDict()
+        self._credits: Dict[str, int] = {}
+        self._index: Dict[str, QueuedJob] = {}
+        self._ready = asyncio.Semaphore(0)
+        self._workers: List[asyncio.Task] = []
+        self._running = 0
+
+        self.wait_time = Histogram(WAIT_BUCKETS)
+        self.wait_time_by_plan: Dict[str, Histogram] = {}
+        self._stats = {"submitted": 0, "dispatched": 0, "cancelled": 0, "failed": 0}
+
+    def submit(self, job_id: str, user_id: str, plan: str = "free") -> None:
+        """Enfileira o job; os workers são iniciados no primeiro envio"""
+        item = QueuedJob(job_id, user_id, plan if plan in self.plan_weights else "free", time.monotonic())
+        self._queues.setdefault(user_id, deque()).append(item)
+        self._index[job_id] = item
+        self._stats["submitted"] += 1
+        self._ensure_workers()
+        self._ready.release()
+
+    def cancel(self, job_id: str) -> bool:
+        """Retira da fila um job que ainda não começou"""
+        item = self._index.pop(job_id, None)
+        if item is None:
+            return False
+        # Remoção preguiçosa: o worker descarta o item ao retirá-lo da fila
+        item.cancelled = True
+        self._stats["cancelled"] += 1
+        return True
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """Posição aproximada (jobs à frente na fila do próprio usuário)"""
+        item = self._index.get(job_id)
+        if item is None:
+            return None
+        queue = self._queues.get(item.user_id, ())
+        return sum(1 for queued in queue if not queued.cancelled and queued.enqueued_at < item.enqueued_at)
+
+    def _ensure_workers(self) -> None:
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        loop = asyncio.get_running_loop()
+        while len(self._workers) < self.max_workers:
+            self._workers.append(loop.create_task(self._worker()))
+
+    def _next(self) -> QueuedJob:
+        user_id, queue = next(iter(self._queues.items()))
+        if self._credits.get(user_id, 0) <= 0:
+            self._credits[user_id] = self.plan_weights[queue[0].plan]
+
+        item = queue.popleft()
+        self._credits[user_id] -= 1
+        if not queue:
+            del self._queues[user_id]
+            self._credits.pop(user_id, None)
+        elif self._credits[user_id] <= 0:
+            self._queues.move_to_end(user_id)
+        return item
+
+    async def _worker(self) -> None:
+        while True:
+            await self._ready.acquire()
+            item = self._next()
+            if item.cancelled:
+                continue
+            self._index.pop(item.job_id, None)
+
+            waited = time.monotonic() - item.enqueued_at
+            self.wait_time.observe(waited)
+            self.wait_time_by_plan.setdefault(item.plan, Histogram(WAIT_BUCKETS)).observe(waited)
+            self._stats["dispatched"] += 1
+
+            self._running += 1
+            try:
+                await self.runner(item.job_id)
+            except Exception as e:
+                self._stats["failed"] += 1
+                logger.error(f"Worker falhou ao executar job {item.job_id}: {e}")
+            finally:
+                self._running -= 1
+
+    async def shutdown(self) -> None:
+        """Encerra os workers (jobs em execução são cancelados)"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Profundidade da fila, ocupação dos workers e tempo de espera"""
+        depth_by_plan: Dict[str, int] = {}
+        for item in self._index.values():
+            depth_by_plan[item.plan] = depth_by_plan.get(item.plan, 0) + 1
+        return {
+            "max_workers": self.max_workers,
+            "running": self._running,
+            "queue_depth": len(self._index),
+            "queue_depth_by_plan": depth_by_plan,
+            "queued_users": len(self._queues),
+            "wait_seconds": self.wait_time.snapshot(),
+            "wait_seconds_by_plan": {plan: h.snapshot() for plan, h in self.wait_time_by_plan.items()},
+            **self._stats,
+        }
@@ -0,0 +1,472 @@
+"""
+Repositório durável de jobs do processamento assíncrono
+Os jobs sobrevivem a reinícios e ficam visíveis para todos os workers do uvicorn. As
+atualizações de progresso são gravadas em lote (write-behind), fora do caminho crítico.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import sys
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Registro serializado de um job (ContractJob.to_dict() passado por JSON)
+JobRecord = Dict[str, Any]
+
+
+def _to_record(job: Any) -> JobRecord:
+    # Ida e volta por JSON: enums viram valores e o registro fica desacoplado do objeto vivo
+    return json.loads(json.dumps(job.to_dict(), default=str))
+
+
+def approx_size(obj: Any, _seen: Optional[set] = None) -> int:
+    """Bytes aproximados de um objeto e do que ele referencia (enums compartilhados não contam)"""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen or isinstance(obj, Enum):
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_size(k, seen) + approx_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(approx_size(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += approx_size(vars(obj), seen)
+    elif hasattr(obj, "__slots__"):
+        size += sum(approx_size(getattr(obj, name), seen) for name in obj.__slots__ if hasattr(obj, name))
+    return size
+
+
+class JobStore(ABC):
+    """Interface do repositório de jobs usada pelo AsyncContractProcessor"""
+
+    @abstractmethod
+    def put(self, job: Any, urgent: bool = False) -> None:
+        """Registra o estado atual do job sem bloquear o chamador"""
+        pass
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    async def list_user_jobs(self, user_id: str, status: Optional[str] = None,
+                             limit: Optional[int] = None) -> List[Any]:
+        """Jobs do usuário em ordem de criação (os `limit` mais recentes)"""
+        pass
+
+    @abstractmethod
+    async def count_by_status(self) -> Dict[str, int]:
+        pass
+
+    @abstractmethod
+    async def purge(self, before: datetime, statuses: Iterable[str]) -> List[str]:
+        """Remove jobs com status em `statuses` sem atualização desde `before`; retorna os ids"""
+        pass
+
+    async def flush(self) -> int:
+        return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__}
+
+
+class MemoryJobStore(JobStore):
+    """
+    Jobs apenas em memória (comportamento original; um conjunto por processo)
+
+    Cada put mantém um índice por usuário (em ordem de criação) e contadores por status,
+    para que listagens custem O(jobs do usuário) e contagens O(1), sem varrer todos os
+    jobs já criados. `_touched` fica em ordem de último put, então a retenção percorre
+    só os jobs mais antigos.
+    """
+
+    # Jobs recentes medidos para estimar a memória por job
+    SIZE_SAMPLE = 100
+
+    def __init__(self):
+        self._jobs: Dict[str, Any] = {}
+        self._by_user: Dict[str, Dict[str, Any]] = {}
+        self._status_of: Dict[str, str] = {}
+        self._status_counts: Dict[str, int] = {}
+        self._touched: "OrderedDict[str, datetime]" = OrderedDict()
+
+    def put(self, job: Any, urgent: bool = False) -> None:
+        self._jobs[job.id] = job
+        self._by_user.setdefault(job.user_id, {})[job.id] = job
+        self._touched[job.id] = datetime.utcnow()
+        self._touched.move_to_end(job.id)
+
+        status = getattr(job.status, "value", job.status)
+        previous = self._status_of.get(job.id)
+        if previous == status:
+            return
+        if previous is not None:
+            self._status_counts[previous] -= 1
+            if not self._status_counts[previous]:
+                del self._status_counts[previous]
+        self._status_of[job.id] = status
+        self._status_counts[status] = self._status_counts.get(status, 0) + 1
+
+    async def get(self, job_id: str) -> Optional[Any]:
+        return self._jobs.get(job_id)
+
+    async def list_user_jobs(self, user_id: str, status: Optional[str] = None,
+                             limit: Optional[int] = None) -> List[Any]:
+        # Do mais recente para o mais antigo, parando ao atingir `limit`
+        jobs: List[Any] = []
+        for job_id, job in reversed(self._by_user.get(user_id, {}).items()):
+            if status is None or self._status_of[job_id] == status:
+                jobs.append(job)
+                if limit and len(jobs) == limit:
+                    break
+        jobs.reverse()
+        return jobs
+
+    async def count_by_status(self) -> Dict[str, int]:
+        return dict(self._status_counts)
+
+    async def purge(self, before: datetime, statuses: Iterable[str]) -> List[str]:
+        statuses = set(statuses)
+        expired = []
+        for job_id, touched in self._touched.items():
+            if touched >= before:
+                break
+            if self._status_of[job_id] in statuses:
+                expired.append(job_id)
+
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            del self._touched[job_id]
+            user_jobs = self._by_user[job.user_id]
+            del user_jobs[job_id]
+            if not user_jobs:
+                del self._by_user[job.user_id]
+            status = self._status_of.pop(job_id)
+            self._status_counts[status] -= 1
+            if not self._status_counts[status]:
+                del self._status_counts[status]
+        return expired
+
+    def get_stats(self) -> Dict[str, Any]:
+        sample = [self._jobs[job_id] for job_id, _ in zip(reversed(self._touched), range(self.SIZE_SAMPLE))]
+        bytes_per_job = sum(approx_size(job) for job in sample) // len(sample) if sample else 0
+        return {
+            "backend": type(self).__name__,
+            "jobs": len(self._jobs),
+            "users": len(self._by_user),
+            "approx_bytes_per_job": bytes_per_job,
+            "approx_bytes": bytes_per_job * len(self._jobs),
+        }
+
+
+class WriteBehindJobStore(JobStore):
+    """
+    Base dos repositórios persistentes com gravação em lote
+
+    `put` só marca o job como pendente; uma tarefa em segundo plano grava os pendentes a
+    cada `flush_interval` segundos, ou logo em seguida quando o lote chega a `max_batch`
+    ou a atualização é urgente (criação, status final). O job é serializado no momento do
+    flush, então vários updates de progresso do mesmo job viram uma única escrita.
+    Leituras pontuais consultam os pendentes antes do banco; listagens e contagens fazem
+    flush antes de consultar.
+    """
+
+    def __init__(self, loader: Callable[[JobRecord], Any],
+                 flush_interval: float = 0.5, max_batch: int = 200):
+        self.loader = loader
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        self._pending: Dict[str, Any] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stats = {"puts": 0, "flushes": 0, "rows_written": 0, "flush_errors": 0}
+
+    @abstractmethod
+    async def _write(self, records: List[JobRecord]) -> None:
+        """Upsert de um lote de registros"""
+        pass
+
+    @abstractmethod
+    async def _read(self, job_id: str) -> Optional[JobRecord]:
+        pass
+
+    @abstractmethod
+    async def _read_user(self, user_id: str, status: Optional[str],
+                         limit: Optional[int]) -> List[JobRecord]:
+        """Registros do usuário em ordem crescente de criação"""
+        pass
+
+    @abstractmethod
+    async def _count_by_status(self) -> Dict[str, int]:
+        pass
+
+    @abstractmethod
+    async def _purge(self, before: datetime, statuses: List[str]) -> List[str]:
+        pass
+
+    def put(self, job: Any, urgent: bool = False) -> None:
+        self._pending[job.id] = job
+        self._stats["puts"] += 1
+        if urgent or len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Grava os jobs pendentes; em caso de falha eles voltam para a fila"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            try:
+                await self._write([_to_record(job) for job in batch.values()])
+            except Exception as e:
+                self._stats["flush_errors"] += 1
+                logger.warning(f"Falha ao gravar {len(batch)} job(s) no repositório: {e}")
+                for job_id, job in batch.items():
+                    self._pending.setdefault(job_id, job)
+                return 0
+
+            self._stats["flushes"] += 1
+            self._stats["rows_written"] += len(batch)
+            return len(batch)
+
+    async def get(self, job_id: str) -> Optional[Any]:
+        job = self._pending.get(job_id)
+        if job is not None:
+            return job
+        record = await self._read(job_id)
+        return self.loader(record) if record else None
+
+    async def list_user_jobs(self, user_id: str, status: Optional[str] = None,
+                             limit: Optional[int] = None) -> List[Any]:
+        await self.flush()
+        return [self.loader(record) for record in await self._read_user(user_id, status, limit)]
+
+    async def count_by_status(self) -> Dict[str, int]:
+        await self.flush()
+        return await self._count_by_status()
+
+    async def purge(self, before: datetime, statuses: Iterable[str]) -> List[str]:
+        await self.flush()
+        return await self._purge(before, list(statuses))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "pending_writes": len(self._pending),
+            "flush_interval": self.flush_interval,
+            "max_batch": self.max_batch,
+            **self._stats,
+        }
+
+
+class SQLiteJobStore(WriteBehindJobStore):
+    """Repositório em disco (SQLite) para execuções locais"""
+
+    def __init__(self, path: str, loader: Callable[[JobRecord], Any], **kwargs):
+        super().__init__(loader, **kwargs)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = asyncio.Lock()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS async_jobs (
+                id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                job_type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                data TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_async_jobs_user_id_created_at "
+            "ON async_jobs (user_id, created_at)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_async_jobs_status ON async_jobs (status)")
+        self._conn.commit()
+
+    async def _run(self, fn: Callable[[], Any]) -> Any:
+        async with self._lock:
+            return await asyncio.to_thread(fn)
+
+    async def _write(self, records: List[JobRecord]) -> None:
+        def _write():
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO async_jobs "
+                "(id, user_id, job_type, status, created_at, updated_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (r["id"], r["user_id"], r["job_type"], r["status"],
+                     r["created_at"], r["updated_at"], json.dumps(r))
+                    for r in records
+                ]
+            )
+            self._conn.commit()
+
+        await self._run(_write)
+
+    async def _read(self, job_id: str) -> Optional[JobRecord]:
+        def _read():
+            return self._conn.execute("SELECT data FROM async_jobs WHERE id = ?", (job_id,)).fetchone()
+
+        row = await self._run(_read)
+        return json.loads(row[0]) if row else None
+
+    async def _read_user(self, user_id: str, status: Optional[str],
+                         limit: Optional[int]) -> List[JobRecord]:
+        def _read_user():
+            query = "SELECT data FROM async_jobs WHERE user_id = ?"
+            params: List[Any] = [user_id]
+            if status:
+                query += " AND status = ?"
+                params.append(status)
+            query += " ORDER BY created_at DESC LIMIT ?"
+            params.append(limit or -1)
+            return self._conn.execute(query, params).fetchall()
+
+        rows = await self._run(_read_user)
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    async def _count_by_status(self) -> Dict[str, int]:
+        def _count():
+            return self._conn.execute("SELECT status, COUNT(*) FROM async_jobs GROUP BY status").fetchall()
+
+        return dict(await self._run(_count))
+
+    async def _purge(self, before: datetime, statuses: List[str]) -> List[str]:
+        def _purge():
+            where = f"status IN ({', '.join('?' * len(statuses))}) AND updated_at < ?"
+            params = [*statuses, before.isoformat()]
+            ids = [row[0] for row in self._conn.execute(f"SELECT id FROM async_jobs WHERE {where}", params)]
+            self._conn.execute(f"DELETE FROM async_jobs WHERE {where}", params)
+            self._conn.commit()
+            return ids
+
+        return await self._run(_purge)
+
+
+class DatabaseJobStore(WriteBehindJobStore):
+    """Repositório compartilhado no Postgres (tabela async_jobs)"""
+
+    async def _write(self, records: List[JobRecord]) -> None:
+        from sqlalchemy.dialects.postgresql import insert
+        from app.db.database import AsyncSessionLocal
+        from app.db.models import AsyncJobRecord
+
+        rows = [
+            {
+                "id": r["id"],
+                "user_id": r["user_id"],
+                "job_type": r["job_type"],
+                "status": r["status"],
+                "created_at": datetime.fromisoformat(r["created_at"]),
+                "updated_at": datetime.fromisoformat(r["updated_at"]),
+                "data": r,
+            }
+            for r in records
+        ]
+        statement = insert(AsyncJobRecord).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[AsyncJobRecord.id],
+            set_={
+                "status": statement.excluded.status,
+                "updated_at": statement.excluded.updated_at,
+                "data": statement.excluded.data,
+            }
+        )
+        async with AsyncSessionLocal() as db:
+            await db.execute(statement)
+            await db.commit()
+
+    async def _read(self, job_id: str) -> Optional[JobRecord]:
+        from sqlalchemy import select
+        from app.db.database import AsyncSessionLocal
+        from app.db.models import AsyncJobRecord
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(AsyncJobRecord.data).where(AsyncJobRecord.id == job_id))
+            return result.scalar_one_or_none()
+
+    async def _read_user(self, user_id: str, status: Optional[str],
+                         limit: Optional[int]) -> List[JobRecord]:
+        from sqlalchemy import select
+        from app.db.database import AsyncSessionLocal
+        from app.db.models import AsyncJobRecord
+
+        query = (
+            select(AsyncJobRecord.data)
+            .where(AsyncJobRecord.user_id == user_id)
+            .order_by(AsyncJobRecord.created_at.desc())
+        )
+        if status:
+            query = query.where(AsyncJobRecord.status == status)
+        if limit:
+            query = query.limit(limit)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(query)
+            return list(reversed(result.scalars().all()))
+
+    async def _count_by_status(self) -> Dict[str, int]:
+        from sqlalchemy import func, select
+        from app.db.database import AsyncSessionLocal
+        from app.db.models import AsyncJobRecord
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(AsyncJobRecord.status, func.count()).group_by(AsyncJobRecord.status)
+            )
+            return dict(result.all())
+
+    async def _purge(self, before: datetime, statuses: List[str]) -> List[str]:
+        from sqlalchemy import delete
+        from app.db.database import AsyncSessionLocal
+        from app.db.models import AsyncJobRecord
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(AsyncJobRecord)
+                .where(AsyncJobRecord.status.in_(statuses), AsyncJobRecord.updated_at < before)
+                .returning(AsyncJobRecord.id)
+            )
+            await db.commit()
+            return list(result.scalars().all())
+
+
+def create_job_store(loader: Callable[[JobRecord], Any]) -> JobStore:
+    """Seleciona o repositório conforme configuração (JOB_STORE_BACKEND)"""
+    options = {
+        "flush_interval": settings.JOB_STORE_FLUSH_INTERVAL_SECONDS,
+        "max_batch": settings.JOB_STORE_MAX_BATCH,
+    }
+    if settings.JOB_STORE_BACKEND == "sqlite":
+        return SQLiteJobStore(settings.JOB_STORE_SQLITE_PATH, loader, **options)
+    if settings.JOB_STORE_BACKEND == "postgres":
+        return DatabaseJobStore(loader, **options)
+    return MemoryJobStore()
@@ -0,0 +1,429 @@
+"""
+Cache de respostas do LLM com fingerprint de prompt
+Evita chamadas repetidas ao Claude para prompts idênticos (ex.: o mesmo contrato de adesão
+enviado por milhares de usuários)
+"""
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """Resposta armazenada para um fingerprint de prompt"""
+    key: str
+    model: str
+    response_text: str
+    created_at: float
+    expires_at: float
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) >= self.expires_at
+
+
+class CacheBackend(ABC):
+    """Armazenamento persistente atrás do LRU em memória"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        pass
+
+    @abstractmethod
+    async def set(self, entry: CacheEntry) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    async def purge_expired(self) -> int:
+        pass
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Backend em disco (SQLite) para execuções locais e workers isolados"""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = asyncio.Lock()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_response_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response_text TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS llm_response_cache_access_idx "
+            "ON llm_response_cache (last_accessed_at)"
+        )
+        self._conn.commit()
+
+    async def _run(self, fn: Callable[[], Any]) -> Any:
+        async with self._lock:
+            return await asyncio.to_thread(fn)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        def _get():
+            row = self._conn.execute(
+                "SELECT key, model, response_text, created_at, expires_at "
+                "FROM llm_response_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "UPDATE llm_response_cache SET last_accessed_at = ? WHERE key = ?",
+                    (time.time(), key)
+                )
+                self._conn.commit()
+            return row
+
+        row = await self._run(_get)
+        return CacheEntry(*row) if row else None
+
+    async def set(self, entry: CacheEntry) -> None:
+        def _set():
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_response_cache "
+                "(key, model, response_text, created_at, expires_at, last_accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (entry.key, entry.model, entry.response_text,
+                 entry.created_at, entry.expires_at, time.time())
+            )
+            # Eviction LRU quando ultrapassa o limite de entradas
+            self._conn.execute(
+                "DELETE FROM llm_response_cache WHERE key IN ("
+                "SELECT key FROM llm_response_cache ORDER BY last_accessed_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+        await self._run(_set)
+
+    async def delete(self, key: str) -> None:
+        def _delete():
+            self._conn.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+        await self._run(_delete)
+
+    async def purge_expired(self) -> int:
+        def _purge():
+            cursor = self._conn.execute(
+                "DELETE FROM llm_response_cache WHERE expires_at <= ?", (time.time(),)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+        return await self._run(_purge)
+
+
+class DatabaseCacheBackend(CacheBackend):
+    """Backend compartilhado no Postgres (tabela llm_response_cache)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        from sqlalchemy import select
+        from app.db.database import AsyncSessionLocal
+        from app.db.models import LLMResponseCacheEntry
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(LLMResponseCacheEntry).where(LLMResponseCacheEntry.key == key)
+            )
+            row = result.scalar_one_or_none()
+            if not row:
+                return None
+
+            row.last_accessed_at = time.time()
+            await db.commit()
+            return CacheEntry(
+                key=row.key,
+                model=row.model,
+                response_text=row.response_text,
+                created_at=row.created_at,
+                expires_at=row.expires_at
+            )
+
+    async def set(self, entry: CacheEntry) -> None:
+        from sqlalchemy import delete, select
+        from app.db.database import AsyncSessionLocal
+        from app.db.models import LLMResponseCacheEntry
+
+        async with AsyncSessionLocal() as db:
+            await db.merge(LLMResponseCacheEntry(
+                key=entry.key,
+                model=entry.model,
+                response_text=entry.response_text,
+                created_at=entry.created_at,
+                expires_at=entry.expires_at,
+                last_accessed_at=time.time()
+            ))
+
+            # Eviction LRU quando ultrapassa o limite de entradas
+            stale = (
+                select(LLMResponseCacheEntry.key)
+                .order_by(LLMResponseCacheEntry.last_accessed_at.desc())
+                .offset(self.max_entries)
+            )
+            await db.execute(
+                delete(LLMResponseCacheEntry).where(LLMResponseCacheEntry.key.in_(stale))
+            )
+            await db.commit()
+
+    async def delete(self, key: str) -> None:
+        from sqlalchemy import delete
+        from app.db.database import AsyncSessionLocal
+        from app.db.models import LLMResponseCacheEntry
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(LLMResponseCacheEntry).where(LLMResponseCacheEntry.key == key))
+            await db.commit()
+
+    async def purge_expired(self) -> int:
+        from sqlalchemy import delete
+        from app.db.database import AsyncSessionLocal
+        from app.db.models import LLMResponseCacheEntry
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(LLMResponseCacheEntry).where(LLMResponseCacheEntry.expires_at <= time.time())
+            )
+            await db.commit()
+            return result.rowcount
+
+
+class LLMResponseCache:
+    """
+    Cache de respostas do LLM chaveado por (modelo, temperatura, hash do prompt normalizado)
+
+    Camada em memória (LRU com TTL) na frente de um backend persistente opcional.
+    Chamadas idênticas simultâneas compartilham a mesma requisição ao LLM.
+    """
+
+    def __init__(self,
+                 backend: Optional[CacheBackend] = None,
+                 ttl_seconds: int = 7 * 24 * 3600,
+                 max_entries: int = 10000,
+                 max_cacheable_temperature: float = 0.1,
+                 enabled: bool = True):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_cacheable_temperature = max_cacheable_temperature
+        self.enabled = enabled
+
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "bypassed": 0}
+        )
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Remove diferenças irrelevantes de espaçamento/indentação"""
+        return " ".join(prompt.split())
+
+    @classmethod
+    def fingerprint(cls, model: str, temperature: float, prompt: str) -> str:
+        """Gera a chave do cache para uma requisição"""
+        digest = hashlib.sha256(cls.normalize_prompt(prompt).encode("utf-8")).hexdigest()
+        return f"{model}:{temperature:.3f}:{digest}"
+
+    def is_cacheable(self, temperature: float) -> bool:
+        """Política: apenas respostas (quase) determinísticas são cacheadas"""
+        return self.enabled and temperature <= self.max_cacheable_temperature
+
+    async def get(self, model: str, temperature: float, prompt: str,
+                  agent: Optional[str] = None) -> Optional[str]:
+        """Busca resposta cacheada (memória primeiro, depois backend)"""
+        key = self.fingerprint(model, temperature, prompt)
+        entry = await self._lookup(key)
+        if agent:
+            self._stats[agent]["hits" if entry else "misses"] += 1
+        return entry.response_text if entry else None
+
+    async def set(self, model: str, temperature: float, prompt: str, response_text: str) -> None:
+        """Armazena resposta para o prompt"""
+        key = self.fingerprint(model, temperature, prompt)
+        await self._store(key, model, response_text)
+
+    async def get_or_create(self,
+                            model: str,
+                            temperature: float,
+                            prompt: str,
+                            factory: Callable[[], Awaitable[Union[str, Tuple[str, str]]]],
+                            agent: str = "unknown") -> str:
+        """Retorna a resposta cacheada ou chama `factory` e armazena o resultado
+
+        `factory` pode devolver `(texto, modelo)` quando outro modelo respondeu (ex.: hedge
+        em modelo de fallback); a resposta é então armazenada sob a chave desse modelo,
+        e não sob a do modelo pedido.
+        """
+        stats = self._stats[agent]
+
+        if not self.is_cacheable(temperature):
+            stats["bypassed"] += 1
+            response_text, _ = self._answer(await factory(), model)
+            return response_text
+
+        key = self.fingerprint(model, temperature, prompt)
+
+        entry = await self._lookup(key)
+        if entry:
+            stats["hits"] += 1
+            return entry.response_text
+
+        # Requisição idêntica já em andamento: aguarda o mesmo resultado
+        inflight = self._inflight.get(key)
+        if inflight:
+            stats["hits"] += 1
+            return await asyncio.shield(inflight)
+
+        stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response_text, answered_by = self._answer(await factory(), model)
+            if answered_by == model:
+                await self._store(key, model, response_text)
+            else:
+                await self.set(answered_by, temperature, prompt, response_text)
+            future.set_result(response_text)
+            return response_text
+        except BaseException as e:
+            future.set_exception(e)
+            # Evita "Future exception was never retrieved" quando não há espera
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    @staticmethod
+    def _answer(result: Union[str, Tuple[str, str]], model: str) -> Tuple[str, str]:
+        return result if isinstance(result, tuple) else (result, model)
+
+    async def invalidate(self, model: str, temperature: float, prompt: str) -> None:
+        """Remove uma resposta (ex.: resposta inválida que não pôde ser parseada)"""
+        key = self.fingerprint(model, temperature, prompt)
+        self._memory.pop(key, None)
+        if self.backend:
+            await self.backend.delete(key)
+
+    async def purge_expired(self) -> int:
+        """Remove entradas expiradas da memória e do backend"""
+        now = time.time()
+        expired = [key for key, entry in self._memory.items() if entry.is_expired(now)]
+        for key in expired:
+            del self._memory[key]
+
+        purged = len(expired)
+        if self.backend:
+            purged += await self.backend.purge_expired()
+        return purged
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna métricas de hit rate por agente"""
+        per_agent = {}
+        for agent, counters in self._stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            per_agent[agent] = {
+                **counters,
+                "hit_rate": counters["hits"] / lookups if lookups else 0.0
+            }
+
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__ if self.backend else "memory",
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "max_cacheable_temperature": self.max_cacheable_temperature,
+            "agents": per_agent
+        }
+
+    async def _lookup(self, key: str) -> Optional[CacheEntry]:
+        entry = self._memory.get(key)
+        if entry and not entry.is_expired():
+            self._memory.move_to_end(key)
+            return entry
+        if entry:
+            del self._memory[key]
+
+        if not self.backend:
+            return None
+
+        try:
+            entry = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Falha ao consultar cache persistente de LLM: {e}")
+            return None
+
+        if entry and not entry.is_expired():
+            self._remember(entry)
+            return entry
+        return None
+
+    async def _store(self, key: str, model: str, response_text: str) -> None:
+        now = time.time()
+        entry = CacheEntry(
+            key=key,
+            model=model,
+            response_text=response_text,
+            created_at=now,
+            expires_at=now + self.ttl_seconds
+        )
+        self._remember(entry)
+
+        if self.backend:
+            try:
+                await self.backend.set(entry)
+            except Exception as e:
+                logger.warning(f"Falha ao gravar cache persistente de LLM: {e}")
+
+    def _remember(self, entry: CacheEntry) -> None:
+        self._memory[entry.key] = entry
+        self._memory.move_to_end(entry.key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+def _create_backend() -> Optional[CacheBackend]:
+    """Seleciona o backend persistente conforme configuração"""
+    if settings.LLM_CACHE_BACKEND == "sqlite":
+        return SQLiteCacheBackend(settings.LLM_CACHE_SQLITE_PATH, settings.LLM_CACHE_MAX_ENTRIES)
+    if settings.LLM_CACHE_BACKEND == "postgres":
+        return DatabaseCacheBackend(settings.LLM_CACHE_MAX_ENTRIES)
+    return None
+
+
+# Instância global compartilhada pelos agentes
+llm_cache = LLMResponseCache(
+    backend=_create_backend(),
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    max_cacheable_temperature=settings.LLM_CACHE_MAX_TEMPERATURE,
+    enabled=settings.LLM_CACHE_ENABLED
+)
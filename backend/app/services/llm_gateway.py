@@ -0,0 +1,841 @@
+"""
+Gateway de acesso ao LLM
+Um único cliente assíncrono compartilhado com limites de concorrência (global e por modelo),
+rate limiting por tokens/minuto, retries com jitter, deadlines, requisições hedged e
+métricas de latência
+"""
+
+import asyncio
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Status HTTP que indicam falha transitória (rate limit, sobrecarga, erro no servidor)
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class LLMGatewayError(Exception):
+    """Falha definitiva ao chamar o LLM através do gateway"""
+
+
+class LLMDeadlineExceeded(LLMGatewayError):
+    """O prazo total da requisição (fila + tentativas) foi excedido"""
+
+
+class LLMBackendError(Exception):
+    """Erro retornado por um backend, com status HTTP opcional"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+@dataclass
+class TextBlock:
+    """Bloco de texto no formato do SDK (response.content[0].text)"""
+    text: str
+    type: str = "text"
+
+
+@dataclass
+class LLMResponse:
+    """Resposta normalizada de um backend"""
+    text: str
+    model: str
+    input_tokens: int = 0  # Entrada cobrada a preço cheio (fora do cache de prefixo)
+    output_tokens: int = 0
+    content: List[TextBlock] = field(default_factory=list)
+    cache_read_input_tokens: int = 0  # Prefixo servido do cache do provedor
+    cache_creation_input_tokens: int = 0  # Prefixo gravado no cache nesta chamada
+
+    def __post_init__(self):
+        if not self.content:
+            self.content = [TextBlock(self.text)]
+
+
+class LLMBackend(ABC):
+    """Transporte usado pelo gateway para efetivamente chamar o modelo"""
+
+    @abstractmethod
+    async def complete(self, model: str, prompt: str, max_tokens: int,
+                       temperature: float, system: Optional[str] = None) -> LLMResponse:
+        """`system` é o prefixo estável do prompt, candidato ao cache do provedor"""
+        pass
+
+    async def stream(self, model: str, prompt: str, max_tokens: int,
+                     temperature: float, system: Optional[str] = None) -> AsyncIterator[str]:
+        """Streaming de texto; por padrão entrega a resposta completa de uma vez"""
+        response = await self.complete(model, prompt, max_tokens, temperature, system)
+        yield response.text
+
+    async def close(self) -> None:
+        pass
+
+
+class AnthropicBackend(LLMBackend):
+    """Backend real: um único AsyncAnthropic com pool de conexões HTTP compartilhado"""
+
+    def __init__(self, api_key: str, max_connections: int, prompt_caching: bool = True):
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.prompt_caching = prompt_caching
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            import httpx
+            from anthropic import AsyncAnthropic
+
+            # Retries ficam a cargo do gateway para respeitar deadlines e métricas
+            self._client = AsyncAnthropic(
+                api_key=self.api_key,
+                max_retries=0,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections
+                    )
+                )
+            )
+        return self._client
+
+    def _request(self, model: str, prompt: str, max_tokens: int, temperature: float,
+                 system: Optional[str]) -> Dict[str, Any]:
+        request: Dict[str, Any] = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        }
+        if system:
+            block: Dict[str, Any] = {"type": "text", "text": system}
+            if self.prompt_caching:
+                # Tudo até este bloco (inclusive) vira um prefixo reaproveitável entre requisições
+                block["cache_control"] = {"type": "ephemeral"}
+            request["system"] = [block]
+        return request
+
+    async def complete(self, model: str, prompt: str, max_tokens: int,
+                       temperature: float, system: Optional[str] = None) -> LLMResponse:
+        response = await self._get_client().messages.create(
+            **self._request(model, prompt, max_tokens, temperature, system)
+        )
+        usage = getattr(response, "usage", None)
+        return LLMResponse(
+            text="".join(getattr(block, "text", "") for block in response.content),
+            model=model,
+            input_tokens=getattr(usage, "input_tokens", 0) or 0,
+            output_tokens=getattr(usage, "output_tokens", 0) or 0,
+            cache_read_input_tokens=getattr(usage, "cache_read_input_tokens", 0) or 0,
+            cache_creation_input_tokens=getattr(usage, "cache_creation_input_tokens", 0) or 0
+        )
+
+    async def stream(self, model: str, prompt: str, max_tokens: int,
+                     temperature: float, system: Optional[str] = None) -> AsyncIterator[str]:
+        async with self._get_client().messages.stream(
+            **self._request(model, prompt, max_tokens, temperature, system)
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Backend local para testes e desenvolvimento
+
+    Responde com `responder(prompt)` (ou texto fixo), simula latência (fixa ou, com
+    `latencies`, uma por chamada em ordem) e pode falhar
+    as primeiras `failures` chamadas com `failure_status` para exercitar os retries.
+    Simula o cache de prefixo do provedor: um `system` já visto (com ao menos
+    `min_cacheable_tokens`, por padrão o mínimo do provedor para o modelo) é contado
+    como leitura de cache em vez de entrada cheia.
+    """
+
+    def __init__(self,
+                 responder: Optional[Callable[[str], str]] = None,
+                 response_text: str = "{}",
+                 latency: float = 0.0,
+                 failures: int = 0,
+                 failure_status: int = 429,
+                 chunk_size: int = 16,
+                 min_cacheable_tokens: Optional[int] = None,
+                 latencies: Optional[List[float]] = None):
+        self.responder = responder
+        self.response_text = response_text
+        self.latency = latency
+        self.latencies = list(latencies or [])
+        self.failures = failures
+        self.failure_status = failure_status
+        self.chunk_size = chunk_size
+        self.min_cacheable_tokens = min_cacheable_tokens
+        self.cached_prefixes: set = set()
+        self.calls: List[Dict[str, Any]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def complete(self, model: str, prompt: str, max_tokens: int,
+                       temperature: float, system: Optional[str] = None) -> LLMResponse:
+        self.calls.append({"model": model, "prompt": prompt, "max_tokens": max_tokens,
+                           "temperature": temperature, "system": system})
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            latency = self.latencies.pop(0) if self.latencies else self.latency
+            if latency:
+                await asyncio.sleep(latency)
+            if self.failures > 0:
+                self.failures -= 1
+                raise LLMBackendError("fake backend failure", status_code=self.failure_status)
+
+            text = self.responder(prompt) if self.responder else self.response_text
+            cache_read = cache_creation = 0
+            if system:
+                system_tokens = estimate_tokens(system)
+                minimum = self.min_cacheable_tokens
+                if minimum is None:
+                    minimum = min_cacheable_tokens(model)
+                if system_tokens < minimum:
+                    prompt = f"{system}\n\n{prompt}"
+                elif (model, system) in self.cached_prefixes:
+                    cache_read = system_tokens
+                else:
+                    self.cached_prefixes.add((model, system))
+                    cache_creation = system_tokens
+            return LLMResponse(
+                text=text,
+                model=model,
+                input_tokens=estimate_tokens(prompt),
+                output_tokens=estimate_tokens(text),
+                cache_read_input_tokens=cache_read,
+                cache_creation_input_tokens=cache_creation
+            )
+        finally:
+            self.in_flight -= 1
+
+    async def stream(self, model: str, prompt: str, max_tokens: int,
+                     temperature: float, system: Optional[str] = None) -> AsyncIterator[str]:
+        response = await self.complete(model, prompt, max_tokens, temperature, system)
+        for start in range(0, len(response.text), self.chunk_size):
+            yield response.text[start:start + self.chunk_size]
+
+
+class TokenBucket:
+    """Rate limiter de tokens por minuto (atendimento FIFO)"""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: int) -> None:
+        """Aguarda até haver `amount` tokens disponíveis e os consome"""
+        amount = min(float(amount), self.capacity)
+        # O lock é mantido durante a espera para que requisições grandes não sofram starvation
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+    def adjust(self, delta: float) -> None:
+        """Corrige a estimativa após a resposta (delta positivo devolve tokens)"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + delta)
+
+
+class Histogram:
+    """Histograma de durações (segundos) com buckets fixos"""
+
+    DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                return
+        self.counts[-1] += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimativa pelo limite superior do bucket que contém o quantil"""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}" for bound in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "avg": round(self.total / self.count, 6) if self.count else None,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
+class PromptCacheMetrics:
+    """Tokens de entrada por agente: lidos do cache de prefixo, gravados nele e sem cache"""
+
+    def __init__(self):
+        self.by_agent: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, agent: Optional[str], response: LLMResponse) -> None:
+        counters = self.by_agent[agent or "unattributed"]
+        counters["requests"] += 1
+        counters["uncached_input_tokens"] += response.input_tokens
+        counters["cache_read_input_tokens"] += response.cache_read_input_tokens
+        counters["cache_creation_input_tokens"] += response.cache_creation_input_tokens
+        if response.cache_read_input_tokens:
+            counters["cache_hits"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        agents = {}
+        for agent, counters in self.by_agent.items():
+            total = (counters["uncached_input_tokens"] + counters["cache_read_input_tokens"]
+                     + counters["cache_creation_input_tokens"])
+            agents[agent] = {
+                **counters,
+                "total_input_tokens": total,
+                "cached_ratio": round(counters["cache_read_input_tokens"] / total, 4) if total else 0.0
+            }
+        return agents
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa barata de tokens (~4 caracteres por token)"""
+    return max(1, len(text) // 4)
+
+
+# Prefixos menores que isso são processados normalmente, sem cache (limites do provedor)
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_MIN_TOKENS_HAIKU = 2048
+
+
+def min_cacheable_tokens(model: str) -> int:
+    """Menor prefixo `system` que o provedor aceita cachear para o modelo"""
+    return PROMPT_CACHE_MIN_TOKENS_HAIKU if "haiku" in model else PROMPT_CACHE_MIN_TOKENS
+
+
+class _GatewayCompletions:
+    """Expõe `completions.create(...)` no formato já usado pelos agentes"""
+
+    def __init__(self, gateway: "LLMGateway"):
+        self._gateway = gateway
+
+    async def create(self, model: str, messages: List[Dict[str, Any]],
+                     max_tokens: int = 4000, temperature: float = 0.1,
+                     timeout: Optional[float] = None, system: Optional[str] = None,
+                     agent: Optional[str] = None, hedge: bool = False, **kwargs) -> LLMResponse:
+        complete = self._gateway.complete_hedged if hedge else self._gateway.complete
+        return await complete(
+            prompt=self._prompt_from(messages),
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=timeout,
+            system=system,
+            agent=agent
+        )
+
+    def stream(self, model: str, messages: List[Dict[str, Any]],
+               max_tokens: int = 4000, temperature: float = 0.1,
+               timeout: Optional[float] = None, system: Optional[str] = None,
+               agent: Optional[str] = None, **kwargs) -> AsyncIterator[str]:
+        return self._gateway.stream(
+            prompt=self._prompt_from(messages),
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=timeout,
+            system=system,
+            agent=agent
+        )
+
+    @staticmethod
+    def _prompt_from(messages: List[Dict[str, Any]]) -> str:
+        return "\n\n".join(
+            message["content"] for message in messages if message.get("role") == "user"
+        )
+
+
+class GatewayClient:
+    """Cliente compatível com `claude_client` que roteia tudo pelo gateway"""
+
+    # Aceita `system` (prefixo cacheável), `agent` (atribuição das métricas), `timeout`
+    # e `hedge` em create(); `system`, `agent` e `timeout` também em stream()
+    supports_prompt_prefix = True
+
+    def __init__(self, gateway: "LLMGateway"):
+        self.completions = _GatewayCompletions(gateway)
+        self.messages = self.completions
+
+
+class LLMGateway:
+    """
+    Ponto único de saída para chamadas ao LLM
+
+    - Limite global e por modelo de requisições em andamento
+    - Token bucket de tokens/minuto (estimativa prévia corrigida pelo uso real)
+    - Retries com backoff exponencial e jitter completo para erros transitórios
+    - Deadline por requisição cobrindo fila, tentativas e esperas
+    - Hedging opcional: se a resposta não chega até o percentil `hedge_percentile` das
+      latências recentes do modelo, dispara uma cópia (opcionalmente em `hedge_model`),
+      fica com a primeira que responder e cancela a outra
+    - Histogramas de espera em fila e latência do upstream
+    """
+
+    def __init__(self,
+                 backend: LLMBackend,
+                 max_concurrency: int = 16,
+                 max_concurrency_per_model: int = 8,
+                 tokens_per_minute: int = 80000,
+                 max_retries: int = 4,
+                 retry_base_delay: float = 0.5,
+                 retry_max_delay: float = 8.0,
+                 request_timeout: float = 120.0,
+                 hedge_percentile: float = 0.95,
+                 hedge_min_samples: int = 20,
+                 hedge_min_delay: float = 1.0,
+                 hedge_model: Optional[str] = None,
+                 latency_window: int = 200):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.max_concurrency_per_model = max_concurrency_per_model
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.request_timeout = request_timeout
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_model = hedge_model
+
+        self._global_slots = asyncio.Semaphore(max_concurrency)
+        self._model_slots: Dict[str, asyncio.Semaphore] = {}
+        self._bucket = TokenBucket(tokens_per_minute)
+
+        self.queue_wait = Histogram()
+        self.latency = Histogram()
+        self.time_to_first_token = Histogram()
+        self.time_to_first_token_by_agent: Dict[str, Histogram] = defaultdict(Histogram)
+        self.latency_by_model: Dict[str, Histogram] = defaultdict(Histogram)
+        # Latências das últimas chamadas bem-sucedidas, base do gatilho de hedging
+        self.recent_latency: Dict[str, deque] = defaultdict(lambda: deque(maxlen=latency_window))
+        self.hedged_latency = Histogram()
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.errors_by_status: Dict[str, int] = defaultdict(int)
+        self.prompt_cache = PromptCacheMetrics()
+        self.in_flight = 0
+        self.waiting = 0
+
+    def as_client(self) -> GatewayClient:
+        """Cliente no formato `claude_client` para injetar nos agentes"""
+        return GatewayClient(self)
+
+    async def complete(self,
+                       prompt: str,
+                       model: str = "claude-3-5-sonnet-20241022",
+                       max_tokens: int = 4000,
+                       temperature: float = 0.1,
+                       timeout: Optional[float] = None,
+                       system: Optional[str] = None,
+                       agent: Optional[str] = None) -> LLMResponse:
+        """Executa a requisição respeitando limites, retries e deadline
+
+        `system` é o prefixo estável (instruções, diretrizes, esquema de saída), enviado à
+        frente do prompt e marcado para o cache de prefixo do provedor.
+        """
+        self.counters["requests"] += 1
+        return await self._complete(prompt, model, max_tokens, temperature, timeout, system, agent)
+
+    async def _complete(self, prompt: str, model: str, max_tokens: int, temperature: float,
+                        timeout: Optional[float], system: Optional[str], agent: Optional[str],
+                        slots_held: Optional[asyncio.Event] = None) -> LLMResponse:
+        """Tentativas de `complete`; `slots_held` é sinalizado quando a requisição sai da fila"""
+        deadline = time.monotonic() + (timeout or self.request_timeout)
+        estimated = estimate_tokens(prompt + (system or "")) + max_tokens
+
+        attempt = 0
+        while True:
+            try:
+                acquired = await self._acquire(model, estimated, deadline)
+                if slots_held is not None:
+                    slots_held.set()
+                try:
+                    response = await self._call_backend(
+                        model,
+                        lambda: self.backend.complete(model, prompt, max_tokens, temperature, system),
+                        deadline
+                    )
+                finally:
+                    self._release(acquired)
+
+                used = (response.input_tokens + response.output_tokens
+                        + response.cache_read_input_tokens + response.cache_creation_input_tokens)
+                if used:
+                    self._bucket.adjust(estimated - used)
+                self.prompt_cache.record(agent, response)
+                self.counters["succeeded"] += 1
+                return response
+
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, deadline, model)
+
+            attempt += 1
+            # Espera fora dos slots para não bloquear outras requisições
+            await asyncio.sleep(delay)
+
+    async def complete_hedged(self,
+                              prompt: str,
+                              model: str = "claude-3-5-sonnet-20241022",
+                              max_tokens: int = 4000,
+                              temperature: float = 0.1,
+                              timeout: Optional[float] = None,
+                              system: Optional[str] = None,
+                              agent: Optional[str] = None) -> LLMResponse:
+        """
+        Como `complete`, mas dispara uma requisição duplicada quando a primeira demora mais
+        que o percentil configurado das latências recentes
+
+        As duas tentativas compartilham o mesmo deadline total; a perdedora é cancelada.
+        Sem amostras suficientes para estimar o percentil, não há hedging. A espera só
+        começa quando a primeira tentativa obtém slots e tokens: fila no gateway não é
+        lentidão do upstream, e duplicar nesse momento só aumentaria a saturação.
+        A resposta traz em `model` o modelo que de fato respondeu.
+        """
+        started = time.monotonic()
+        deadline = started + (timeout or self.request_timeout)
+        hedge_after = self.hedge_delay(model)
+        self.counters["requests"] += 1
+        self.counters["hedged_requests"] += 1
+        slots_held = asyncio.Event()
+
+        def _attempt(attempt_model: str, held: Optional[asyncio.Event] = None) -> asyncio.Task:
+            return asyncio.ensure_future(self._complete(
+                prompt, attempt_model, max_tokens, temperature,
+                self._remaining(deadline), system, agent, held
+            ))
+
+        primary = _attempt(model, slots_held)
+        attempts = [primary]
+        try:
+            pending = {primary}
+            if hedge_after is not None:
+                dequeued = asyncio.ensure_future(slots_held.wait())
+                try:
+                    await asyncio.wait({primary, dequeued}, timeout=self._remaining(deadline),
+                                       return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    dequeued.cancel()
+                done, pending = await asyncio.wait(pending, timeout=min(hedge_after, self._remaining(deadline)))
+                if not done:
+                    self.counters["hedges_fired"] += 1
+                    attempts.append(_attempt(self.hedge_model or model))
+                    pending.add(attempts[-1])
+                else:
+                    pending = done
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.counters["hedge_wins"] += 1
+                        self.hedged_latency.observe(time.monotonic() - started)
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """Espera antes de disparar a cópia, ou None enquanto faltam amostras"""
+        recent = self.recent_latency[model]
+        if len(recent) < self.hedge_min_samples:
+            return None
+        ordered = sorted(recent)
+        percentile = ordered[min(len(ordered) - 1, int(self.hedge_percentile * len(ordered)))]
+        return max(self.hedge_min_delay, percentile)
+
+    async def stream(self,
+                     prompt: str,
+                     model: str = "claude-3-5-sonnet-20241022",
+                     max_tokens: int = 4000,
+                     temperature: float = 0.1,
+                     timeout: Optional[float] = None,
+                     system: Optional[str] = None,
+                     agent: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Versão em streaming de `complete`: produz os trechos de texto conforme chegam
+
+        Retries só acontecem antes do primeiro trecho; depois disso a falha é propagada
+        para não duplicar texto já entregue ao cliente.
+        """
+        deadline = time.monotonic() + (timeout or self.request_timeout)
+        estimated = estimate_tokens(prompt + (system or "")) + max_tokens
+        self.counters["streams"] += 1
+
+        attempt = 0
+        while True:
+            emitted = False
+            try:
+                acquired = await self._acquire(model, estimated, deadline)
+                started = time.monotonic()
+                self.in_flight += 1
+                try:
+                    chunks = self.backend.stream(model, prompt, max_tokens, temperature, system).__aiter__()
+                    while True:
+                        remaining = self._remaining(deadline)
+                        try:
+                            delta = await asyncio.wait_for(chunks.__anext__(), remaining)
+                        except StopAsyncIteration:
+                            break
+                        except asyncio.TimeoutError:
+                            raise LLMDeadlineExceeded("Deadline excedido durante o streaming do LLM")
+
+                        if not emitted:
+                            first_token = time.monotonic() - started
+                            self.time_to_first_token.observe(first_token)
+                            self.time_to_first_token_by_agent[agent or "unattributed"].observe(first_token)
+                            emitted = True
+                        yield delta
+                finally:
+                    elapsed = time.monotonic() - started
+                    self.in_flight -= 1
+                    self.latency.observe(elapsed)
+                    self.latency_by_model[model].observe(elapsed)
+                    self._release(acquired)
+
+                self.counters["succeeded"] += 1
+                return
+
+            except Exception as e:
+                if emitted:
+                    self.counters["failed"] += 1
+                    raise
+                delay = self._retry_delay(e, attempt, deadline, model)
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _acquire(self, model: str, estimated: int, deadline: float) -> List[asyncio.Semaphore]:
+        """Aguarda tokens, slot do modelo e slot global, nessa ordem; mede a espera em fila
+
+        Nenhum slot é retido durante a espera por tokens, e o slot global (compartilhado
+        por todos os modelos) é o último: um modelo saturado não bloqueia os demais.
+        """
+        model_slots = self._model_slots.setdefault(
+            model, asyncio.Semaphore(self.max_concurrency_per_model)
+        )
+
+        queued_at = time.monotonic()
+        self.waiting += 1
+        tokens_taken = False
+        acquired: List[asyncio.Semaphore] = []
+        try:
+            await asyncio.wait_for(self._bucket.acquire(estimated), self._remaining(deadline))
+            tokens_taken = True
+            for slots in (model_slots, self._global_slots):
+                await asyncio.wait_for(slots.acquire(), self._remaining(deadline))
+                acquired.append(slots)
+        except BaseException as e:
+            self._release(acquired)
+            if tokens_taken:
+                self._bucket.adjust(estimated)
+            if isinstance(e, (asyncio.TimeoutError, LLMDeadlineExceeded)):
+                raise LLMDeadlineExceeded("Deadline excedido aguardando capacidade do LLM")
+            raise
+        finally:
+            self.waiting -= 1
+            self.queue_wait.observe(time.monotonic() - queued_at)
+
+        return acquired
+
+    @staticmethod
+    def _release(acquired: List[asyncio.Semaphore]) -> None:
+        for slots in acquired:
+            slots.release()
+
+    async def _call_backend(self, model: str, call: Callable[[], Awaitable[LLMResponse]],
+                            deadline: float) -> LLMResponse:
+        # O deadline é checado antes de criar a corrotina, que do contrário nunca seria aguardada
+        remaining = self._remaining(deadline)
+        started = time.monotonic()
+        self.in_flight += 1
+        try:
+            response = await asyncio.wait_for(call(), remaining)
+            self.recent_latency[model].append(time.monotonic() - started)
+            return response
+        except asyncio.TimeoutError:
+            if time.monotonic() >= deadline:
+                raise LLMDeadlineExceeded("Deadline excedido aguardando resposta do LLM")
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            self.in_flight -= 1
+            self.latency.observe(elapsed)
+            self.latency_by_model[model].observe(elapsed)
+
+    def _retry_delay(self, error: Exception, attempt: int, deadline: float, model: str) -> float:
+        """Decide se a falha é re-tentável e retorna o backoff; caso contrário relança"""
+        if isinstance(error, LLMDeadlineExceeded):
+            self.counters["deadline_exceeded"] += 1
+            raise error
+
+        status = self._status_of(error)
+        self.errors_by_status[str(status or type(error).__name__)] += 1
+
+        if not self._is_retryable(error) or attempt >= self.max_retries:
+            self.counters["failed"] += 1
+            raise error
+
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+        delay = max(delay, getattr(error, "retry_after", None) or 0.0)
+        if time.monotonic() + delay >= deadline:
+            self.counters["deadline_exceeded"] += 1
+            raise LLMDeadlineExceeded(
+                f"Deadline excedido após {attempt + 1} tentativa(s): {error}"
+            ) from error
+
+        self.counters["retries"] += 1
+        logger.warning(f"LLM {model} falhou ({status or type(error).__name__}), "
+                       f"tentativa {attempt + 1}/{self.max_retries} em {delay:.2f}s")
+        return delay
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMDeadlineExceeded("Deadline excedido")
+        return remaining
+
+    @staticmethod
+    def _status_of(error: Exception) -> Optional[int]:
+        status = getattr(error, "status_code", None)
+        if status is None:
+            status = getattr(getattr(error, "response", None), "status_code", None)
+        return status
+
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+            return True
+        status = self._status_of(error)
+        if status is not None:
+            return status in RETRYABLE_STATUS_CODES
+        # Erros de conexão/timeout do SDK não carregam status HTTP
+        return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas do gateway (contadores, fila e histogramas)"""
+        return {
+            "backend": type(self.backend).__name__,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "limits": {
+                "max_concurrency": self.max_concurrency,
+                "max_concurrency_per_model": self.max_concurrency_per_model,
+                "tokens_per_minute": int(self._bucket.capacity),
+                "available_tokens": int(self._bucket.tokens)
+            },
+            "counters": dict(self.counters),
+            "errors_by_status": dict(self.errors_by_status),
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+            "latency_seconds": self.latency.snapshot(),
+            "time_to_first_token_seconds": self.time_to_first_token.snapshot(),
+            "time_to_first_token_by_agent": {
+                agent: histogram.snapshot() for agent, histogram in self.time_to_first_token_by_agent.items()
+            },
+            "latency_by_model": {
+                model: histogram.snapshot() for model, histogram in self.latency_by_model.items()
+            },
+            "prompt_cache_by_agent": self.prompt_cache.snapshot(),
+            "hedging": self._hedging_stats()
+        }
+
+    def _hedging_stats(self) -> Dict[str, Any]:
+        hedged = self.counters["hedged_requests"]
+        fired = self.counters["hedges_fired"]
+        return {
+            "hedged_requests": hedged,
+            "hedges_fired": fired,
+            "hedge_wins": self.counters["hedge_wins"],
+            "hedge_rate": round(fired / hedged, 4) if hedged else 0.0,
+            "hedge_percentile": self.hedge_percentile,
+            "hedge_model": self.hedge_model,
+            "trigger_seconds_by_model": {model: self.hedge_delay(model) for model in self.recent_latency},
+            # Latência ponta a ponta com hedging vs. latência de uma tentativa isolada
+            "hedged_latency_seconds": self.hedged_latency.snapshot(),
+            "tail_latency": {
+                "p99_single_attempt": self.latency.quantile(0.99),
+                "p99_hedged": self.hedged_latency.quantile(0.99)
+            }
+        }
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def _create_backend() -> LLMBackend:
+    """Seleciona o backend conforme configuração"""
+    if settings.LLM_BACKEND == "fake":
+        return FakeLLMBackend()
+    return AnthropicBackend(settings.CLAUDE_API_KEY, settings.LLM_MAX_CONCURRENCY,
+                            prompt_caching=settings.LLM_PROMPT_CACHING_ENABLED)
+
+
+# Instância global compartilhada por agentes, workers e API
+llm_gateway = LLMGateway(
+    backend=_create_backend(),
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_concurrency_per_model=settings.LLM_MAX_CONCURRENCY_PER_MODEL,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+    max_retries=settings.LLM_MAX_RETRIES,
+    retry_base_delay=settings.LLM_RETRY_BASE_DELAY,
+    retry_max_delay=settings.LLM_RETRY_MAX_DELAY,
+    request_timeout=settings.LLM_REQUEST_TIMEOUT_SECONDS,
+    hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+    hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+    hedge_min_delay=settings.LLM_HEDGE_MIN_DELAY_SECONDS,
+    hedge_model=settings.LLM_HEDGE_FALLBACK_MODEL or None
+)
@@ -7,6 +7,8 @@ import re
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from app.services.rule_engine import Rule, RuleSet, rule_engine
+
 class MockLLMService:
     """
     Serviço LLM simulado para análise de contratos
@@ -15,6 +17,14 @@ class MockLLMService:
     
     def __init__(self):
         self.risk_patterns = self._initialize_risk_patterns()
+        self.risk_rules = RuleSet("mock_llm_risk", [
+            # Busca por substring, como um "pattern in text" sem distinção de maiúsculas
+            Rule(id=pattern, keywords=(pattern,), tag=risk_level, whole_word=False)
+            for risk_level, patterns_list in self.risk_patterns.items()
+            for pattern_info in patterns_list
+            for pattern in pattern_info["patterns"]
+        ])
+        rule_engine.register(self.risk_rules)
         self.contract_templates = self._initialize_contract_templates()
     
     def _initialize_risk_patterns(self) -> Dict[str, List[Dict[str, Any]]]:
@@ -161,14 +171,18 @@ class MockLLMService:
         """Analisa riscos baseado em padrões"""
         results = {"high": [], "medium": [], "low": []}
         
-        text_lower = text.lower()
+        # Primeira ocorrência de cada padrão, numa única varredura
+        first_matches = {}
+        for match in rule_engine.scan(text, self.risk_rules.name):
+            first_matches.setdefault(match.rule_id, match)
         
         for risk_level, patterns_list in self.risk_patterns.items():
             for pattern_info in patterns_list:
                 for pattern in pattern_info["patterns"]:
-                    if pattern in text_lower:
+                    if pattern in first_matches:
                         # Encontra o contexto da cláusula
-                        context = self._extract_context(text, pattern)
+                        match = first_matches[pattern]
+                        context = self._extract_context(text, match.start, match.end)
                         
                         risk_item = {
                             "clause": pattern,
@@ -182,14 +196,10 @@ class MockLLMService:
         
         return results
     
-    def _extract_context(self, text: str, pattern: str, context_length: int = 200) -> str:
+    def _extract_context(self, text: str, match_start: int, match_end: int, context_length: int = 200) -> str:
         """Extrai contexto ao redor de um padrão encontrado"""
-        pattern_index = text.lower().find(pattern.lower())
-        if pattern_index == -1:
-            return ""
-        
-        start = max(0, pattern_index - context_length // 2)
-        end = min(len(text), pattern_index + len(pattern) + context_length // 2)
+        start = max(0, match_start - context_length // 2)
+        end = min(len(text), match_end + context_length // 2)
         
         context = text[start:end].strip()
         
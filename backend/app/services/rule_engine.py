@@ -0,0 +1,281 @@
+"""
+Motor de regras compilado
+Conjuntos de regras declarativos (palavras-chave e regex) são compilados uma única vez num
+matcher combinado que devolve trechos tipados com offsets
+"""
+
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass(frozen=True, eq=False)
+class Rule:
+    """
+    Regra declarativa
+
+    - keywords: termos literais (espaços casam com qualquer sequência de espaços em branco).
+      Todas as regras de palavra-chave de todos os conjuntos compartilham uma única trie,
+      varrida uma vez por texto; ocorrências sobrepostas de regras diferentes são reportadas.
+    - pattern: regex (ver RuleSet.exclusive). Não use referências numéricas (\\1).
+    """
+    id: str
+    keywords: Tuple[str, ...] = ()
+    pattern: Optional[str] = None
+    tag: str = ""
+    whole_word: bool = True  # Equivalente a \b...\b (apenas palavras-chave)
+    case_sensitive: bool = False
+    data: Any = None
+
+
+@dataclass
+class RuleSet:
+    """
+    Conjunto nomeado de regras
+
+    exclusive=True: as regras regex formam uma única alternância (semântica de analisador
+    léxico: cada trecho pertence a uma só regra e a primeira declarada vence quando duas
+    começam na mesma posição). exclusive=False: cada regra regex é um detector
+    independente, como um re.finditer próprio.
+    """
+    name: str
+    rules: List[Rule]
+    exclusive: bool = True
+
+
+@dataclass
+class RuleMatch:
+    """Trecho do texto casado por uma regra"""
+    rule_set: str
+    rule_id: str
+    tag: str
+    start: int
+    end: int
+    text: str
+    rule: Rule = field(compare=False, repr=False)
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _normalize_keyword(keyword: str) -> str:
+    return " ".join(keyword.lower().split())
+
+
+def _needs_ignorecase(rule: Rule) -> bool:
+    """IGNORECASE só custa (e só importa) quando o padrão tem letras fora de escapes (\\d, \\s)"""
+    return not rule.case_sensitive and any(char.isalpha() for char in re.sub(r"\\.", "", rule.pattern))
+
+
+def _at_boundary(text: str, position: int) -> bool:
+    """Mesma definição de \\b do módulo re"""
+    before = position > 0 and _is_word(text[position - 1])
+    after = position < len(text) and _is_word(text[position])
+    return before != after
+
+
+def keyword_trie_pattern(keywords: Iterable[str], flexible_whitespace: bool = True) -> str:
+    """
+    Regex em forma de trie: prefixos comuns fatorados, continuação mais longa primeiro
+
+    Numa posição, casa o termo mais longo que começa ali; os demais termos presentes na
+    mesma posição são exatamente os seus prefixos. Com flexible_whitespace, espaços casam
+    com qualquer sequência de espaços em branco; sem ele, apenas com um espaço literal.
+    """
+    trie: Dict[str, Any] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = []
+        for char, child in node.items():
+            if char == "":
+                continue
+            token = r"\s+" if char == " " and flexible_whitespace else re.escape(char)
+            branches.append(token + build(child))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class _CompiledRules:
+    """Estado compilado (imutável) de todos os conjuntos registrados"""
+
+    def __init__(self, rule_sets: Dict[str, RuleSet]):
+        # Palavra-chave normalizada -> [(conjunto, regra, termo original)]
+        self.keyword_entries: Dict[str, List[Tuple[str, Rule, str]]] = defaultdict(list)
+        for rule_set in rule_sets.values():
+            for rule in rule_set.rules:
+                for keyword in rule.keywords:
+                    self.keyword_entries[_normalize_keyword(keyword)].append((rule_set.name, rule, keyword))
+
+        # A trie roda sobre o texto em minúsculas (bem mais rápido que IGNORECASE); o matcher
+        # com IGNORECASE só é usado quando lower() altera o comprimento do texto
+        self.keyword_matcher = self.keyword_matcher_ignorecase = None
+        if self.keyword_entries:
+            trie_pattern = keyword_trie_pattern(sorted(self.keyword_entries))
+            # Lookahead de largura zero: encontra termos em todas as posições, inclusive sobrepostos
+            self.keyword_matcher = re.compile(f"(?=({trie_pattern}))")
+            self.keyword_matcher_ignorecase = re.compile(f"(?=({trie_pattern}))", re.IGNORECASE)
+
+        # Para cada termo, os termos registrados que são prefixos dele (mesma posição inicial)
+        self.prefixes: Dict[str, List[str]] = {
+            key: [other for other in self.keyword_entries if key.startswith(other) and other != key]
+            for key in self.keyword_entries
+        }
+        self.single_keyword = {
+            key: re.compile(keyword_trie_pattern([key]), re.IGNORECASE) for key in self.keyword_entries
+        }
+
+        # Conjunto -> [(regex, grupo nomeado -> regra)]
+        self.pattern_matchers: Dict[str, List[Tuple[re.Pattern, Dict[str, Rule]]]] = {}
+        for rule_set in rule_sets.values():
+            pattern_rules = [rule for rule in rule_set.rules if rule.pattern]
+            if not pattern_rules:
+                continue
+            batches = [pattern_rules] if rule_set.exclusive else [[rule] for rule in pattern_rules]
+            self.pattern_matchers[rule_set.name] = [self._alternation(batch) for batch in batches]
+
+    @staticmethod
+    def _alternation(rules: List[Rule]) -> Tuple[re.Pattern, Dict[str, Rule]]:
+        groups = {f"_r{index}": rule for index, rule in enumerate(rules)}
+        combined = "|".join(
+            f"(?P<{name}>{'(?i:' if _needs_ignorecase(rule) else '(?:'}{rule.pattern}))"
+            for name, rule in groups.items()
+        )
+        return re.compile(combined), groups
+
+class _TextScan:
+    """Resultados já calculados para um texto"""
+    __slots__ = ("keyword_matches", "pattern_matches")
+
+    def __init__(self):
+        self.keyword_matches: Optional[Dict[str, List[RuleMatch]]] = None
+        self.pattern_matches: Dict[str, List[RuleMatch]] = {}
+
+
+class RuleEngine:
+    """
+    Registro global de conjuntos de regras
+
+    Cada componente registra seus conjuntos ao ser importado e chama scan() com os nomes que
+    lhe interessam. Os resultados dos últimos textos ficam em cache, então componentes que
+    analisam o mesmo contrato (entidades, CNPJ, riscos) compartilham uma única varredura.
+    """
+
+    def __init__(self, cache_size: int = 8):
+        self.cache_size = cache_size
+        self._rule_sets: Dict[str, RuleSet] = {}
+        self._compiled: Optional[_CompiledRules] = None
+        self._cache: "OrderedDict[str, _TextScan]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, rule_set: RuleSet) -> None:
+        """Registra (ou substitui) um conjunto; a recompilação ocorre no próximo scan"""
+        with self._lock:
+            if self._rule_sets.get(rule_set.name) is rule_set:
+                return
+            self._rule_sets[rule_set.name] = rule_set
+            self._compiled = None
+            self._cache.clear()
+
+    def scan(self, text: str, *rule_sets: str) -> List[RuleMatch]:
+        """Trechos dos conjuntos pedidos, ordenados por posição"""
+        compiled = self._get_compiled()
+        unknown = [name for name in rule_sets if name not in self._rule_sets]
+        if unknown:
+            raise KeyError(f"Conjunto de regras não registrado: {', '.join(unknown)}")
+
+        with self._lock:
+            scan = self._cache.pop(text, None) or _TextScan()
+            self._cache[text] = scan
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        if scan.keyword_matches is None:
+            scan.keyword_matches = self._scan_keywords(compiled, text)
+        matches: List[RuleMatch] = []
+        for name in rule_sets:
+            matches.extend(scan.keyword_matches.get(name, []))
+            if name in compiled.pattern_matchers:
+                if name not in scan.pattern_matches:
+                    scan.pattern_matches[name] = self._scan_patterns(compiled, name, text)
+                matches.extend(scan.pattern_matches[name])
+
+        matches.sort(key=lambda match: (match.start, -match.end))
+        return matches
+
+    @staticmethod
+    def group_by_rule(matches: Iterable[RuleMatch]) -> Dict[str, List[RuleMatch]]:
+        grouped: Dict[str, List[RuleMatch]] = defaultdict(list)
+        for match in matches:
+            grouped[match.rule_id].append(match)
+        return dict(grouped)
+
+    def _get_compiled(self) -> _CompiledRules:
+        compiled = self._compiled
+        if compiled is None:
+            with self._lock:
+                if self._compiled is None:
+                    self._compiled = _CompiledRules(dict(self._rule_sets))
+                compiled = self._compiled
+        return compiled
+
+    def _scan_keywords(self, compiled: _CompiledRules, text: str) -> Dict[str, List[RuleMatch]]:
+        results: Dict[str, List[RuleMatch]] = defaultdict(list)
+        if compiled.keyword_matcher is None:
+            return results
+
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            hits, subject = compiled.keyword_matcher.finditer(lowered), lowered
+        else:
+            hits, subject = compiled.keyword_matcher_ignorecase.finditer(text), text
+
+        entries = compiled.keyword_entries
+        for hit in hits:
+            start, end = hit.span(1)
+            key = hit.group(1)
+            if key not in entries:
+                key = _normalize_keyword(key)
+            candidates = [(key, end)]
+            for prefix in compiled.prefixes.get(key, ()):
+                prefix_match = compiled.single_keyword[prefix].match(subject, start)
+                if prefix_match:
+                    candidates.append((prefix, prefix_match.end()))
+
+            starts_word = _at_boundary(text, start)
+            for candidate, candidate_end in candidates:
+                matched = text[start:candidate_end]
+                whole_word = starts_word and _at_boundary(text, candidate_end)
+                for set_name, rule, keyword in entries[candidate]:
+                    if rule.whole_word and not whole_word:
+                        continue
+                    if rule.case_sensitive and " ".join(matched.split()) != " ".join(keyword.split()):
+                        continue
+                    results[set_name].append(RuleMatch(
+                        set_name, rule.id, rule.tag, start, candidate_end, matched, rule
+                    ))
+        return results
+
+    @staticmethod
+    def _scan_patterns(compiled: _CompiledRules, name: str, text: str) -> List[RuleMatch]:
+        matches = []
+        for pattern, groups in compiled.pattern_matchers[name]:
+            for hit in pattern.finditer(text):
+                rule = groups[hit.lastgroup]
+                matches.append(RuleMatch(name, rule.id, rule.tag, hit.start(), hit.end(), hit.group(), rule))
+        return matches
+
+
+# Instância global
+rule_engine = RuleEngine()
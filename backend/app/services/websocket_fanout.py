@@ -0,0 +1,189 @@
+"""
+Envio de notificações de jobs por WebSocket sem bloquear o pipeline
+Cada conexão tem a sua fila de saída e uma tarefa de envio própria. O progresso de cada
+job é agregado (vale o mais recente) e limitado a N mensagens por segundo; envios têm
+timeout e clientes lentos são desconectados.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Código de fechamento para cliente que não acompanha o ritmo ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class OutboundConnection:
+    """
+    Fila de saída de um WebSocket
+
+    Mensagens de status/conclusão seguem em ordem (FIFO). Mensagens `job_progress`
+    ficam uma por job, substituídas pela mais recente, e saem no máximo a cada
+    `progress_interval` segundos; antes de um evento do mesmo job, o progresso pendente
+    é enviado para manter a ordem.
+    """
+
+    def __init__(self, user_id: str, websocket: Any,
+                 on_drop: Callable[["OutboundConnection", str], None],
+                 progress_interval: float = 0.25, send_timeout: float = 5.0, max_queue: int = 100):
+        self.user_id = user_id
+        self.websocket = websocket
+        self.on_drop = on_drop
+        self.progress_interval = progress_interval
+        self.send_timeout = send_timeout
+        self.max_queue = max_queue
+        self.closed = False
+
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._progress: Dict[str, Dict[str, Any]] = {}
+        self._last_progress: Dict[str, float] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"sent": 0, "coalesced": 0, "send_timeouts": 0}
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def enqueue(self, message: Dict[str, Any]) -> bool:
+        """Agenda o envio (nunca bloqueia); False se a conexão foi descartada"""
+        if self.closed:
+            return False
+
+        job_id = message.get("job_id")
+        if message.get("type") == "job_progress" and job_id:
+            if job_id in self._progress:
+                self.stats["coalesced"] += 1
+            self._progress[job_id] = message
+        else:
+            if job_id in self._progress:
+                self._queue.append(self._progress.pop(job_id))
+            self._last_progress.pop(job_id, None)
+            self._queue.append(message)
+            if len(self._queue) > self.max_queue:
+                self.drop(f"fila de saída com mais de {self.max_queue} mensagens")
+                return False
+
+        self._wakeup.set()
+        return True
+
+    def pending(self) -> int:
+        return len(self._queue) + len(self._progress)
+
+    def _next_message(self) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """Próxima mensagem a enviar, ou quanto esperar pelo próximo progresso liberado"""
+        if self._queue:
+            return self._queue.popleft(), None
+
+        now = time.monotonic()
+        next_due = None
+        for job_id, message in self._progress.items():
+            due = self._last_progress.get(job_id, 0.0) + self.progress_interval
+            if due <= now:
+                del self._progress[job_id]
+                self._last_progress[job_id] = now
+                return message, None
+            next_due = due if next_due is None else min(next_due, due)
+        return None, (next_due - now if next_due is not None else None)
+
+    async def _run(self) -> None:
+        while not self.closed:
+            message, delay = self._next_message()
+            if message is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await asyncio.wait_for(self.websocket.send_json(message), self.send_timeout)
+            except asyncio.TimeoutError:
+                self.stats["send_timeouts"] += 1
+                self.drop(f"envio excedeu {self.send_timeout:g}s")
+                return
+            except Exception as e:
+                self.drop(f"erro de envio: {e}")
+                return
+            self.stats["sent"] += 1
+
+    def drop(self, reason: str) -> None:
+        """Descarta a conexão (cliente lento ou com erro)"""
+        if self.closed:
+            return
+        self.closed = True
+        self.on_drop(self, reason)
+
+    async def close(self, code: Optional[int] = None) -> None:
+        self.closed = True
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        if code is not None:
+            try:
+                await asyncio.wait_for(self.websocket.close(code=code), self.send_timeout)
+            except Exception:
+                pass
+
+
+class WebSocketFanout:
+    """Conexões WebSocket por usuário com envio concorrente e não bloqueante"""
+
+    def __init__(self, progress_per_second: float = 4.0, send_timeout: float = 5.0, max_queue: int = 100):
+        self.progress_interval = 1 / progress_per_second if progress_per_second > 0 else 0.0
+        self.send_timeout = send_timeout
+        self.max_queue = max_queue
+        self.connections: Dict[str, List[OutboundConnection]] = {}
+        self._stats = {"published": 0, "dropped_slow_consumers": 0}
+        self._closed_stats = {"sent": 0, "coalesced": 0, "send_timeouts": 0}
+
+    def register(self, user_id: str, websocket: Any) -> OutboundConnection:
+        connection = OutboundConnection(
+            user_id, websocket, self._on_drop,
+            progress_interval=self.progress_interval,
+            send_timeout=self.send_timeout,
+            max_queue=self.max_queue
+        )
+        self.connections.setdefault(user_id, []).append(connection)
+        connection.start()
+        return connection
+
+    async def unregister(self, user_id: str, websocket: Any) -> None:
+        for connection in list(self.connections.get(user_id, [])):
+            if connection.websocket is websocket:
+                self._remove(connection)
+                await connection.close()
+
+    def publish(self, user_id: str, message: Dict[str, Any]) -> int:
+        """Enfileira a mensagem em todas as conexões do usuário; retorna quantas aceitaram"""
+        self._stats["published"] += 1
+        return sum(connection.enqueue(message) for connection in list(self.connections.get(user_id, [])))
+
+    def _on_drop(self, connection: OutboundConnection, reason: str) -> None:
+        logger.warning(f"WebSocket do usuário {connection.user_id} descartado: {reason}")
+        self._stats["dropped_slow_consumers"] += 1
+        self._remove(connection)
+        asyncio.get_running_loop().create_task(connection.close(SLOW_CONSUMER_CLOSE_CODE))
+
+    def _remove(self, connection: OutboundConnection) -> None:
+        connections = self.connections.get(connection.user_id, [])
+        if connection in connections:
+            connections.remove(connection)
+            for key in self._closed_stats:
+                self._closed_stats[key] += connection.stats[key]
+        if not connections:
+            self.connections.pop(connection.user_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        live = [connection for connections in self.connections.values() for connection in connections]
+        return {
+            "connected_users": len(self.connections),
+            "connections": len(live),
+            "pending_messages": sum(connection.pending() for connection in live),
+            "progress_per_second": 1 / self.progress_interval if self.progress_interval else None,
+            **self._stats,
+            **{key: value + sum(c.stats[key] for c in live) for key, value in self._closed_stats.items()},
+        }
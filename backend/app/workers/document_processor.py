@@ -11,6 +11,8 @@ from datetime import datetime
 from app.db.database import AsyncSessionLocal
 from app.db.models import Contract, User, RiskFactor
 from app.agents.factory import AgentFactory
+from app.services.llm_gateway import llm_gateway
+from app.services.contract_dedup import contract_dedup
 from app.services.rag_service import rag_service
 from app.services.email_service import email_service
 from app.core.config import settings
@@ -78,12 +80,17 @@ class DocumentProcessor:
                 # Step 3 & 4: Analyze with AI agents
                 analysis_results = await self._analyze_contract_with_agents(
                     extracted_text, 
-                    contract_id
+                    contract_id,
+                    db
                 )
                 
                 # Step 5: Save analysis results
                 await self._save_analysis_results(contract, analysis_results, db)
                 
+                # Make this contract available for near-duplicate reuse
+                if settings.CONTRACT_DEDUP_ENABLED and contract.processing_status == "completed":
+                    contract_dedup.add(str(contract.id), extracted_text, contract.contract_type)
+                
                 # Step 6: Send notification email
                 await self._send_completion_notification(contract, db)
                 
@@ -161,13 +168,26 @@ class DocumentProcessor:
             logger.error(f"OCR error: {str(e)}")
             return "", 0.0
     
-    async def _analyze_contract_with_agents(self, contract_text: str, contract_id: str) -> Dict[str, Any]:
+    async def _analyze_contract_with_agents(self, contract_text: str, contract_id: str,
+                                            db: Optional[AsyncSession] = None) -> Dict[str, Any]:
         """Analyze contract using AI agent factory"""
         
-        # Initialize agent factory with proper clients
-        # TODO: Initialize with actual Claude client and RAG service
+        # Initialize agent factory with the shared LLM gateway and RAG service
         if not self.agent_factory:
-            self.agent_factory = AgentFactory(None, rag_service)
+            self.agent_factory = AgentFactory(llm_gateway.as_client(), rag_service)
+        
+        # Near-duplicate of an analysed contract: reuse it, re-analysing only changed clauses
+        if settings.CONTRACT_DEDUP_ENABLED and db is not None:
+            try:
+                reused = await contract_dedup.reuse_analysis(
+                    contract_text, self.agent_factory, db, contract_id=contract_id
+                )
+                if reused:
+                    logger.info(f"Contract {contract_id} reused analysis of "
+                                f"{reused['analysis']['metadata']['dedup']['reused_from']}")
+                    return reused
+            except Exception as e:
+                logger.warning(f"Near-duplicate lookup failed for {contract_id}: {str(e)}")
         
         try:
             # Use agent factory for analysis
@@ -0,0 +1,167 @@
+"""
+Benchmark do classificador por embeddings - acurácia e latência contra um conjunto rotulado
+Compara palavras-chave, kNN/centroides e a cascata usada pelo ClassifierAgent
+(palavras-chave -> embeddings -> LLM), contando quantos contratos ainda iriam ao LLM
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.agents.classifier_agent import ClassifierAgent
+from app.agents.embedding_classifier import CONTRACT_TYPE_EXAMPLES, EmbeddingClassifier
+
+# Frases distintas dos exemplos de treino; várias evitam as palavras-chave do ClassifierAgent
+SENTENCES = {
+    "locacao": [
+        "O locatário pagará o aluguel até o quinto dia útil de cada mês na conta indicada pelo locador.",
+        "As chaves serão devolvidas ao término do prazo, com o imóvel pintado e limpo.",
+        "Benfeitorias necessárias serão indenizadas; as voluptuárias não serão indenizadas.",
+        "A garantia locatícia será o seguro-fiança contratado pelo inquilino.",
+        "Animais de estimação são permitidos desde que respeitado o regimento do condomínio.",
+        "O reajuste do aluguel seguirá o IPCA acumulado a cada doze meses de vigência.",
+        "O proprietário realizará os reparos estruturais do telhado e da rede hidráulica.",
+        "A vistoria final comparará o estado do apartamento com o laudo de entrada.",
+    ],
+    "telecom": [
+        "A velocidade de download entregue será de no mínimo 80% da velocidade contratada.",
+        "O cliente poderá solicitar a portabilidade do número para outra operadora.",
+        "O modem fornecido em comodato deverá ser devolvido no cancelamento do serviço.",
+        "A franquia mensal de dados móveis não utilizada não será acumulada.",
+        "O suporte técnico funcionará 24 horas por meio da central de relacionamento.",
+        "Reclamações não resolvidas poderão ser registradas na agência reguladora.",
+        "A instalação da fibra será agendada em até sete dias úteis após a assinatura.",
+        "Ligações para números de outras operadoras estão incluídas no pacote contratado.",
+    ],
+    "financeiro": [
+        "O valor liberado será creditado na conta do cliente em até dois dias úteis.",
+        "O custo efetivo total anual da operação é de 34,5% conforme a planilha anexa.",
+        "A liquidação antecipada garante a redução proporcional dos juros.",
+        "As prestações serão calculadas pela tabela Price com vencimentos mensais.",
+        "Em caso de atraso incidirão juros moratórios e multa contratual de 2%.",
+        "O avalista responde solidariamente pelo pagamento da dívida.",
+        "O veículo permanecerá alienado fiduciariamente à instituição até a quitação.",
+        "A tarifa de cadastro será cobrada uma única vez no início do relacionamento.",
+    ],
+    "trabalho": [
+        "O empregado cumprirá expediente das 8h às 17h com uma hora de intervalo.",
+        "As horas extraordinárias serão remuneradas com adicional de cinquenta por cento.",
+        "O colaborador terá direito a vale-refeição e plano de saúde custeado pela empresa.",
+        "A remuneração será depositada até o quinto dia útil do mês subsequente.",
+        "O empregador anotará o contrato na carteira de trabalho digital.",
+        "O período de experiência será de quarenta e cinco dias prorrogáveis.",
+        "O funcionário poderá ser transferido de setor conforme necessidade da empresa.",
+        "Férias coletivas poderão ser concedidas em dezembro mediante aviso prévio.",
+    ],
+    "servicos": [
+        "A contratada desenvolverá o sistema conforme o cronograma do anexo técnico.",
+        "O pagamento ocorrerá após o aceite formal de cada etapa entregue.",
+        "A empresa prestadora manterá sigilo sobre as informações do contratante.",
+        "Os profissionais alocados não terão vínculo empregatício com o tomador.",
+        "A consultoria entregará relatório mensal de indicadores de desempenho.",
+        "Os serviços de limpeza serão executados diariamente no horário comercial.",
+        "Atrasos injustificados nas entregas sujeitam a contratada a glosas.",
+        "A manutenção dos equipamentos será realizada por técnicos certificados.",
+    ],
+    "compra_venda": [
+        "O vendedor entregará os produtos no endereço do comprador em até dez dias.",
+        "O preço total dos bens é pago à vista mediante transferência bancária.",
+        "A mercadoria será conferida no recebimento e eventuais avarias registradas.",
+        "A propriedade dos bens se transfere com a tradição após o pagamento.",
+        "O adquirente poderá devolver itens com defeito no prazo de trinta dias.",
+        "O frete e o seguro do transporte correm por conta do alienante.",
+        "Os lotes de insumos seguirão as especificações técnicas do pedido de compra.",
+        "O sinal pago será abatido do preço no momento da entrega dos equipamentos.",
+    ],
+}
+
+
+def build_labelled_set(per_category: int, seed: int = 7):
+    random.seed(seed)
+    samples = []
+    for label, sentences in SENTENCES.items():
+        for _ in range(per_category):
+            samples.append((" ".join(random.sample(sentences, random.randint(2, 4))), label))
+    random.shuffle(samples)
+    return samples
+
+
+def keyword_classify(text: str):
+    """Mesma regra de palavras-chave do ClassifierAgent.classify_contract"""
+    lower = text.lower()
+    scores = {label: sum(1 for keyword in keywords if keyword in lower)
+              for label, keywords in ClassifierAgent.CONTRACT_TYPES.items()}
+    best = max(scores, key=scores.get)
+    return best, scores[best] / len(ClassifierAgent.CONTRACT_TYPES[best])
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--per-category", type=int, default=50)
+    parser.add_argument("--min-confidence", type=float, default=0.6)
+    args = parser.parse_args()
+
+    samples = build_labelled_set(args.per_category)
+    print("🧭 BENCHMARK DO CLASSIFICADOR POR EMBEDDINGS")
+    print("=" * 72)
+    print(f"{len(samples)} contratos rotulados, {len(SENTENCES)} categorias, "
+          f"limiar de confiança {args.min_confidence}")
+
+    keyword_hits = sum(keyword_classify(text)[0] == label for text, label in samples)
+    print(f"\nPalavras-chave: acurácia {keyword_hits / len(samples):.1%}")
+
+    for mode in ("knn", "centroid"):
+        classifier = EmbeddingClassifier(CONTRACT_TYPE_EXAMPLES, mode=mode)
+        started = time.perf_counter()
+        classifier.classify("aquecimento")  # Monta o índice e calibra
+        fit_ms = (time.perf_counter() - started) * 1000
+
+        latencies, correct, confident, confident_correct, bins = [], 0, 0, 0, {}
+        cascade_correct = deferred = 0
+        for text, label in samples:
+            started = time.perf_counter()
+            prediction = classifier.classify(text)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+            correct += prediction.label == label
+            bucket = min(int(prediction.confidence * 5), 4)
+            hits, total = bins.get(bucket, (0, 0))
+            bins[bucket] = (hits + (prediction.label == label), total + 1)
+            if prediction.confidence >= args.min_confidence:
+                confident += 1
+                confident_correct += prediction.label == label
+
+            keyword_label, keyword_confidence = keyword_classify(text)
+            if keyword_confidence >= 0.3:
+                cascade_correct += keyword_label == label
+            elif prediction.confidence >= args.min_confidence:
+                cascade_correct += prediction.label == label
+            else:
+                deferred += 1
+
+        decided = len(samples) - deferred
+        print(f"\nEmbeddings ({mode}) - índice em {fit_ms:.1f}ms, temperatura {classifier.temperature:.1f}")
+        print(f"  acurácia total:            {correct / len(samples):.1%}")
+        print(f"  acurácia acima do limiar:  {confident_correct / max(confident, 1):.1%} "
+              f"({confident / len(samples):.1%} dos contratos)")
+        print(f"  latência p50/p99:          {percentile(latencies, 0.5):.3f}ms / "
+              f"{percentile(latencies, 0.99):.3f}ms")
+        print("  calibração (confiança -> acurácia):")
+        for bucket in sorted(bins):
+            hits, total = bins[bucket]
+            print(f"    {bucket * 0.2:.1f}-{bucket * 0.2 + 0.2:.1f}: {hits / total:6.1%} ({total} contratos)")
+        print(f"  cascata palavras-chave -> embeddings: acurácia {cascade_correct / max(decided, 1):.1%} "
+              f"nos decididos, {deferred / len(samples):.1%} enviados ao LLM")
+
+
+if __name__ == "__main__":
+    main()
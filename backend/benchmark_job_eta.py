@@ -0,0 +1,109 @@
+"""
+Benchmark da estimativa de conclusão dos jobs
+Simula jobs de análise de contrato com durações realistas por etapa (a análise pelo agente
+domina, e o custo cresce com o número de arquivos) e compara, a cada início de etapa, o
+tempo restante previsto pela extrapolação anterior (decorrido / progresso) e pelo modelo
+de durações históricas (StageDurationModel) com o tempo restante real.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.job_eta import QUEUE_STAGE, StageDurationModel
+
+ROUTE = ["file_validation", "ocr_extraction", "contract_classification",
+         "agent_analysis", "result_compilation", "notification"]
+
+# Duração média (s) por arquivo, e fixa, de cada etapa
+STAGE_COST = {
+    "file_validation": (0.1, 0.5),
+    "ocr_extraction": (4.0, 1.0),
+    "contract_classification": (0.0, 0.3),
+    "agent_analysis": (1.5, 25.0),
+    "result_compilation": (0.0, 0.5),
+    "notification": (0.0, 0.2),
+}
+
+
+def simulate_job(rng, files):
+    """Espera na fila e durações das etapas de um job com `files` arquivos"""
+    queue = rng.expovariate(1 / 5.0)
+    durations = [
+        (per_file * files + fixed) * rng.lognormvariate(0, 0.25)
+        for per_file, fixed in (STAGE_COST[stage] for stage in ROUTE)
+    ]
+    return queue, durations
+
+
+def profile_of(files):
+    return ("1" if files == 1 else "2-5" if files <= 5 else "6-20", "unknown")
+
+
+def legacy_remaining(elapsed, position):
+    """Extrapolação anterior: progresso fixo por posição da etapa na rota"""
+    progress = (position + 1) / (len(ROUTE) + 1)
+    return elapsed / progress - elapsed
+
+
+def run_job(model, rng, job_id, files, errors):
+    queue, durations = simulate_job(rng, files)
+    profile = profile_of(files)
+    total = queue + sum(durations)
+
+    model.observe("contract_analysis", profile, QUEUE_STAGE, queue)
+    model.begin(job_id, "contract_analysis", profile, now=queue)
+    clock = queue
+    for position, (stage, seconds) in enumerate(zip(ROUTE, durations)):
+        actual = total - clock
+        predicted = model.remaining(job_id, stage, ROUTE[position + 1:], now=clock)
+        if errors is not None and predicted is not None:
+            errors["legacy"].append(abs(legacy_remaining(clock, position) - actual) / actual)
+            errors["model"].append(abs(predicted - actual) / actual)
+        clock += seconds
+        model.stage_finished(job_id, stage, now=clock)
+    model.finish(job_id, completed=True, now=clock)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", type=int, default=500, help="jobs concluídos antes da medição")
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    model = StageDurationModel()
+    for n in range(args.history):
+        run_job(model, rng, f"warmup-{n}", rng.choice([1, 3, 10]), None)
+
+    errors = {"legacy": [], "model": []}
+    for n in range(args.jobs):
+        run_job(model, rng, f"job-{n}", rng.choice([1, 3, 10]), errors)
+
+    print("⏱️  BENCHMARK DA ESTIMATIVA DE CONCLUSÃO")
+    print("=" * 72)
+    print(f"{args.history} jobs de histórico, {args.jobs} jobs medidos, "
+          f"{len(errors['model'])} estimativas (uma por início de etapa)")
+    print(f"\n{'erro relativo do tempo restante':<34} {'mediana':>10} {'p90':>10} {'média':>10}")
+    for label, key in (("decorrido / progresso", "legacy"), ("durações históricas", "model")):
+        values = errors[key]
+        print(f"{label:<34} {statistics.median(values):9.1%} {percentile(values, 0.9):9.1%} "
+              f"{statistics.fmean(values):9.1%}")
+
+    stats = model.get_stats()
+    print(f"\nerro absoluto reportado pelo modelo: média {stats['absolute_error_seconds']['avg']:.1f}s, "
+          f"p95 <= {stats['absolute_error_seconds']['p95']}s")
+
+
+if __name__ == "__main__":
+    main()
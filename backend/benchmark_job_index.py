@@ -0,0 +1,128 @@
+"""
+Benchmark das consultas de jobs - índice por usuário e contadores por status
+Preenche o MemoryJobStore com 1M de jobs retidos e compara get_user_jobs, o snapshot
+inicial do WebSocket e jobs_by_status com a implementação anterior (varredura completa
+de todos os jobs, uma por status).
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.job_store import MemoryJobStore
+
+STATUSES = ["pending", "processing", "completed", "failed", "cancelled", "timed_out"]
+FINAL_WEIGHTS = [0, 0, 90, 6, 3, 1]
+
+
+class Job:
+    """Job mínimo (o repositório só usa id, user_id, status e created_at)"""
+    __slots__ = ("id", "user_id", "status", "created_at")
+
+    def __init__(self, job_id, user_id, status, created_at):
+        self.id = job_id
+        self.user_id = user_id
+        self.status = status
+        self.created_at = created_at
+
+
+class ScanJobStore:
+    """Implementação anterior: cada consulta percorre todos os jobs"""
+
+    def __init__(self, jobs):
+        self._jobs = jobs
+
+    async def list_user_jobs(self, user_id, status=None, limit=None):
+        jobs = [
+            job for job in self._jobs.values()
+            if job.user_id == user_id and (status is None or job.status == status)
+        ]
+        jobs.sort(key=lambda job: job.created_at)
+        return jobs[-limit:] if limit else jobs
+
+    async def jobs_by_status(self):
+        return {status: sum(1 for job in self._jobs.values() if job.status == status) for status in STATUSES}
+
+
+class IndexedQueries:
+    def __init__(self, store):
+        self.store = store
+
+    async def list_user_jobs(self, user_id, status=None, limit=None):
+        return await self.store.list_user_jobs(user_id, status, limit)
+
+    async def jobs_by_status(self):
+        counts = await self.store.count_by_status()
+        return {status: counts.get(status, 0) for status in STATUSES}
+
+
+def populate(args):
+    rng = random.Random(args.seed)
+    store = MemoryJobStore()
+    users = [f"user-{n}" for n in range(args.users)]
+    started = time.perf_counter()
+    for n in range(args.jobs):
+        job = Job(f"job-{n}", rng.choice(users), "pending", n)
+        store.put(job)
+        # Transições de estado até o desfecho final (cada uma atualiza os contadores)
+        job.status = "processing"
+        store.put(job)
+        if rng.random() < 0.99:
+            job.status = rng.choices(STATUSES, FINAL_WEIGHTS)[0]
+            store.put(job)
+    return store, users, time.perf_counter() - started
+
+
+def comparable(result):
+    return [job.id for job in result] if isinstance(result, list) else result
+
+
+async def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = await fn()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+async def main_async(args):
+    print("🗂️  BENCHMARK DAS CONSULTAS DE JOBS")
+    print("=" * 72)
+    store, users, load_seconds = populate(args)
+    print(f"{args.jobs:,} jobs de {args.users:,} usuários carregados em {load_seconds:.1f}s "
+          f"({load_seconds / args.jobs * 1e6:.1f}µs por job, com as transições de status)")
+
+    user = users[0]
+    scan, indexed = ScanJobStore(store._jobs), IndexedQueries(store)
+    cases = [
+        ("get_user_jobs", lambda q: q.list_user_jobs(user)),
+        ("snapshot do WebSocket (20)", lambda q: q.list_user_jobs(user, limit=20)),
+        ("jobs em andamento", lambda q: q.list_user_jobs(user, status="processing")),
+        ("jobs_by_status", lambda q: q.jobs_by_status()),
+    ]
+
+    print(f"\n{'consulta':<28} {'varredura':>12} {'indexado':>12} {'ganho':>10}")
+    for label, query in cases:
+        scan_ms, expected = await timed(lambda: query(scan), args.scan_repeat)
+        indexed_ms, result = await timed(lambda: query(indexed), args.repeat)
+        assert comparable(expected) == comparable(result)
+        print(f"{label:<28} {scan_ms:10.2f}ms {indexed_ms:10.4f}ms {scan_ms / indexed_ms:9.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--scan-repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark do pipeline de jobs - vazão (jobs/min) e latência do event loop
+Compara o processamento em linha (estágio de CPU no event loop, como antes) com o
+StagePipeline (CPU num ProcessPoolExecutor, I/O em workers assíncronos) com 1, 4 e 16
+núcleos. OCR e LLM são simulados por esperas; a varredura de regras é trabalho real.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.agents.entity_classifier import ENTITY_RULES
+from app.services.job_pipeline import PipelineStage, StagePipeline
+from app.services.rule_engine import rule_engine
+
+CLAUSE = (
+    "A CONTRATADA, pessoa jurídica inscrita no CNPJ nº 12.345.678/0001-90, prestará ao "
+    "CONTRATANTE, consumidor pessoa física inscrito no CPF nº 123.456.789-09, os serviços "
+    "descritos neste contrato de adesão, observada a relação de consumo e a boa-fé objetiva. "
+)
+
+
+def cpu_stage(job: int, size_kb: int) -> int:
+    """Varredura de regras num contrato sintético (texto único por job, sem cache)"""
+    text = f"Contrato {job}. " + CLAUSE * (size_kb * 1024 // len(CLAUSE) + 1)
+    return len(rule_engine.scan(text, ENTITY_RULES.name))
+
+
+class LoopLag:
+    """Maior atraso de um timer de 10ms: quanto o event loop ficou travado"""
+
+    def __init__(self):
+        self.max_lag = 0.0
+        self._task = None
+
+    async def _tick(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            self.max_lag = max(self.max_lag, time.perf_counter() - started - 0.01)
+
+    def __enter__(self):
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+async def run_inline(args):
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def job(n):
+        async with semaphore:
+            await asyncio.sleep(args.ocr_ms / 1000)
+            cpu_stage(n, args.size_kb)
+            await asyncio.sleep(args.llm_ms / 1000)
+
+    await asyncio.gather(*(job(n) for n in range(args.jobs)))
+
+
+async def run_pipeline(args, cores):
+    loop = asyncio.get_running_loop()
+    pipeline = None
+
+    async def ocr(item):
+        await asyncio.sleep(args.ocr_ms / 1000)
+
+    async def scan(item):
+        await loop.run_in_executor(pipeline.cpu_executor, cpu_stage, int(item.job_id), args.size_kb)
+
+    async def llm(item):
+        await asyncio.sleep(args.llm_ms / 1000)
+
+    pipeline = StagePipeline(
+        [
+            PipelineStage("ocr_extraction", ocr, "io", args.concurrency),
+            PipelineStage("contract_classification", scan, "cpu"),
+            PipelineStage("agent_analysis", llm, "io", args.concurrency),
+        ],
+        cpu_workers=cores
+    )
+    # Aquecimento do pool (processos criados fora da medição)
+    await asyncio.gather(*(loop.run_in_executor(pipeline.cpu_executor, cpu_stage, -n, 1) for n in range(cores)))
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    route = ["ocr_extraction", "contract_classification", "agent_analysis"]
+
+    async def job(n):
+        async with semaphore:
+            await pipeline.run(str(n), route)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(job(n) for n in range(args.jobs)))
+    elapsed = time.perf_counter() - started
+    await pipeline.shutdown()
+    return elapsed
+
+
+async def measure(label, coro_factory):
+    with LoopLag() as lag:
+        started = time.perf_counter()
+        elapsed = await coro_factory()
+        elapsed = elapsed or time.perf_counter() - started
+    return label, elapsed, lag.max_lag
+
+
+async def main_async(args):
+    started = time.perf_counter()
+    cpu_stage(0, args.size_kb)
+    cpu_ms = (time.perf_counter() - started) * 1000
+
+    print("🏭 BENCHMARK DO PIPELINE DE JOBS")
+    print("=" * 72)
+    print(f"{args.jobs} jobs, {args.concurrency} em andamento, OCR {args.ocr_ms}ms, LLM {args.llm_ms}ms, "
+          f"varredura de regras ~{cpu_ms:.0f}ms por job")
+    print(f"Núcleos disponíveis nesta máquina: {os.cpu_count()}")
+
+    results = [await measure("em linha (event loop)", lambda: run_inline(args))]
+    for cores in args.cores:
+        results.append(await measure(f"pipeline, {cores} núcleo(s)", lambda c=cores: run_pipeline(args, c)))
+
+    print(f"\n{'modo':<26} {'jobs/min':>10} {'tempo':>8} {'travamento máx. do loop':>24}")
+    for label, elapsed, lag in results:
+        print(f"{label:<26} {args.jobs / elapsed * 60:10.0f} {elapsed:7.1f}s {lag * 1000:21.0f}ms")
+    if max(args.cores) > (os.cpu_count() or 1):
+        print("\nObs.: com mais processos do que núcleos a vazão do estágio de CPU não aumenta; "
+              "rode em máquinas com 4 e 16 núcleos para medir o ganho de escala.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--size-kb", type=int, default=256, help="Tamanho do contrato varrido no estágio de CPU")
+    parser.add_argument("--ocr-ms", type=int, default=300)
+    parser.add_argument("--llm-ms", type=int, default=800)
+    parser.add_argument("--cores", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
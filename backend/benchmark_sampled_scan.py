@@ -0,0 +1,130 @@
+"""
+Benchmark da varredura amostrada - acurácia versus caracteres lidos em contratos longos
+Gera um corpus sintético (título e partes no início, corpo extenso com palavras-chave
+esparsas da categoria e ruído de outras categorias) e compara orçamentos de leitura do
+IntelligentClassifier e do EntityClassifier contra a varredura completa
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.agents.intelligent_classifier import IntelligentClassifier
+from app.core.config import settings
+
+BOILERPLATE = [
+    "As partes declaram ter lido e compreendido integralmente as condições deste instrumento.",
+    "Qualquer tolerância quanto ao descumprimento de obrigação não implicará novação ou renúncia.",
+    "As notificações serão feitas por escrito e consideradas recebidas na data do protocolo.",
+    "Este instrumento obriga as partes e seus sucessores a qualquer título.",
+    "A nulidade de uma disposição não prejudica a validade das demais cláusulas.",
+    "Os casos omissos serão resolvidos de comum acordo, observada a legislação aplicável.",
+    "Fica eleito o foro da comarca do domicílio do contratante para dirimir controvérsias.",
+    "Os valores serão atualizados anualmente pelo índice oficial de inflação.",
+]
+
+
+def fake_cpf(rng):
+    digits = f"{rng.randrange(10 ** 11):011d}"
+    return f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+
+
+def fake_cnpj(rng):
+    digits = f"{rng.randrange(10 ** 14):014d}"
+    return f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:]}"
+
+
+def build_contract(rng, category, rules, size, hidden_head):
+    """Contrato de ~`size` caracteres; com hidden_head a evidência fica só no corpo"""
+    keywords = rules[category]['keywords']
+    others = [c for c in rules if c != category]
+    head_terms = [] if hidden_head else rng.sample(keywords, min(3, len(keywords)))
+    parts = [
+        f"CONTRATO {' '.join(head_terms).upper()}",
+        f"CONTRATANTE: Fulano de Tal, CPF nº {fake_cpf(rng)}. "
+        f"CONTRATADA: Empresa Exemplo Ltda, CNPJ nº {fake_cnpj(rng)}.",
+        *(f"O objeto envolve {term} nas condições abaixo." for term in head_terms),
+    ]
+    length = sum(len(part) for part in parts)
+    clause = 1
+    while length < size:
+        sentence = rng.choice(BOILERPLATE)
+        roll = rng.random()
+        if roll < 0.03:
+            sentence += f" Aplica-se o disposto sobre {rng.choice(keywords)}."
+        elif roll < 0.05:
+            sentence += f" Não se aplica o regime de {rng.choice(rules[rng.choice(others)]['keywords'])}."
+        parts.append(f"Cláusula {clause}ª. {sentence}")
+        length += len(parts[-1])
+        clause += 1
+    parts.append("E por estarem justas e contratadas, assinam a relação de consumo descrita.")
+    return "\n".join(parts)
+
+
+def build_corpus(classifier, count, min_size, max_size, hidden_share, seed):
+    rng = random.Random(seed)
+    rules = classifier.classification_rules
+    corpus = []
+    for _ in range(count):
+        category = rng.choice(list(rules))
+        size = int(min_size * (max_size / min_size) ** rng.random())  # Log-uniforme
+        corpus.append((build_contract(rng, category, rules, size, rng.random() < hidden_share), category))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contracts", type=int, default=120)
+    parser.add_argument("--min-size", type=int, default=20_000)
+    parser.add_argument("--max-size", type=int, default=1_000_000)
+    parser.add_argument("--hidden-head-share", type=float, default=0.2)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[4000, 8000, 16000, 32000, 64000])
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    classifier = IntelligentClassifier()
+    corpus = build_corpus(classifier, args.contracts, args.min_size, args.max_size,
+                          args.hidden_head_share, args.seed)
+    total_chars = sum(len(text) for text, _ in corpus)
+    print("📏 BENCHMARK DA VARREDURA AMOSTRADA")
+    print("=" * 72)
+    print(f"{len(corpus)} contratos sintéticos, {total_chars / 1e6:.1f}M caracteres, "
+          f"{args.hidden_head_share:.0%} sem evidência no início")
+
+    original_budget = settings.CLASSIFIER_SCAN_BUDGET_CHARS
+    runs = {}
+    try:
+        for budget in [0] + sorted(args.budgets):
+            settings.CLASSIFIER_SCAN_BUDGET_CHARS = budget
+            started = time.perf_counter()
+            results = [classifier.classify_contract(text) for text, _ in corpus]
+            classify_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            entities = [classifier.entity_classifier.identify_entities(text) for text, _ in corpus]
+            entity_seconds = time.perf_counter() - started
+            runs[budget] = (results, entities, classify_seconds, entity_seconds)
+    finally:
+        settings.CLASSIFIER_SCAN_BUDGET_CHARS = original_budget
+
+    full_results, full_entities = runs[0][0], runs[0][1]
+    print(f"\n{'orçamento':>10} {'lido':>7} {'acurácia':>9} {'= completa':>11} "
+          f"{'entidades =':>12} {'ms/contrato':>12} {'ms entidades':>13}")
+    for budget, (results, entities, classify_seconds, entity_seconds) in runs.items():
+        read = sum(result.get('scanned_chars', len(text)) for result, (text, _) in zip(results, corpus))
+        accuracy = sum(result['classification'] == label for result, (_, label) in zip(results, corpus))
+        agreement = sum(a['classification'] == b['classification'] for a, b in zip(results, full_results))
+        entity_agreement = sum(
+            (a.type, a.party_relationship) == (b.type, b.party_relationship)
+            for a, b in zip(entities, full_entities)
+        )
+        print(f"{budget or 'completo':>10} {read / total_chars:7.1%} {accuracy / len(corpus):9.1%} "
+              f"{agreement / len(corpus):11.1%} {entity_agreement / len(corpus):12.1%} "
+              f"{classify_seconds * 1000 / len(corpus):12.2f} {entity_seconds * 1000 / len(corpus):13.2f}")
+
+
+if __name__ == "__main__":
+    main()
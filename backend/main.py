@@ -29,6 +29,16 @@ app.include_router(signatures.router, prefix="/api/v1/signatures", tags=["signat
 app.include_router(image_processing.router, prefix="/api/v1", tags=["image-processing"])
 app.include_router(async_jobs.router, prefix="/api/v1/async", tags=["async-processing"])
 
+@app.on_event("startup")
+async def start_job_consumer():
+    # Cada worker do uvicorn/gunicorn consome jobs do broker, mesmo sem receber requisições
+    await async_jobs.async_processor.start()
+
+@app.on_event("shutdown")
+async def flush_job_store():
+    # Para os workers e grava o progresso pendente (write-behind) antes de encerrar
+    await async_jobs.async_processor.shutdown()
+
 @app.get("/")
 async def root():
     return {
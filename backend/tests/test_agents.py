@@ -1,10 +1,17 @@
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock
-from app.agents.base_agent import BaseContractAgent, ContractAnalysis
+from app.agents.base_agent import AnalysisStage, BaseContractAgent, ContractAnalysis
 from app.agents.classifier_agent import ClassifierAgent
 from app.agents.rental_agent import RentalAgent
 from app.agents.telecom_agent import TelecomAgent
 from app.agents.financial_agent import FinancialAgent
+from app.agents.clause_segmenter import ClauseSegmenter
+from app.agents.embedding_classifier import CONTRACT_TYPE_EXAMPLES, EmbeddingClassifier
+from app.agents.intelligent_classifier import IntelligentClassifier
+from app.agents.intent_router import Intent, IntentRouter
+from app.core.config import settings
+from app.services.llm_gateway import FakeLLMBackend, LLMGateway, estimate_tokens, min_cacheable_tokens
 
 class TestBaseContractAgent:
     """Test base contract agent functionality."""
@@ -38,6 +45,266 @@ class TestBaseContractAgent:
         assert analysis.risk_level == "medium"
         assert len(analysis.key_findings) == 2
         assert analysis.confidence_score == 0.85
+    
+    @pytest.mark.asyncio
+    async def test_stage_graph_runs_concurrently_with_deadlines(self):
+        """Test that independent stages overlap and slow stages fall back to defaults."""
+        agent = TelecomAgent(MagicMock(), MagicMock())
+        
+        async def slow(result, delay):
+            await asyncio.sleep(delay)
+            return result
+        
+        started = asyncio.get_running_loop().time()
+        results, timings = await agent.run_stage_graph([
+            AnalysisStage("rag_context", lambda: slow("contexto", 0.05), timeout=1.0),
+            AnalysisStage("precedents", lambda: slow(["p"], 0.05), timeout=1.0),
+            AnalysisStage("company", lambda: slow({"cnpj": "x"}, 1.0), timeout=0.05, default=None),
+        ])
+        elapsed = asyncio.get_running_loop().time() - started
+        
+        assert elapsed < 0.5
+        assert results == {"rag_context": "contexto", "precedents": ["p"], "company": None}
+        assert timings["company"]["status"] == "timeout"
+        assert timings["rag_context"]["status"] == "ok"
+
+class TestIntentRouter:
+    """Test declarative intent routing for template agents."""
+    
+    @pytest.fixture
+    def router(self):
+        """Create router with a small intent table."""
+        router = IntentRouter()
+        router.register("DemoAgent", [
+            Intent(name="cancelar", keywords=["cancelar", "multa"], template="CANCELAR"),
+            Intent(name="fidelidade", keywords=["fidelidade", "multa rescisória"], template="FIDELIDADE"),
+            Intent(name="canais", keywords=["canais", "cai"], template="CANAIS"),
+        ])
+        return router
+    
+    def test_first_declared_intent_wins(self, router):
+        """Test that declaration order breaks ties like the old if/elif chains."""
+        assert router.respond("DemoAgent", "fidelidade e cancelar") == "CANCELAR"
+        assert router.respond("DemoAgent", "qual a fidelidade?") == "FIDELIDADE"
+    
+    def test_substring_and_overlapping_keywords(self, router):
+        """Test substring semantics, including keywords sharing a prefix."""
+        assert router.respond("DemoAgent", "multa rescisória") == "CANCELAR"
+        assert router.respond("DemoAgent", "o sinal caiu") == "CANAIS"
+    
+    def test_unmatched_question_and_stats(self, router):
+        """Test misses and hit reporting."""
+        assert router.respond("DemoAgent", "bom dia") is None
+        assert router.respond("OtherAgent", "cancelar") is None
+        router.respond("DemoAgent", "canais")
+        
+        stats = router.get_intent_stats()
+        assert stats["top_intents"][0] == {"agent": "DemoAgent", "intent": "canais", "hits": 1}
+        assert stats["unmatched_by_agent"]["DemoAgent"] == 1
+
+class TestClauseSegmentation:
+    """Test clause segmentation and map-reduce clause analysis."""
+    
+    LONG_CONTRACT = "CONTRATO DE FINANCIAMENTO\nPartes qualificadas abaixo.\n" + "".join(
+        f"\nCLÁUSULA {n}ª - DA OBRIGAÇÃO {n}\n" + "O financiado se obriga ao pagamento das parcelas. " * 30
+        for n in range(1, 9)
+    )
+    
+    def test_segments_clauses_and_paragraphs(self):
+        """Test CLÁUSULA, § and numbered boundaries."""
+        text = (
+            "CONTRATO DE LOCAÇÃO\n"
+            "CLÁUSULA 1ª - DO OBJETO\nLocação do imóvel para fins exclusivamente residenciais do locatário.\n"
+            "§ 1º É vedada a sublocação total ou parcial do imóvel sem autorização do locador.\n"
+            "2. DA MULTA\nMulta de três aluguéis em caso de rescisão antecipada pelo locatário.\n"
+        )
+        clauses = ClauseSegmenter(min_clause_chars=10).segment(text)
+        
+        assert [c.heading for c in clauses][:2] == ["Preâmbulo", "CLÁUSULA 1ª - DO OBJETO"]
+        assert clauses[2].parent == "1"
+        assert clauses[3].number == "2"
+    
+    @pytest.mark.asyncio
+    async def test_map_reduce_with_bounded_concurrency(self):
+        """Test that every clause is analysed, merged and concurrency stays bounded."""
+        backend = FakeLLMBackend(
+            response_text='{"analysis": "ok", "risk_level": "alto", "legal_basis": "Art. 51 CDC", '
+                          '"key_finding": "Parcela abusiva", "confidence_score": 0.9, '
+                          '"risk_factors": [{"type": "juros", "description": "d", "severity": "high"}]}',
+            latency=0.01
+        )
+        agent = FinancialAgent(LLMGateway(backend).as_client(), MagicMock())
+        agent.CLAUSE_CONCURRENCY = 3
+        
+        result = await agent.analyze_contract(self.LONG_CONTRACT)
+        
+        assert result.metadata["clause_count"] == 8
+        assert len(result.clauses_analysis) == 8
+        assert len(result.risk_factors) == 8
+        assert result.risk_level == "Alto Risco"
+        assert backend.max_in_flight <= 3
+
+class TestModelRouting:
+    """Test cheap-first model routing with escalation."""
+    
+    LOW_RISK = '{"summary": "ok", "risk_factors": [{"type": "prazo", "severity": "low"}], "confidence_score": 0.9}'
+    HIGH_RISK = '{"summary": "ok", "risk_factors": [{"type": "multa", "severity": "high"}], "confidence_score": 0.9}'
+    
+    @pytest.mark.asyncio
+    async def test_fast_model_accepted_or_escalated(self):
+        """Test that the fast model answer is kept unless it reports a high-severity risk."""
+        from app.agents.model_router import model_router
+        fast, full = model_router.routes["fast"].model, model_router.routes["full"].model
+        
+        backend = FakeLLMBackend(response_text=self.LOW_RISK)
+        agent = RentalAgent(LLMGateway(backend).as_client(), MagicMock())
+        result = await agent.analyze_contract("Locação residencial do imóvel da Rua das Flores, 10.")
+        
+        assert [call["model"] for call in backend.calls] == [fast]
+        assert result.metadata["routing"]["route"] == "fast"
+        
+        backend = FakeLLMBackend(response_text=self.HIGH_RISK)
+        agent = RentalAgent(LLMGateway(backend).as_client(), MagicMock())
+        result = await agent.analyze_contract("Locação residencial do imóvel da Rua das Palmeiras, 20.")
+        
+        assert [call["model"] for call in backend.calls] == [fast, full]
+        assert result.metadata["routing"]["attempts"][0]["reason"] == "high_severity_risk"
+    
+    @pytest.mark.asyncio
+    async def test_rules_route_skips_llm_for_confident_short_contracts(self):
+        """Test the deterministic route and the explicit full-analysis request."""
+        backend = FakeLLMBackend(response_text=self.LOW_RISK)
+        agent = RentalAgent(LLMGateway(backend).as_client(), MagicMock())
+        context = {"classification": {"contract_type": "locacao", "confidence": 0.95}}
+        
+        result = await agent.analyze_contract("Locação residencial do imóvel da Rua dos Ipês, 30.", context)
+        
+        assert not backend.calls
+        assert result.metadata["routing"]["route"] == "rules"
+        
+        await agent.analyze_contract("Locação residencial do imóvel da Rua dos Ipês, 30.",
+                                     {**context, "analysis_depth": "full"})
+        assert len(backend.calls) == 1
+
+class TestPromptPrefixCaching:
+    """Test the stable prompt prefix and cached-token accounting."""
+    
+    @pytest.mark.asyncio
+    async def test_prefix_is_shared_across_contracts(self):
+        """Test that only the suffix varies and repeat prefixes count as cache reads."""
+        backend = FakeLLMBackend(response_text=TestModelRouting.LOW_RISK)
+        gateway = LLMGateway(backend)
+        agent = RentalAgent(gateway.as_client(), MagicMock())
+        
+        await agent.analyze_contract("Locação residencial do imóvel da Rua das Acácias, 40.")
+        await agent.analyze_contract("Locação residencial do imóvel da Rua das Orquídeas, 50.")
+        
+        first, second = backend.calls
+        assert first["system"] == second["system"] == agent.get_prompt_prefix()
+        assert "Acácias" in first["prompt"] and "Acácias" not in first["system"]
+        stats = gateway.get_stats()["prompt_cache_by_agent"]["locacao"]
+        assert stats["cache_hits"] == 1
+        assert stats["cache_read_input_tokens"] == stats["cache_creation_input_tokens"] > 0
+    
+    def test_prefixes_reach_provider_cache_minimum(self):
+        """Test that the specialized prefixes are long enough to be cached on every routed model."""
+        for agent_class in (RentalAgent, TelecomAgent, FinancialAgent):
+            prefix = agent_class(MagicMock(), MagicMock()).get_prompt_prefix()
+            for model in (settings.MODEL_ROUTING_FAST_MODEL, settings.MODEL_ROUTING_FULL_MODEL):
+                assert estimate_tokens(prefix) >= min_cacheable_tokens(model), (agent_class.__name__, model)
+
+class TestEmbeddingClassifier:
+    """Test the local embedding tier between keywords and the LLM."""
+    
+    @pytest.mark.asyncio
+    async def test_embedding_tier_skips_llm(self):
+        """Test that a keyword-poor contract is classified locally without calling Claude."""
+        backend = FakeLLMBackend(response_text='{"contract_type": "servicos", "confidence": 0.9}')
+        agent = ClassifierAgent(LLMGateway(backend).as_client(), MagicMock())
+        
+        result = await agent.classify_contract(
+            "As horas extraordinárias serão pagas com adicional e o expediente terá intervalo de uma hora."
+        )
+        
+        assert result["contract_type"] == "trabalho"
+        assert result["method"] == "embedding_knn"
+        assert not backend.calls
+    
+    def test_unrelated_text_is_ambiguous(self):
+        """Test that calibrated confidence stays low without category evidence."""
+        classifier = EmbeddingClassifier(CONTRACT_TYPE_EXAMPLES)
+        
+        prediction = classifier.classify("Ata da reunião sobre a pintura da fachada e o jardim.")
+        
+        assert prediction.confidence < 0.6
+        assert classifier.classify("Plano de internet por fibra com roteador wifi.").label == "telecom"
+    
+    def test_out_of_domain_text_goes_to_general(self):
+        """Test that a text sharing almost no terms with any category is not sent to a specialized agent."""
+        text = "Termo de comodato de bicicleta entre vizinhos."
+        classifier = IntelligentClassifier()
+        
+        prediction = classifier.embedding_classifier.classify(text)
+        assert prediction.label is None and prediction.confidence == 0.0
+        assert prediction.shared_features < classifier.embedding_classifier.min_shared_features
+        assert classifier.classify_contract(text)["classification"] == "general"
+        assert EmbeddingClassifier(CONTRACT_TYPE_EXAMPLES).classify(text).label is None
+
+class TestBulkClassification:
+    """Test vectorized bulk classification."""
+    
+    TEXTS = [
+        "Contrato de plano de saúde com carência e coparticipação na rede credenciada.",
+        "Fatura do cartão de crédito com anuidade cartão e juros do rotativo cartão.",
+        "Aluguel do apartamento com caução e fiador, contrato de locação residencial.",
+        "Documento sem relação com nenhuma categoria.",
+        "",
+    ]
+    
+    def test_matches_single_document_classifier(self, monkeypatch):
+        """Test that serial and process-pool batches equal classify_contract per text."""
+        classifier = IntelligentClassifier()
+        expected = [classifier.classify_contract(text) for text in self.TEXTS]
+        
+        assert classifier.classify_many(self.TEXTS, max_workers=1) == expected
+        
+        monkeypatch.setattr("app.agents.intelligent_classifier.settings.BULK_CLASSIFICATION_PARALLEL_MIN_BATCH", 2)
+        assert classifier.classify_many(self.TEXTS * 2, max_workers=2) == expected * 2
+        assert expected[0]["classification"] == "health_insurance"
+
+class TestSampledScan:
+    """Test bounded-cost scanning of long contracts."""
+    
+    FILLER = "As partes declaram ter lido e compreendido as condições deste instrumento. " * 2000
+    
+    def test_reads_head_and_tail_within_budget(self, monkeypatch):
+        """Test that a clear long contract stops early with the full-scan result and offsets."""
+        monkeypatch.setattr("app.core.config.settings.CLASSIFIER_SCAN_BUDGET_CHARS", 8000)
+        text = ("Contrato de plano de saúde com carência e coparticipação na rede credenciada. "
+                + self.FILLER + "Beneficiário: CPF nº 123.456.789-09, consumidor.")
+        classifier = IntelligentClassifier()
+        
+        sampled = classifier.classify_contract(text)
+        assert sampled["scanned_chars"] <= 8000 < len(text)
+        assert classifier.classify_many([text], max_workers=1) == [sampled]
+        
+        entity_info = classifier.entity_classifier.identify_entities(text)
+        cpf = next(e for e in entity_info.identified_entities if e["is_document_number"])
+        assert text[cpf["start"]:cpf["end"]].strip() == cpf["text"]
+        
+        monkeypatch.setattr("app.core.config.settings.CLASSIFIER_SCAN_BUDGET_CHARS", 0)
+        full = classifier.classify_contract(text)
+        assert full["scanned_chars"] == len(text)
+        assert full["classification"] == sampled["classification"] == "health_insurance"
+    
+    def test_extends_when_undecided(self, monkeypatch):
+        """Test that evidence only in the middle of the contract widens the scan."""
+        monkeypatch.setattr("app.core.config.settings.CLASSIFIER_SCAN_BUDGET_CHARS", 4000)
+        text = self.FILLER + " Fatura do cartão de crédito com anuidade cartão e rotativo cartão. " + self.FILLER * 2
+        
+        result = IntelligentClassifier().classify_contract(text)
+        assert result["classification"] == "credit_card"
+        assert result["scanned_chars"] > 4000
 
 @pytest.mark.agents
 class TestClassifierAgent:
@@ -245,9 +512,14 @@ class TestAgentIntegration:
         
         agent = RentalAgent(broken_client, mock_rag_service)
         
-        # Should handle errors gracefully
-        with pytest.raises(Exception):
-            await agent.analyze_contract("test contract")
+        # Should handle errors gracefully: failed stages fall back to the basic analysis
+        result = await agent.analyze_contract("test contract")
+        
+        assert isinstance(result, ContractAnalysis)
+        assert result.summary == "Análise básica por falha na análise especializada"
+        assert result.confidence_score == 0.3
+        assert result.metadata["stage_timings"]["rag_context"]["status"] == "error"
+        assert result.metadata["stage_timings"]["llm"]["status"] == "error"
 
 @pytest.mark.slow
 class TestAgentPerformance:
@@ -1,7 +1,7 @@
 import pytest
 import json
 from httpx import AsyncClient
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from app.main import app
 
 @pytest.mark.integration
@@ -254,12 +254,11 @@ class TestChatAPI:
             "message_type": "user"
         }
         
-        with patch("app.api.v1.chat.generate_ai_response") as mock_ai:
-            mock_ai.return_value = {
-                "content": "Olá! Como posso ajudá-lo com seu contrato?",
-                "message_type": "assistant"
-            }
-            
+        async def mock_stream(session, message, db, context):
+            yield "Olá! Como posso ajudá-lo "
+            yield "com seu contrato?"
+        
+        with patch("app.api.v1.chat.stream_ai_response", side_effect=mock_stream):
             response = await client.post(
                 f"/api/v1/chat/sessions/{session_id}/messages",
                 json=message_data,
@@ -295,6 +294,33 @@ class TestChatAPI:
         assert "messages" in data
         assert isinstance(data["messages"], list)
 
+@pytest.mark.integration
+class TestAsyncJobsAPI:
+    """Test async job API endpoints."""
+    
+    @pytest.mark.asyncio
+    async def test_job_plan_comes_from_subscription(self, client: AsyncClient, sample_user_data):
+        """Test that a client-supplied plan is ignored in favour of the user's subscription."""
+        headers = await TestContractsAPI().get_auth_headers(client, sample_user_data)
+        
+        with patch("app.api.v1.async_jobs.async_processor") as processor:
+            processor.create_job = AsyncMock(return_value="job-1")
+            processor.get_job = AsyncMock(return_value=MagicMock(status=MagicMock(value="pending")))
+            response = await client.post(
+                "/api/v1/async/jobs",
+                params={"plan": "premium"},
+                json={
+                    "job_type": "contract_analysis",
+                    "files": ["contrato.pdf"],
+                    "contract_title": "Contrato",
+                    "user_email": sample_user_data["email"]
+                },
+                headers=headers
+            )
+        
+        assert response.status_code == 200
+        assert processor.create_job.await_args.kwargs["plan"] == "free"
+
 @pytest.mark.integration
 class TestHealthAPI:
     """Test health check endpoints."""
@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from datetime import timedelta
+from app.services.async_processor import TERMINAL_STATUSES, AsyncContractProcessor, JobStatus, JobType
+
+class TestAsyncContractProcessor:
+    """Test the job lifecycle through create_job."""
+    
+    @staticmethod
+    def processor(monkeypatch, release_analysis):
+        """Create a processor whose stage helpers are fast fakes; analysis waits for `release_analysis`."""
+        monkeypatch.setattr("app.services.async_processor.settings.ASYNC_MAX_CONCURRENT_JOBS", 1)
+        processor = AsyncContractProcessor()
+        
+        async def returning(value, *args, **kwargs):
+            await asyncio.sleep(0.01)
+            return value
+        
+        async def analyze(contract_type, text):
+            await release_analysis.wait()
+            return {"contract_type": contract_type, "risk_level": "baixo"}
+        
+        async def compile_result(job_id, text, contract_type, analysis):
+            return {"contract_type": contract_type, "analysis": analysis}
+        
+        processor._validate_files = lambda files: returning(files)
+        processor._extract_text_from_files = lambda files: returning("Contrato de locação residencial.")
+        processor._classify_contract = lambda text: returning("locacao")
+        processor._analyze_with_agent = analyze
+        processor._compile_final_result = compile_result
+        processor._send_completion_notification = lambda *args, **kwargs: returning(None)
+        return processor
+    
+    @staticmethod
+    async def wait_for(processor, job_id, statuses, timeout=5.0):
+        async with asyncio.timeout(timeout):
+            while (job := await processor.get_job(job_id)).status not in statuses:
+                await asyncio.sleep(0.01)
+        return job
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_request_reuses_job_until_reprocess(self, monkeypatch, tmp_path):
+        """Test that identical inputs share one job and that a finished job is returned with its result."""
+        release = asyncio.Event()
+        processor = self.processor(monkeypatch, release)
+        contract = tmp_path / "contrato.pdf"
+        contract.write_bytes(b"%PDF contrato")
+        try:
+            first = await processor.create_job("u1", "u1@x.com", JobType.CONTRACT_ANALYSIS, [str(contract)], "Contrato")
+            second = await processor.create_job("u1", "u1@x.com", JobType.CONTRACT_ANALYSIS, [str(contract)], "Contrato")
+            other_user = await processor.create_job("u2", "u2@x.com", JobType.CONTRACT_ANALYSIS, [str(contract)], "Contrato")
+            assert second == first and other_user != first
+            
+            release.set()
+            job = await self.wait_for(processor, first, TERMINAL_STATUSES)
+            assert job.status == JobStatus.COMPLETED
+            assert (await processor.get_job_result(job))["analysis"]["risk_level"] == "baixo"
+            
+            assert await processor.create_job("u1", "u1@x.com", JobType.CONTRACT_ANALYSIS, [str(contract)], "Contrato") == first
+            again = await processor.create_job("u1", "u1@x.com", JobType.CONTRACT_ANALYSIS, [str(contract)],
+                                               "Contrato", reprocess=True)
+            assert again != first
+            stats = processor.dedup.get_stats()
+            assert stats["hits_running"] == 1 and stats["hits_completed"] == 1
+        finally:
+            await processor.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_cancel_running_job_keeps_worker(self, monkeypatch, tmp_path):
+        """Test that cancelling a running job frees its worker for the next job."""
+        release = asyncio.Event()
+        processor = self.processor(monkeypatch, release)
+        files = []
+        for name in ("a.pdf", "b.pdf"):
+            path = tmp_path / name
+            path.write_bytes(name.encode())
+            files.append(str(path))
+        try:
+            running = await processor.create_job("u1", "u1@x.com", JobType.CONTRACT_ANALYSIS, [files[0]], "Lento")
+            async with asyncio.timeout(5.0):
+                while running not in processor.active_jobs:
+                    await asyncio.sleep(0.01)
+            
+            assert await processor.cancel_job(running)
+            job = await self.wait_for(processor, running, TERMINAL_STATUSES)
+            assert job.status == JobStatus.CANCELLED
+            async with asyncio.timeout(5.0):
+                while running in processor.active_jobs:
+                    await asyncio.sleep(0.01)
+            assert not await processor.cancel_job(running)
+            
+            release.set()
+            following = await processor.create_job("u1", "u1@x.com", JobType.CONTRACT_ANALYSIS, [files[1]], "Rápido")
+            assert (await self.wait_for(processor, following, TERMINAL_STATUSES)).status == JobStatus.COMPLETED
+            assert processor.outcomes["cancelled"] == 1 and processor.outcomes["completed"] == 1
+        finally:
+            await processor.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_redelivery_staleness_follows_visibility_timeout(self, monkeypatch, tmp_path):
+        """Test that a redelivered job counts as running elsewhere only while its progress is within the visibility timeout."""
+        monkeypatch.setattr("app.services.job_broker.settings.JOB_BROKER_BACKEND", "sqlite")
+        monkeypatch.setattr("app.services.job_broker.settings.JOB_BROKER_SQLITE_PATH", str(tmp_path / "broker.db"))
+        monkeypatch.setattr("app.services.job_broker.settings.JOB_BROKER_VISIBILITY_TIMEOUT_SECONDS", 60.0)
+        release = asyncio.Event()
+        processor = self.processor(monkeypatch, release)
+        contract = tmp_path / "contrato.pdf"
+        contract.write_bytes(b"%PDF contrato")
+        try:
+            job_id = await processor.create_job("u1", "u1@x.com", JobType.CONTRACT_ANALYSIS, [str(contract)], "Contrato")
+            job = await self.wait_for(processor, job_id, {JobStatus.PROCESSING})
+            assert processor._running_elsewhere(job)
+            
+            # Sem progresso por mais que o visibility timeout (bem menos que o prazo do job)
+            job.updated_at -= timedelta(minutes=5)
+            assert not processor._running_elsewhere(job)
+            release.set()
+        finally:
+            await processor.shutdown()
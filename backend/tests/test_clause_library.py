@@ -0,0 +1,102 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.agents.rental_agent import RentalAgent
+from app.agents.clause_segmenter import Clause
+from app.services.clause_library import ClauseLibrary
+from app.services.llm_gateway import FakeLLMBackend, LLMGateway
+
+class TestClauseLibrary:
+    """Test standard-clause lookup before the LLM."""
+    
+    @pytest.mark.asyncio
+    async def test_known_clause_skips_llm_and_miss_is_queued(self, monkeypatch):
+        """Test that a reworded standard clause is served from the library."""
+        library = ClauseLibrary()
+        monkeypatch.setattr("app.agents.base_agent.clause_library", library)
+        backend = FakeLLMBackend(response_text='{"analysis": "ok", "risk_level": "baixo", "risk_factors": []}')
+        agent = RentalAgent(LLMGateway(backend).as_client(), MagicMock())
+        agent.get_rag_context = AsyncMock(return_value="")
+        
+        known = Clause(index=1, heading="CLÁUSULA 9ª", start=0, end=0, text=(
+            "Fica eleito o foro da comarca da sede da CONTRATADA para dirimir quaisquer dúvidas oriundas "
+            "do presente contrato, com renúncia expressa a qualquer outro, por mais privilegiado que seja."
+        ))
+        verdict = await agent.analyze_clause(known)
+        
+        assert verdict["library_match"]["category"] == "foro_eleicao"
+        assert verdict["risk_level"] == "alto"
+        assert not backend.calls
+        
+        novel = Clause(index=2, heading="CLÁUSULA 10ª", start=0, end=0,
+                       text="O locatário poderá manter um animal doméstico de pequeno porte no imóvel.")
+        await agent.analyze_clause(novel)
+        
+        assert len(backend.calls) == 1
+        pending = library.list_pending()
+        assert len(pending) == 1 and pending[0]["agent_type"] == "locacao"
+        
+        await library.approve(pending[0]["id"], "animais_domesticos")
+        await agent.analyze_clause(novel)
+        assert len(backend.calls) == 1
+        assert library.get_stats()["simhash_hits"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_near_miss_with_other_figures_or_negation_goes_to_llm(self, monkeypatch):
+        """Test that clauses differing only in amounts, rates or a negation are not served from the library."""
+        library = ClauseLibrary()
+        monkeypatch.setattr("app.agents.base_agent.clause_library", library)
+        
+        near_misses = [
+            ("locacao", "Em caso de rescisão antecipada do contrato pelo locatário, este pagará multa equivalente "
+                        "a 12 (doze) aluguéis vigentes, proporcional ao tempo restante do contrato."),
+            ("locacao", "Em caso de rescisão antecipada do contrato pelo locatário, este pagará multa equivalente "
+                        "a 3 (três) aluguéis vigentes, não proporcional ao tempo restante do contrato."),
+            ("financeiro", "O atraso no pagamento acarretará multa moratória de 10% (dez por cento) sobre o valor "
+                           "da parcela, acrescida de juros de mora de 1% (um por cento) ao mês, calculados pro rata die."),
+        ]
+        for agent_type, text in near_misses:
+            assert await library.lookup(text, agent_type) is None
+        assert library.get_stats()["term_mismatches"] >= len(near_misses)
+        
+        backend = FakeLLMBackend(response_text='{"analysis": "abusiva", "risk_level": "alto", "risk_factors": []}')
+        agent = RentalAgent(LLMGateway(backend).as_client(), MagicMock())
+        agent.get_rag_context = AsyncMock(return_value="")
+        verdict = await agent.analyze_clause(Clause(index=1, heading="CLÁUSULA 5ª", start=0, end=0,
+                                                    text=near_misses[0][1]))
+        
+        assert "library_match" not in verdict
+        assert verdict["risk_level"] == "alto"
+        
+        reworded = ("Em caso de rescisão antecipada do contrato pelo LOCATÁRIO, este pagará multa equivalente "
+                    "a três aluguéis vigentes, proporcional ao tempo restante do contrato.")
+        clause, method, _ = await library.lookup(reworded, "locacao")
+        assert (clause.category, method) == ("multa_rescisoria_locacao", "simhash")
+    
+    @pytest.mark.asyncio
+    async def test_pending_and_approved_clauses_are_shared_through_the_store(self, tmp_path):
+        """Test that a worker's miss reaches the reviewing process and the approval reaches the worker."""
+        path = str(tmp_path / "clauses.json")
+        worker = ClauseLibrary(path=path, reload_interval=0)
+        api = ClauseLibrary(path=path)
+        text = "O locatário poderá manter um animal doméstico de pequeno porte no imóvel."
+        
+        worker.record_miss(text, {"analysis": "ok", "risk_level": "baixo", "risk_factors": []}, "locacao")
+        pending = api.list_pending()
+        assert len(pending) == 1 and api.has_pending(pending[0]["id"])
+        
+        await api.approve(pending[0]["id"], "animais_domesticos")
+        clause, method, _ = await worker.lookup(text, "locacao")
+        assert (clause.category, method) == ("animais_domesticos", "simhash")
+        assert not worker.pending and not ClauseLibrary(path=path).list_pending()
+    
+    @pytest.mark.asyncio
+    async def test_failing_embedder_is_not_retried_on_every_lookup(self):
+        """Test that after an embedder failure lookups fall back to SimHash without calling it again."""
+        embedder = AsyncMock(side_effect=RuntimeError("embeddings indisponíveis"))
+        library = ClauseLibrary(embedder=embedder)
+        
+        for _ in range(3):
+            assert await library.lookup("O locatário poderá manter um animal doméstico no imóvel.", "locacao") is None
+        
+        assert embedder.await_count == 1
+        assert library.get_stats()["embedder_failures"] == 1
@@ -0,0 +1,128 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from app.agents.telecom_agent import TelecomAgent
+from app.agents.factory import AgentFactory
+from app.services.contract_dedup import ContractDedupIndex
+from app.services.llm_gateway import FakeLLMBackend, LLMGateway
+
+class TestContractDedup:
+    """Test near-duplicate detection and clause-level reuse."""
+    
+    BODY = "".join(
+        f"\nCLÁUSULA {n}ª - DA CONDIÇÃO {n}\n"
+        + f"O assinante aceita a condição {n} do plano de telefonia e pagará a mensalidade contratada. " * 4
+        for n in range(1, 16)
+    )
+    
+    def test_finds_near_duplicate_only(self):
+        """Test that a lightly edited copy matches and an unrelated contract does not."""
+        index = ContractDedupIndex()
+        index.add("original", "Assinante: Maria\n" + self.BODY)
+        
+        edited = "Assinante: José\n" + self.BODY.replace("condição 3 do", "condição 3 revista do")
+        unrelated = self.BODY.replace("telefonia", "financiamento imobiliário com juros")
+        
+        assert index.find_near_duplicate(edited)[0] == "original"
+        assert index.find_near_duplicate(unrelated) is None
+    
+    @pytest.mark.asyncio
+    async def test_reanalyses_only_changed_clauses(self):
+        """Test that reuse keeps prior verdicts and re-analyses the edited clause."""
+        index = ContractDedupIndex()
+        backend = FakeLLMBackend(response_text='{"analysis": "nova", "risk_level": "alto", '
+                                               '"risk_factors": [{"type": "t", "severity": "high"}]}')
+        agent = TelecomAgent(LLMGateway(backend).as_client(), MagicMock())
+        prior = {"status": "success", "classification": {"contract_type": "telecom"}, "analysis": {
+            "summary": "Resumo", "key_findings": [], "recommendations": [], "risk_level": "Baixo Risco",
+            "clauses_analysis": [{"clause": "CLÁUSULA 3ª - DA CONDIÇÃO 3", "analysis": "antiga"}],
+            "risk_factors": [],
+        }}
+        edited = self.BODY.replace("condição 3 do", "condição 3 revista do")
+        
+        plan = index.plan_reuse(edited, self.BODY)
+        result = await index.apply_reuse(prior, plan, agent, "original", 0.9)
+        
+        assert len(backend.calls) == 1
+        assert plan.reused == 14
+        assert [c["analysis"] for c in result["analysis"]["clauses_analysis"]] == ["nova"]
+        assert result["analysis"]["metadata"]["dedup"]["reanalysed_clauses"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_reuse_builds_agent_through_factory(self, monkeypatch):
+        """Test reuse end to end for agents whose constructors take no database session."""
+        backend = FakeLLMBackend(response_text='{"analysis": "nova", "risk_level": "baixo", "risk_factors": []}')
+        factory = AgentFactory(LLMGateway(backend).as_client(), MagicMock())
+        edited = self.BODY.replace("condição 3 do", "condição 3 revista do")
+        
+        for contract_type in ("telecom", "financeiro"):
+            index = ContractDedupIndex()
+            index.add("original", self.BODY, contract_type)
+            prior = {"status": "success", "classification": {"contract_type": contract_type}, "analysis": {
+                "summary": "Resumo", "key_findings": [], "recommendations": [], "risk_level": "Baixo Risco",
+                "clauses_analysis": [], "risk_factors": [],
+            }}
+            monkeypatch.setattr(index, "refresh", AsyncMock(return_value=0))
+            monkeypatch.setattr(index, "_load_source", AsyncMock(return_value=(prior, self.BODY)))
+            monkeypatch.setattr(factory.classifier, "classify_contract",
+                                AsyncMock(return_value={"contract_type": contract_type, "confidence": 0.9}))
+            
+            result = await index.reuse_analysis(edited, factory, db=None, contract_id="new")
+            
+            assert result["analysis"]["metadata"]["dedup"]["reused_from"] == "original"
+            assert [c["analysis"] for c in result["analysis"]["clauses_analysis"]] == ["nova"]
+        
+        with pytest.raises(ValueError):
+            factory.get_agent("credit_card")
+    
+    @pytest.mark.asyncio
+    async def test_reuse_requires_same_type_and_scrubs_source_data(self, monkeypatch):
+        """Test that another type is never reused and no source party data is copied."""
+        source = "Assinante: Maria Souza, CPF 123.456.789-00, Rua das Flores, 10\n" + self.BODY
+        upload = "Assinante: José Lima\n" + self.BODY
+        prior = {"status": "success", "classification": {"contract_type": "telecom"}, "analysis": {
+            "summary": "Contrato de Maria Souza", "key_findings": ["Titular: Maria Souza"],
+            "recommendations": ["Enviar notificação para maria@exemplo.com"], "risk_level": "Baixo Risco",
+            "clauses_analysis": [{"clause": "CLÁUSULA 1ª - DA CONDIÇÃO 1",
+                                  "analysis": "Cobrança no endereço Rua das Flores, 10"}],
+            "risk_factors": [{"type": "dados", "severity": "low",
+                              "description": "CPF 123.456.789-00 de Maria Souza no cadastro"}],
+        }}
+        index = ContractDedupIndex()
+        index.add("original", source, "telecom")
+        monkeypatch.setattr(index, "refresh", AsyncMock(return_value=0))
+        monkeypatch.setattr(index, "_load_source", AsyncMock(return_value=(prior, source)))
+        factory = AgentFactory(MagicMock(), MagicMock())
+        
+        classify = AsyncMock(return_value={"contract_type": "financeiro", "confidence": 0.9})
+        monkeypatch.setattr(factory.classifier, "classify_contract", classify)
+        assert await index.reuse_analysis(upload, factory, db=None) is None
+        assert index.get_stats()["rejected_other_type"] == 1
+        
+        classify.return_value = {"contract_type": "telecom", "confidence": 0.9}
+        result = await index.reuse_analysis(upload, factory, db=None)
+        
+        copied = str(result)
+        assert result["analysis"]["metadata"]["dedup"]["reanalysed_clauses"] == 0
+        assert "Maria" not in copied and "Flores" not in copied
+        assert "123.456.789-00" not in copied and "maria@exemplo.com" not in copied
+        assert result["analysis"]["risk_level"] == "Baixo Risco"
+    
+    @pytest.mark.asyncio
+    async def test_refresh_pages_through_rows_sharing_a_timestamp(self, monkeypatch):
+        """Test that refresh reads every batch and keeps rows that share the last indexed timestamp."""
+        index = ContractDedupIndex()
+        noon, later = datetime(2024, 5, 1, 12), datetime(2024, 5, 1, 13)
+        rows = [(f"c{n}", self.BODY, "telecom", noon) for n in range(5)]
+        
+        async def fetch_completed(db, after, limit):
+            ordered = sorted(rows, key=lambda row: (row[3], row[0]))
+            return [row for row in ordered if after is None or (row[3], row[0]) > after][:limit]
+        
+        monkeypatch.setattr(index, "_fetch_completed", fetch_completed)
+        
+        assert await index.refresh(None, batch_size=2) == 5
+        rows += [("c5", self.BODY, "telecom", noon), ("c6", self.BODY, "telecom", later)]
+        assert await index.refresh(None, batch_size=2) == 2
+        assert await index.refresh(None, batch_size=2) == 0
+        assert index.get_stats()["indexed_contracts"] == 7
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from app.services.job_broker import SQLiteJobBroker
+
+class TestJobBroker:
+    """Test job distribution and event pub/sub across broker instances."""
+    
+    @pytest.mark.asyncio
+    async def test_workers_share_queue_and_events(self, tmp_path):
+        """Test that another worker takes the job, unacked jobs come back and events cross over."""
+        path = str(tmp_path / "broker.db")
+        web = SQLiteJobBroker(path, poll_interval=0.01, visibility_timeout=0.2)
+        worker = SQLiteJobBroker(path, poll_interval=0.01, visibility_timeout=0.2)
+        received = []
+        await web.start(lambda channel, message: received.append((channel, message)))
+        await worker.start(lambda channel, message: None)
+        
+        await web.enqueue({"job_id": "j1"})
+        delivery = await worker.receive(timeout=1)
+        assert delivery.payload == {"job_id": "j1"} and not delivery.redelivered
+        assert await web.receive(timeout=0.05) is None
+        
+        # Sem ack (worker caiu): volta a ser entregue depois do visibility timeout
+        await asyncio.sleep(0.25)
+        retry = await web.receive(timeout=1)
+        assert retry.redelivered and retry.payload == {"job_id": "j1"}
+        await web.ack(retry)
+        assert await worker.receive(timeout=0.3) is None
+        
+        await web.subscribe("jobs:user:u1")
+        worker.publish("jobs:user:u1", {"type": "job_progress", "progress": 0.5})
+        worker.publish("jobs:user:u2", {"type": "job_progress", "progress": 0.7})
+        await asyncio.sleep(0.2)
+        assert received == [("jobs:user:u1", {"type": "job_progress", "progress": 0.5})]
+        
+        await web.close()
+        await worker.close()
+
+    @pytest.mark.asyncio
+    async def test_extended_delivery_is_not_redelivered(self, tmp_path):
+        """Test that a worker renewing a held job keeps it from another worker past the visibility timeout."""
+        path = str(tmp_path / "broker.db")
+        holder = SQLiteJobBroker(path, poll_interval=0.01, visibility_timeout=0.2)
+        other = SQLiteJobBroker(path, poll_interval=0.01, visibility_timeout=0.2)
+        assert holder.heartbeat_interval == pytest.approx(0.2 / 3)
+
+        await holder.enqueue({"job_id": "j1"})
+        delivery = await holder.receive(timeout=1)
+        for _ in range(5):
+            await asyncio.sleep(holder.heartbeat_interval)
+            await holder.extend([delivery])
+        assert await other.receive(timeout=0.05) is None
+        assert holder.get_stats()["extended"] == 5
+
+        # Sem renovação (worker parado) a entrega expira normalmente
+        await asyncio.sleep(0.25)
+        retry = await other.receive(timeout=1)
+        assert retry.redelivered and retry.id == delivery.id
+
+        await holder.close()
+        await other.close()
@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+from app.services.job_cancellation import CancellationToken, JobCancelled, run_cancellable
+
+class TestJobCancellation:
+    """Test deadlines and cancellation tokens for thread/process work."""
+    
+    @pytest.mark.asyncio
+    async def test_deadline_abandons_thread_work(self):
+        """Test that a stage timeout stops the blocking loop at its next checkpoint."""
+        import threading
+        import time
+        
+        stopped = threading.Event()
+        
+        def blocking_stage(token):
+            try:
+                while True:
+                    token.check()
+                    time.sleep(0.01)
+            finally:
+                stopped.set()
+        
+        token = CancellationToken("deadline-test")
+        with pytest.raises(TimeoutError):
+            async with asyncio.timeout(0.05):
+                await run_cancellable(blocking_stage, token=token)
+        
+        assert token.reason == "abandoned"
+        assert await asyncio.to_thread(stopped.wait, 1.0)
+    
+    def test_pickled_token_sees_cancellation(self):
+        """Test that a token copy sent to a worker process observes cancel()."""
+        import pickle
+        
+        token = CancellationToken("pickle-test")
+        remote = pickle.loads(pickle.dumps(token))
+        remote.check()
+        
+        token.cancel("timeout")
+        with pytest.raises(JobCancelled):
+            remote.check()
+        token.close()
+        assert not remote.cancelled
@@ -0,0 +1,30 @@
+import pytest
+from app.services.job_dedup import JobDedupIndex
+
+class TestJobDedup:
+    """Test content-addressed job deduplication."""
+    
+    @pytest.mark.asyncio
+    async def test_hash_follows_file_bytes_not_names(self, tmp_path):
+        """Test that re-uploads hash alike while other bytes, options or users do not."""
+        first, reupload, other = tmp_path / "a.pdf", tmp_path / "copy.pdf", tmp_path / "b.pdf"
+        first.write_bytes(b"contrato" * 1000)
+        reupload.write_bytes(b"contrato" * 1000)
+        other.write_bytes(b"contrato" * 999)
+        
+        index = JobDedupIndex(max_entries=2)
+        key = await index.input_hash("u1", "contract_analysis", [str(first)], {"lang": "pt"})
+        assert key == await index.input_hash("u1", "contract_analysis", [str(reupload)], {"lang": "pt"})
+        assert key != await index.input_hash("u1", "contract_analysis", [str(other)], {"lang": "pt"})
+        assert key != await index.input_hash("u1", "contract_analysis", [str(first)], None)
+        assert key != await index.input_hash("u2", "contract_analysis", [str(first)], {"lang": "pt"})
+        
+        index.remember(key, "j1")
+        index.remember("k2", "j2")
+        assert index.lookup(key) == "j1"
+        index.remember("k3", "j3")
+        assert index.lookup("k2") is None and index.lookup(key) == "j1"
+        
+        index.record("running")
+        index.record(None)
+        assert index.get_stats()["hit_rate"] == 0.5
@@ -0,0 +1,30 @@
+from app.services.job_eta import StageDurationModel, job_profile
+
+class TestStageDurationModel:
+    """Test ETA prediction from historical stage durations."""
+    
+    def test_predicts_remaining_stages_and_reports_error(self, tmp_path):
+        """Test profile fallback, remaining-time prediction and accuracy tracking."""
+        contract = tmp_path / "contrato.pdf"
+        contract.write_bytes(b"x" * 2048)
+        assert job_profile([str(contract)]) == ("1", "<1MB")
+        assert job_profile(["/remote/a.jpg"] * 6) == ("6-20", "unknown")
+        
+        model = StageDurationModel(alpha=0.5, min_samples=2)
+        for seconds in (2.0, 4.0):
+            model.observe("contract_analysis", ("1", "<1MB"), "ocr_extraction", seconds)
+            model.observe("contract_analysis", ("1", "<1MB"), "agent_analysis", 10 * seconds)
+        assert model.predict("contract_analysis", ("1", "<1MB"), ["ocr_extraction", "agent_analysis"]) == 33.0
+        # Perfil sem histórico usa o do tipo de job; etapa sem histórico não tem previsão
+        assert model.stage_duration("contract_analysis", ("21+", "50MB+"), "ocr_extraction") == 3.0
+        assert model.predict("contract_analysis", ("1", "<1MB"), ["notification"]) is None
+        
+        model.begin("j1", "contract_analysis", ("1", "<1MB"), now=100.0)
+        assert model.remaining("j1", "ocr_extraction", ["agent_analysis"], now=101.0) == 32.0
+        model.stage_finished("j1", "ocr_extraction", now=104.0)
+        model.finish("j1", completed=True, now=133.0)
+        
+        stats = model.get_stats()
+        assert stats["predictions"] == 1 and stats["jobs_evaluated"] == 1
+        assert stats["absolute_error_seconds"]["count"] == 1
+        assert stats["stages"]["ocr_extraction/contract_analysis/1/<1MB"]["count"] == 3
@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from app.services.job_pipeline import PipelineStage, StagePipeline
+
+class TestStagePipeline:
+    """Test the stage-separated job pipeline."""
+    
+    @pytest.mark.asyncio
+    async def test_routes_errors_and_cancellation(self):
+        """Test routing, error propagation and that a cancelled job frees its worker."""
+        async def fetch(item):
+            await asyncio.sleep(10 if item.job_id == "slow" else 0.01)
+        
+        async def analyze(item):
+            if item.job_id == "bad":
+                raise ValueError("boom")
+            item.context["done"] = True
+        
+        pipeline = StagePipeline(
+            [PipelineStage("fetch", fetch, workers=1), PipelineStage("analyze", analyze, workers=1)],
+            queue_size=1
+        )
+        with pytest.raises(TimeoutError):
+            async with asyncio.timeout(0.05):
+                await pipeline.run("slow", ["fetch", "analyze"])
+        
+        results = await asyncio.gather(
+            pipeline.run("ok", ["fetch", "analyze"]),
+            pipeline.run("bad", ["fetch", "analyze"]),
+            pipeline.run("short", ["analyze"]),
+            return_exceptions=True
+        )
+        assert results[0] == {"done": True}
+        assert isinstance(results[1], ValueError)
+        assert results[2] == {"done": True}
+        
+        stages = pipeline.get_stats()["stages"]
+        assert stages["fetch"]["processed"] == 2 and stages["analyze"]["failed"] == 1
+        with pytest.raises(ValueError):
+            await pipeline.run("x", ["missing"])
+        await pipeline.shutdown()
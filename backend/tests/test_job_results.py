@@ -0,0 +1,51 @@
+import pytest
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from unittest.mock import MagicMock
+from app.services.job_results import DiskResultSpill
+from app.services.job_store import MemoryJobStore
+
+@dataclass
+class _StoredJob:
+    id: str
+    user_id: str
+    status: str
+    created_at: str
+    progress: float = 0.0
+    
+    def to_dict(self):
+        return {**asdict(self), "job_type": "contract_analysis", "updated_at": self.created_at}
+
+class TestJobRetention:
+    """Test retention of finished jobs and result spilling."""
+    
+    @pytest.mark.asyncio
+    async def test_purges_only_expired_finished_jobs(self):
+        """Test that purge keeps running and recent jobs and updates the indexes."""
+        store = MemoryJobStore()
+        old_done, old_running = _StoredJob("j1", "u1", "completed", "1"), _StoredJob("j2", "u1", "processing", "2")
+        store.put(old_done)
+        store.put(old_running)
+        cutoff = datetime.utcnow()
+        store.put(_StoredJob("j3", "u2", "completed", "3"))
+        
+        assert await store.purge(cutoff, ["completed", "failed"]) == ["j1"]
+        assert await store.get("j1") is None
+        assert [j.id for j in await store.list_user_jobs("u1")] == ["j2"]
+        assert await store.count_by_status() == {"processing": 1, "completed": 1}
+        assert store.get_stats()["approx_bytes_per_job"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_large_results_spill_and_load_lazily(self, tmp_path):
+        """Test that only results above the threshold leave memory and load back intact."""
+        spill = DiskResultSpill(str(tmp_path), threshold_bytes=1000)
+        small = MagicMock(id="small", result={"ok": True}, result_ref=None)
+        large = MagicMock(id="large", result={"clauses": ["x" * 50] * 100}, result_ref=None)
+        
+        assert not await spill.spill(small) and small.result == {"ok": True}
+        assert await spill.spill(large)
+        assert large.result is None and large.result_ref.endswith("large.json")
+        assert (await spill.load(large))["clauses"][0] == "x" * 50
+        
+        await spill.discard(["large", "small"])
+        assert not (tmp_path / "large.json").exists()
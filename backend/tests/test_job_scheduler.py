@@ -0,0 +1,32 @@
+import asyncio
+import pytest
+from app.services.job_scheduler import FairJobScheduler
+
+class TestFairJobScheduler:
+    """Test the bounded, per-user fair job scheduler."""
+    
+    @pytest.mark.asyncio
+    async def test_round_robin_weighted_by_plan(self):
+        """Test that a large premium batch does not starve a free user."""
+        started = []
+        
+        async def runner(job_id):
+            started.append(job_id)
+            await asyncio.sleep(0)
+        
+        scheduler = FairJobScheduler(runner, max_workers=1)
+        for n in range(1, 7):
+            scheduler.submit(f"p{n}", "enterprise", plan="premium")
+        scheduler.submit("f1", "individual")
+        scheduler.submit("f2", "individual")
+        scheduler.submit("f3", "individual")
+        assert scheduler.cancel("f3")
+        
+        for _ in range(50):
+            await asyncio.sleep(0)
+        await scheduler.shutdown()
+        
+        assert started == ["p1", "p2", "p3", "p4", "f1", "p5", "p6", "f2"]
+        stats = scheduler.get_stats()
+        assert stats["dispatched"] == 8 and stats["cancelled"] == 1
+        assert stats["queue_depth"] == 0 and stats["wait_seconds"]["count"] == 8
@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from dataclasses import asdict, dataclass
+from app.services.job_store import MemoryJobStore, SQLiteJobStore
+
+@dataclass
+class _StoredJob:
+    id: str
+    user_id: str
+    status: str
+    created_at: str
+    progress: float = 0.0
+    
+    def to_dict(self):
+        return {**asdict(self), "job_type": "contract_analysis", "updated_at": self.created_at}
+
+class TestJobStore:
+    """Test the durable async job store."""
+    
+    @staticmethod
+    def load(record):
+        return _StoredJob(**{k: v for k, v in record.items() if k not in ("job_type", "updated_at")})
+    
+    @pytest.mark.asyncio
+    async def test_write_behind_survives_restart(self, tmp_path):
+        """Test that progress updates are batched and a new store instance sees the jobs."""
+        path = str(tmp_path / "jobs.db")
+        store = SQLiteJobStore(path, self.load, flush_interval=60)
+        job = _StoredJob("j1", "u1", "processing", "2024-01-01T00:00:00")
+        for step in range(10):
+            job.progress = step / 10
+            store.put(job)
+        
+        assert await store.get("j1") is job
+        assert store.get_stats()["rows_written"] == 0
+        
+        store.put(_StoredJob("j2", "u1", "completed", "2024-01-02T00:00:00"), urgent=True)
+        await asyncio.sleep(0.05)
+        assert store.get_stats()["flushes"] == 1
+        assert store.get_stats()["rows_written"] == 2
+        
+        restarted = SQLiteJobStore(path, self.load, flush_interval=60)
+        assert (await restarted.get("j1")).progress == 0.9
+        assert [j.id for j in await restarted.list_user_jobs("u1", limit=1)] == ["j2"]
+        assert await restarted.count_by_status() == {"processing": 1, "completed": 1}
+
+class TestJobIndex:
+    """Test the per-user index and status counters of the in-memory job store."""
+    
+    @pytest.mark.asyncio
+    async def test_counters_follow_transitions(self):
+        """Test that counts and user listings track status changes without scans."""
+        store = MemoryJobStore()
+        jobs = [_StoredJob(f"j{n}", "u1" if n % 2 else "u2", "pending", f"2024-01-0{n + 1}") for n in range(6)]
+        for job in jobs:
+            store.put(job)
+        for job in jobs[:4]:
+            job.status = "processing"
+            store.put(job)
+            store.put(job)
+        jobs[1].status = "completed"
+        store.put(jobs[1])
+        
+        assert await store.count_by_status() == {"pending": 2, "processing": 3, "completed": 1}
+        assert [j.id for j in await store.list_user_jobs("u1")] == ["j1", "j3", "j5"]
+        assert [j.id for j in await store.list_user_jobs("u1", limit=2)] == ["j3", "j5"]
+        assert [j.id for j in await store.list_user_jobs("u1", status="processing")] == ["j3"]
+        assert await store.list_user_jobs("nobody") == []
@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import AsyncMock
+from app.services.llm_cache import LLMResponseCache
+
+class TestLLMResponseCache:
+    """Test LLM response caching by prompt fingerprint."""
+    
+    @pytest.mark.asyncio
+    async def test_normalized_prompt_hits_cache(self):
+        """Test that whitespace-only prompt differences share one LLM call."""
+        cache = LLMResponseCache(max_entries=10)
+        factory = AsyncMock(return_value='{"ok": true}')
+        
+        first = await cache.get_or_create("model", 0.1, "Analise  o\n contrato", factory, agent="locacao")
+        second = await cache.get_or_create("model", 0.1, "Analise o contrato", factory, agent="locacao")
+        
+        assert first == second == '{"ok": true}'
+        assert factory.await_count == 1
+        assert cache.get_stats()["agents"]["locacao"]["hit_rate"] == 0.5
+    
+    @pytest.mark.asyncio
+    async def test_high_temperature_bypasses_cache(self):
+        """Test that non-deterministic requests are never cached."""
+        cache = LLMResponseCache(max_entries=10)
+        factory = AsyncMock(return_value="texto")
+        
+        await cache.get_or_create("model", 0.7, "prompt", factory)
+        await cache.get_or_create("model", 0.7, "prompt", factory)
+        
+        assert factory.await_count == 2
+        assert cache.get_stats()["memory_entries"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = LLMResponseCache(max_entries=2)
+        for prompt in ["a", "b"]:
+            await cache.set("model", 0.1, prompt, prompt.upper())
+        await cache.get("model", 0.1, "a")
+        await cache.set("model", 0.1, "c", "C")
+        
+        assert await cache.get("model", 0.1, "a") == "A"
+        assert await cache.get("model", 0.1, "b") is None
+    
+    @pytest.mark.asyncio
+    async def test_reply_from_other_model_is_stored_under_that_model(self):
+        """Test that a reply answered by another model never fills the requested model's entry."""
+        cache = LLMResponseCache(max_entries=10)
+        factory = AsyncMock(return_value=("texto", "fallback"))
+        
+        assert await cache.get_or_create("model", 0.1, "prompt", factory) == "texto"
+        
+        assert await cache.get("model", 0.1, "prompt") is None
+        assert await cache.get("fallback", 0.1, "prompt") == "texto"
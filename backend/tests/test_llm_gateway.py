@@ -0,0 +1,160 @@
+import asyncio
+import pytest
+import time
+from unittest.mock import MagicMock
+from app.agents.rental_agent import RentalAgent
+from app.agents.telecom_agent import TelecomAgent
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_gateway import FakeLLMBackend, LLMDeadlineExceeded, LLMGateway
+
+class TestLLMGateway:
+    """Test the pooled LLM gateway against the fake backend."""
+    
+    @pytest.mark.asyncio
+    async def test_per_model_concurrency_limit(self):
+        """Test that in-flight requests never exceed the per-model limit."""
+        backend = FakeLLMBackend(latency=0.01)
+        gateway = LLMGateway(backend, max_concurrency=10, max_concurrency_per_model=2)
+        
+        await asyncio.gather(*[gateway.complete(f"prompt {i}", model="m") for i in range(8)])
+        
+        assert backend.max_in_flight == 2
+        assert gateway.get_stats()["latency_seconds"]["count"] == 8
+    
+    @pytest.mark.asyncio
+    async def test_retries_rate_limited_requests(self):
+        """Test that 429s are retried until the request succeeds."""
+        backend = FakeLLMBackend(response_text="ok", failures=2)
+        gateway = LLMGateway(backend, retry_base_delay=0.001, retry_max_delay=0.002)
+        
+        response = await gateway.complete("prompt")
+        
+        assert response.content[0].text == "ok"
+        assert gateway.counters["retries"] == 2
+        assert gateway.errors_by_status["429"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_deadline_exceeded(self):
+        """Test that slow upstream calls fail at the request deadline."""
+        gateway = LLMGateway(FakeLLMBackend(latency=1.0), request_timeout=0.05)
+        
+        with pytest.raises(LLMDeadlineExceeded):
+            await gateway.complete("prompt")
+        assert gateway.counters["deadline_exceeded"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_short_prefix_is_not_cached(self):
+        """Test that a prefix below the provider's minimum is billed as regular input."""
+        backend = FakeLLMBackend()
+        gateway = LLMGateway(backend)
+        
+        for _ in range(2):
+            await gateway.complete("prompt", system="Prefixo curto demais para o cache.", agent="locacao")
+        
+        stats = gateway.get_stats()["prompt_cache_by_agent"]["locacao"]
+        assert stats["cache_read_input_tokens"] == stats["cache_creation_input_tokens"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_saturated_model_does_not_block_other_models(self):
+        """Test that requests queued for a busy model do not hold global slots."""
+        backend = FakeLLMBackend(latencies=[0.3, 0.01, 0.01])
+        gateway = LLMGateway(backend, max_concurrency=2, max_concurrency_per_model=1)
+        
+        running = asyncio.ensure_future(gateway.complete("a", model="m"))
+        queued = asyncio.ensure_future(gateway.complete("b", model="m"))
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(gateway.complete("c", model="n"), 0.1)
+        
+        assert not running.done() and not queued.done()
+        await asyncio.gather(running, queued)
+    
+    @pytest.mark.asyncio
+    async def test_expired_deadline_skips_backend_call(self):
+        """Test that no backend call is created once the deadline has passed."""
+        gateway = LLMGateway(FakeLLMBackend())
+        call = MagicMock()
+        
+        with pytest.raises(LLMDeadlineExceeded):
+            await gateway._call_backend("m", call, time.monotonic() - 1)
+        call.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_stream_through_agent(self):
+        """Test that agents stream gateway deltas and report time-to-first-token."""
+        backend = FakeLLMBackend(response_text="Resposta sobre fidelidade em partes.", chunk_size=8)
+        gateway = LLMGateway(backend)
+        agent = TelecomAgent(gateway.as_client(), None)
+        
+        deltas = [delta async for delta in agent.stream_response("Posso cancelar a qualquer momento?")]
+        
+        assert len(deltas) > 1
+        assert "".join(deltas) == "Resposta sobre fidelidade em partes."
+        stats = gateway.get_stats()
+        assert stats["time_to_first_token_seconds"]["count"] == 1
+        assert stats["time_to_first_token_by_agent"][agent.agent_type]["count"] == 1
+
+class TestHedgedRequests:
+    """Test hedged LLM requests and the analysis deadline."""
+    
+    LOW_RISK = '{"summary": "ok", "risk_factors": [{"type": "prazo", "severity": "low"}], "confidence_score": 0.9}'
+    
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged(self):
+        """Test that a request slower than the latency percentile is duplicated."""
+        backend = FakeLLMBackend(response_text="ok", latencies=[1.0, 0.01])
+        gateway = LLMGateway(backend, hedge_min_samples=5, hedge_min_delay=0.02, hedge_model="fallback")
+        gateway.recent_latency["m"].extend([0.01] * 5)
+        
+        response = await gateway.complete_hedged("prompt", model="m")
+        
+        assert response.model == "fallback"
+        assert [call["model"] for call in backend.calls] == ["m", "fallback"]
+        hedging = gateway.get_stats()["hedging"]
+        assert hedging["hedge_rate"] == 1.0 and hedging["hedge_wins"] == 1
+        assert hedging["hedged_latency_seconds"]["sum"] < 0.5
+        assert gateway.counters["requests"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_queue_wait_does_not_trigger_hedge(self):
+        """Test that time spent waiting for a model slot does not count towards the hedge delay."""
+        backend = FakeLLMBackend(response_text="ok", latencies=[0.2, 0.01])
+        gateway = LLMGateway(backend, max_concurrency_per_model=1, hedge_min_samples=5,
+                             hedge_min_delay=0.05, hedge_model="fallback")
+        gateway.recent_latency["m"].extend([0.01] * 5)
+        
+        holder = asyncio.ensure_future(gateway.complete("holder", model="m"))
+        await asyncio.sleep(0)
+        response = await gateway.complete_hedged("prompt", model="m")
+        await holder
+        
+        assert response.model == "m"
+        assert [call["model"] for call in backend.calls] == ["m", "m"]
+        assert gateway.counters["hedges_fired"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_hedge_reply_is_cached_under_fallback_model(self, monkeypatch):
+        """Test that a reply won by the fallback model is not served as the primary model's answer."""
+        cache = LLMResponseCache(max_entries=10)
+        monkeypatch.setattr("app.agents.base_agent.llm_cache", cache)
+        monkeypatch.setattr("app.agents.base_agent.settings.LLM_HEDGING_ENABLED", True)
+        backend = FakeLLMBackend(response_text="ok", latencies=[1.0, 0.01])
+        gateway = LLMGateway(backend, hedge_min_samples=5, hedge_min_delay=0.02, hedge_model="fallback")
+        gateway.recent_latency["m"].extend([0.01] * 5)
+        agent = RentalAgent(gateway.as_client(), MagicMock())
+        
+        assert await agent._complete("prompt", model="m") == "ok"
+        
+        assert await cache.get("m", 0.1, "prompt") is None
+        assert await cache.get("fallback", 0.1, "prompt") == "ok"
+    
+    @pytest.mark.asyncio
+    async def test_deadline_falls_back_to_basic_analysis(self, monkeypatch):
+        """Test that an analysis past its hard deadline returns the fallback analysis."""
+        monkeypatch.setattr("app.agents.base_agent.settings.LLM_ANALYSIS_DEADLINE_SECONDS", 0.05)
+        backend = FakeLLMBackend(response_text=self.LOW_RISK, latency=1.0)
+        agent = RentalAgent(LLMGateway(backend).as_client(), MagicMock())
+        
+        result = await agent.analyze_contract("Locação do imóvel da Rua dos Cedros, 60, com multa.")
+        
+        assert result.confidence_score == 0.3
+        assert len(backend.calls) == 1
@@ -0,0 +1,41 @@
+from app.services.rule_engine import Rule, RuleEngine, RuleSet
+
+class TestRuleEngine:
+    """Test the compiled rule engine shared by the rule-based scanners."""
+    
+    def test_keyword_and_pattern_spans(self):
+        """Test overlapping keywords, word boundaries, case and exclusive patterns."""
+        engine = RuleEngine()
+        engine.register(RuleSet("test", [
+            Rule("pf", keywords=("pessoa física",)),
+            Rule("contratante_pf", keywords=("contratante pessoa física",)),
+            Rule("multa", keywords=("multa",), whole_word=False),
+            Rule("latim", keywords=("ipso facto",), case_sensitive=True),
+            Rule("cnpj", pattern=r"\d{14}"),
+            Rule("cpf", pattern=r"\d{11}"),
+        ]))
+        
+        text = "O CONTRATANTE  Pessoa Física paga MULTAS. Ipso facto, ipso facto. Doc 11222333000181"
+        spans = {(m.rule_id, m.text) for m in engine.scan(text, "test")}
+        
+        assert spans == {
+            ("contratante_pf", "CONTRATANTE  Pessoa Física"),
+            ("pf", "Pessoa Física"),
+            ("multa", "MULTA"),
+            ("latim", "ipso facto"),
+            ("cnpj", "11222333000181"),
+        }
+    
+    def test_entity_classifier_uses_single_scan(self):
+        """Test entity classification on top of the engine."""
+        from app.agents.entity_classifier import EntityClassifier
+        
+        info = EntityClassifier().identify_entities(
+            "A EMPRESA ALFA LTDA., CNPJ nº 12.345.678/0001-90, presta serviços ao consumidor "
+            "João, CPF 123.456.789-00, em relação de consumo."
+        )
+        
+        assert info.type == "mixed"
+        assert info.party_relationship == "b2c"
+        documents = {e["text"] for e in info.identified_entities if e["is_document_number"]}
+        assert documents == {"CNPJ nº 12.345.678/0001-90", "CPF 123.456.789-00"}
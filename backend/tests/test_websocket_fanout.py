@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from app.services.websocket_fanout import WebSocketFanout
+
+class TestWebSocketFanout:
+    """Test per-connection queues for job notifications."""
+    
+    class FakeSocket:
+        def __init__(self, delay=0.0):
+            self.delay = delay
+            self.sent = []
+            self.close_code = None
+        
+        async def send_json(self, message):
+            await asyncio.sleep(self.delay)
+            self.sent.append(message)
+        
+        async def close(self, code=1000):
+            self.close_code = code
+    
+    @pytest.mark.asyncio
+    async def test_coalesces_progress_and_drops_slow_consumer(self):
+        """Test latest-wins progress, ordered status events and that a stalled client is dropped."""
+        fanout = WebSocketFanout(progress_per_second=10, send_timeout=0.05)
+        fast, stalled = self.FakeSocket(), self.FakeSocket(delay=10)
+        fanout.register("u1", fast)
+        fanout.register("u1", stalled)
+        
+        for progress in range(50):
+            fanout.publish("u1", {"type": "job_progress", "job_id": "j1", "progress": progress})
+            await asyncio.sleep(0.001)
+        assert len(fast.sent) < 10
+        await asyncio.sleep(0.15)
+        assert fast.sent[-1]["progress"] == 49
+        
+        fanout.publish("u1", {"type": "job_progress", "job_id": "j1", "progress": 100})
+        fanout.publish("u1", {"type": "job_completed", "job_id": "j1"})
+        await asyncio.sleep(0.05)
+        assert [m.get("progress") for m in fast.sent[-2:]] == [100, None]
+        assert stalled.close_code == 1013 and stalled.sent == []
+        
+        stats = fanout.get_stats()
+        assert stats["connections"] == 1 and stats["dropped_slow_consumers"] == 1
+        assert stats["coalesced"] >= 40 and stats["send_timeouts"] == 1
+        await fanout.unregister("u1", fast)